@@ -1,10 +1,15 @@
 import logging
-from typing import List, Dict, Any, Optional
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Iterator, Optional
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import ConnectionError, RequestError
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PIT_KEEP_ALIVE = "2m"
+
 
 class ElasticsearchStorage:
     def __init__(self, hosts: str, username: str = "", password: str = ""):
@@ -40,6 +45,15 @@ class ElasticsearchStorage:
             self.client.close()
         logger.info("Elasticsearch连接已关闭")
 
+    def is_healthy(self) -> bool:
+        if self.client is None:
+            return False
+        try:
+            return bool(self.client.ping())
+        except Exception as e:
+            logger.warning(f"Elasticsearch健康检查失败: {e}")
+            return False
+
     def _extract_id(self, document: Dict[str, Any]) -> Optional[str]:
         if '_id' in document:
             doc_id = document.pop('_id')
@@ -101,56 +115,175 @@ class ElasticsearchStorage:
             logger.error(f"Elasticsearch批量操作失败: {e}")
             raise
 
-    def query_documents(self, index_name: str, query: Dict[str, Any], batch_size: int = 0) -> List[Dict[str, Any]]:
+    def _hit_to_document(self, hit: Dict[str, Any]) -> Dict[str, Any]:
+        doc = dict(hit.get('_source') or {})
+        if '_id' in hit:
+            doc['_id'] = hit['_id']
+        return doc
+
+    def _iter_slice(
+        self,
+        pit_id: str,
+        query: Dict[str, Any],
+        page_size: int,
+        source_fields: Optional[List[str]],
+        keep_alive: str,
+        slice_spec: Optional[Dict[str, int]] = None,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """在 PIT 快照上按 _shard_doc 排序逐页 search_after。"""
+        search_after = None
+        while True:
+            params: Dict[str, Any] = {
+                "pit": {"id": pit_id, "keep_alive": keep_alive},
+                "query": query,
+                "size": page_size,
+                "sort": [{"_shard_doc": "asc"}],
+                "track_total_hits": False,
+            }
+            if source_fields is not None:
+                params["source"] = source_fields
+            if slice_spec is not None:
+                params["slice"] = slice_spec
+            if search_after is not None:
+                params["search_after"] = search_after
+
+            response = self.client.search(**params)
+            pit_id = response.get('pit_id') or pit_id
+            hits = response['hits']['hits']
+            if not hits:
+                return
+            yield [self._hit_to_document(hit) for hit in hits]
+            if len(hits) < page_size:
+                return
+            search_after = hits[-1]['sort']
+
+    def _iter_slices_parallel(
+        self,
+        pit_id: str,
+        query: Dict[str, Any],
+        page_size: int,
+        source_fields: Optional[List[str]],
+        keep_alive: str,
+        slices: int,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """每个 slice 一个线程并行翻页，经有界队列汇总，页的先后顺序不固定。"""
+        pages: queue.Queue = queue.Queue(maxsize=slices * 2)
+        stop = threading.Event()
+        finished = object()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def read_slice(slice_id: int):
+            try:
+                for page in self._iter_slice(
+                    pit_id,
+                    query,
+                    page_size,
+                    source_fields,
+                    keep_alive,
+                    {"id": slice_id, "max": slices},
+                ):
+                    if not put(page):
+                        return
+                put(finished)
+            except BaseException as e:
+                put(e)
+
+        with ThreadPoolExecutor(max_workers=slices) as executor:
+            for slice_id in range(slices):
+                executor.submit(read_slice, slice_id)
+            try:
+                remaining = slices
+                while remaining:
+                    item = pages.get()
+                    if item is finished:
+                        remaining -= 1
+                    elif isinstance(item, BaseException):
+                        raise item
+                    else:
+                        yield item
+            finally:
+                stop.set()
+
+    def iter_documents(
+        self,
+        index_name: str,
+        query: Dict[str, Any],
+        page_size: int = 1000,
+        limit: int = 0,
+        source_fields: Optional[List[str]] = None,
+        slices: int = 1,
+        keep_alive: str = DEFAULT_PIT_KEEP_ALIVE,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """基于 PIT + search_after 按页导出索引，slices > 1 时分片并行读取。"""
         if not self.client:
             self.connect()
 
         try:
-            search_params = {
-                "index": index_name,
-                "body": {
-                    "query": query
-                }
-            }
-            
-            if batch_size > 0:
-                search_params["size"] = batch_size
-            
-            response = self.client.search(**search_params)
-            
-            documents = []
-            for hit in response['hits']['hits']:
-                doc = hit['_source'].copy()
-                if '_id' in hit:
-                    doc['_id'] = hit['_id']
-                documents.append(doc)
-            
-            if batch_size <= 0:
-                total = response['hits']['total']['value'] if isinstance(response['hits']['total'], dict) else response['hits']['total']
-                scroll_size = len(documents)
-                
-                while scroll_size > 0 and len(documents) < total:
-                    scroll_id = response.get('_scroll_id')
-                    if not scroll_id:
-                        break
-                    
-                    response = self.client.scroll(
-                        scroll_id=scroll_id,
-                        scroll='2m'
-                    )
-                    
-                    scroll_size = len(response['hits']['hits'])
-                    for hit in response['hits']['hits']:
-                        doc = hit['_source'].copy()
-                        if '_id' in hit:
-                            doc['_id'] = hit['_id']
-                        documents.append(doc)
-            
-            return documents
+            pit_id = self.client.open_point_in_time(
+                index=index_name,
+                keep_alive=keep_alive,
+            )['id']
+        except RequestError as e:
+            logger.error(f"Elasticsearch打开PIT失败: {e}")
+            raise
+
+        if slices > 1:
+            pages = self._iter_slices_parallel(
+                pit_id, query, page_size, source_fields, keep_alive, slices,
+            )
+        else:
+            pages = self._iter_slice(
+                pit_id, query, page_size, source_fields, keep_alive,
+            )
+        try:
+            remaining = limit if limit > 0 else None
+            for page in pages:
+                if remaining is not None:
+                    page = page[:remaining]
+                    remaining -= len(page)
+                if page:
+                    yield page
+                if remaining == 0:
+                    break
         except RequestError as e:
             logger.error(f"Elasticsearch查询文档失败: {e}")
             raise
         except Exception as e:
             logger.error(f"Elasticsearch查询操作失败: {e}")
             raise
+        finally:
+            pages.close()
+            try:
+                self.client.close_point_in_time(id=pit_id)
+            except Exception as e:
+                logger.warning(f"Elasticsearch关闭PIT失败: {e}")
 
+    def query_documents(
+        self,
+        index_name: str,
+        query: Dict[str, Any],
+        batch_size: int = 0,
+        source_fields: Optional[List[str]] = None,
+        slices: int = 1,
+        page_size: int = 1000,
+    ) -> List[Dict[str, Any]]:
+        return [
+            doc
+            for page in self.iter_documents(
+                index_name,
+                query,
+                page_size,
+                limit=batch_size,
+                source_fields=source_fields,
+                slices=slices,
+            )
+            for doc in page
+        ]
@@ -1,12 +1,34 @@
+import io
 import json
 import logging
-from typing import List, Dict, Any
+import os
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from pathlib import Path
 
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 仅 .zst 文件需要
+    zstandard = None
+
 logger = logging.getLogger(__name__)
 
+INDEX_SUFFIX = '.idx'
+ZSTD_SUFFIX = '.zst'
+INDEX_STRIDE = 1000
+
+# (首条记录序号, 记录数, 起始字节偏移, 结束字节偏移)
+IndexEntry = Tuple[int, int, int, int]
+
 
 class FileStorage:
+    """以 NDJSON 格式存储文档，每行一条，追加写入不重写已有内容。
+
+    路径以 .zst 结尾时每次追加写入一个独立的 zstd 帧。旁路索引
+    <文件名>.idx 为每次追加记录一行首条记录序号和字节偏移，skip 时
+    直接定位到最近的记录块；索引与数据文件大小不一致时按数据重建。
+    旧版 JSON 数组文件在首次访问时一次性迁移为 NDJSON。
+    """
+
     def __init__(self):
         pass
 
@@ -23,69 +45,244 @@ class FileStorage:
             directory.mkdir(parents=True, exist_ok=True)
             logger.info(f"创建目录: {directory}")
 
+    def _index_path(self, file_path: Path) -> Path:
+        return file_path.with_name(file_path.name + INDEX_SUFFIX)
+
+    def _is_compressed(self, file_path: Path) -> bool:
+        if file_path.suffix != ZSTD_SUFFIX:
+            return False
+        if zstandard is None:
+            raise RuntimeError("读写 .zst 文件需要安装 zstandard")
+        return True
+
+    def _encode(self, file_path: Path, documents: List[Dict[str, Any]]) -> bytes:
+        data = b''.join(
+            json.dumps(doc, ensure_ascii=False).encode('utf-8') + b'\n'
+            for doc in documents
+        )
+        if self._is_compressed(file_path):
+            return zstandard.ZstdCompressor().compress(data)
+        return data
+
+    def _open_lines(self, file_path: Path, offset: int = 0):
+        f = open(file_path, 'rb')
+        f.seek(offset)
+        if self._is_compressed(file_path):
+            reader = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True)
+            return io.BufferedReader(reader)
+        return f
+
+    def _write_index(self, index_path: Path, entries: List[IndexEntry]):
+        tmp_path = index_path.with_name(index_path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.writelines(f"{first} {count} {start} {end}\n" for first, count, start, end in entries)
+        os.replace(tmp_path, index_path)
+
+    def _read_index(self, index_path: Path) -> List[IndexEntry]:
+        entries = []
+        with open(index_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) == 4:
+                    entries.append(tuple(int(part) for part in parts))
+        return entries
+
+    def _last_index_entry(self, index_path: Path) -> Optional[IndexEntry]:
+        with open(index_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 4096))
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            parts = line.split()
+            if len(parts) == 4:
+                return tuple(int(part) for part in parts)
+        return None
+
+    def _rebuild_index(self, file_path: Path) -> List[IndexEntry]:
+        """按数据文件重建索引：明文每 INDEX_STRIDE 行一项，压缩文件整体一项。"""
+        entries: List[IndexEntry] = []
+        size = file_path.stat().st_size if file_path.exists() else 0
+        if size and self._is_compressed(file_path):
+            with self._open_lines(file_path) as f:
+                count = sum(1 for line in f if line.strip())
+            entries.append((0, count, 0, size))
+        elif size:
+            with open(file_path, 'rb') as f:
+                first = count = start = offset = 0
+                for line in f:
+                    offset += len(line)
+                    if not line.strip():
+                        continue
+                    count += 1
+                    if count == INDEX_STRIDE:
+                        entries.append((first, count, start, offset))
+                        first, count, start = first + count, 0, offset
+                if count or start < offset:
+                    entries.append((first, count, start, offset))
+        self._write_index(self._index_path(file_path), entries)
+        logger.info(f"重建文件索引: {file_path}, 共 {len(entries)} 项")
+        return entries
+
+    def _load_index(self, file_path: Path) -> List[IndexEntry]:
+        index_path = self._index_path(file_path)
+        size = file_path.stat().st_size if file_path.exists() else 0
+        if index_path.exists():
+            entries = self._read_index(index_path)
+            if (entries[-1][3] if entries else 0) == size:
+                return entries
+        return self._rebuild_index(file_path)
+
+    def _next_record(self, file_path: Path) -> int:
+        """返回下一条追加记录的序号，索引失效时先重建。"""
+        index_path = self._index_path(file_path)
+        size = file_path.stat().st_size if file_path.exists() else 0
+        last = self._last_index_entry(index_path) if index_path.exists() else None
+        if (last[3] if last else 0) != size:
+            entries = self._rebuild_index(file_path)
+            last = entries[-1] if entries else None
+        return last[0] + last[1] if last else 0
+
+    def _is_legacy_format(self, file_path: Path) -> bool:
+        if file_path.suffix == ZSTD_SUFFIX or not file_path.exists():
+            return False
+        with open(file_path, 'rb') as f:
+            first_line = f.readline()
+            while first_line and not first_line.strip():
+                first_line = f.readline()
+        head = first_line.lstrip()
+        if head.startswith(b'['):
+            return True
+        if not head.startswith(b'{'):
+            return False
+        try:
+            json.loads(head)
+            return False
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            # 旧版 indent=4 写出的单个对象跨越多行。
+            return True
+
+    def migrate_legacy_file(self, file_path: str) -> bool:
+        """把旧版 JSON 数组文件一次性转换为 NDJSON，已是新格式时返回 False。"""
+        normalized_path = self._normalize_path(file_path)
+        if not self._is_legacy_format(normalized_path):
+            return False
+        with open(normalized_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if not isinstance(data, list):
+            data = [data]
+        self._write(normalized_path, data)
+        logger.info(f"已将旧版 JSON 数组文件迁移为 NDJSON: {normalized_path}, 共 {len(data)} 条记录")
+        return True
+
+    def _write(self, file_path: Path, documents: List[Dict[str, Any]]):
+        """整体重写文件；明文按 INDEX_STRIDE 条分块写入索引，压缩文件每块一帧。"""
+        entries: List[IndexEntry] = []
+        tmp_path = file_path.with_name(file_path.name + '.tmp')
+        with open(tmp_path, 'wb') as f:
+            for first in range(0, len(documents), INDEX_STRIDE):
+                chunk = documents[first:first + INDEX_STRIDE]
+                start = f.tell()
+                f.write(self._encode(file_path, chunk))
+                entries.append((first, len(chunk), start, f.tell()))
+        os.replace(tmp_path, file_path)
+        self._write_index(self._index_path(file_path), entries)
+
     def write_documents(self, file_path: str, documents: List[Dict[str, Any]]):
         try:
             normalized_path = self._normalize_path(file_path)
             self._ensure_directory(normalized_path)
-            
-            with open(normalized_path, 'w', encoding='utf-8') as f:
-                json.dump(documents, f, ensure_ascii=False, indent=4)
-            
+            self._write(normalized_path, documents)
             logger.info(f"写入文件成功: {normalized_path}, 共 {len(documents)} 条记录")
         except Exception as e:
             logger.error(f"写入文件失败: {e}")
             raise
 
     def append_documents(self, file_path: str, documents: List[Dict[str, Any]]):
+        if not documents:
+            return
         try:
             normalized_path = self._normalize_path(file_path)
             self._ensure_directory(normalized_path)
-            
-            existing_data = []
-            if normalized_path.exists():
-                try:
-                    with open(normalized_path, 'r', encoding='utf-8') as f:
-                        existing_data = json.load(f)
-                        if not isinstance(existing_data, list):
-                            existing_data = [existing_data]
-                except (json.JSONDecodeError, ValueError):
-                    existing_data = []
-            
-            existing_data.extend(documents)
-            
-            with open(normalized_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, ensure_ascii=False, indent=4)
-            
+            self.migrate_legacy_file(str(normalized_path))
+
+            first = self._next_record(normalized_path)
+            data = self._encode(normalized_path, documents)
+            with open(normalized_path, 'ab') as f:
+                start = f.tell()
+                f.write(data)
+                end = f.tell()
+            with open(self._index_path(normalized_path), 'a', encoding='utf-8') as f:
+                f.write(f"{first} {len(documents)} {start} {end}\n")
+
             logger.info(f"追加文件成功: {normalized_path}, 新增 {len(documents)} 条记录")
         except Exception as e:
             logger.error(f"追加文件失败: {e}")
             raise
 
-    def query_documents(self, file_path: str, filter_func=None, batch_size: int = 0) -> List[Dict[str, Any]]:
+    def iter_documents(
+        self,
+        file_path: str,
+        filter_func=None,
+        page_size: int = 1000,
+        limit: int = 0,
+        skip: int = 0,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """逐行流式读取，按页返回；skip 按原始记录计数并借助索引定位。"""
         try:
             normalized_path = self._normalize_path(file_path)
-            
+
             if not normalized_path.exists():
                 logger.warning(f"文件不存在: {normalized_path}")
-                return []
-            
-            with open(normalized_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                if not isinstance(data, list):
-                    data = [data]
-            
-            documents = data
-            if filter_func:
-                documents = [doc for doc in documents if filter_func(doc)]
-            
-            if batch_size > 0 and len(documents) > batch_size:
-                documents = documents[:batch_size]
-            
-            return documents
-        except (json.JSONDecodeError, ValueError) as e:
-            logger.error(f"文件JSON解析失败: {e}")
-            raise
+                return
+            self.migrate_legacy_file(str(normalized_path))
+
+            offset = 0
+            to_skip = skip
+            if skip > 0:
+                for first, count, start, end in self._load_index(normalized_path):
+                    if first > skip:
+                        break
+                    offset, to_skip = start, skip - first
+
+            remaining = limit if limit > 0 else None
+            page = []
+            with self._open_lines(normalized_path, offset) as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    if to_skip > 0:
+                        to_skip -= 1
+                        continue
+                    try:
+                        doc = json.loads(line)
+                    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                        logger.warning(f"文件 {normalized_path} 存在无法解析的记录: {e}")
+                        continue
+                    if filter_func and not filter_func(doc):
+                        continue
+                    page.append(doc)
+                    if remaining is not None:
+                        remaining -= 1
+                    if len(page) >= page_size or remaining == 0:
+                        yield page
+                        page = []
+                    if remaining == 0:
+                        return
+            if page:
+                yield page
         except Exception as e:
             logger.error(f"读取文件失败: {e}")
             raise
 
+    def query_documents(
+        self,
+        file_path: str,
+        filter_func=None,
+        batch_size: int = 0,
+        skip: int = 0,
+    ) -> List[Dict[str, Any]]:
+        return [
+            doc
+            for page in self.iter_documents(file_path, filter_func, limit=batch_size, skip=skip)
+            for doc in page
+        ]
@@ -22,8 +22,9 @@
 # 示例：筛选 snapshot 字段不存在的文档
 #   { "$and": [ { "field": "snapshot", "op": "not_exists" } ] }
 
+import json
 import logging
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -31,8 +32,9 @@ load_dotenv()
 from csi_base_component_sdk import ComponentContext, ComponentFailure, RabbitMQClient
 from mongodb import MongoDBStorage
 from elasticsearch_storage import ElasticsearchStorage
-from redis_storage import RedisStorage
+from redis_storage import VALUE_TYPES as REDIS_VALUE_TYPES, RedisStorage
 from file_storage import FileStorage
+from storage_pool import create_registry
 
 logging.basicConfig(
     level=logging.INFO,
@@ -42,6 +44,14 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 BATCH_SIZE = 100
+DEFAULT_PAGE_SIZE = 1000
+DEFAULT_MEMORY_LIMIT_MB = 64
+
+storage_registry = create_registry({
+    'mongodb': MongoDBStorage,
+    'elasticsearch': ElasticsearchStorage,
+    'redis': RedisStorage,
+})
 
 _CONDITION_OPS = frozenset([
     'eq', 'ne', 'gt', 'lt', 'gte', 'lte', 'in', 'contains', 'exists', 'not_exists',
@@ -79,6 +89,33 @@ def get_redis_config():
     }
 
 
+def get_elasticsearch_read_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """读取 Elasticsearch 导出参数：_source 字段过滤、并行 slice 数和单页条数。"""
+    source_fields = config.get('source_fields')
+    if isinstance(source_fields, str):
+        source_fields = [field for field in source_fields.split(',') if field]
+    slices = int(config.get('slices', 1))
+    page_size = int(config.get('page_size', DEFAULT_PAGE_SIZE))
+    if slices <= 0 or page_size <= 0:
+        raise ComponentFailure("slices 和 page_size 必须大于 0")
+    return {
+        'source_fields': source_fields or None,
+        'slices': slices,
+        'page_size': page_size,
+    }
+
+
+def get_redis_options(config: Dict[str, Any]) -> Dict[str, Any]:
+    """读取 Redis 值类型（string / hash / json）和写入 TTL 秒数。"""
+    value_type = config.get('redis_value_type', 'string')
+    if value_type not in REDIS_VALUE_TYPES:
+        raise ComponentFailure(f"不支持的 Redis 值类型: {value_type}")
+    ttl_seconds = int(config.get('redis_ttl_seconds', 0))
+    if ttl_seconds < 0:
+        raise ComponentFailure("redis_ttl_seconds 不能小于 0")
+    return {'value_type': value_type, 'ttl_seconds': ttl_seconds}
+
+
 def get_input_queues(inputs: Dict[str, Any]) -> List[str]:
     data_in = inputs.get('data_in', {})
     if isinstance(data_in, dict) and data_in.get('type') == 'reference':
@@ -318,6 +355,19 @@ def filter_documents(documents: List[Dict[str, Any]], conditions: Dict[str, Any]
     return documents
 
 
+_STORAGE_CONFIGS = {
+    'mongodb': get_mongodb_config,
+    'elasticsearch': get_elasticsearch_config,
+    'redis': get_redis_config,
+}
+
+
+def _report_storage_failure(target: str):
+    get_config = _STORAGE_CONFIGS.get(target)
+    if get_config is not None:
+        storage_registry.report_failure(target, get_config())
+
+
 def process_messages(
     rabbitmq: RabbitMQClient,
     messages: List[Dict[str, Any]],
@@ -325,7 +375,8 @@ def process_messages(
     target_name: str,
     output_queues: List[str],
     conditions: Dict[str, Any] = None,
-    storage_filter: bool = False
+    storage_filter: bool = False,
+    redis_options: Dict[str, Any] = None,
 ):
     mongodb_config = get_mongodb_config()
     elasticsearch_config = get_elasticsearch_config()
@@ -349,28 +400,16 @@ def process_messages(
         if target == 'rabbitmq':
             pass
         elif target == 'mongodb':
-            storage = MongoDBStorage(**mongodb_config)
-            try:
-                storage.connect()
-                storage.insert_documents(target_name, message_bodies)
-            finally:
-                storage.close()
+            storage = storage_registry.acquire(target, mongodb_config)
+            storage.insert_documents(target_name, message_bodies)
         
         elif target == 'elasticsearch':
-            storage = ElasticsearchStorage(**elasticsearch_config)
-            try:
-                storage.connect()
-                storage.index_documents(target_name, message_bodies)
-            finally:
-                storage.close()
+            storage = storage_registry.acquire(target, elasticsearch_config)
+            storage.index_documents(target_name, message_bodies)
         
         elif target == 'redis':
-            storage = RedisStorage(**redis_config)
-            try:
-                storage.connect()
-                storage.set_documents(target_name, message_bodies)
-            finally:
-                storage.close()
+            storage = storage_registry.acquire(target, redis_config)
+            storage.set_documents(target_name, message_bodies, **(redis_options or {}))
         
         elif target == 'file':
             storage = FileStorage()
@@ -394,6 +433,7 @@ def process_messages(
     
     except Exception as e:
         logger.error(f"批量处理消息失败: {e}")
+        _report_storage_failure(target)
         return 0, len(message_bodies)
 
 
@@ -405,6 +445,9 @@ def read_from_storage(
     batch_size: int = 0,
     include_message_ids: bool = False,
     include_delivery_tags: bool = False,
+    es_read_options: Dict[str, Any] = None,
+    redis_value_type: str = 'string',
+    file_skip: int = 0,
 ) -> (
     List[Dict[str, Any]]
     | tuple[List[Dict[str, Any]], List[str | None]]
@@ -440,36 +483,39 @@ def read_from_storage(
             documents = all_messages
         
         elif target == 'mongodb':
-            storage = MongoDBStorage(**mongodb_config)
-            try:
-                storage.connect()
-                query = build_mongodb_query(conditions)
-                documents = storage.query_documents(target_name, query, batch_size)
-            finally:
-                storage.close()
+            storage = storage_registry.acquire(target, mongodb_config)
+            query = build_mongodb_query(conditions)
+            documents = storage.query_documents(target_name, query, batch_size)
         
         elif target == 'elasticsearch':
-            storage = ElasticsearchStorage(**elasticsearch_config)
-            try:
-                storage.connect()
-                query = build_elasticsearch_query(conditions)
-                documents = storage.query_documents(target_name, query, batch_size)
-            finally:
-                storage.close()
+            storage = storage_registry.acquire(target, elasticsearch_config)
+            query = build_elasticsearch_query(conditions)
+            documents = storage.query_documents(
+                target_name,
+                query,
+                batch_size,
+                **(es_read_options or {}),
+            )
         
         elif target == 'redis':
-            storage = RedisStorage(**redis_config)
-            try:
-                storage.connect()
-                filter_func = None
-                documents = storage.query_documents(target_name, filter_func, batch_size)
-            finally:
-                storage.close()
+            storage = storage_registry.acquire(target, redis_config)
+            filter_func = None
+            documents = storage.query_documents(
+                target_name,
+                filter_func,
+                batch_size,
+                value_type=redis_value_type,
+            )
         
         elif target == 'file':
             storage = FileStorage()
             filter_func = None
-            documents = storage.query_documents(target_name, filter_func, batch_size)
+            documents = storage.query_documents(
+                target_name,
+                filter_func,
+                batch_size,
+                skip=file_skip,
+            )
         
         else:
             logger.warning(f"未知的目标类型: {target}")
@@ -479,6 +525,7 @@ def read_from_storage(
     
     except Exception as e:
         logger.error(f"从存储读取数据失败: {e}")
+        _report_storage_failure(target)
         raise
     
     if include_delivery_tags:
@@ -492,6 +539,156 @@ def read_from_storage(
     return documents
 
 
+def iter_storage_pages(
+    rabbitmq: RabbitMQClient,
+    target: str,
+    target_name: str,
+    conditions: Dict[str, Any] = None,
+    batch_size: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    es_read_options: Dict[str, Any] = None,
+    redis_value_type: str = 'string',
+    file_skip: int = 0,
+) -> Iterator[tuple[List[Dict[str, Any]], List[str | None], List[int]]]:
+    """按页读取目标存储，逐页返回 (文档, 消息 ID, 未确认的 delivery tag)。"""
+    if target == 'rabbitmq':
+        while True:
+            messages = rabbitmq.read_messages(target_name, page_size)
+            if not messages:
+                return
+            yield (
+                [msg['body'] for msg in messages],
+                [msg.get('message_id') for msg in messages],
+                [msg['delivery_tag'] for msg in messages],
+            )
+
+    try:
+        if target == 'mongodb':
+            storage = storage_registry.acquire(target, get_mongodb_config())
+            query = build_mongodb_query(conditions)
+            pages = storage.iter_documents(target_name, query, page_size, batch_size)
+
+        elif target == 'elasticsearch':
+            storage = storage_registry.acquire(target, get_elasticsearch_config())
+            query = build_elasticsearch_query(conditions)
+            options = dict(es_read_options or {})
+            options.pop('page_size', None)
+            pages = storage.iter_documents(
+                target_name,
+                query,
+                page_size,
+                batch_size,
+                **options,
+            )
+
+        elif target == 'redis':
+            storage = storage_registry.acquire(target, get_redis_config())
+            pages = storage.iter_documents(
+                target_name,
+                None,
+                page_size,
+                batch_size,
+                value_type=redis_value_type,
+            )
+
+        elif target == 'file':
+            storage = FileStorage()
+            pages = storage.iter_documents(
+                target_name,
+                None,
+                page_size,
+                batch_size,
+                skip=file_skip,
+            )
+
+        else:
+            logger.warning(f"未知的目标类型: {target}")
+            return
+
+        for page in pages:
+            yield page, [None] * len(page), []
+    except Exception as e:
+        logger.error(f"从存储读取数据失败: {e}")
+        _report_storage_failure(target)
+        raise
+
+
+def _estimate_size(document: Any) -> int:
+    return len(json.dumps(document, ensure_ascii=False, default=str).encode('utf-8'))
+
+
+def stream_from_storage(
+    rabbitmq: RabbitMQClient,
+    target: str,
+    target_name: str,
+    output_queues: List[str],
+    conditions: Dict[str, Any] = None,
+    batch_size: int = 0,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    memory_limit_bytes: int = DEFAULT_MEMORY_LIMIT_MB * 1024 * 1024,
+    es_read_options: Dict[str, Any] = None,
+    redis_value_type: str = 'string',
+    file_skip: int = 0,
+) -> int:
+    """边读边发布存储数据，返回发布的文档数。
+
+    待发布缓冲达到 page_size 条或 memory_limit_bytes 字节即发布一次，
+    首条数据无需等待全量读取完成。RabbitMQ 来源的 delivery tag 在
+    所属页全部发布确认后才 ACK，失败时重新入队尚未确认的消息。
+    """
+    documents: List[Dict[str, Any]] = []
+    message_ids: List[str | None] = []
+    buffered_bytes = 0
+    ready_tags: List[int] = []
+    page_tags: List[int] = []
+    published = 0
+
+    def flush():
+        nonlocal documents, message_ids, buffered_bytes, ready_tags, published
+        if documents and not rabbitmq.publish_messages(
+            output_queues,
+            documents,
+            message_ids=message_ids,
+        ):
+            raise ComponentFailure("数据输出未获得 RabbitMQ 确认")
+        if ready_tags:
+            rabbitmq.ack_all_message(ready_tags)
+        published += len(documents)
+        if documents:
+            logger.info(f"已流式输出 {published} 条数据")
+        documents, message_ids, buffered_bytes, ready_tags = [], [], 0, []
+
+    try:
+        for page, page_message_ids, page_tags in iter_storage_pages(
+            rabbitmq,
+            target,
+            target_name,
+            conditions,
+            batch_size,
+            page_size,
+            es_read_options,
+            redis_value_type,
+            file_skip,
+        ):
+            for document, message_id in zip(page, page_message_ids):
+                documents.append(document)
+                message_ids.append(message_id)
+                buffered_bytes += _estimate_size(document)
+                if len(documents) >= page_size or buffered_bytes >= memory_limit_bytes:
+                    flush()
+            # 整页文档都进入缓冲后才允许确认该页的源消息。
+            ready_tags.extend(page_tags)
+            page_tags = []
+            if not documents and ready_tags:
+                flush()
+        flush()
+    except BaseException:
+        for tag in ready_tags + page_tags:
+            rabbitmq.nack_message(tag, requeue=True)
+        raise
+    return published
+
+
 def run(base_component: ComponentContext) -> dict:
     try:
         if True:
@@ -510,6 +707,10 @@ def run(base_component: ComponentContext) -> dict:
             data_output_queues = get_data_output_queues(outputs)
             conditions = get_conditions_from_inputs(inputs)
             storage_filter = config.get('storage_filter', False)
+            redis_options = get_redis_options(config)
+            file_skip = int(config.get('skip', 0))
+            if file_skip < 0:
+                raise ComponentFailure("skip 不能小于 0")
             
             logger.info(f"目标类型: {target}, 目标名称: {target_name}")
             if input_queues:
@@ -550,7 +751,8 @@ def run(base_component: ComponentContext) -> dict:
                             target_name,
                             direct_output_queues,
                             conditions if conditions else None,
-                            storage_filter
+                            storage_filter,
+                            redis_options,
                         )
                         
                         delivery_tags = [msg['delivery_tag'] for msg in messages]
@@ -572,7 +774,37 @@ def run(base_component: ComponentContext) -> dict:
                             f"已处理 {total_processed} 条消息，成功 {total_success} 条，失败 {total_errors} 条"
                         )
             
-            if data_output_queues:
+            if data_output_queues and config.get('stream_read', False):
+                logger.info("开始流式读取存储数据")
+
+                batch_size = config.get('batch_size', 0)
+                page_size = config.get('page_size', DEFAULT_PAGE_SIZE)
+                memory_limit_mb = config.get('memory_limit_mb', DEFAULT_MEMORY_LIMIT_MB)
+                if page_size <= 0 or memory_limit_mb <= 0:
+                    raise ComponentFailure("page_size 和 memory_limit_mb 必须大于 0")
+
+                query_conditions = conditions if target in ['mongodb', 'elasticsearch'] else None
+                if conditions and query_conditions is None:
+                    logger.info(f"目标类型 {target} 不支持条件查询，将读取全部数据")
+
+                published = stream_from_storage(
+                    base_component.rabbitmq,
+                    target,
+                    target_name,
+                    data_output_queues,
+                    query_conditions,
+                    batch_size if batch_size > 0 else 0,
+                    page_size,
+                    int(memory_limit_mb * 1024 * 1024),
+                    get_elasticsearch_read_options(config),
+                    redis_options['value_type'],
+                    file_skip,
+                )
+                logger.info(f"已将 {published} 条数据输出到队列: {data_output_queues}")
+                total_processed += published
+                total_success += published
+
+            elif data_output_queues:
                 logger.info("开始从存储读取数据")
 
                 batch_size = config.get('batch_size', 0)
@@ -593,6 +825,9 @@ def run(base_component: ComponentContext) -> dict:
                         batch_size if batch_size > 0 else 0,
                         include_message_ids=True,
                         include_delivery_tags=True,
+                        es_read_options=get_elasticsearch_read_options(config),
+                        redis_value_type=redis_options['value_type'],
+                        file_skip=file_skip,
                     )
                     
                     logger.info(f"从存储读取到 {len(documents)} 条数据")
@@ -642,3 +877,6 @@ def run(base_component: ComponentContext) -> dict:
     except Exception as e:
         logger.error(f"程序执行失败: {e}", exc_info=True)
         raise ComponentFailure(f"程序执行失败: {e}") from e
+    finally:
+        # 输入流 EOS 与存储读取均已结束，释放本进程持有的存储连接。
+        storage_registry.close_all()
@@ -1,5 +1,5 @@
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 from urllib.parse import quote_plus
 from pymongo import MongoClient
 from pymongo.errors import ConnectionFailure, OperationFailure
@@ -45,6 +45,16 @@ class MongoDBStorage:
             self.client.close()
         logger.info("MongoDB连接已关闭")
 
+    def is_healthy(self) -> bool:
+        if self.client is None:
+            return False
+        try:
+            self.client.admin.command('ping')
+            return True
+        except Exception as e:
+            logger.warning(f"MongoDB健康检查失败: {e}")
+            return False
+
     def _prepare_document(self, document: Dict[str, Any]) -> Dict[str, Any]:
         doc_copy = document.copy()
         if '_id' in doc_copy:
@@ -91,25 +101,40 @@ class MongoDBStorage:
             logger.error(f"MongoDB批量操作失败: {e}")
             raise
 
-    def query_documents(self, collection_name: str, query: Dict[str, Any], batch_size: int = 0) -> List[Dict[str, Any]]:
+    def _serialize_document(self, doc: Dict[str, Any]) -> Dict[str, Any]:
+        doc_dict = dict(doc)
+        if '_id' in doc_dict:
+            doc_dict['_id'] = str(doc_dict['_id'])
+        return doc_dict
+
+    def iter_documents(
+        self,
+        collection_name: str,
+        query: Dict[str, Any],
+        page_size: int = 1000,
+        limit: int = 0,
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """按页迭代查询结果，游标每次只向服务端取回 page_size 条。"""
         if self.db is None:
             self.connect()
 
         try:
             collection = self.db[collection_name]
-            cursor = collection.find(query)
-            
-            if batch_size > 0:
-                cursor = cursor.limit(batch_size)
-            
-            documents = []
-            for doc in cursor:
-                doc_dict = dict(doc)
-                if '_id' in doc_dict:
-                    doc_dict['_id'] = str(doc_dict['_id'])
-                documents.append(doc_dict)
-            
-            return documents
+            cursor = collection.find(query).batch_size(page_size)
+            if limit > 0:
+                cursor = cursor.limit(limit)
+
+            page = []
+            try:
+                for doc in cursor:
+                    page.append(self._serialize_document(doc))
+                    if len(page) >= page_size:
+                        yield page
+                        page = []
+            finally:
+                cursor.close()
+            if page:
+                yield page
         except OperationFailure as e:
             logger.error(f"MongoDB查询文档失败: {e}")
             raise
@@ -117,3 +142,9 @@ class MongoDBStorage:
             logger.error(f"MongoDB查询操作失败: {e}")
             raise
 
+    def query_documents(self, collection_name: str, query: Dict[str, Any], batch_size: int = 0) -> List[Dict[str, Any]]:
+        return [
+            doc
+            for page in self.iter_documents(collection_name, query, limit=batch_size)
+            for doc in page
+        ]
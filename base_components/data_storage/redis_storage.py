@@ -1,11 +1,14 @@
 import json
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import redis
 from redis.exceptions import ConnectionError, RedisError
 
 logger = logging.getLogger(__name__)
 
+VALUE_TYPES = ('string', 'hash', 'json')
+PIPELINE_SIZE = 1000
+
 
 class RedisStorage:
     def __init__(self, host: str, port: int, password: str = "", db: int = 0):
@@ -38,6 +41,15 @@ class RedisStorage:
             self.client.close()
         logger.info("Redis连接已关闭")
 
+    def is_healthy(self) -> bool:
+        if self.client is None:
+            return False
+        try:
+            return bool(self.client.ping())
+        except Exception as e:
+            logger.warning(f"Redis健康检查失败: {e}")
+            return False
+
     def _build_key(self, key_prefix: str, document: Dict[str, Any]) -> str:
         if '_id' in document:
             doc_id = document['_id']
@@ -52,36 +64,69 @@ class RedisStorage:
     def _serialize_value(self, document: Dict[str, Any]) -> bytes:
         return json.dumps(document, ensure_ascii=False).encode('utf-8')
 
-    def set_document(self, key_prefix: str, document: Dict[str, Any]):
-        if self.client is None:
-            self.connect()
+    def _serialize_hash(self, document: Dict[str, Any]) -> Dict[str, bytes]:
+        # 每个字段单独 JSON 编码，读取时可还原数值和嵌套结构。
+        return {
+            str(field): json.dumps(value, ensure_ascii=False).encode('utf-8')
+            for field, value in document.items()
+        }
 
-        try:
-            key = self._build_key(key_prefix, document)
-            value = self._serialize_value(document)
-            self.client.set(key, value)
-            return key
-        except RedisError as e:
-            logger.error(f"Redis设置文档失败: {e}")
-            raise
-        except Exception as e:
-            logger.error(f"Redis操作失败: {e}")
-            raise
+    def _decode_hash(self, mapping: Dict[bytes, bytes]) -> Dict[str, Any]:
+        document = {}
+        for field, value in mapping.items():
+            text = value.decode('utf-8')
+            try:
+                document[field.decode('utf-8')] = json.loads(text)
+            except json.JSONDecodeError:
+                document[field.decode('utf-8')] = text
+        return document
 
-    def set_documents(self, key_prefix: str, documents: List[Dict[str, Any]]):
+    def _queue_write(self, pipe, key: str, document: Dict[str, Any], value_type: str, ttl_seconds: int):
+        if value_type == 'string':
+            pipe.set(key, self._serialize_value(document), ex=ttl_seconds or None)
+            return
+        if value_type == 'hash':
+            pipe.delete(key)
+            if document:
+                pipe.hset(key, mapping=self._serialize_hash(document))
+        else:
+            pipe.execute_command('JSON.SET', key, '$', self._serialize_value(document))
+        if ttl_seconds:
+            pipe.expire(key, ttl_seconds)
+
+    def set_document(
+        self,
+        key_prefix: str,
+        document: Dict[str, Any],
+        value_type: str = 'string',
+        ttl_seconds: int = 0,
+    ):
+        return self.set_documents(key_prefix, [document], value_type, ttl_seconds)[0]
+
+    def set_documents(
+        self,
+        key_prefix: str,
+        documents: List[Dict[str, Any]],
+        value_type: str = 'string',
+        ttl_seconds: int = 0,
+    ):
+        """非事务管道批量写入，每 PIPELINE_SIZE 条执行一次以限制缓冲。"""
+        if value_type not in VALUE_TYPES:
+            raise ValueError(f"不支持的 Redis 值类型: {value_type}")
         if self.client is None:
             self.connect()
 
         try:
-            pipe = self.client.pipeline()
+            pipe = self.client.pipeline(transaction=False)
             keys = []
-            
+
             for doc in documents:
                 key = self._build_key(key_prefix, doc)
-                value = self._serialize_value(doc)
-                pipe.set(key, value)
+                self._queue_write(pipe, key, doc, value_type, ttl_seconds)
                 keys.append(key)
-            
+                if len(keys) % PIPELINE_SIZE == 0:
+                    pipe.execute()
+
             pipe.execute()
             return keys
         except RedisError as e:
@@ -91,36 +136,83 @@ class RedisStorage:
             logger.error(f"Redis批量操作失败: {e}")
             raise
 
-    def query_documents(self, key_prefix: str, filter_func=None, batch_size: int = 0) -> List[Dict[str, Any]]:
+    def _read_values(self, keys: List[bytes], value_type: str) -> List[Any]:
+        """一次往返读取一批键：字符串用 MGET，hash / JSON 用管道。"""
+        if value_type == 'string':
+            return self.client.mget(keys)
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            if value_type == 'hash':
+                pipe.hgetall(key)
+            else:
+                pipe.execute_command('JSON.GET', key)
+        return pipe.execute(raise_on_error=False)
+
+    def _decode_value(self, value: Any, value_type: str) -> Optional[Dict[str, Any]]:
+        if isinstance(value, Exception):
+            raise value
+        if not value:
+            return None
+        if value_type == 'hash':
+            return self._decode_hash(value)
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        return json.loads(value)
+
+    def _read_page(self, keys: List[bytes], value_type: str, filter_func) -> List[Dict[str, Any]]:
+        page = []
+        for key, value in zip(keys, self._read_values(keys, value_type)):
+            try:
+                doc = self._decode_value(value, value_type)
+            except (json.JSONDecodeError, UnicodeDecodeError, RedisError) as e:
+                logger.warning(f"Redis键 {key} 的值解析失败: {e}")
+                continue
+            if doc is not None and (filter_func is None or filter_func(doc)):
+                page.append(doc)
+        return page
+
+    def iter_documents(
+        self,
+        key_prefix: str,
+        filter_func=None,
+        page_size: int = 1000,
+        limit: int = 0,
+        value_type: str = 'string',
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """按 SCAN 游标分页迭代前缀下的文档。
+
+        SCAN 结果累积到 page_size 个键后一次批量读取，每页只需一次往返。
+        """
+        if value_type not in VALUE_TYPES:
+            raise ValueError(f"不支持的 Redis 值类型: {value_type}")
         if self.client is None:
             self.connect()
 
         try:
             pattern = f"{key_prefix}:*"
-            documents = []
-            
+            remaining = limit if limit > 0 else None
+            pending_keys: List[bytes] = []
+
             cursor = 0
             while True:
-                cursor, keys = self.client.scan(cursor, match=pattern, count=100)
-                
-                for key in keys:
-                    value = self.client.get(key)
-                    if value:
-                        try:
-                            doc = json.loads(value.decode('utf-8'))
-                            if filter_func is None or filter_func(doc):
-                                documents.append(doc)
-                        except (json.JSONDecodeError, UnicodeDecodeError) as e:
-                            logger.warning(f"Redis键 {key} 的值解析失败: {e}")
-                            continue
-                
-                if cursor == 0:
+                cursor, keys = self.client.scan(cursor, match=pattern, count=page_size)
+                pending_keys.extend(keys)
+                exhausted = cursor == 0
+
+                while pending_keys and (len(pending_keys) >= page_size or exhausted):
+                    batch = pending_keys[:page_size]
+                    pending_keys = pending_keys[page_size:]
+                    page = self._read_page(batch, value_type, filter_func)
+                    if remaining is not None:
+                        page = page[:remaining]
+                        remaining -= len(page)
+                    if page:
+                        yield page
+                    if remaining == 0:
+                        return
+
+                if exhausted:
                     break
-            
-            if batch_size > 0 and len(documents) > batch_size:
-                documents = documents[:batch_size]
-            
-            return documents
         except RedisError as e:
             logger.error(f"Redis查询文档失败: {e}")
             raise
@@ -128,3 +220,20 @@ class RedisStorage:
             logger.error(f"Redis查询操作失败: {e}")
             raise
 
+    def query_documents(
+        self,
+        key_prefix: str,
+        filter_func=None,
+        batch_size: int = 0,
+        value_type: str = 'string',
+    ) -> List[Dict[str, Any]]:
+        return [
+            doc
+            for page in self.iter_documents(
+                key_prefix,
+                filter_func,
+                limit=batch_size,
+                value_type=value_type,
+            )
+            for doc in page
+        ]
@@ -0,0 +1,90 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HEALTH_CHECK_SECONDS = 30.0
+
+
+class StorageRegistry:
+    """进程内按目标类型和连接配置复用已连接的存储客户端。
+
+    客户端在首次使用时建立连接，之后各批次共享同一连接池；空闲超过
+    健康检查间隔或上次操作失败后，下次取用前先 ping，失败则关闭并重连。
+    """
+
+    def __init__(
+        self,
+        factories: Dict[str, Callable[..., Any]],
+        health_check_seconds: float | None = None,
+    ):
+        if health_check_seconds is None:
+            health_check_seconds = float(
+                os.getenv('STORAGE_HEALTH_CHECK_SECONDS', DEFAULT_HEALTH_CHECK_SECONDS)
+            )
+        self._factories = factories
+        self._health_check_seconds = health_check_seconds
+        self._storages: Dict[Tuple[str, Hashable], Any] = {}
+        self._checked_at: Dict[Tuple[str, Hashable], float] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(target: str, config: Dict[str, Any]) -> Tuple[str, Hashable]:
+        return target, tuple(sorted(config.items()))
+
+    def acquire(self, target: str, config: Dict[str, Any]) -> Any:
+        """返回可用的存储客户端，必要时新建或重建连接。"""
+        key = self._key(target, config)
+        with self._lock:
+            storage = self._storages.get(key)
+            now = time.monotonic()
+            if storage is not None and now - self._checked_at[key] >= self._health_check_seconds:
+                if storage.is_healthy():
+                    self._checked_at[key] = now
+                else:
+                    logger.warning(f"{target} 连接健康检查失败，重新建立连接")
+                    self._close(key)
+                    storage = None
+            if storage is None:
+                storage = self._factories[target](**config)
+                storage.connect()
+                self._storages[key] = storage
+                self._checked_at[key] = time.monotonic()
+            return storage
+
+    def report_failure(self, target: str, config: Dict[str, Any]):
+        """操作失败后要求下次取用前重新做健康检查。"""
+        key = self._key(target, config)
+        with self._lock:
+            if key in self._checked_at:
+                self._checked_at[key] = float('-inf')
+
+    def _close(self, key: Tuple[str, Hashable]):
+        storage = self._storages.pop(key, None)
+        self._checked_at.pop(key, None)
+        if storage is None:
+            return
+        try:
+            storage.close()
+        except Exception as e:
+            logger.warning(f"关闭 {key[0]} 连接失败: {e}")
+
+    def close_all(self):
+        """关闭全部已缓存的连接，可重复调用。"""
+        with self._lock:
+            for key in list(self._storages):
+                self._close(key)
+
+    def __len__(self) -> int:
+        return len(self._storages)
+
+
+def create_registry(factories: Dict[str, Callable[..., Any]]) -> StorageRegistry:
+    """创建注册表并在进程退出时关闭其中的连接。"""
+    registry = StorageRegistry(factories)
+    atexit.register(registry.close_all)
+    return registry
@@ -0,0 +1,6 @@
+"""数据存储组件测试配置：组件以平铺模块运行，测试时把组件目录加入导入路径。"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,136 @@
+"""Elasticsearch 存储 PIT + search_after 导出测试。"""
+
+import threading
+
+import pytest
+
+from elasticsearch_storage import ElasticsearchStorage
+
+
+class _FakeElasticsearch:
+    """按 PIT 语义返回固定文档集，记录每次 search 参数和 PIT 关闭情况。"""
+
+    def __init__(self, total: int):
+        self.documents = [
+            {"_id": f"doc-{pos}", "_source": {"pos": pos, "name": f"n{pos}", "body": "x"}}
+            for pos in range(total)
+        ]
+        self.searches = []
+        self.closed_pits = []
+        self._lock = threading.Lock()
+
+    def open_point_in_time(self, index, keep_alive):
+        return {"id": "pit-1"}
+
+    def close_point_in_time(self, id):
+        self.closed_pits.append(id)
+
+    def search(
+        self,
+        pit,
+        query,
+        size,
+        sort,
+        track_total_hits,
+        source=None,
+        slice=None,
+        search_after=None,
+    ):
+        with self._lock:
+            self.searches.append({
+                "pit": pit,
+                "size": size,
+                "source": source,
+                "slice": slice,
+                "search_after": search_after,
+            })
+        assert sort == [{"_shard_doc": "asc"}]
+        start = search_after[0] + 1 if search_after else 0
+        hits = []
+        for doc in self.documents:
+            pos = doc["_source"]["pos"]
+            if pos < start or (slice and pos % slice["max"] != slice["id"]):
+                continue
+            payload = doc["_source"]
+            if source is not None:
+                payload = {key: value for key, value in payload.items() if key in source}
+            hits.append({"_id": doc["_id"], "_source": payload, "sort": [pos]})
+            if len(hits) == size:
+                break
+        return {"pit_id": pit["id"], "hits": {"hits": hits}}
+
+
+class _FailingSliceElasticsearch(_FakeElasticsearch):
+    def search(self, **kwargs):
+        if kwargs.get("slice", {}).get("id") == 2:
+            raise RuntimeError("slice 2 failed")
+        return super().search(**kwargs)
+
+
+def _storage(client) -> ElasticsearchStorage:
+    storage = ElasticsearchStorage("http://localhost:9200")
+    storage.client = client
+    return storage
+
+
+def test_iter_documents_pages_with_search_after_and_closes_pit():
+    client = _FakeElasticsearch(7)
+
+    pages = list(_storage(client).iter_documents("idx", {"match_all": {}}, page_size=3))
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [doc["pos"] for page in pages for doc in page] == list(range(7))
+    assert pages[0][0]["_id"] == "doc-0"
+    assert [search["search_after"] for search in client.searches] == [None, [2], [5]]
+    assert all(search["slice"] is None for search in client.searches)
+    assert client.closed_pits == ["pit-1"]
+
+
+def test_limit_stops_paging_and_closes_pit():
+    client = _FakeElasticsearch(10)
+
+    docs = _storage(client).query_documents("idx", {"match_all": {}}, batch_size=4, page_size=3)
+
+    assert [doc["pos"] for doc in docs] == [0, 1, 2, 3]
+    assert len(client.searches) == 2
+    assert client.closed_pits == ["pit-1"]
+
+
+def test_abandoned_iterator_closes_pit():
+    client = _FakeElasticsearch(10)
+    pages = _storage(client).iter_documents("idx", {"match_all": {}}, page_size=2)
+
+    next(pages)
+    pages.close()
+
+    assert client.closed_pits == ["pit-1"]
+
+
+def test_source_fields_are_forwarded_to_search():
+    client = _FakeElasticsearch(2)
+
+    docs = _storage(client).query_documents("idx", {"match_all": {}}, source_fields=["pos"])
+
+    assert docs == [{"pos": 0, "_id": "doc-0"}, {"pos": 1, "_id": "doc-1"}]
+    assert client.searches[0]["source"] == ["pos"]
+
+
+def test_sliced_read_covers_every_document_once():
+    client = _FakeElasticsearch(20)
+
+    docs = _storage(client).query_documents("idx", {"match_all": {}}, slices=3, page_size=2)
+
+    assert sorted(doc["pos"] for doc in docs) == list(range(20))
+    assert {search["slice"]["id"] for search in client.searches} == {0, 1, 2}
+    assert all(search["slice"]["max"] == 3 for search in client.searches)
+    assert any(search["search_after"] is not None for search in client.searches)
+    assert client.closed_pits == ["pit-1"]
+
+
+def test_failed_slice_propagates_error_and_closes_pit():
+    client = _FailingSliceElasticsearch(20)
+
+    with pytest.raises(RuntimeError, match="slice 2 failed"):
+        _storage(client).query_documents("idx", {"match_all": {}}, slices=3, page_size=2)
+
+    assert client.closed_pits == ["pit-1"]
@@ -0,0 +1,115 @@
+"""比较消息分片协议在不同压缩编码下的体积、分片数和编解码耗时。
+
+用法：
+
+    python -m benchmarks.fragment_compression [--size-mb 32] [--repeat 3]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import time
+
+from csi_base_component_sdk.fragmentation import (
+    FRAGMENT_MESSAGE_TYPE,
+    SUPPORTED_CODECS,
+    FragmentAssembler,
+    FragmentSettings,
+    encode_fragments,
+    parse_fragment,
+)
+
+
+def _html_payload(size: int) -> bytes:
+    page = (
+        "<html><head><title>标题</title></head><body>"
+        + "".join(
+            f'<div class="item" data-id="{index}"><a href="/post/{index}">'
+            f"帖子 {index}</a><p>正文内容 {index % 97}</p></div>"
+            for index in range(200)
+        )
+        + "</body></html>"
+    )
+    records = []
+    total = 0
+    while total < size:
+        record = {"url": f"https://example.com/{len(records)}", "html": page}
+        records.append(record)
+        total += len(page)
+    return json.dumps(records, ensure_ascii=False).encode("utf-8")
+
+
+def _json_payload(size: int) -> bytes:
+    records = []
+    total = 0
+    while total < size:
+        record = {
+            "id": len(records),
+            "title": f"标题 {len(records)}",
+            "tags": ["安全", "情报", "网络"],
+            "score": len(records) % 100 / 10,
+        }
+        records.append(record)
+        total += 96
+    return json.dumps(records, ensure_ascii=False).encode("utf-8")
+
+
+def _run(name: str, body: bytes, codec: str | None, repeat: int) -> None:
+    settings = FragmentSettings(
+        compression_codecs=(codec,) if codec else (),
+    )
+    encode_seconds = decode_seconds = 0.0
+    fragments = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fragments = encode_fragments(body, "benchmark", settings)
+        encode_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        assembler = FragmentAssembler[int](settings)
+        result = None
+        for index, fragment in enumerate(fragments):
+            parsed = parse_fragment(
+                fragment.body,
+                FRAGMENT_MESSAGE_TYPE,
+                fragment.headers,
+                settings,
+            )
+            result = assembler.add(parsed, index)
+        decode_seconds += time.perf_counter() - started
+        if fragments and (result is None or result.body != body):
+            raise RuntimeError("重组结果与原始消息不一致")
+
+    wire_bytes = sum(len(fragment.body) for fragment in fragments) or len(body)
+    print(
+        f"{name:<6} {codec or 'none':<6} "
+        f"原始 {len(body) / 1048576:8.2f} MiB  "
+        f"传输 {wire_bytes / 1048576:8.2f} MiB  "
+        f"比例 {len(body) / wire_bytes:6.2f}x  "
+        f"分片 {len(fragments):4d}  "
+        f"编码 {encode_seconds / repeat * 1000:8.1f} ms  "
+        f"解码 {decode_seconds / repeat * 1000:8.1f} ms"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=32)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    size = args.size_mb * 1024 * 1024
+    payloads = {
+        "html": _html_payload(size),
+        "json": _json_payload(size),
+        "random": os.urandom(size),
+    }
+    codecs = [None, *sorted(SUPPORTED_CODECS)]
+    for name, body in payloads.items():
+        for codec in codecs:
+            _run(name, body, codec, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
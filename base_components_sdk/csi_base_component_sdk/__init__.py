@@ -29,4 +29,4 @@ __all__ = [
     "ReferenceStreamAborted",
     "ReferenceStreamTransportError",
 ]
-__version__ = "2.7.0"
+__version__ = "2.8.0"
@@ -0,0 +1,139 @@
+"""RabbitMQ 发布确认窗口，批量发布后按 delivery tag 统一结算 Broker 确认。"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import Any, Callable
+
+
+class PublisherConfirmTimeout(RuntimeError):
+    """等待 Broker 发布确认超时。"""
+
+
+@dataclass
+class PendingPublish:
+    """保存一条已发布、等待确认的物理消息，NACK 后可原样重发。"""
+
+    queue_name: str
+    body: bytes | str
+    properties: Any
+    mandatory: bool = False
+    key: Any = None
+    attempts: int = 0
+    returned: bool = False
+
+
+class PublisherConfirmWindow:
+    """维护有界的未确认发布窗口。
+
+    通道进入 confirm 模式后 Broker 按发布顺序从 1 开始分配 delivery tag，
+    窗口据此在本地编号，并用 multiple 确认一次结算多条。被 NACK 的消息
+    在 flush 时有限次重发；mandatory 消息被 Basic.Return 退回后视为失败，
+    不会重试。窗口与通道一一对应，通道重建时必须丢弃旧窗口。
+    """
+
+    def __init__(
+        self,
+        publish: Callable[[PendingPublish], None],
+        pump: Callable[[], None],
+        *,
+        window_size: int,
+        max_retries: int = 3,
+        timeout_seconds: float = 30.0,
+    ) -> None:
+        if window_size <= 0:
+            raise ValueError("发布确认窗口大小必须大于 0")
+        if max_retries < 0:
+            raise ValueError("发布确认重试次数不能小于 0")
+        if timeout_seconds <= 0:
+            raise ValueError("发布确认超时必须大于 0 秒")
+        self._publish = publish
+        self._pump = pump
+        self.window_size = window_size
+        self.max_retries = max_retries
+        self.timeout_seconds = timeout_seconds
+        self._next_tag = 0
+        self._outstanding: dict[int, PendingPublish] = {}
+        self._nacked: list[PendingPublish] = []
+        self._failed: list[PendingPublish] = []
+        self._returned: dict[tuple[str, str | None], int] = {}
+        self._last_progress_at = time.monotonic()
+        self.stats = {
+            "published": 0,
+            "acked": 0,
+            "nacked": 0,
+            "retried": 0,
+            "returned": 0,
+        }
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._outstanding)
+
+    def publish(self, item: PendingPublish) -> None:
+        """发布一条消息，窗口已满时先等待确认腾出位置。"""
+        while len(self._outstanding) >= self.window_size:
+            self._wait()
+        self._send(item)
+
+    def _send(self, item: PendingPublish) -> None:
+        item.attempts += 1
+        self._publish(item)
+        self._next_tag += 1
+        self._outstanding[self._next_tag] = item
+        self.stats["published"] += 1
+
+    def handle_confirm(self, delivery_tag: int, multiple: bool, acked: bool) -> None:
+        """结算 Basic.Ack/Basic.Nack，multiple 时覆盖不超过该 tag 的全部发布。"""
+        if multiple:
+            tags = [tag for tag in self._outstanding if tag <= delivery_tag]
+        else:
+            tags = [delivery_tag]
+        for tag in tags:
+            item = self._outstanding.pop(tag, None)
+            if item is None:
+                continue
+            if not acked:
+                self.stats["nacked"] += 1
+                self._nacked.append(item)
+                continue
+            identity = (item.queue_name, getattr(item.properties, "message_id", None))
+            if self._returned.get(identity):
+                # Basic.Return 总是先于同一消息的 Basic.Ack 到达。
+                self._returned[identity] -= 1
+                item.returned = True
+                self._failed.append(item)
+                continue
+            self.stats["acked"] += 1
+        self._last_progress_at = time.monotonic()
+
+    def handle_return(self, routing_key: str, message_id: str | None) -> None:
+        """记录被 Broker 退回的 mandatory 消息，等待随后的确认帧认领。"""
+        identity = (routing_key, message_id)
+        self._returned[identity] = self._returned.get(identity, 0) + 1
+        self.stats["returned"] += 1
+
+    def flush(self) -> list[PendingPublish]:
+        """等待全部发布结算并重发被 NACK 的消息，返回最终失败的发布。"""
+        while self._outstanding or self._nacked:
+            while self._nacked:
+                item = self._nacked.pop(0)
+                if item.attempts > self.max_retries:
+                    self._failed.append(item)
+                    continue
+                self.stats["retried"] += 1
+                self.publish(item)
+            if self._outstanding:
+                self._wait()
+        self._returned.clear()
+        failed, self._failed = self._failed, []
+        return failed
+
+    def _wait(self) -> None:
+        if time.monotonic() - self._last_progress_at >= self.timeout_seconds:
+            raise PublisherConfirmTimeout(
+                f"{self.timeout_seconds:g}s 内未收到 Broker 发布确认，"
+                f"未确认 {len(self._outstanding)} 条"
+            )
+        self._pump()
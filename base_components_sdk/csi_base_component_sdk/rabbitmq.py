@@ -4,8 +4,9 @@ import json
 import logging
 import os
 import time
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional
 from uuid import uuid4
 
 import pika
@@ -20,6 +21,7 @@ from .fragmentation import (
     encode_fragments,
     parse_fragment,
 )
+from .publisher_confirms import PendingPublish, PublisherConfirmWindow
 
 logger = logging.getLogger("CSI_SDK")
 
@@ -30,6 +32,8 @@ REFERENCE_CONTROL_CONTENT_TYPE = (
 )
 REFERENCE_PROTOCOL = "eos-v1"
 MESSAGE_ID_MAX_BYTES = 255
+PUBLISH_CONFIRM_POLL_SECONDS = 1.0
+REFERENCE_CONSUMER_MODES = ("get", "consume")
 
 
 class ReferenceStreamAborted(RuntimeError):
@@ -78,6 +82,15 @@ class _PendingDelivery:
     first_transport_error: ReferenceStreamTransportError | None = None
 
 
+@dataclass
+class _PushConsumer:
+    """basic_consume 推送到本地的已交付、尚未被业务读取的物理消息。"""
+
+    consumer_tag: str
+    channel_generation: int
+    deliveries: deque[tuple[Any, Any, bytes, float]] = field(default_factory=deque)
+
+
 @dataclass(frozen=True)
 class _FragmentDeliveryToken:
     method_frame: Any
@@ -104,6 +117,9 @@ class RabbitMQClient:
         vhost: str = None,
         reference_consumer_ack_timeout_seconds: float | None = None,
         reference_consumer_ack_safety_margin_seconds: float | None = None,
+        reference_consumer_mode: str | None = None,
+        reference_consumer_prefetch_count: int | None = None,
+        publish_confirm_window: int | None = None,
     ):
         dotenv_path = find_dotenv(usecwd=True)
         if dotenv_path:
@@ -118,6 +134,8 @@ class RabbitMQClient:
         self.connection: Optional[pika.BlockingConnection] = None
         self.consumer_channel: Optional[pika.channel.Channel] = None
         self.publisher_channel: Optional[pika.channel.Channel] = None
+        self._confirm_channel: Optional[pika.channel.Channel] = None
+        self._confirm_window: PublisherConfirmWindow | None = None
         self._reference_inputs: dict[str, _ReferenceInputState] = {}
         self._reference_outputs: list[_ReferenceOutput] = []
         self._reference_result_queues: set[str] = set()
@@ -132,6 +150,9 @@ class RabbitMQClient:
             FragmentAssembler[_FragmentDeliveryToken],
         ] = {}
         self._fragment_settings = FragmentSettings.from_env()
+        self._push_consumers: dict[str, _PushConsumer] = {}
+        self._declared_queues: set[str] = set()
+        self._queue_declare_stats = {"declared": 0, "saved": 0}
         self._published_controls: set[tuple[str, str, str, str]] = set()
         self._cancel_check: Callable[[], None] | None = None
         self._successful_result_callback: Callable[[], None] | None = None
@@ -164,6 +185,32 @@ class RabbitMQClient:
         self.reference_consumer_ack_safety_margin_seconds = float(
             safety_margin_seconds
         )
+        consumer_mode = (
+            reference_consumer_mode
+            or os.getenv("CSI_REFERENCE_CONSUMER_MODE", "get")
+        ).strip().lower()
+        if consumer_mode not in REFERENCE_CONSUMER_MODES:
+            raise ValueError(
+                "REFERENCE 消费模式必须是 "
+                + " 或 ".join(REFERENCE_CONSUMER_MODES)
+            )
+        prefetch_count = (
+            reference_consumer_prefetch_count
+            if reference_consumer_prefetch_count is not None
+            else int(os.getenv("CSI_REFERENCE_PREFETCH_COUNT", "100"))
+        )
+        if prefetch_count <= 0:
+            raise ValueError("REFERENCE 预取数量必须大于 0")
+        self.reference_consumer_mode = consumer_mode
+        self.reference_consumer_prefetch_count = int(prefetch_count)
+        window_size = (
+            publish_confirm_window
+            if publish_confirm_window is not None
+            else int(os.getenv("CSI_RABBITMQ_PUBLISH_WINDOW", "1"))
+        )
+        if window_size <= 0:
+            raise ValueError("发布确认窗口大小必须大于 0")
+        self.publish_confirm_window = int(window_size)
 
     @property
     def channel(self) -> Optional[pika.channel.Channel]:
@@ -196,6 +243,7 @@ class RabbitMQClient:
         self._reference_result_queues.clear()
         self._backend_owned_reference_queues.clear()
         self._fragment_assemblers.clear()
+        self._cancel_push_consumers()
         self._cancel_check = cancel_check
         self._successful_result_callback = successful_result_callback
 
@@ -276,6 +324,10 @@ class RabbitMQClient:
         self._raise_for_managed_pending_reconnect()
         self._pending_deliveries.clear()
         self._fragment_assemblers.clear()
+        self._push_consumers.clear()
+        self._declared_queues.clear()
+        self._confirm_channel = None
+        self._confirm_window = None
         connection = None
         consumer_channel = None
         publisher_channel = None
@@ -492,6 +544,9 @@ class RabbitMQClient:
                 pending.state = "invalidated"
                 if pending.is_backend_owned:
                     pending.first_transport_error = deadline_error
+        # multiple NACK 同时退回了已推送到本地缓冲但尚未读取的消息。
+        for consumer in self._push_consumers.values():
+            consumer.deliveries.clear()
 
     def raise_if_transport_failed(self, *, check_deadline: bool = True) -> None:
         """显式检查托管 REFERENCE 消费传输是否已不可恢复。"""
@@ -517,6 +572,8 @@ class RabbitMQClient:
             self._raise_for_managed_pending_reconnect()
             self._pending_deliveries.clear()
             self._fragment_assemblers.clear()
+            self._push_consumers.clear()
+            self._declared_queues.clear()
             try:
                 self.consumer_channel = self._open_consumer_channel()
             except Exception as exc:
@@ -536,6 +593,7 @@ class RabbitMQClient:
         if not self.connection or self.connection.is_closed:
             return self.connect()
         if not self.publisher_channel or self.publisher_channel.is_closed:
+            self._declared_queues.clear()
             try:
                 self.publisher_channel = self._open_publisher_channel()
                 self._publisher_close_reason = None
@@ -602,6 +660,10 @@ class RabbitMQClient:
         queue_name: str,
         channel: pika.channel.Channel,
     ) -> None:
+        """按连接缓存已声明的队列，同一队列只向 Broker 声明一次。"""
+        if queue_name in self._declared_queues:
+            self._queue_declare_stats["saved"] += 1
+            return
         channel.queue_declare(
             queue=queue_name,
             durable=True,
@@ -609,6 +671,15 @@ class RabbitMQClient:
             auto_delete=False,
             arguments={},
         )
+        self._declared_queues.add(queue_name)
+        self._queue_declare_stats["declared"] += 1
+
+    def queue_declare_stats(self) -> dict[str, int]:
+        """返回实际声明次数和命中缓存省去的声明次数。"""
+        return {
+            **self._queue_declare_stats,
+            "cached_queues": len(self._declared_queues),
+        }
 
     def _prepare_queue(
         self,
@@ -642,15 +713,185 @@ class RabbitMQClient:
             publish_kwargs["mandatory"] = True
         return self.publisher_channel.basic_publish(**publish_kwargs)
 
-    def _ack_delivery(self, logical_id: int) -> None:
-        """确认逻辑消息对应的所有物理交付。"""
-        pending = self._pending_deliveries[logical_id]
+    def _ensure_confirm_window(self) -> PublisherConfirmWindow:
+        """返回异步确认发布通道上的确认窗口，不存在或通道已关闭时重建。"""
+        if (
+            self._confirm_window is not None
+            and self._confirm_channel is not None
+            and not self._confirm_channel.is_closed
+        ):
+            return self._confirm_window
+        if self.connection is None or self.connection.is_closed:
+            raise RuntimeError("RabbitMQ 连接尚未建立")
+        self._confirm_window = None
+        channel = self.connection.channel()
+        # 阻塞通道的 confirm_delivery 会逐条等待确认，这里直接在底层通道上开启
+        # confirm 模式，由窗口按 delivery tag 结算。
+        channel_impl = channel._impl
+        connection = self.connection
+
+        def publish(item: PendingPublish) -> None:
+            channel_impl.basic_publish(
+                exchange="",
+                routing_key=item.queue_name,
+                body=item.body,
+                properties=item.properties,
+                mandatory=item.mandatory,
+            )
+
+        def pump() -> None:
+            connection.process_data_events(time_limit=PUBLISH_CONFIRM_POLL_SECONDS)
+            if channel.is_closed:
+                raise RuntimeError(
+                    "发布确认通道已关闭: "
+                    + self._describe_transport_reason(
+                        getattr(channel_impl, "_closing_reason", None)
+                    )
+                )
+
+        window = PublisherConfirmWindow(
+            publish,
+            pump,
+            window_size=self.publish_confirm_window,
+        )
+
+        def on_confirm(frame: Any) -> None:
+            method = frame.method
+            window.handle_confirm(
+                method.delivery_tag,
+                bool(getattr(method, "multiple", False)),
+                isinstance(method, pika.spec.Basic.Ack),
+            )
+            # 唤醒正在 process_data_events 中等待的发布方，避免空等到轮询上限。
+            connection.add_callback_threadsafe(lambda: None)
+
+        def on_return(_channel: Any, method: Any, properties: Any, _body: bytes) -> None:
+            window.handle_return(
+                method.routing_key,
+                self._message_id(properties),
+            )
+
+        selected: list[bool] = []
+        channel_impl.confirm_delivery(
+            ack_nack_callback=on_confirm,
+            callback=lambda _frame: selected.append(True),
+        )
+        channel_impl.add_on_return_callback(on_return)
+        while not selected:
+            pump()
+        self._confirm_channel = channel
+        self._confirm_window = window
+        return window
+
+    def _close_confirm_channel(self) -> None:
+        channel, self._confirm_channel = self._confirm_channel, None
+        self._confirm_window = None
+        if channel is not None and not channel.is_closed:
+            try:
+                channel.close()
+            except Exception as exc:
+                logger.warning("关闭发布确认通道失败: %s", exc)
+
+    def _publish_confirmed(
+        self,
+        publications: List[tuple[Any, str, bytes | str, pika.BasicProperties]],
+    ) -> list[PendingPublish]:
+        """以确认窗口发布一批物理消息，返回重试后仍未确认或被退回的发布。"""
+        try:
+            window = self._ensure_confirm_window()
+            for key, queue_name, body, properties in publications:
+                window.publish(
+                    PendingPublish(
+                        queue_name=queue_name,
+                        body=body,
+                        properties=properties,
+                        mandatory=self._is_backend_owned_reference_queue(queue_name),
+                        key=key,
+                    )
+                )
+            return window.flush()
+        except BaseException:
+            # 窗口内残留的未结算发布无法再与新通道的 delivery tag 对应。
+            self._close_confirm_channel()
+            raise
+
+    def flush_publishes(self) -> None:
+        """结算确认窗口中仍未确认的发布，保证后续控制帧排在数据之后。"""
+        if self._confirm_window is None or not self._confirm_window.outstanding:
+            return
+        failed = self._publish_confirmed([])
+        if failed:
+            raise ReferenceStreamTransportError(
+                f"队列 {failed[0].queue_name} 存在 {len(failed)} 条未获确认的发布"
+            )
+
+    def _outstanding_physical_tags(self) -> set[int]:
+        """返回当前消费通道上已交付但尚未确认或拒绝的物理 delivery tag。"""
+        tags = {
+            physical_tag
+            for pending in self._pending_deliveries.values()
+            if pending.state == "pending"
+            and pending.channel_generation == self._consumer_channel_generation
+            for physical_tag in pending.physical_tags
+        }
+        return tags
+
+    def _has_active_push_consumer(self) -> bool:
+        """判断当前消费通道上是否存在推送消费者。"""
+        return any(
+            consumer.channel_generation == self._consumer_channel_generation
+            for consumer in self._push_consumers.values()
+        )
+
+    def _ack_physical_tags(self, physical_tags: Iterable[int]) -> None:
+        """用尽量少的 basic_ack 帧确认一组物理交付。
+
+        multiple 会确认通道上不大于该 tag 的全部未结算交付，因此只合并到
+        第一个不属于本次确认的未结算 tag 之前；其后的交付仍逐条确认，
+        避免误确认组件尚未处理的消息。推送消费者的交付可能仍停留在 pika
+        内部的待分发事件中、本地无从得知其 tag，此时不合并、全部逐条确认。
+        """
         if self.consumer_channel is None:
             raise RuntimeError("RabbitMQ 消费通道未创建")
-        for physical_tag in pending.physical_tags:
+        settling = sorted(set(physical_tags))
+        if not settling:
+            return
+        if self._has_active_push_consumer():
+            for physical_tag in settling:
+                self.consumer_channel.basic_ack(delivery_tag=physical_tag)
+            return
+        blocking_tag = min(
+            self._outstanding_physical_tags().difference(settling),
+            default=None,
+        )
+        contiguous = [
+            physical_tag
+            for physical_tag in settling
+            if blocking_tag is None or physical_tag < blocking_tag
+        ]
+        if len(contiguous) > 1:
+            self.consumer_channel.basic_ack(
+                delivery_tag=contiguous[-1],
+                multiple=True,
+            )
+            settling = settling[len(contiguous) :]
+        for physical_tag in settling:
             self.consumer_channel.basic_ack(delivery_tag=physical_tag)
-        pending.state = "settled"
-        self._pending_deliveries.pop(logical_id, None)
+
+    def _ack_delivery(self, logical_id: int) -> None:
+        """确认逻辑消息对应的所有物理交付。"""
+        self._ack_deliveries([self._pending_deliveries[logical_id]])
+
+    def _ack_deliveries(self, deliveries: list[_PendingDelivery]) -> None:
+        """一次结算多条逻辑消息，连续的物理交付合并为 multiple 确认。"""
+        self._ack_physical_tags(
+            physical_tag
+            for pending in deliveries
+            for physical_tag in pending.physical_tags
+        )
+        for pending in deliveries:
+            pending.state = "settled"
+            self._pending_deliveries.pop(pending.logical_id, None)
 
     def _nack_delivery(self, logical_id: int, requeue: bool) -> None:
         """拒绝逻辑消息对应的所有物理交付。"""
@@ -668,6 +909,7 @@ class RabbitMQClient:
     def close(self) -> None:
         """关闭 RabbitMQ 连接。"""
         try:
+            self._close_confirm_channel()
             if self.publisher_channel and not self.publisher_channel.is_closed:
                 self.publisher_channel.close()
             if (
@@ -684,6 +926,8 @@ class RabbitMQClient:
         finally:
             self._pending_deliveries.clear()
             self._fragment_assemblers.clear()
+            self._push_consumers.clear()
+            self._declared_queues.clear()
             self.consumer_channel = None
             self.publisher_channel = None
             self.connection = None
@@ -828,6 +1072,87 @@ class RabbitMQClient:
         else:
             state.completed = True
 
+    def _push_consumer(self, queue_name: str) -> _PushConsumer:
+        """返回当前消费通道代次上的推送消费者，不存在时按预取数量创建。"""
+        consumer = self._push_consumers.get(queue_name)
+        if (
+            consumer is not None
+            and consumer.channel_generation == self._consumer_channel_generation
+        ):
+            return consumer
+        if self.consumer_channel is None:
+            raise RuntimeError("RabbitMQ 消费通道未创建")
+        deliveries: deque[tuple[Any, Any, bytes, float]] = deque()
+
+        def on_message(_channel, method_frame, properties, body) -> None:
+            # Broker 的确认超时从投递时开始计算，因此在回调时记录接收时间。
+            deliveries.append((method_frame, properties, body, time.monotonic()))
+
+        self.consumer_channel.basic_qos(
+            prefetch_count=self.reference_consumer_prefetch_count,
+        )
+        consumer_tag = self.consumer_channel.basic_consume(
+            queue=queue_name,
+            on_message_callback=on_message,
+            auto_ack=False,
+        )
+        consumer = _PushConsumer(
+            consumer_tag=consumer_tag,
+            channel_generation=self._consumer_channel_generation,
+            deliveries=deliveries,
+        )
+        self._push_consumers[queue_name] = consumer
+        return consumer
+
+    def _cancel_push_consumer(self, queue_name: str) -> None:
+        """停止推送消费，并将已缓冲但未读取的消息重新入队。"""
+        consumer = self._push_consumers.pop(queue_name, None)
+        if consumer is None:
+            return
+        if (
+            consumer.channel_generation != self._consumer_channel_generation
+            or not self._is_transport_open()
+        ):
+            return
+        try:
+            self.consumer_channel.basic_cancel(consumer.consumer_tag)
+            while consumer.deliveries:
+                method_frame, _, _, _ = consumer.deliveries.popleft()
+                self.consumer_channel.basic_nack(
+                    delivery_tag=method_frame.delivery_tag,
+                    requeue=True,
+                )
+        except Exception as exc:
+            logger.warning("取消 RabbitMQ 推送消费者失败: %s", exc)
+
+    def _cancel_push_consumers(self) -> None:
+        for queue_name in list(self._push_consumers):
+            self._cancel_push_consumer(queue_name)
+
+    def _receive_delivery(
+        self,
+        queue_name: str,
+        *,
+        push: bool,
+    ) -> tuple[Any, Any, bytes, float] | None:
+        """取得一条物理消息及其接收时间，队列暂无消息时返回 None。"""
+        if self.consumer_channel is None:
+            raise RuntimeError("RabbitMQ 消费通道未创建")
+        if not push:
+            method_frame, properties, body = self.consumer_channel.basic_get(
+                queue=queue_name,
+                auto_ack=False,
+            )
+            if method_frame is None:
+                return None
+            return method_frame, properties, body, time.monotonic()
+        consumer = self._push_consumer(queue_name)
+        if not consumer.deliveries:
+            self.process_data_events()
+        if not consumer.deliveries:
+            return None
+        return consumer.deliveries.popleft()
+
     def _next_delivery(
         self,
         queue_name: str,
@@ -843,6 +1168,8 @@ class RabbitMQClient:
         if state and state.completed:
             return None
 
+        # 推送模式只用于 EOS v1 输入流；普通队列按需单条拉取，避免预取后长期占用消息。
+        push = state is not None and self.reference_consumer_mode == "consume"
         while True:
             self.raise_if_transport_failed()
             if self._cancel_check:
@@ -850,27 +1177,27 @@ class RabbitMQClient:
                     self._cancel_check()
                 except Exception as exc:
                     raise _CancellationSignal(exc) from exc
-            if self.consumer_channel is None:
-                raise RuntimeError("RabbitMQ 消费通道未创建")
-            method_frame, properties, body = self.consumer_channel.basic_get(
-                queue=queue_name,
-                auto_ack=False,
-            )
-            if method_frame is None:
+            received = self._receive_delivery(queue_name, push=push)
+            if received is None:
                 if state is None or not wait_for_data:
                     return None
-                self.process_data_events()
+                if push:
+                    # 阻塞到推送消息到达或轮询间隔结束，期间同时处理心跳。
+                    self.process_data_events(time_limit=self._poll_interval)
+                else:
+                    self.process_data_events()
                 if self._cancel_check:
                     try:
                         self._cancel_check()
                     except Exception as exc:
                         raise _CancellationSignal(exc) from exc
-                time.sleep(self._poll_interval)
+                if not push:
+                    time.sleep(self._poll_interval)
                 continue
 
+            method_frame, properties, body, received_at = received
             logical_id = self._next_logical_delivery_id
             self._next_logical_delivery_id += 1
-            received_at = time.monotonic()
             logical_frame = _LogicalDeliveryFrame(
                 delivery_tag=logical_id,
                 exchange=method_frame.exchange,
@@ -898,20 +1225,29 @@ class RabbitMQClient:
                     and assembler.has_pending
                     and self._control_type(properties) == REFERENCE_ABORT_TYPE
                 ):
-                    for token in assembler.discard_pending():
-                        self._ack_delivery(token.method_frame.delivery_tag)
+                    self._ack_deliveries(
+                        [
+                            self._pending_deliveries[token.method_frame.delivery_tag]
+                            for token in assembler.discard_pending()
+                        ]
+                    )
                 self._handle_control(
                     queue_name,
                     logical_id,
                     properties,
                 )
                 if assembler and assembler.has_pending and state.completed:
-                    for token in assembler.discard_pending():
-                        self._ack_delivery(token.method_frame.delivery_tag)
+                    self._ack_deliveries(
+                        [
+                            self._pending_deliveries[token.method_frame.delivery_tag]
+                            for token in assembler.discard_pending()
+                        ]
+                    )
                     raise FragmentProtocolError(
                         f"REFERENCE 数据流 {state.stream_id} 结束时存在未完整消息分片"
                     )
                 if state.completed:
+                    self._cancel_push_consumer(queue_name)
                     return None
                 continue
             return logical_frame, properties, body
@@ -1045,17 +1381,17 @@ class RabbitMQClient:
             logger.error("获取消息失败: %s", exc)
             return None
 
-    def ack_message(self, delivery_tag: int) -> bool:
-        """确认消息。"""
+    def _settleable_delivery(self, delivery_tag: int) -> _PendingDelivery | None:
+        """返回仍可在当前消费通道上结算的逻辑交付，否则返回 None。"""
         pending = self._pending_deliveries.get(delivery_tag)
         if pending is None:
-            return False
+            return None
         if pending.first_transport_error is not None:
             raise pending.first_transport_error
         if pending.is_backend_owned:
             self.raise_if_transport_failed()
         if pending.state != "pending":
-            return False
+            return None
         if pending.channel_generation != self._consumer_channel_generation:
             if pending.is_backend_owned:
                 error = self._lock_consumer_transport_error(
@@ -1065,7 +1401,7 @@ class RabbitMQClient:
                 if error is not None:
                     raise error
             self._pending_deliveries.pop(delivery_tag, None)
-            return False
+            return None
         if not self._is_transport_open():
             if pending.is_backend_owned:
                 error = self._lock_consumer_transport_error(
@@ -1075,6 +1411,13 @@ class RabbitMQClient:
                 if error is not None:
                     raise error
             self._pending_deliveries.pop(delivery_tag, None)
+            return None
+        return pending
+
+    def ack_message(self, delivery_tag: int) -> bool:
+        """确认消息。"""
+        pending = self._settleable_delivery(delivery_tag)
+        if pending is None:
             return False
         try:
             self._ack_delivery(delivery_tag)
@@ -1094,35 +1437,9 @@ class RabbitMQClient:
 
     def nack_message(self, delivery_tag: int, requeue: bool = True) -> bool:
         """拒绝消息。"""
-        pending = self._pending_deliveries.get(delivery_tag)
+        pending = self._settleable_delivery(delivery_tag)
         if pending is None:
             return False
-        if pending.first_transport_error is not None:
-            raise pending.first_transport_error
-        if pending.is_backend_owned:
-            self.raise_if_transport_failed()
-        if pending.state != "pending":
-            return False
-        if pending.channel_generation != self._consumer_channel_generation:
-            if pending.is_backend_owned:
-                error = self._lock_consumer_transport_error(
-                    "消费通道代次已变更",
-                    pending.channel_generation,
-                )
-                if error is not None:
-                    raise error
-            self._pending_deliveries.pop(delivery_tag, None)
-            return False
-        if not self._is_transport_open():
-            if pending.is_backend_owned:
-                error = self._lock_consumer_transport_error(
-                    self._consumer_channel_close_reason(),
-                    pending.channel_generation,
-                )
-                if error is not None:
-                    raise error
-            self._pending_deliveries.pop(delivery_tag, None)
-            return False
         try:
             self._nack_delivery(delivery_tag, requeue)
             return True
@@ -1168,20 +1485,31 @@ class RabbitMQClient:
                 resolved_message_id,
             )
             self._prepare_queue(queue_name, self.publisher_channel)
-            for body, properties in publications:
-                published = self._publish_to_queue(
-                    queue_name,
-                    body=body,
-                    properties=properties,
-                    prepare=False,
+            if self.publish_confirm_window > 1:
+                confirmed = not self._publish_confirmed(
+                    [
+                        (queue_name, queue_name, body, properties)
+                        for body, properties in publications
+                    ]
                 )
-                if published is False:
-                    if self._is_backend_owned_reference_queue(queue_name):
-                        raise ReferenceStreamTransportError(
-                            f"后端托管 REFERENCE 队列 {queue_name} 发布未获确认"
-                        )
-                    logger.error("RabbitMQ 拒绝确认业务消息: %s", queue_name)
-                    return False
+            else:
+                confirmed = all(
+                    self._publish_to_queue(
+                        queue_name,
+                        body=body,
+                        properties=properties,
+                        prepare=False,
+                    )
+                    is not False
+                    for body, properties in publications
+                )
+            if not confirmed:
+                if self._is_backend_owned_reference_queue(queue_name):
+                    raise ReferenceStreamTransportError(
+                        f"后端托管 REFERENCE 队列 {queue_name} 发布未获确认"
+                    )
+                logger.error("RabbitMQ 拒绝确认业务消息: %s", queue_name)
+                return False
             if message and queue_name in self._reference_result_queues:
                 self._notify_successful_result()
             return True
@@ -1203,12 +1531,78 @@ class RabbitMQClient:
     ) -> int:
         """批量发送同一条业务消息到多个队列。"""
         resolved_message_id = self._resolve_message_id(message_id)
+        if self.publish_confirm_window > 1 and len(queue_names) > 1:
+            return self._send_fan_out_confirmed(
+                queue_names,
+                message,
+                resolved_message_id,
+            )
         success_count = 0
         for queue_name in queue_names:
             if self.send_message(queue_name, message, resolved_message_id):
                 success_count += 1
         return success_count
 
+    def _send_fan_out_confirmed(
+        self,
+        queue_names: List[str],
+        message: dict,
+        message_id: str,
+    ) -> int:
+        """在一个确认窗口内将同一业务消息扇出到多个队列，返回成功的队列数。"""
+        targets = list(dict.fromkeys(queue_names))
+        managed_queue = next(
+            (
+                item
+                for item in targets
+                if self._is_backend_owned_reference_queue(item)
+            ),
+            None,
+        )
+        if not self._ensure_connection() or not self.publisher_channel:
+            if managed_queue:
+                raise ReferenceStreamTransportError(
+                    f"后端托管 REFERENCE 队列 {managed_queue} 连接或通道不可用"
+                )
+            logger.error("无法连接到 RabbitMQ")
+            return 0
+        try:
+            publications = self._build_business_publications(message, message_id)
+            for target_queue in targets:
+                self._prepare_queue(target_queue, self.publisher_channel)
+            failed = self._publish_confirmed(
+                [
+                    (target_queue, target_queue, body, properties)
+                    for body, properties in publications
+                    for target_queue in targets
+                ]
+            )
+        except ReferenceStreamTransportError:
+            raise
+        except Exception as exc:
+            if managed_queue:
+                raise ReferenceStreamTransportError(
+                    f"后端托管 REFERENCE 队列 {managed_queue} 发布失败: {exc}"
+                ) from exc
+            logger.error("发送消息失败: %s", exc)
+            return 0
+        failed_queues = {item.key for item in failed}
+        for target_queue in targets:
+            if target_queue not in failed_queues:
+                continue
+            if self._is_backend_owned_reference_queue(target_queue):
+                raise ReferenceStreamTransportError(
+                    f"后端托管 REFERENCE 队列 {target_queue} 发布未获确认"
+                )
+            logger.error("RabbitMQ 拒绝确认业务消息: %s", target_queue)
+        if message and any(
+            target_queue in self._reference_result_queues
+            for target_queue in targets
+            if target_queue not in failed_queues
+        ):
+            self._notify_successful_result()
+        return sum(1 for item in queue_names if item not in failed_queues)
+
     def _publish_control(
         self,
         queue_name: str,
@@ -1290,6 +1684,7 @@ class RabbitMQClient:
         """向当前组件的全部 EOS v1 输出流发送终止控制帧。"""
         if status == "success":
             self.raise_if_transport_failed()
+            self.flush_publishes()
         control_type = (
             REFERENCE_EOS_TYPE if status == "success" else REFERENCE_ABORT_TYPE
         )
@@ -1476,14 +1871,35 @@ class RabbitMQClient:
             return []
 
     def ack_all_message(self, delivery_tags: List[int]) -> bool:
-        """批量确认消息。"""
+        """批量确认消息，连续的物理交付只发送一次 multiple 确认。"""
         logical_tags = list(dict.fromkeys(delivery_tags))
         if any(tag not in self._pending_deliveries for tag in logical_tags):
             return False
+        deliveries = []
         for logical_tag in logical_tags:
-            if not self.ack_message(logical_tag):
+            pending = self._settleable_delivery(logical_tag)
+            if pending is None:
                 return False
-        return True
+            deliveries.append(pending)
+        # 后续条目的截止检查可能已主动重入队前面的交付。
+        if any(pending.state != "pending" for pending in deliveries):
+            return False
+        try:
+            self._ack_deliveries(deliveries)
+            return True
+        except Exception as exc:
+            if any(pending.is_backend_owned for pending in deliveries):
+                error = self._lock_consumer_transport_error(
+                    exc,
+                    deliveries[0].channel_generation,
+                )
+                if error is not None:
+                    raise error from exc
+            if not self._is_transport_open():
+                for pending in deliveries:
+                    self._pending_deliveries.pop(pending.logical_id, None)
+            logger.error("批量确认消息失败: %s", exc)
+            return False
 
     def publish_messages(
         self,
@@ -1541,6 +1957,12 @@ class RabbitMQClient:
             for target_queue in dict.fromkeys(queue_names):
                 active_queue = target_queue
                 self._prepare_queue(target_queue, self.publisher_channel)
+            if self.publish_confirm_window > 1:
+                return self._publish_records_confirmed(
+                    queue_names,
+                    messages,
+                    resolved_message_ids,
+                )
             for message, resolved_message_id in zip(
                 messages,
                 resolved_message_ids,
@@ -1597,12 +2019,52 @@ class RabbitMQClient:
             logger.error("批量发布消息失败: %s", exc)
             return False
 
-    def process_data_events(self) -> None:
-        """处理心跳并立即传播托管消费通道的失效根因。"""
+    def _publish_records_confirmed(
+        self,
+        queue_names: List[str],
+        messages: List[Dict[str, Any]],
+        message_ids: List[str],
+    ) -> bool:
+        """在一个确认窗口内发布全部记录的全部分片，最后统一结算确认。"""
+        targets = list(dict.fromkeys(queue_names))
+        publications: List[tuple[Any, str, bytes | str, pika.BasicProperties]] = []
+        for index, (message, message_id) in enumerate(zip(messages, message_ids)):
+            for body, properties in self._build_business_publications(
+                message,
+                message_id,
+            ):
+                publications.extend(
+                    ((index, target_queue), target_queue, body, properties)
+                    for target_queue in targets
+                )
+        failed = self._publish_confirmed(publications)
+        failed_keys = {item.key for item in failed}
+        for index, message in enumerate(messages):
+            if message and any(
+                (index, target_queue) not in failed_keys
+                for target_queue in targets
+                if target_queue in self._reference_result_queues
+            ):
+                self._notify_successful_result()
+        if not failed:
+            return True
+        failed_queue = failed[0].queue_name
+        if self._is_backend_owned_reference_queue(failed_queue):
+            raise ReferenceStreamTransportError(
+                f"后端托管 REFERENCE 队列 {failed_queue} 批量发布未获确认"
+            )
+        logger.error("RabbitMQ 拒绝确认批量业务消息: %s", failed_queue)
+        return False
+
+    def process_data_events(self, time_limit: float = 0) -> None:
+        """处理心跳和推送交付，并立即传播托管消费通道的失效根因。"""
         self.raise_if_transport_failed()
         try:
             if self.connection and not self.connection.is_closed:
-                self.connection.process_data_events()
+                if time_limit:
+                    self.connection.process_data_events(time_limit=time_limit)
+                else:
+                    self.connection.process_data_events()
         except Exception as exc:
             error = self._consumer_transport_error
             if error is None:
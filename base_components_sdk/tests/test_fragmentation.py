@@ -1,6 +1,7 @@
 """RabbitMQ 业务消息分片协议测试。"""
 
 import hashlib
+import os
 
 import pytest
 
@@ -8,7 +9,9 @@ from csi_base_component_sdk.fragmentation import (
     DEFAULT_FRAGMENT_BYTES,
     DEFAULT_FRAGMENT_THRESHOLD_BYTES,
     DEFAULT_MAX_LOGICAL_MESSAGE_BYTES,
+    FRAGMENT_HEADER_CODEC,
     FRAGMENT_MESSAGE_TYPE,
+    SUPPORTED_CODECS,
     FragmentAssembler,
     FragmentProtocolError,
     FragmentSettings,
@@ -43,6 +46,18 @@ def test_fragment_settings_allow_optional_environment_overrides(monkeypatch):
     assert FragmentSettings.from_env() == FragmentSettings(12, 8, 64)
 
 
+def test_compression_is_off_until_enabled_by_environment(monkeypatch):
+    monkeypatch.delenv("CSI_RABBITMQ_COMPRESSION", raising=False)
+    settings = FragmentSettings.from_env()
+    body = b"a" * (settings.compression_threshold_bytes + 1)
+
+    assert settings.compression_codec is None
+    assert encode_fragments(body, "message-1", settings) == []
+
+    monkeypatch.setenv("CSI_RABBITMQ_COMPRESSION", "gzip")
+    assert FragmentSettings.from_env().compression_codec == "gzip"
+
+
 def test_encode_and_reassemble_fragmented_message():
     settings = FragmentSettings(12, 8, 64)
     body = "中文消息内容".encode("utf-8") * 3
@@ -130,3 +145,101 @@ def test_encode_rejects_message_over_logical_limit():
             "message-1",
             FragmentSettings(2, 1, 4),
         )
+
+
+def _compressible_body(size: int) -> bytes:
+    row = '{"title": "网页标题", "html": "<div class=\\"content\\">正文</div>"},'
+    return ("[" + row * (size // len(row.encode("utf-8")) + 1)).encode("utf-8")
+
+
+@pytest.mark.parametrize("codec", sorted(SUPPORTED_CODECS))
+def test_compressed_payload_is_fragmented_and_restored(codec):
+    settings = FragmentSettings(
+        threshold_bytes=4096,
+        fragment_bytes=1024,
+        max_logical_message_bytes=1024 * 1024,
+        compression_threshold_bytes=1024,
+        compression_codecs=(codec,),
+    )
+    body = _compressible_body(64 * 1024)
+    fragments = encode_fragments(body, "message-1", settings)
+    assembler = FragmentAssembler[int](settings)
+
+    assert fragments[0].headers[FRAGMENT_HEADER_CODEC] == codec
+    assert len(fragments) < len(body) // settings.fragment_bytes
+    result = None
+    for index, encoded in enumerate(fragments):
+        parsed = parse_fragment(
+            encoded.body,
+            FRAGMENT_MESSAGE_TYPE,
+            encoded.headers,
+            settings,
+        )
+        result = assembler.add(parsed, index)
+
+    assert result is not None
+    assert result.body == body
+    assert result.message_id == "message-1"
+
+
+def test_compressed_message_below_fragment_threshold_uses_single_fragment():
+    settings = FragmentSettings(
+        threshold_bytes=64 * 1024,
+        fragment_bytes=32 * 1024,
+        max_logical_message_bytes=1024 * 1024,
+        compression_threshold_bytes=1024,
+        compression_codecs=("gzip",),
+    )
+    body = _compressible_body(16 * 1024)
+    [encoded] = encode_fragments(body, "message-1", settings)
+
+    parsed = parse_fragment(
+        encoded.body,
+        FRAGMENT_MESSAGE_TYPE,
+        encoded.headers,
+        settings,
+    )
+
+    assert FragmentAssembler[int](settings).add(parsed, 1).body == body
+
+
+def test_incompressible_payload_keeps_plain_transport():
+    settings = FragmentSettings(
+        threshold_bytes=64 * 1024,
+        fragment_bytes=32 * 1024,
+        max_logical_message_bytes=1024 * 1024,
+        compression_threshold_bytes=1024,
+    )
+
+    assert encode_fragments(os.urandom(16 * 1024), "message-1", settings) == []
+
+
+def test_compressed_fragment_rejects_unknown_codec_and_size_mismatch():
+    settings = FragmentSettings(
+        threshold_bytes=64 * 1024,
+        fragment_bytes=32 * 1024,
+        max_logical_message_bytes=1024 * 1024,
+        compression_threshold_bytes=1024,
+        compression_codecs=("gzip",),
+    )
+    [encoded] = encode_fragments(_compressible_body(16 * 1024), "message-1", settings)
+
+    with pytest.raises(FragmentProtocolError, match="不支持的消息压缩编码"):
+        parse_fragment(
+            encoded.body,
+            FRAGMENT_MESSAGE_TYPE,
+            {**encoded.headers, FRAGMENT_HEADER_CODEC: "brotli"},
+            settings,
+        )
+
+    forged = parse_fragment(
+        encoded.body,
+        FRAGMENT_MESSAGE_TYPE,
+        {
+            **encoded.headers,
+            "x-csi-original-size": encoded.headers["x-csi-original-size"] - 1,
+        },
+        settings,
+    )
+    with pytest.raises(FragmentProtocolError, match="解压后的大小不一致"):
+        FragmentAssembler[int](settings).add(forged, 1)
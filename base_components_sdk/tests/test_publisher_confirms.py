@@ -0,0 +1,141 @@
+"""发布确认窗口测试。"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from csi_base_component_sdk.publisher_confirms import (
+    PendingPublish,
+    PublisherConfirmTimeout,
+    PublisherConfirmWindow,
+)
+
+
+class _Broker:
+    """记录发布并在每次 pump 时按脚本回送确认。"""
+
+    def __init__(self):
+        self.published: list[PendingPublish] = []
+        self.script: list = []
+        self.window: PublisherConfirmWindow | None = None
+
+    def publish(self, item: PendingPublish) -> None:
+        self.published.append(item)
+
+    def pump(self) -> None:
+        if self.script:
+            self.script.pop(0)(self.window)
+
+
+def _item(queue_name="queue-1", message_id="m-1", key=None) -> PendingPublish:
+    return PendingPublish(
+        queue_name=queue_name,
+        body=b"{}",
+        properties=SimpleNamespace(message_id=message_id),
+        key=key,
+    )
+
+
+def _window(broker: _Broker, **kwargs) -> PublisherConfirmWindow:
+    window = PublisherConfirmWindow(
+        broker.publish,
+        broker.pump,
+        window_size=kwargs.pop("window_size", 100),
+        **kwargs,
+    )
+    broker.window = window
+    return window
+
+
+def test_multiple_ack_settles_every_outstanding_publish_at_once():
+    broker = _Broker()
+    window = _window(broker)
+    for index in range(5):
+        window.publish(_item(message_id=f"m-{index}"))
+    broker.script = [lambda w: w.handle_confirm(5, True, True)]
+
+    assert window.flush() == []
+    assert window.outstanding == 0
+    assert window.stats["acked"] == 5
+    assert len(broker.published) == 5
+
+
+def test_window_blocks_until_confirms_free_capacity():
+    broker = _Broker()
+    window = _window(broker, window_size=2)
+    broker.script = [lambda w: w.handle_confirm(1, False, True)]
+
+    window.publish(_item(message_id="m-1"))
+    window.publish(_item(message_id="m-2"))
+    window.publish(_item(message_id="m-3"))
+
+    assert window.outstanding == 2
+    assert broker.script == []
+
+
+def test_only_nacked_publishes_are_retried():
+    broker = _Broker()
+    window = _window(broker)
+    window.publish(_item(message_id="m-1"))
+    window.publish(_item(message_id="m-2"))
+    window.publish(_item(message_id="m-3"))
+    broker.script = [
+        lambda w: (w.handle_confirm(1, False, True), w.handle_confirm(2, False, False)),
+        lambda w: w.handle_confirm(3, False, True),
+        lambda w: w.handle_confirm(4, False, True),
+    ]
+
+    assert window.flush() == []
+    assert [item.properties.message_id for item in broker.published] == [
+        "m-1",
+        "m-2",
+        "m-3",
+        "m-2",
+    ]
+    assert window.stats["retried"] == 1
+
+
+def test_nack_exhausting_retries_is_reported_as_failed():
+    broker = _Broker()
+    window = _window(broker, max_retries=1)
+    window.publish(_item(key="record-1"))
+    broker.script = [
+        lambda w: w.handle_confirm(1, False, False),
+        lambda w: w.handle_confirm(2, False, False),
+    ]
+
+    failed = window.flush()
+
+    assert [item.key for item in failed] == ["record-1"]
+    assert failed[0].attempts == 2
+
+
+def test_returned_mandatory_publish_fails_without_retry():
+    broker = _Broker()
+    window = _window(broker)
+    window.publish(_item(queue_name="missing", message_id="m-1", key="missing"))
+    window.publish(_item(queue_name="queue-1", message_id="m-1", key="queue-1"))
+    broker.script = [
+        lambda w: (w.handle_return("missing", "m-1"), w.handle_confirm(2, True, True)),
+    ]
+
+    failed = window.flush()
+
+    assert [item.key for item in failed] == ["missing"]
+    assert failed[0].returned is True
+    assert len(broker.published) == 2
+
+
+def test_flush_times_out_without_broker_progress(monkeypatch):
+    broker = _Broker()
+    window = _window(broker, timeout_seconds=5)
+    clock = iter([0.0, 10.0])
+    monkeypatch.setattr(
+        "csi_base_component_sdk.publisher_confirms.time.monotonic",
+        lambda: next(clock),
+    )
+    window._last_progress_at = 0.0
+    window.publish(_item())
+
+    with pytest.raises(PublisherConfirmTimeout):
+        window.flush()
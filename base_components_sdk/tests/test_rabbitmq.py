@@ -1,8 +1,9 @@
 """RabbitMQ 队列和 REFERENCE EOS 协议测试。"""
 
+import itertools
 import json
 from types import SimpleNamespace
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, call
 
 import pika
 import pytest
@@ -535,6 +536,37 @@ def test_reference_queue_has_no_auto_delete_or_expiration():
     assert properties.content_encoding == "utf-8"
 
 
+def test_external_queue_is_declared_once_per_connection():
+    client = _connected_client()
+
+    for index in range(3):
+        assert client.send_message("queue-1", {"value": index}) is True
+    client.channel.basic_get.return_value = (None, None, None)
+    assert client.get_message("queue-1") is None
+
+    client.channel.queue_declare.assert_called_once()
+    assert client.queue_declare_stats() == {
+        "declared": 1,
+        "saved": 3,
+        "cached_queues": 1,
+    }
+
+
+def test_declared_queue_cache_is_invalidated_on_channel_recovery():
+    client = _connected_client()
+    assert client.send_message("queue-1", {"value": 1}) is True
+    closed_channel = client.publisher_channel
+    closed_channel.is_closed = True
+    replacement_channel = MagicMock(is_closed=False)
+    client._open_publisher_channel = MagicMock(return_value=replacement_channel)
+
+    assert client.send_message("queue-1", {"value": 2}) is True
+
+    assert closed_channel.queue_declare.call_count == 1
+    replacement_channel.queue_declare.assert_called_once()
+    assert client.queue_declare_stats()["declared"] == 2
+
+
 def test_managed_reference_publish_never_declares_and_is_mandatory():
     client = _connected_client()
     _configure_managed_output(client)
@@ -737,7 +769,7 @@ def test_send_message_fragments_oversized_json_before_publish():
     callback.assert_called_once_with()
 
 
-def test_get_message_reassembles_fragments_and_ack_confirms_every_part():
+def test_get_message_reassembles_fragments_and_ack_confirms_every_part_at_once():
     client = _connected_client()
     client._fragment_settings = FragmentSettings(16, 8, 128)
     publications = client._build_business_publications(
@@ -755,10 +787,10 @@ def test_get_message_reassembles_fragments_and_ack_confirms_every_part():
     assert json.loads(message["body"]) == {"value": "中" * 12}
     assert message["message_id"] == "logical-1"
     assert client.ack_message(message["delivery_tag"]) is True
-    assert [
-        call.kwargs["delivery_tag"]
-        for call in client.channel.basic_ack.call_args_list
-    ] == list(range(1, len(publications) + 1))
+    client.channel.basic_ack.assert_called_once_with(
+        delivery_tag=len(publications),
+        multiple=True,
+    )
 
 
 def test_send_messages_batch_reuses_message_id_for_fan_out():
@@ -806,8 +838,8 @@ def test_publish_messages_uses_one_id_per_record_across_queues():
     assert published_ids[2] == published_ids[3]
     assert len(published_ids[2]) == 32
     assert published_ids[2] != "record-1"
-    for call in client.channel.basic_publish.call_args_list:
-        properties = call.kwargs["properties"]
+    for publish_call in client.channel.basic_publish.call_args_list:
+        properties = publish_call.kwargs["properties"]
         assert properties.content_type == "application/json"
         assert properties.content_encoding == "utf-8"
 
@@ -862,6 +894,107 @@ def test_publish_messages_uses_managed_topology_for_every_record():
     )
 
 
+class _ConfirmChannelImpl:
+    """模拟 confirm 模式下的底层通道，在连接事件中批量回送确认。"""
+
+    def __init__(self):
+        self.published: list[dict] = []
+        self.ack_nack_callback = None
+        self.return_callback = None
+        self.nack_tags: set[int] = set()
+
+    def confirm_delivery(self, *, ack_nack_callback, callback):
+        self.ack_nack_callback = ack_nack_callback
+        callback(None)
+
+    def add_on_return_callback(self, callback):
+        self.return_callback = callback
+
+    def basic_publish(self, **kwargs):
+        self.published.append(kwargs)
+
+    def confirm_all(self):
+        """按 delivery tag 回送确认，连续 ACK 合并为一个 multiple 确认帧。"""
+        last = len(self.published)
+        for tag in sorted(self.nack_tags):
+            self.ack_nack_callback(
+                SimpleNamespace(method=pika.spec.Basic.Nack(delivery_tag=tag))
+            )
+        self.ack_nack_callback(
+            SimpleNamespace(
+                method=pika.spec.Basic.Ack(delivery_tag=last, multiple=True)
+            )
+        )
+
+
+def _pipelined_client(impl: _ConfirmChannelImpl) -> RabbitMQClient:
+    client = RabbitMQClient(publish_confirm_window=64)
+    confirm_channel = SimpleNamespace(is_closed=False, _impl=impl)
+    client.connection = SimpleNamespace(
+        is_closed=False,
+        channel=MagicMock(return_value=confirm_channel),
+        process_data_events=MagicMock(side_effect=lambda **_: impl.confirm_all()),
+        add_callback_threadsafe=MagicMock(),
+    )
+    client.channel = MagicMock(is_closed=False)
+    return client
+
+
+def test_publish_messages_resolves_confirms_in_bulk():
+    impl = _ConfirmChannelImpl()
+    client = _pipelined_client(impl)
+
+    assert client.publish_messages(
+        ["queue-1", "queue-2"],
+        [{"value": index} for index in range(10)],
+    ) is True
+
+    assert len(impl.published) == 20
+    client.channel.basic_publish.assert_not_called()
+    assert client.connection.process_data_events.call_count == 1
+    assert client._confirm_window.stats["acked"] == 20
+
+
+def test_pipelined_publish_retries_only_nacked_messages():
+    impl = _ConfirmChannelImpl()
+    impl.nack_tags = {2}
+    client = _pipelined_client(impl)
+
+    assert client.publish_messages("queue-1", [{"value": 1}, {"value": 2}]) is True
+
+    bodies = [json.loads(item["body"])["value"] for item in impl.published]
+    assert bodies == [1, 2, 2]
+
+
+def test_pipelined_fan_out_counts_returned_queue_as_failed():
+    impl = _ConfirmChannelImpl()
+    client = _pipelined_client(impl)
+
+    def confirm_with_return(**_kwargs):
+        item = impl.published[1]
+        impl.return_callback(
+            None,
+            SimpleNamespace(routing_key=item["routing_key"]),
+            item["properties"],
+            item["body"],
+        )
+        impl.confirm_all()
+
+    client.connection.process_data_events.side_effect = confirm_with_return
+
+    assert client.send_messages_batch(["queue-1", "queue-2"], {"value": 1}) == 1
+
+
+def test_managed_pipelined_publish_failure_raises_transport_error():
+    impl = _ConfirmChannelImpl()
+    impl.nack_tags = {1, 2, 3, 4}
+    client = _pipelined_client(impl)
+    _configure_managed_output(client)
+
+    with pytest.raises(ReferenceStreamTransportError, match="未获确认"):
+        client.send_message("queue-1", {"value": 1})
+
+
 def test_mixed_batch_keeps_external_queue_failure_behavior():
     client = _connected_client()
     _configure_managed_output(client, "queue-2")
@@ -950,15 +1083,66 @@ def test_managed_ack_all_raises_for_amqp_failure():
         (_delivery(2), _properties(message_id="data-2"), b'{"value": 2}'),
     ]
     assert len(client.read_messages("queue-1", batch_size=2)) == 2
-    client.channel.basic_ack.side_effect = [None, RuntimeError("ack failed")]
+    client.channel.basic_ack.side_effect = RuntimeError("ack failed")
 
     with pytest.raises(ReferenceStreamTransportError, match="ack failed"):
         client.ack_all_message([1, 2])
 
-    assert 1 not in client._pending_deliveries
+    client.channel.basic_ack.assert_called_once_with(delivery_tag=2, multiple=True)
+    assert 1 in client._pending_deliveries
     assert 2 in client._pending_deliveries
 
 
+def test_ack_all_sends_single_multiple_ack_for_contiguous_batch():
+    client = _connected_client()
+    client.channel.basic_get.side_effect = [
+        (_delivery(tag), _properties(message_id=f"data-{tag}"), b'{"value": 1}')
+        for tag in range(1, 4)
+    ]
+    assert len(client.read_messages("queue-1", batch_size=3)) == 3
+
+    assert client.ack_all_message([3, 1, 2]) is True
+
+    client.channel.basic_ack.assert_called_once_with(delivery_tag=3, multiple=True)
+    assert client._pending_deliveries == {}
+
+
+def test_ack_all_does_not_cover_unsettled_earlier_delivery():
+    client = _connected_client()
+    client.channel.basic_get.side_effect = [
+        (_delivery(tag), _properties(message_id=f"data-{tag}"), b'{"value": 1}')
+        for tag in range(1, 6)
+    ]
+    assert len(client.read_messages("queue-1", batch_size=5)) == 5
+
+    assert client.ack_all_message([1, 2, 4, 5]) is True
+
+    assert client.channel.basic_ack.call_args_list == [
+        call(delivery_tag=2, multiple=True),
+        call(delivery_tag=4),
+        call(delivery_tag=5),
+    ]
+    assert list(client._pending_deliveries) == [3]
+
+    assert client.ack_message(3) is True
+    assert client.channel.basic_ack.call_args_list[-1] == call(delivery_tag=3)
+
+
+def test_ack_all_rejects_whole_batch_when_one_delivery_is_stale():
+    client = _connected_client()
+    client.channel.basic_get.side_effect = [
+        (_delivery(tag), _properties(message_id=f"data-{tag}"), b'{"value": 1}')
+        for tag in range(1, 3)
+    ]
+    assert len(client.read_messages("queue-1", batch_size=2)) == 2
+    client._pending_deliveries[2].state = "invalidated"
+
+    assert client.ack_all_message([1, 2]) is False
+
+    client.channel.basic_ack.assert_not_called()
+    assert 1 in client._pending_deliveries
+
+
 def test_external_queue_ack_all_returns_false_for_amqp_failure():
     client = _connected_client()
     _receive_message(client)
@@ -1118,6 +1302,187 @@ def test_eos_wait_honors_context_cancellation(monkeypatch):
         client.get_message("queue-1")
 
 
+def _push_client(deliveries: list, **kwargs) -> RabbitMQClient:
+    """创建推送消费模式的测试客户端，每次处理连接事件时推送一条脚本消息。"""
+    client = RabbitMQClient(reference_consumer_mode="consume", **kwargs)
+    client.connection = SimpleNamespace(
+        is_closed=False,
+        process_data_events=MagicMock(),
+    )
+    client.channel = MagicMock(is_closed=False)
+    client.channel.basic_consume.return_value = "consumer-1"
+    scripted = list(deliveries)
+
+    def dispatch_events(**_kwargs):
+        if not scripted:
+            return
+        callback = client.channel.basic_consume.call_args.kwargs[
+            "on_message_callback"
+        ]
+        method_frame, properties, body = scripted.pop(0)
+        callback(client.channel, method_frame, properties, body)
+
+    client.connection.process_data_events.side_effect = dispatch_events
+    return client
+
+
+def test_push_consumer_reads_reference_stream_without_polling(monkeypatch):
+    client = _push_client(
+        [
+            (_delivery(7), _properties(message_id="data-7"), b'{"value": 7}'),
+            (_delivery(8), _properties(REFERENCE_EOS_TYPE, "producer-1"), b"{}"),
+        ],
+        reference_consumer_prefetch_count=25,
+    )
+    _configure_managed_input(client)
+    monkeypatch.setattr(
+        "csi_base_component_sdk.rabbitmq.time.sleep",
+        MagicMock(side_effect=AssertionError("推送模式不应休眠轮询")),
+    )
+
+    message = client.get_message("queue-1")
+
+    assert message["message_id"] == "data-7"
+    client.channel.basic_qos.assert_called_once_with(prefetch_count=25)
+    assert client.channel.basic_consume.call_args.kwargs["auto_ack"] is False
+    client.channel.basic_get.assert_not_called()
+    assert client.ack_message(message["delivery_tag"]) is True
+    client.channel.basic_ack.assert_called_once_with(delivery_tag=7)
+
+    assert client.get_message("queue-1") is None
+    client.channel.basic_cancel.assert_called_once_with("consumer-1")
+    assert client.channel.basic_consume.call_count == 1
+
+
+def test_push_consumer_blocks_on_connection_events_while_waiting():
+    client = _push_client(
+        [(_delivery(1), _properties(message_id="data-1"), b'{"value": 1}')]
+    )
+    scripted_dispatch = client.connection.process_data_events.side_effect
+    waits: list[dict] = []
+
+    def dispatch_events(**kwargs):
+        waits.append(kwargs)
+        if client.connection.process_data_events.call_count == 1:
+            return
+        scripted_dispatch(**kwargs)
+
+    client.connection.process_data_events.side_effect = dispatch_events
+    _configure_managed_input(client)
+
+    assert client.get_message("queue-1")["message_id"] == "data-1"
+    assert {"time_limit": client._poll_interval} in waits
+
+
+def test_push_consumer_deadline_starts_at_broker_delivery(monkeypatch):
+    client = _push_client(
+        [(_delivery(3), _properties(message_id="data-3"), b'{"value": 3}')],
+    )
+    _configure_managed_input(client)
+    clock = itertools.chain([100.0], itertools.repeat(160.0))
+    monkeypatch.setattr(
+        "csi_base_component_sdk.rabbitmq.time.monotonic",
+        lambda: next(clock),
+    )
+
+    message = client.get_message("queue-1")
+
+    pending = client._pending_deliveries[message["delivery_tag"]]
+    assert pending.received_at == 100.0
+    assert pending.deadline_at == (
+        100.0
+        + client.reference_consumer_ack_timeout_seconds
+        - client.reference_consumer_ack_safety_margin_seconds
+    )
+
+
+def test_push_consumer_reassembles_fragments():
+    client = _push_client([])
+    client._fragment_settings = FragmentSettings(
+        threshold_bytes=16,
+        fragment_bytes=8,
+        max_logical_message_bytes=1024,
+    )
+    _configure_managed_input(client)
+    publications = client._build_business_publications(
+        {"value": "x" * 20},
+        "logical-1",
+    )
+    client.connection.process_data_events.side_effect = None
+    consumer = client._push_consumer("queue-1")
+    for tag, (body, properties) in enumerate(publications, start=1):
+        consumer.deliveries.append(
+            (
+                _delivery(tag),
+                SimpleNamespace(
+                    type=properties.type,
+                    headers=properties.headers,
+                    message_id=properties.message_id,
+                ),
+                body,
+                0.0,
+            )
+        )
+
+    message = client.get_message("queue-1")
+
+    assert json.loads(message["body"]) == {"value": "x" * 20}
+    assert message["message_id"] == "logical-1"
+    assert client.ack_message(message["delivery_tag"]) is True
+    assert client.channel.basic_ack.call_count == len(publications)
+
+
+def test_ack_all_does_not_coalesce_while_push_consumer_is_active():
+    client = _push_client([])
+    _configure_managed_input(client)
+    client.connection.process_data_events.side_effect = None
+    consumer = client._push_consumer("queue-1")
+    for tag in (1, 2):
+        consumer.deliveries.append(
+            (
+                _delivery(tag),
+                _properties(message_id=f"data-{tag}"),
+                b'{"value": 1}',
+                0.0,
+            )
+        )
+    first = client.get_message("queue-1")
+    second = client.get_message("queue-1")
+
+    # 其余交付可能仍在 pika 的待分发事件中，本地缓冲为空也不能合并确认。
+    assert not consumer.deliveries
+    assert client.ack_all_message(
+        [first["delivery_tag"], second["delivery_tag"]]
+    ) is True
+
+    assert client.channel.basic_ack.call_args_list == [
+        call(delivery_tag=1),
+        call(delivery_tag=2),
+    ]
+
+
+def test_push_consumer_cancel_requeues_buffered_deliveries():
+    client = _push_client([])
+    _configure_managed_input(client)
+    consumer = client._push_consumer("queue-1")
+    consumer.deliveries.append(
+        (_delivery(9), _properties(message_id="data-9"), b"{}", 0.0)
+    )
+
+    client._cancel_push_consumer("queue-1")
+
+    client.channel.basic_cancel.assert_called_once_with("consumer-1")
+    client.channel.basic_nack.assert_called_once_with(delivery_tag=9, requeue=True)
+    assert "queue-1" not in client._push_consumers
+
+
+def test_invalid_reference_consumer_mode_is_rejected():
+    with pytest.raises(ValueError, match="消费模式"):
+        RabbitMQClient(reference_consumer_mode="stream")
+    with pytest.raises(ValueError, match="预取数量"):
+        RabbitMQClient(reference_consumer_prefetch_count=0)
+
+
 def test_abort_is_acked_and_hidden_from_component():
     client = _connected_client()
     client.configure_reference_streams(
@@ -263,7 +263,7 @@ def test_component_context_marks_reference_publish_automatically(monkeypatch):
 
 
 def test_sdk_version_is_2_7_0():
-    assert csi_base_component_sdk.__version__ == "2.7.0"
+    assert csi_base_component_sdk.__version__ == "2.8.0"
 
 
 @pytest.mark.parametrize(
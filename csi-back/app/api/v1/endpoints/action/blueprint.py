@@ -42,7 +42,11 @@ from app.schemas.constants import (
 )
 from app.service.action import ActionInstanceService, node_model_to_response
 from app.service.action.compiler import BlueprintCompiler
-from app.service.action.schedule import validate_blueprint_params
+from app.service.action.graph_cache import WorkflowGraphCache
+from app.service.action.schedule import (
+    ActionScheduleService,
+    validate_blueprint_params,
+)
 from app.service.auth.service import has_backend_permissions
 from app.service.blueprint_revision import BlueprintRevisionService
 from app.service.boundary_binding_validator import (
@@ -239,7 +243,10 @@ async def get_blueprints(
     results = []
     for blueprint in blueprints:
         steps = len(blueprint.graph.nodes)
-        branches = count_workflow_paths(blueprint)
+        branches = count_workflow_paths(
+            blueprint,
+            WorkflowGraphCache.get_blueprint_graph(blueprint),
+        )
         latest_revision = await ActionBlueprintRevisionModel.find(
             {"blueprint_id": blueprint.id, "is_active": True}
         ).sort("-revision_number").first_or_none()
@@ -354,6 +361,7 @@ async def update_blueprint(blueprint_id: str, data: ActionBlueprintSchema):
         schedule.last_error = f"蓝图更新后参数不兼容：{reason}"
         schedule.updated_at = datetime.now(timezone.utc)
         await schedule.save()
+        await ActionScheduleService.notify_changed(schedule.id)
         disabled_schedules.append(
             BlueprintScheduleImpactSchema(
                 id=schedule.id,
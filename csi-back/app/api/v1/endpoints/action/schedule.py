@@ -165,6 +165,7 @@ async def create_schedule(data: ActionScheduleCreateRequest):
         updated_at=now,
     )
     await schedule.insert()
+    await ActionScheduleService.notify_changed(schedule.id)
     return ApiResponseSchema.success(data=schedule_response(schedule, blueprint))
 
 
@@ -321,6 +322,7 @@ async def update_schedule(schedule_id: str, data: ActionScheduleUpdateRequest):
     schedule.last_error = None
     schedule.updated_at = utc_now()
     await schedule.save()
+    await ActionScheduleService.notify_changed(schedule.id)
     return ApiResponseSchema.success(data=schedule_response(schedule, blueprint))
 
 
@@ -334,4 +336,5 @@ async def delete_schedule(schedule_id: str):
     schedule.next_run_at = None
     schedule.updated_at = utc_now()
     await schedule.save()
+    await ActionScheduleService.notify_changed(schedule.id)
     return ApiResponseSchema.success()
@@ -467,32 +467,34 @@ async def stream_alerts(
                 f"event: stream.reset\n"
                 f"data: {payload}\n\n"
             )
-        while True:
-            if await request.is_disconnected():
-                break
-            try:
-                messages = await AlertStreamService.read_after(
-                    cursor,
-                    block_ms=settings.ALERT_SSE_HEARTBEAT_SECONDS * 1000,
-                )
-            except asyncio.CancelledError:
-                raise
-            except Exception as exc:
-                payload = json.dumps(
-                    {"message": "告警事件流暂时不可用", "detail": str(exc)[:300]},
-                    ensure_ascii=False,
-                )
-                yield f"event: stream.error\ndata: {payload}\n\n"
-                await asyncio.sleep(1)
-                continue
-            if not messages:
-                yield ": keep-alive\n\n"
-                continue
-            for stream_id, fields in messages:
-                cursor = stream_id
-                event_name = fields.get("event") or "message"
-                data = fields.get("data") or "{}"
-                yield f"id: {stream_id}\nevent: {event_name}\ndata: {data}\n\n"
+        subscription = AlertStreamService.subscribe(cursor)
+        try:
+            while True:
+                if await request.is_disconnected():
+                    break
+                try:
+                    messages = await subscription.read(
+                        timeout=settings.ALERT_SSE_HEARTBEAT_SECONDS,
+                    )
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    payload = json.dumps(
+                        {"message": "告警事件流暂时不可用", "detail": str(exc)[:300]},
+                        ensure_ascii=False,
+                    )
+                    yield f"event: stream.error\ndata: {payload}\n\n"
+                    await asyncio.sleep(1)
+                    continue
+                if not messages:
+                    yield ": keep-alive\n\n"
+                    continue
+                for stream_id, fields in messages:
+                    event_name = fields.get("event") or "message"
+                    data = fields.get("data") or "{}"
+                    yield f"id: {stream_id}\nevent: {event_name}\ndata: {data}\n\n"
+        finally:
+            await subscription.close()
 
     return StreamingResponse(
         event_stream(),
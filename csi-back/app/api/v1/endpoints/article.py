@@ -5,8 +5,9 @@ from elasticsearch.exceptions import NotFoundError
 from app.db.elasticsearch import get_es
 from app.schemas.article import ArticleSchema
 from app.schemas.response import ApiResponseSchema
-from app.models.platform.platform import PlatformModel
+from app.service.platform_cache import PlatformMetadataCache
 from app.utils.date_time import parse_datetime
+from app.utils.search import source_projection
 from app.utils.entity_entities import parse_entities
 
 logger = logger.bind(name=__name__)
@@ -24,18 +25,11 @@ async def get_article_detail(uuid: str):
         return ApiResponseSchema.error(code=250001, message="Elasticsearch连接未初始化")
     
     try:
-        result = await es.get(index="article", id=uuid)
+        result = await es.get(index="article", id=uuid, **source_projection("detail").get_kwargs())
         source_data = result.get("_source", {})
         
         platform = source_data.get("platform")
-        platform_uuid = None
-        if platform:
-            try:
-                platform_obj = await PlatformModel.find_one({"name": platform})
-                if platform_obj:
-                    platform_uuid = platform_obj.id
-            except Exception as e:
-                logger.warning(f"查询平台UUID失败: {e}, platform_name: {platform}")
+        platform_uuid = await PlatformMetadataCache.get_id(platform)
         
         article_data = ArticleSchema(
             uuid=source_data.get("uuid", uuid),
@@ -6,8 +6,9 @@ from app.db.elasticsearch import get_es
 from app.schemas.forum import ForumSchema, CommentResultSchema
 from app.schemas.response import ApiResponseSchema
 from app.schemas.general import PageParamsSchema, PageResponseSchema
-from app.models.platform.platform import PlatformModel
+from app.service.platform_cache import PlatformMetadataCache
 from app.utils.date_time import parse_datetime
+from app.utils.search import source_projection
 from app.utils.entity_entities import parse_entities
 
 logger = logger.bind(name=__name__)
@@ -24,18 +25,11 @@ async def get_forum_detail(uuid: str):
         return ApiResponseSchema.error(code=250001, message="Elasticsearch连接未初始化")
     
     try:
-        result = await es.get(index="forum", id=uuid)
+        result = await es.get(index="forum", id=uuid, **source_projection("detail").get_kwargs())
         source_data = result.get("_source", {})
         
         platform = source_data.get("platform")
-        platform_uuid = None
-        if platform:
-            try:
-                platform_obj = await PlatformModel.find_one({"name": platform})
-                if platform_obj:
-                    platform_uuid = platform_obj.id
-            except Exception as e:
-                logger.warning(f"查询平台UUID失败: {e}, platform_name: {platform}")
+        platform_uuid = await PlatformMetadataCache.get_id(platform)
         
         topic_id = source_data.get("topic_id")
         topic_thread_uuid = None
@@ -142,13 +136,7 @@ async def get_comments(
     if thread_type not in ["comment", "featured"]:
         return ApiResponseSchema.error(code=240002, message="thread_type参数只能是comment或featured")
     
-    platform_id = None
-    try:
-        platform_obj = await PlatformModel.find_one({"name": platform})
-        if platform_obj:
-            platform_id = platform_obj.id
-    except Exception as e:
-        logger.warning(f"查询平台ID失败: {e}, platform_name: {platform}")
+    platform_id = await PlatformMetadataCache.get_id(platform)
 
     try:
         query_body = {
@@ -181,10 +169,10 @@ async def get_comments(
                     },
                     "aggs": {
                         "latest": {
-                            "top_hits": {
+                            "top_hits": source_projection("list").apply({
                                 "sort": [{"last_edit_at": {"order": "desc", "missing": "_last"}}],
                                 "size": 1
-                            }
+                            })
                         },
                         "floor_val": {
                             "max": {"field": "floor"}
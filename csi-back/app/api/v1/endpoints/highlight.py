@@ -7,6 +7,7 @@ from app.db.elasticsearch import get_es
 from app.schemas.constants import ENTITY_TYPE_NAMES, EntityType
 from app.schemas.highlight import HighlightRequestSchema
 from app.schemas.response import ApiResponseSchema
+from app.service.search import bump_search_index_generation
 
 logger = logger.bind(name=__name__)
 
@@ -53,6 +54,7 @@ async def set_highlight(
             id=uuid,
             body={"doc": update_data}
         )
+        await bump_search_index_generation()
         
         logger.info(f"成功更新{entity_name}标记状态: {uuid}, is_highlighted={data.is_highlighted}")
         return ApiResponseSchema.success(data={"message": "标记状态更新成功"})
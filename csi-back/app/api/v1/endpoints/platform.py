@@ -3,6 +3,7 @@ import re
 from fastapi import APIRouter, Depends, Query
 from typing import Annotated, List, Optional
 
+from app.core.config import settings
 from app.db.elasticsearch import get_es
 from app.schemas.overview import (
     OverviewTimeSeriesParamsSchema,
@@ -18,6 +19,7 @@ from app.utils.async_fetch import async_download_file
 from app.utils.file_security import validate_image_file, get_file_extension_from_mime, calculate_file_hash
 from app.utils.cos import upload_bytes_with_public_url, file_exists
 from app.service.overview import fetch_time_field_stats
+from app.service.platform_cache import PlatformMetadataCache
 
 logger = logger.bind(name=__name__)
 
@@ -69,7 +71,11 @@ async def create_platform(data: PlatformCreateRequestSchema):
             }
             headers["referer"] = data.url
             
-            logo_data = await async_download_file(data.logo, headers=headers)
+            logo_data = await async_download_file(
+                data.logo,
+                headers=headers,
+                max_size=settings.MAX_LOGO_SIZE
+            )
             
             is_valid, message, mime_type = validate_image_file(logo_data, data.logo)
             if is_valid and mime_type:
@@ -113,6 +119,7 @@ async def create_platform(data: PlatformCreateRequestSchema):
     )
     
     await platform_model.insert()
+    await PlatformMetadataCache.invalidate(platform_model.name)
     logger.info(f"成功创建平台: {platform_id} - {data.name}")
     
     return ApiResponseSchema.success(data=PlatformBaseInfoSchema.from_doc(platform_model))
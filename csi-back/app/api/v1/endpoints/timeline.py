@@ -7,6 +7,7 @@ from app.schemas.general import PageParamsSchema, PageResponseSchema
 from app.schemas.response import ApiResponseSchema
 from app.schemas.timeline import TimelineDiffCompareResponseSchema, TimelineResponseSchema
 from app.utils.date_time import parse_datetime
+from app.utils.search import source_projection
 
 
 router = APIRouter(
@@ -40,6 +41,7 @@ async def get_timeline(
         "from": from_,
         "size": params.page_size
     }
+    source_projection("list").apply(query_body)
     result = await es.search(index=index_name, body=query_body)
     total = result["hits"]["total"]["value"]
     hits = result["hits"]["hits"]
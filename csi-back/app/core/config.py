@@ -21,6 +21,8 @@ class Settings(BaseSettings):
     REDIS_URL: str
     REDIS_PASSWORD: str
     ACTION_CACHE_TTL: int = 600
+    ACTION_GRAPH_CACHE_SIZE: int = 1024
+    PLATFORM_CACHE_TTL_SECONDS: int = 300
     
     ELASTICSEARCH_URL: str
     ELASTICSEARCH_USER: str
@@ -33,19 +35,31 @@ class Settings(BaseSettings):
     ACTION_TIMEOUT_CHECK_INTERVAL_SECONDS: float = 1.0
     ACTION_SCHEDULER_POLL_SECONDS: int = 10
     ACTION_SCHEDULER_BATCH_SIZE: int = 100
+    REFERENCE_BRIDGE_BATCH_SIZE: int = 500
     ACTION_SCHEDULER_LOCK_SECONDS: int = 30
     ACTION_SCHEDULER_HEARTBEAT_TTL_SECONDS: int = 30
+    ACTION_SCHEDULER_MODE: str = "poll"
+    ACTION_SCHEDULER_WORKER_CONCURRENCY: int = 16
+    ACTION_SCHEDULER_RESYNC_SECONDS: int = 300
+    ACTION_NODE_DISPATCH_CONCURRENCY: int = 32
     ALERT_WORKER_POLL_SECONDS: float = 1.0
     ALERT_RULE_LOCK_SECONDS: int = 300
+    ALERT_RULE_SHARD_COUNT: int = 64
+    ALERT_RULE_SHARD_LEASE_SECONDS: int = 30
+    ALERT_RULE_SCAN_CONCURRENCY: int = 8
+    ALERT_PROVIDER_SCAN_CONCURRENCY: int = 2
     ALERT_OBSERVATION_LEASE_SECONDS: int = 60
     ALERT_OBSERVATION_MAX_ATTEMPTS: int = 10
+    ALERT_OBSERVATION_BATCH_SIZE: int = 200
     ALERT_REALTIME_RECONCILE_SECONDS: int = 300
     ALERT_WORKER_HEARTBEAT_SECONDS: int = 5
     ALERT_WORKER_HEARTBEAT_TTL_SECONDS: int = 20
     ALERT_SSE_HEARTBEAT_SECONDS: int = 15
     ALERT_SSE_STREAM_MAXLEN: int = 20000
+    SSE_HUB_SUBSCRIBER_BUFFER: int = 1000
     ALERT_PROVIDER_PAGE_SIZE: int = 200
     ALERT_OBSERVATION_RETENTION_DAYS: int = 14
+    ALERT_RULE_INDEX_CHECK_SECONDS: float = 1.0
     COMPONENT_SIGNAL_MAX_BATCH_SIZE: int = 100
     COMPONENT_SIGNAL_MAX_REQUEST_BYTES: int = 262144
     COMPONENT_SIGNAL_METADATA_MAX_BYTES: int = 16384
@@ -70,10 +84,18 @@ class Settings(BaseSettings):
     COS_SECRET_ACCESS_KEY: str
     COS_BUCKET_NAME: str
     COS_REGION: str
+    COS_MAX_POOL_CONNECTIONS: int = 50
+    COS_MULTIPART_PART_SIZE: int = 8 * 1024 * 1024
+    COS_MULTIPART_CONCURRENCY: int = 4
 
     USE_PROXY: bool = False
     OUT_SERVICE_PROXY: Optional[str] = None
     MAX_LOGO_SIZE: int = 5 * 1024 * 1024
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 20
+    HTTP_DNS_CACHE_SECONDS: int = 300
+    HTTP_KEEPALIVE_SECONDS: int = 30
+    HTTP_DOWNLOAD_MAX_BYTES: int = 512 * 1024 * 1024
 
     NANOBOT_AGENT_MAX_PARALLEL_SESSIONS: int = 0
     NANOBOT_SHUTDOWN_TIMEOUT_S: float = 30.0
@@ -89,6 +111,8 @@ class Settings(BaseSettings):
     EMBEDDING_MODEL: str = "Qwen/Qwen3-Embedding-8B"
     EMBEDDING_MODEL_URL: str = "https://api.siliconflow.cn/v1/embeddings"
     EMBEDDING_MODEL_API_KEY: str = ""
+    EMBEDDING_CACHE_SIZE: int = 2048
+    EMBEDDING_CACHE_TTL_SECONDS: int = 60 * 60 * 24
 
     DOCKER_HOST: Optional[str] = None
     AIO_SANDBOX_IMAGE: str = ""
@@ -98,6 +122,7 @@ class Settings(BaseSettings):
 
     HYBRID_TOTAL_CAP: int = 10000
     RRF_K: int = 60
+    HYBRID_RESULT_CACHE_TTL_SECONDS: int = 120
     VECTOR_NUM_CANDIDATES_MULTIPLIER: int = 100
     VECTOR_NUM_CANDIDATES_MIN: int = 2000
     VECTOR_NUM_CANDIDATES_MAX: int = 10000
@@ -159,21 +184,43 @@ class Settings(BaseSettings):
             raise RuntimeError("TEMPORARY_ACCOUNT_MAX_DAYS 必须大于 0")
         positive_fields = {
             "ACTION_TIMEOUT_CHECK_INTERVAL_SECONDS": self.ACTION_TIMEOUT_CHECK_INTERVAL_SECONDS,
+            "PLATFORM_CACHE_TTL_SECONDS": self.PLATFORM_CACHE_TTL_SECONDS,
+            "HYBRID_RESULT_CACHE_TTL_SECONDS": self.HYBRID_RESULT_CACHE_TTL_SECONDS,
+            "EMBEDDING_CACHE_SIZE": self.EMBEDDING_CACHE_SIZE,
+            "EMBEDDING_CACHE_TTL_SECONDS": self.EMBEDDING_CACHE_TTL_SECONDS,
+            "COS_MAX_POOL_CONNECTIONS": self.COS_MAX_POOL_CONNECTIONS,
+            "COS_MULTIPART_CONCURRENCY": self.COS_MULTIPART_CONCURRENCY,
+            "HTTP_POOL_LIMIT": self.HTTP_POOL_LIMIT,
+            "HTTP_POOL_LIMIT_PER_HOST": self.HTTP_POOL_LIMIT_PER_HOST,
+            "HTTP_DNS_CACHE_SECONDS": self.HTTP_DNS_CACHE_SECONDS,
+            "HTTP_KEEPALIVE_SECONDS": self.HTTP_KEEPALIVE_SECONDS,
+            "HTTP_DOWNLOAD_MAX_BYTES": self.HTTP_DOWNLOAD_MAX_BYTES,
             "ACTION_SCHEDULER_POLL_SECONDS": self.ACTION_SCHEDULER_POLL_SECONDS,
             "ACTION_SCHEDULER_BATCH_SIZE": self.ACTION_SCHEDULER_BATCH_SIZE,
+            "REFERENCE_BRIDGE_BATCH_SIZE": self.REFERENCE_BRIDGE_BATCH_SIZE,
             "ACTION_SCHEDULER_LOCK_SECONDS": self.ACTION_SCHEDULER_LOCK_SECONDS,
             "ACTION_SCHEDULER_HEARTBEAT_TTL_SECONDS": self.ACTION_SCHEDULER_HEARTBEAT_TTL_SECONDS,
+            "ACTION_SCHEDULER_WORKER_CONCURRENCY": self.ACTION_SCHEDULER_WORKER_CONCURRENCY,
+            "ACTION_SCHEDULER_RESYNC_SECONDS": self.ACTION_SCHEDULER_RESYNC_SECONDS,
+            "ACTION_NODE_DISPATCH_CONCURRENCY": self.ACTION_NODE_DISPATCH_CONCURRENCY,
             "ALERT_WORKER_POLL_SECONDS": self.ALERT_WORKER_POLL_SECONDS,
             "ALERT_RULE_LOCK_SECONDS": self.ALERT_RULE_LOCK_SECONDS,
+            "ALERT_RULE_SHARD_COUNT": self.ALERT_RULE_SHARD_COUNT,
+            "ALERT_RULE_SHARD_LEASE_SECONDS": self.ALERT_RULE_SHARD_LEASE_SECONDS,
+            "ALERT_RULE_SCAN_CONCURRENCY": self.ALERT_RULE_SCAN_CONCURRENCY,
+            "ALERT_PROVIDER_SCAN_CONCURRENCY": self.ALERT_PROVIDER_SCAN_CONCURRENCY,
             "ALERT_OBSERVATION_LEASE_SECONDS": self.ALERT_OBSERVATION_LEASE_SECONDS,
             "ALERT_OBSERVATION_MAX_ATTEMPTS": self.ALERT_OBSERVATION_MAX_ATTEMPTS,
+            "ALERT_OBSERVATION_BATCH_SIZE": self.ALERT_OBSERVATION_BATCH_SIZE,
             "ALERT_REALTIME_RECONCILE_SECONDS": self.ALERT_REALTIME_RECONCILE_SECONDS,
             "ALERT_WORKER_HEARTBEAT_SECONDS": self.ALERT_WORKER_HEARTBEAT_SECONDS,
             "ALERT_WORKER_HEARTBEAT_TTL_SECONDS": self.ALERT_WORKER_HEARTBEAT_TTL_SECONDS,
             "ALERT_SSE_HEARTBEAT_SECONDS": self.ALERT_SSE_HEARTBEAT_SECONDS,
             "ALERT_SSE_STREAM_MAXLEN": self.ALERT_SSE_STREAM_MAXLEN,
+            "SSE_HUB_SUBSCRIBER_BUFFER": self.SSE_HUB_SUBSCRIBER_BUFFER,
             "ALERT_PROVIDER_PAGE_SIZE": self.ALERT_PROVIDER_PAGE_SIZE,
             "ALERT_OBSERVATION_RETENTION_DAYS": self.ALERT_OBSERVATION_RETENTION_DAYS,
+            "ALERT_RULE_INDEX_CHECK_SECONDS": self.ALERT_RULE_INDEX_CHECK_SECONDS,
             "COMPONENT_SIGNAL_MAX_BATCH_SIZE": self.COMPONENT_SIGNAL_MAX_BATCH_SIZE,
             "COMPONENT_SIGNAL_MAX_REQUEST_BYTES": self.COMPONENT_SIGNAL_MAX_REQUEST_BYTES,
             "COMPONENT_SIGNAL_METADATA_MAX_BYTES": self.COMPONENT_SIGNAL_METADATA_MAX_BYTES,
@@ -190,6 +237,8 @@ class Settings(BaseSettings):
         invalid = [name for name, value in positive_fields.items() if value <= 0]
         if invalid:
             raise RuntimeError(f"认证防护配置必须大于 0: {', '.join(invalid)}")
+        if self.ACTION_SCHEDULER_MODE not in {"poll", "heap"}:
+            raise RuntimeError("ACTION_SCHEDULER_MODE 必须是 poll 或 heap")
         if self.COMPONENT_RUN_TIMEOUT_SECONDS < 0:
             raise RuntimeError("COMPONENT_RUN_TIMEOUT_SECONDS 不能小于 0")
         if self.REFERENCE_CONSUMER_ACK_TIMEOUT_SECONDS <= 0:
@@ -231,6 +280,8 @@ class Settings(BaseSettings):
             raise RuntimeError("NANOBOT_EVENT_STREAM_MAXLEN 不能小于 100")
         if self.NANOBOT_EVENT_STREAM_TTL_SECONDS < 60:
             raise RuntimeError("NANOBOT_EVENT_STREAM_TTL_SECONDS 不能小于 60")
+        if self.COS_MULTIPART_PART_SIZE < 5 * 1024 * 1024:
+            raise RuntimeError("COS_MULTIPART_PART_SIZE 不能小于 5 MiB")
 
 class SettingsProxy:
     """Stable reference used by modules that import ``settings`` once."""
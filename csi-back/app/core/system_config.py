@@ -66,21 +66,35 @@ CONFIG_FIELDS = (
     _f("REDIS_URL", "Redis 地址", "infrastructure", "readonly", "string", sensitive=True),
     _f("REDIS_PASSWORD", "Redis 密码", "infrastructure", "readonly", "string", sensitive=True),
     _f("ACTION_CACHE_TTL", "行动缓存有效期", "search", "runtime", "integer", description="单位：秒", constraints=POSITIVE),
+    _f("ACTION_GRAPH_CACHE_SIZE", "行动编译图缓存容量", "search", "runtime", "integer", description="单进程保留的编译图数量", constraints=POSITIVE),
+    _f("PLATFORM_CACHE_TTL_SECONDS", "平台元数据缓存有效期", "search", "runtime", "integer", description="单位：秒，平台新增或编辑时主动失效", constraints=POSITIVE),
     _f("ACTION_SCHEDULER_POLL_SECONDS", "行动调度扫描间隔", "infrastructure", "restart", "integer", description="单位：秒", constraints=POSITIVE),
     _f("ACTION_SCHEDULER_BATCH_SIZE", "行动调度单批上限", "infrastructure", "restart", "integer", constraints=POSITIVE),
+    _f("REFERENCE_BRIDGE_BATCH_SIZE", "Reference 桥接单批上限", "infrastructure", "runtime", "integer", description="每批转存的最大消息数，1 表示逐条转存", constraints=POSITIVE),
     _f("ACTION_SCHEDULER_LOCK_SECONDS", "行动调度锁定时长", "infrastructure", "restart", "integer", description="单位：秒", constraints=POSITIVE),
     _f("ACTION_SCHEDULER_HEARTBEAT_TTL_SECONDS", "行动调度心跳有效期", "infrastructure", "restart", "integer", description="单位：秒", constraints=POSITIVE),
+    _f("ACTION_SCHEDULER_MODE", "行动调度模式", "infrastructure", "restart", "string", description="poll 为周期扫描，heap 为内存最小堆增量调度", constraints={"enum": ["poll", "heap"]}),
+    _f("ACTION_SCHEDULER_WORKER_CONCURRENCY", "行动调度触发并发数", "infrastructure", "restart", "integer", description="仅 heap 模式生效", constraints=POSITIVE),
+    _f("ACTION_SCHEDULER_RESYNC_SECONDS", "行动调度全量对账周期", "infrastructure", "restart", "integer", description="单位：秒；仅 heap 模式生效", constraints=POSITIVE),
+    _f("ACTION_NODE_DISPATCH_CONCURRENCY", "行动节点并发派发上限", "infrastructure", "runtime", "integer", description="单次补偿派发中同时运行的节点数", constraints=POSITIVE),
     _f("ALERT_WORKER_POLL_SECONDS", "告警 Worker 扫描间隔", "infrastructure", "runtime", "number", description="单位：秒", constraints={"min": 0.1}),
     _f("ALERT_RULE_LOCK_SECONDS", "告警规则锁定时长", "infrastructure", "restart", "integer", description="单位：秒", constraints=POSITIVE),
+    _f("ALERT_RULE_SHARD_COUNT", "告警规则扫描分片数", "infrastructure", "restart", "integer", description="所有告警 Worker 必须使用相同取值", constraints=POSITIVE),
+    _f("ALERT_RULE_SHARD_LEASE_SECONDS", "告警规则分片租约时长", "infrastructure", "runtime", "integer", description="单位：秒", constraints=POSITIVE),
+    _f("ALERT_RULE_SCAN_CONCURRENCY", "告警规则并发扫描数", "infrastructure", "restart", "integer", constraints=POSITIVE),
+    _f("ALERT_PROVIDER_SCAN_CONCURRENCY", "单个告警源并发扫描数", "infrastructure", "restart", "integer", constraints=POSITIVE),
     _f("ALERT_OBSERVATION_LEASE_SECONDS", "告警观测租约时长", "infrastructure", "restart", "integer", description="单位：秒", constraints=POSITIVE),
     _f("ALERT_OBSERVATION_MAX_ATTEMPTS", "告警观测最大重试次数", "infrastructure", "runtime", "integer", constraints=POSITIVE),
+    _f("ALERT_OBSERVATION_BATCH_SIZE", "告警观测批量领取数量", "infrastructure", "runtime", "integer", constraints=POSITIVE),
     _f("ALERT_REALTIME_RECONCILE_SECONDS", "实时告警补偿扫描周期", "infrastructure", "runtime", "integer", description="单位：秒", constraints=POSITIVE),
     _f("ALERT_WORKER_HEARTBEAT_SECONDS", "告警 Worker 心跳间隔", "infrastructure", "restart", "integer", description="单位：秒", constraints=POSITIVE),
     _f("ALERT_WORKER_HEARTBEAT_TTL_SECONDS", "告警 Worker 心跳有效期", "infrastructure", "restart", "integer", description="单位：秒", constraints=POSITIVE),
     _f("ALERT_SSE_HEARTBEAT_SECONDS", "告警 SSE 心跳间隔", "infrastructure", "runtime", "integer", description="单位：秒", constraints=POSITIVE),
     _f("ALERT_SSE_STREAM_MAXLEN", "告警 SSE 事件流最大长度", "infrastructure", "runtime", "integer", constraints={"min": 100}),
+    _f("SSE_HUB_SUBSCRIBER_BUFFER", "SSE 订阅者缓冲长度", "infrastructure", "runtime", "integer", description="缓冲溢出的订阅者改为按游标追赶", constraints=POSITIVE),
     _f("ALERT_PROVIDER_PAGE_SIZE", "告警 Provider 扫描分页", "infrastructure", "runtime", "integer", constraints=POSITIVE),
     _f("ALERT_OBSERVATION_RETENTION_DAYS", "已处理告警观测保留天数", "infrastructure", "runtime", "integer", constraints=POSITIVE),
+    _f("ALERT_RULE_INDEX_CHECK_SECONDS", "告警规则索引版本检查间隔", "infrastructure", "runtime", "number", description="单位：秒", constraints={"min": 0.1}),
     _f("COMPONENT_SIGNAL_MAX_BATCH_SIZE", "组件信号单批上限", "infrastructure", "runtime", "integer", constraints=POSITIVE),
     _f("COMPONENT_SIGNAL_MAX_REQUEST_BYTES", "组件信号请求大小上限", "infrastructure", "restart", "integer", description="单位：字节", constraints=POSITIVE),
     _f("COMPONENT_SIGNAL_METADATA_MAX_BYTES", "组件信号元数据大小上限", "infrastructure", "runtime", "integer", description="单位：字节", constraints=POSITIVE),
@@ -107,9 +121,17 @@ CONFIG_FIELDS = (
     _f("COS_SECRET_ACCESS_KEY", "COS Secret Key", "integration", "restart", "string", sensitive=True),
     _f("COS_BUCKET_NAME", "COS Bucket", "integration", "restart", "string"),
     _f("COS_REGION", "COS Region", "integration", "restart", "string"),
+    _f("COS_MAX_POOL_CONNECTIONS", "COS 连接池上限", "integration", "restart", "integer", description="进程内共享客户端的最大连接数", constraints=POSITIVE),
+    _f("COS_MULTIPART_PART_SIZE", "COS 分片大小", "integration", "runtime", "integer", description="单位：字节，不小于 5 MiB", constraints={"min": 5 * 1024 * 1024}),
+    _f("COS_MULTIPART_CONCURRENCY", "COS 分片并发数", "integration", "runtime", "integer", description="单次流式传输同时进行的分片数", constraints=POSITIVE),
     _f("USE_PROXY", "启用外部代理", "network", "runtime", "boolean"),
     _f("OUT_SERVICE_PROXY", "外部代理地址", "network", "runtime", "string", sensitive=True, constraints={"format": "url", "optional": True}),
     _f("MAX_LOGO_SIZE", "Logo 最大大小", "network", "runtime", "integer", description="单位：字节", constraints=POSITIVE),
+    _f("HTTP_POOL_LIMIT", "HTTP 连接池上限", "network", "restart", "integer", description="共享会话的总连接数", constraints=POSITIVE),
+    _f("HTTP_POOL_LIMIT_PER_HOST", "HTTP 单主机连接上限", "network", "restart", "integer", constraints=POSITIVE),
+    _f("HTTP_DNS_CACHE_SECONDS", "HTTP DNS 缓存时长", "network", "restart", "integer", description="单位：秒", constraints=POSITIVE),
+    _f("HTTP_KEEPALIVE_SECONDS", "HTTP 长连接保持时长", "network", "restart", "integer", description="单位：秒", constraints=POSITIVE),
+    _f("HTTP_DOWNLOAD_MAX_BYTES", "HTTP 下载最大大小", "network", "runtime", "integer", description="单位：字节，流式下载超过后中止", constraints=POSITIVE),
     _f("NANOBOT_AGENT_MAX_PARALLEL_SESSIONS", "Agent 最大并行会话", "agent", "runtime", "integer", description="0 表示不限制", constraints=NON_NEGATIVE),
     _f("NANOBOT_SHUTDOWN_TIMEOUT_S", "Agent 关闭超时", "agent", "runtime", "number", description="单位：秒", constraints={"min": 1}),
     _f("NANOBOT_RUNTIME_WORKER_ENABLED", "启用分析任务 Worker", "agent", "restart", "boolean"),
@@ -123,6 +145,8 @@ CONFIG_FIELDS = (
     _f("EMBEDDING_MODEL", "Embedding 模型", "integration", "restart", "string"),
     _f("EMBEDDING_MODEL_URL", "Embedding 地址", "integration", "restart", "string", constraints={"format": "url"}),
     _f("EMBEDDING_MODEL_API_KEY", "Embedding API Key", "integration", "restart", "string", sensitive=True),
+    _f("EMBEDDING_CACHE_SIZE", "查询向量本地缓存容量", "integration", "runtime", "integer", description="单进程 LRU 保留的查询向量数量", constraints=POSITIVE),
+    _f("EMBEDDING_CACHE_TTL_SECONDS", "查询向量缓存有效期", "integration", "runtime", "integer", description="单位：秒，Redis 中以 float16 压缩存储", constraints=POSITIVE),
     _f("DOCKER_HOST", "Docker Host", "agent", "runtime", "string", sensitive=True, constraints={"optional": True}),
     _f("AIO_SANDBOX_IMAGE", "一体化沙盒镜像", "agent", "runtime", "string"),
     _f("WINDOWS_SANDBOX_IMAGE", "Windows 沙盒镜像", "agent", "runtime", "string"),
@@ -130,6 +154,7 @@ CONFIG_FIELDS = (
     _f("SANDBOX_PORT_RANGE", "沙盒端口范围", "agent", "runtime", "string", description="例如 16700-16799", constraints={"format": "port_range"}),
     _f("HYBRID_TOTAL_CAP", "混合检索总量上限", "search", "runtime", "integer", constraints=POSITIVE),
     _f("RRF_K", "RRF K 值", "search", "runtime", "integer", constraints=POSITIVE),
+    _f("HYBRID_RESULT_CACHE_TTL_SECONDS", "混合检索结果集缓存有效期", "search", "runtime", "integer", description="单位：秒，缓存融合后的文档 ID 列表供翻页复用", constraints=POSITIVE),
     _f("VECTOR_NUM_CANDIDATES_MULTIPLIER", "向量候选倍数", "search", "runtime", "integer", constraints=POSITIVE),
     _f("VECTOR_NUM_CANDIDATES_MIN", "向量候选最小值", "search", "runtime", "integer", constraints=POSITIVE),
     _f("VECTOR_NUM_CANDIDATES_MAX", "向量候选最大值", "search", "runtime", "integer", constraints=POSITIVE),
@@ -382,6 +407,9 @@ class SystemConfigManager:
         if start < 1 or end > 65535 or start > end:
             raise ValueError("SANDBOX_PORT_RANGE 必须位于 1-65535 且起始端口不大于结束端口")
         for item in CONFIG_FIELDS:
+            choices = item.constraints.get("enum")
+            if choices and getattr(candidate, item.key) not in choices:
+                raise ValueError(f"{item.key} 必须是 {'、'.join(choices)} 之一")
             if item.constraints.get("format") != "url":
                 continue
             value = getattr(candidate, item.key)
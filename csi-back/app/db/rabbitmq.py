@@ -4,7 +4,7 @@ import asyncio
 import json
 from collections.abc import Awaitable, Callable
 from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any, Literal, Sequence
 from uuid import uuid4
 
@@ -55,6 +55,69 @@ def _ensure_publish_confirmed(confirmation, queue_name: str) -> None:
     raise RuntimeError(f"Reference消息发布未获确认: {queue_name}")
 
 
+class _ReferenceAckTracker:
+    """记录同一通道上尚未结算的物理投递，把连续的确认合并为一帧。
+
+    multiple=True 会确认通道上不大于该 delivery tag 的全部未结算消息，
+    因此只合并到第一个不属于本次确认的未结算 tag 之前，其余仍逐条确认。
+    """
+
+    def __init__(self) -> None:
+        self._outstanding: set[int] = set()
+
+    def track(self, message: AbstractIncomingMessage) -> None:
+        delivery_tag = getattr(message, "delivery_tag", None)
+        if delivery_tag is not None:
+            self._outstanding.add(delivery_tag)
+
+    def is_settled(self, message: AbstractIncomingMessage) -> bool:
+        """multiple 确认不会更新前序消息对象的状态，以登记结果为准。"""
+        if getattr(message, "processed", False):
+            return True
+        delivery_tag = getattr(message, "delivery_tag", None)
+        return delivery_tag is not None and delivery_tag not in self._outstanding
+
+    async def ack(self, messages: Sequence[AbstractIncomingMessage]) -> None:
+        settling: dict[int, AbstractIncomingMessage] = {}
+        for message in messages:
+            if self.is_settled(message):
+                continue
+            delivery_tag = getattr(message, "delivery_tag", None)
+            if delivery_tag is None:
+                await message.ack()
+                continue
+            settling[delivery_tag] = message
+        delivery_tags = sorted(settling)
+        blocking_tag = min(
+            self._outstanding.difference(delivery_tags),
+            default=None,
+        )
+        contiguous = [
+            delivery_tag
+            for delivery_tag in delivery_tags
+            if blocking_tag is None or delivery_tag < blocking_tag
+        ]
+        if len(contiguous) > 1:
+            await settling[contiguous[-1]].ack(multiple=True)
+            self._outstanding.difference_update(contiguous)
+            delivery_tags = delivery_tags[len(contiguous) :]
+        for delivery_tag in delivery_tags:
+            await settling[delivery_tag].ack()
+            self._outstanding.discard(delivery_tag)
+
+    async def nack(
+        self,
+        messages: Sequence[AbstractIncomingMessage],
+        *,
+        requeue: bool,
+    ) -> None:
+        for message in messages:
+            if self.is_settled(message):
+                continue
+            await message.nack(requeue=requeue)
+            self._outstanding.discard(getattr(message, "delivery_tag", None))
+
+
 @dataclass
 class ReferenceMessageDelivery:
     """封装一条手动确认的 Reference 消息及其所属通道。"""
@@ -63,19 +126,26 @@ class ReferenceMessageDelivery:
     message: AbstractIncomingMessage
     owns_channel: bool = True
     physical_messages: tuple[AbstractIncomingMessage, ...] = ()
+    ack_tracker: _ReferenceAckTracker | None = None
 
     def __post_init__(self) -> None:
         if not self.physical_messages:
             self.physical_messages = (self.message,)
 
     async def ack(self) -> None:
-        """确认源消息。"""
+        """确认源消息，同一通道上连续的物理分片合并为一次 multiple 确认。"""
+        if self.ack_tracker is not None:
+            await self.ack_tracker.ack(self.physical_messages)
+            return
         for message in self.physical_messages:
             if not getattr(message, "processed", False):
                 await message.ack()
 
     async def nack(self, *, requeue: bool = True) -> None:
         """拒绝源消息并按需重新入队。"""
+        if self.ack_tracker is not None:
+            await self.ack_tracker.nack(self.physical_messages, requeue=requeue)
+            return
         for message in self.physical_messages:
             if not getattr(message, "processed", False):
                 await message.nack(requeue=requeue)
@@ -86,6 +156,38 @@ class ReferenceMessageDelivery:
             await self.channel.close()
 
 
+@dataclass
+class ReferenceMessageBatch:
+    """同一通道上按投递顺序取得的一批手动确认 Reference 物理消息。"""
+
+    channel: AbstractChannel
+    iterator: AbstractQueueIterator | None
+    messages: list[AbstractIncomingMessage]
+    acked: int = 0
+
+    async def ack_through(self, count: int) -> None:
+        """以 multiple=True 一次确认前 count 条消息。"""
+        if count <= self.acked:
+            return
+        await self.messages[count - 1].ack(multiple=True)
+        # multiple 确认不会更新前序消息对象的状态，由批次记录已确认位置。
+        self.acked = count
+
+    async def nack_pending(self, *, requeue: bool = True) -> None:
+        """拒绝本批尚未处理的消息。"""
+        for message in self.messages[self.acked :]:
+            if not getattr(message, "processed", False):
+                await message.nack(requeue=requeue)
+
+    async def close(self) -> None:
+        """停止消费并关闭通道，已预取但未取出的消息随通道关闭重新入队。"""
+        if self.iterator is not None:
+            with suppress(Exception):
+                await self.iterator.close()
+        if not self.channel.is_closed:
+            await self.channel.close()
+
+
 class _LogicalIncomingMessage:
     """向后端原生节点暴露重组后的完整消息属性。"""
 
@@ -95,11 +197,13 @@ class _LogicalIncomingMessage:
         message_id: str,
         source: AbstractIncomingMessage,
         physical_messages: tuple[AbstractIncomingMessage, ...],
+        ack_tracker: _ReferenceAckTracker | None = None,
     ):
         self.body = body
         self.message_id = message_id
         self._source = source
         self._physical_messages = physical_messages
+        self._ack_tracker = ack_tracker
         self.type = None
         self.headers = {
             key: value
@@ -111,6 +215,11 @@ class _LogicalIncomingMessage:
     @property
     def processed(self) -> bool:
         """仅当全部物理分片均已确认或拒绝时视为已处理。"""
+        if self._ack_tracker is not None:
+            return all(
+                self._ack_tracker.is_settled(message)
+                for message in self._physical_messages
+            )
         return all(
             getattr(message, "processed", False)
             for message in self._physical_messages
@@ -128,6 +237,7 @@ class ReferenceQueueConsumer:
     iterator: AbstractQueueIterator
     _closed: bool = False
     assembler: FragmentAssembler[AbstractIncomingMessage] | None = None
+    ack_tracker: _ReferenceAckTracker = field(default_factory=_ReferenceAckTracker)
 
     async def receive(self) -> ReferenceMessageDelivery | None:
         """等待下一条消息，消费者关闭后返回 None。"""
@@ -140,6 +250,7 @@ class ReferenceQueueConsumer:
                 message = await self.iterator.__anext__()
             except StopAsyncIteration:
                 return None
+            self.ack_tracker.track(message)
             control_kind = get_reference_control_kind(message)
             if control_kind is not None:
                 if self.assembler.has_pending and control_kind == "abort":
@@ -149,11 +260,13 @@ class ReferenceQueueConsumer:
                         message=message,
                         owns_channel=False,
                         physical_messages=(*pending, message),
+                        ack_tracker=self.ack_tracker,
                     )
                 return ReferenceMessageDelivery(
                     channel=self.channel,
                     message=message,
                     owns_channel=False,
+                    ack_tracker=self.ack_tracker,
                 )
 
             fragment = parse_fragment(
@@ -167,6 +280,7 @@ class ReferenceQueueConsumer:
                     channel=self.channel,
                     message=message,
                     owns_channel=False,
+                    ack_tracker=self.ack_tracker,
                 )
             assembled = self.assembler.add(fragment, message)
             if assembled is None:
@@ -179,9 +293,11 @@ class ReferenceQueueConsumer:
                     assembled.message_id,
                     physical_messages[0],
                     physical_messages,
+                    self.ack_tracker,
                 ),
                 owns_channel=False,
                 physical_messages=physical_messages,
+                ack_tracker=self.ack_tracker,
             )
 
     async def close(self) -> None:
@@ -350,6 +466,61 @@ async def get_reference_message(
         raise
 
 
+async def get_reference_batch(
+    queue_name: str,
+    limit: int,
+    *,
+    wait_seconds: float = 0.0,
+    linger_seconds: float = 0.005,
+) -> ReferenceMessageBatch | None:
+    """以推送消费方式取得至多 limit 条物理消息，遇到控制消息即截止。
+
+    首条消息最多等待 wait_seconds，之后只收取在 linger_seconds 内
+    到达的消息，因此空队列和低流量时不会为凑满批次而阻塞。
+    """
+    if not rabbitmq_connection:
+        raise RuntimeError("RabbitMQ连接未初始化")
+    if limit <= 0:
+        raise ValueError("Reference批量大小必须大于 0")
+    channel = await rabbitmq_connection.channel(
+        publisher_confirms=True,
+        on_return_raises=True,
+    )
+    iterator: AbstractQueueIterator | None = None
+    try:
+        await channel.set_qos(prefetch_count=limit)
+        queue = await _get_reference_queue(channel, queue_name)
+        iterator = queue.iterator(no_ack=False)
+        await iterator.__aenter__()
+        messages: list[AbstractIncomingMessage] = []
+        timeout = max(wait_seconds, linger_seconds)
+        while len(messages) < limit:
+            try:
+                message = await asyncio.wait_for(iterator.__anext__(), timeout)
+            except (asyncio.TimeoutError, StopAsyncIteration):
+                break
+            messages.append(message)
+            if get_reference_control_kind(message) is not None:
+                break
+            timeout = linger_seconds
+        batch = ReferenceMessageBatch(
+            channel=channel,
+            iterator=iterator,
+            messages=messages,
+        )
+        if not messages:
+            await batch.close()
+            return None
+        return batch
+    except BaseException:
+        if iterator is not None:
+            with suppress(Exception):
+                await iterator.close()
+        if not channel.is_closed:
+            await channel.close()
+        raise
+
+
 async def get_reference_logical_message(
     queue_name: str,
 ) -> ReferenceMessageDelivery | None:
@@ -361,6 +532,7 @@ async def get_reference_logical_message(
         on_return_raises=True,
     )
     assembler = FragmentAssembler[AbstractIncomingMessage](fragment_settings)
+    ack_tracker = _ReferenceAckTracker()
     try:
         queue = await _get_reference_queue(channel, queue_name)
         while True:
@@ -368,6 +540,7 @@ async def get_reference_logical_message(
             if message is None:
                 await channel.close()
                 return None
+            ack_tracker.track(message)
 
             control_kind = get_reference_control_kind(message)
             if control_kind is not None:
@@ -377,10 +550,12 @@ async def get_reference_logical_message(
                         channel=channel,
                         message=message,
                         physical_messages=(*pending, message),
+                        ack_tracker=ack_tracker,
                     )
                 return ReferenceMessageDelivery(
                     channel=channel,
                     message=message,
+                    ack_tracker=ack_tracker,
                 )
 
             fragment = parse_fragment(
@@ -393,6 +568,7 @@ async def get_reference_logical_message(
                 return ReferenceMessageDelivery(
                     channel=channel,
                     message=message,
+                    ack_tracker=ack_tracker,
                 )
             assembled = assembler.add(fragment, message)
             if assembled is None:
@@ -405,8 +581,10 @@ async def get_reference_logical_message(
                     assembled.message_id,
                     physical_messages[0],
                     physical_messages,
+                    ack_tracker,
                 ),
                 physical_messages=physical_messages,
+                ack_tracker=ack_tracker,
             )
     except Exception:
         if not channel.is_closed:
@@ -486,6 +664,27 @@ async def publish_reference_delivery(
         _ensure_publish_confirmed(confirmation, queue_name)
 
 
+async def publish_reference_batch(
+    channel: AbstractChannel,
+    messages: Sequence[AbstractIncomingMessage],
+    queue_names: Sequence[str],
+) -> None:
+    """并发发布一批 DATA 并统一等待 publisher confirm，全部确认后才可确认源消息。"""
+    for queue_name in dict.fromkeys(queue_names):
+        confirmations = await asyncio.gather(
+            *(
+                channel.default_exchange.publish(
+                    clone_reference_message(message),
+                    routing_key=queue_name,
+                    mandatory=True,
+                )
+                for message in messages
+            )
+        )
+        for confirmation in confirmations:
+            _ensure_publish_confirmed(confirmation, queue_name)
+
+
 async def publish_reference_json_delivery(
     delivery: ReferenceMessageDelivery,
     queue_names: Sequence[str],
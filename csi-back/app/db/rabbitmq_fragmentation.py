@@ -1,12 +1,19 @@
 from __future__ import annotations
 
 import hashlib
+import io
 import math
 import os
+import zlib
 from dataclasses import dataclass, field
 from typing import Any, Generic, TypeVar
 from uuid import uuid4
 
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 未安装时回退为 gzip
+    zstandard = None
+
 
 FRAGMENT_MESSAGE_TYPE = "csi.message.fragment.v1"
 FRAGMENT_HEADER_ID = "x-csi-fragment-id"
@@ -15,10 +22,26 @@ FRAGMENT_HEADER_COUNT = "x-csi-fragment-count"
 FRAGMENT_HEADER_ORIGINAL_SIZE = "x-csi-original-size"
 FRAGMENT_HEADER_ORIGINAL_SHA256 = "x-csi-original-sha256"
 FRAGMENT_HEADER_ORIGINAL_MESSAGE_ID = "x-csi-original-message-id"
+FRAGMENT_HEADER_CODEC = "x-csi-fragment-codec"
+FRAGMENT_HEADER_ENCODED_SIZE = "x-csi-fragment-encoded-size"
+
+CODEC_ZSTD = "zstd"
+CODEC_GZIP = "gzip"
+KNOWN_CODECS = (CODEC_ZSTD, CODEC_GZIP)
+SUPPORTED_CODECS = frozenset(
+    codec
+    for codec in KNOWN_CODECS
+    if codec != CODEC_ZSTD or zstandard is not None
+)
 
 DEFAULT_FRAGMENT_THRESHOLD_BYTES = 12 * 1024 * 1024
 DEFAULT_FRAGMENT_BYTES = 8 * 1024 * 1024
 DEFAULT_MAX_LOGICAL_MESSAGE_BYTES = 256 * 1024 * 1024
+DEFAULT_COMPRESSION_THRESHOLD_BYTES = 1024 * 1024
+# 默认不压缩：旧版对端不识别单分片压缩消息，需两端均已升级后再按环境变量开启。
+DEFAULT_COMPRESSION_CODECS: tuple[str, ...] = ()
+# 压缩后至少节省 10% 才采用压缩结果，避免为已压缩内容付出解压开销。
+MIN_COMPRESSION_SAVING_RATIO = 0.9
 MAX_PENDING_FRAGMENT_GROUPS = 128
 MAX_FRAGMENT_COUNT = 4096
 
@@ -43,13 +66,27 @@ def _read_positive_int(name: str, default: int) -> int:
     return value
 
 
+def _read_codecs(name: str, default: tuple[str, ...]) -> tuple[str, ...]:
+    """读取逗号分隔的压缩编码优先级，none 表示关闭压缩。"""
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return default
+    if raw.strip().lower() == "none":
+        return ()
+    return tuple(
+        item.strip().lower() for item in raw.split(",") if item.strip()
+    )
+
+
 @dataclass(frozen=True)
 class FragmentSettings:
-    """保存消息分片阈值、物理分片大小和逻辑消息上限。"""
+    """保存消息分片阈值、物理分片大小、逻辑消息上限和压缩策略。"""
 
     threshold_bytes: int = DEFAULT_FRAGMENT_THRESHOLD_BYTES
     fragment_bytes: int = DEFAULT_FRAGMENT_BYTES
     max_logical_message_bytes: int = DEFAULT_MAX_LOGICAL_MESSAGE_BYTES
+    compression_threshold_bytes: int = DEFAULT_COMPRESSION_THRESHOLD_BYTES
+    compression_codecs: tuple[str, ...] = DEFAULT_COMPRESSION_CODECS
 
     def __post_init__(self) -> None:
         if self.threshold_bytes <= 0:
@@ -60,6 +97,19 @@ class FragmentSettings:
             raise ValueError("物理分片大小不能超过消息分片阈值")
         if self.threshold_bytes > self.max_logical_message_bytes:
             raise ValueError("消息分片阈值不能超过逻辑消息大小上限")
+        if self.compression_threshold_bytes <= 0:
+            raise ValueError("消息压缩阈值必须大于 0")
+        unknown = set(self.compression_codecs).difference(KNOWN_CODECS)
+        if unknown:
+            raise ValueError(f"不支持的消息压缩编码: {', '.join(sorted(unknown))}")
+
+    @property
+    def compression_codec(self) -> str | None:
+        """按优先级协商出本进程可用的压缩编码，均不可用时不压缩。"""
+        return next(
+            (codec for codec in self.compression_codecs if codec in SUPPORTED_CODECS),
+            None,
+        )
 
     @classmethod
     def from_env(cls) -> "FragmentSettings":
@@ -77,6 +127,14 @@ class FragmentSettings:
                 "CSI_RABBITMQ_MAX_LOGICAL_MESSAGE_BYTES",
                 DEFAULT_MAX_LOGICAL_MESSAGE_BYTES,
             ),
+            compression_threshold_bytes=_read_positive_int(
+                "CSI_RABBITMQ_COMPRESSION_THRESHOLD_BYTES",
+                DEFAULT_COMPRESSION_THRESHOLD_BYTES,
+            ),
+            compression_codecs=_read_codecs(
+                "CSI_RABBITMQ_COMPRESSION",
+                DEFAULT_COMPRESSION_CODECS,
+            ),
         )
 
 
@@ -100,6 +158,8 @@ class ParsedFragment:
     original_sha256: str
     original_message_id: str
     body: bytes
+    codec: str | None = None
+    encoded_size: int | None = None
 
 
 @dataclass(frozen=True)
@@ -117,31 +177,87 @@ class _AssemblyState(Generic[TokenT]):
     original_size: int
     original_sha256: str
     original_message_id: str
+    codec: str | None = None
+    encoded_size: int | None = None
     chunks: dict[int, bytes] = field(default_factory=dict)
     arrival_tokens: list[TokenT] = field(default_factory=list)
 
 
+def compress_payload(body: bytes, codec: str) -> bytes:
+    """按指定编码压缩逻辑消息。"""
+    if codec == CODEC_ZSTD and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    if codec == CODEC_GZIP:
+        return zlib.compress(body, 6, wbits=31)
+    raise FragmentProtocolError(f"不支持的消息压缩编码: {codec}")
+
+
+def decompress_payload(body: bytes, codec: str, original_size: int) -> bytes:
+    """解压逻辑消息，输出超过原始大小时立即中止以防解压炸弹。"""
+    if codec == CODEC_ZSTD and zstandard is not None:
+        try:
+            reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(body))
+            decoded = reader.read(original_size + 1)
+        except zstandard.ZstdError as exc:
+            raise FragmentProtocolError("消息分片 zstd 解压失败") from exc
+    elif codec == CODEC_GZIP:
+        try:
+            decompressor = zlib.decompressobj(wbits=31)
+            decoded = decompressor.decompress(body, original_size + 1)
+        except zlib.error as exc:
+            raise FragmentProtocolError("消息分片 gzip 解压失败") from exc
+    else:
+        raise FragmentProtocolError(f"不支持的消息压缩编码: {codec}")
+    if len(decoded) != original_size:
+        raise FragmentProtocolError("消息分片解压后的大小不一致")
+    return decoded
+
+
+def _compress_for_transport(
+    body: bytes,
+    settings: FragmentSettings,
+) -> tuple[bytes, str | None]:
+    """超过压缩阈值且压缩有效时返回压缩结果和编码，否则返回原始消息。"""
+    codec = settings.compression_codec
+    if codec is None or len(body) <= settings.compression_threshold_bytes:
+        return body, None
+    compressed = compress_payload(body, codec)
+    if len(compressed) > len(body) * MIN_COMPRESSION_SAVING_RATIO:
+        return body, None
+    return compressed, codec
+
+
 def encode_fragments(
     body: bytes,
     message_id: str,
     settings: FragmentSettings,
 ) -> list[EncodedFragment]:
-    """超过阈值时拆分消息，未超过阈值时返回空列表。"""
+    """先压缩再拆分消息，无需压缩且未超过分片阈值时返回空列表。
+
+    超过压缩阈值的消息按协商编码压缩，压缩有效时即使只有一个物理分片
+    也使用分片协议承载，以便通过头部标记编码；SHA-256 始终针对原始消息。
+    """
     size = len(body)
     if size > settings.max_logical_message_bytes:
         raise FragmentProtocolError(
             "逻辑消息大小 "
             f"{size} 超过上限 {settings.max_logical_message_bytes}"
         )
-    if size <= settings.threshold_bytes:
+    payload, codec = _compress_for_transport(body, settings)
+    if codec is None and size <= settings.threshold_bytes:
         return []
 
     fragment_id = uuid4().hex
     checksum = hashlib.sha256(body).hexdigest()
-    count = math.ceil(size / settings.fragment_bytes)
+    count = math.ceil(len(payload) / settings.fragment_bytes)
+    codec_headers = (
+        {FRAGMENT_HEADER_CODEC: codec, FRAGMENT_HEADER_ENCODED_SIZE: len(payload)}
+        if codec
+        else {}
+    )
     return [
         EncodedFragment(
-            body=body[
+            body=payload[
                 index * settings.fragment_bytes :
                 (index + 1) * settings.fragment_bytes
             ],
@@ -153,6 +269,7 @@ def encode_fragments(
                 FRAGMENT_HEADER_ORIGINAL_SIZE: size,
                 FRAGMENT_HEADER_ORIGINAL_SHA256: checksum,
                 FRAGMENT_HEADER_ORIGINAL_MESSAGE_ID: message_id,
+                **codec_headers,
             },
         )
         for index in range(count)
@@ -176,16 +293,29 @@ def parse_fragment(
         original_size = int(metadata[FRAGMENT_HEADER_ORIGINAL_SIZE])
         original_sha256 = str(metadata[FRAGMENT_HEADER_ORIGINAL_SHA256])
         original_message_id = str(metadata[FRAGMENT_HEADER_ORIGINAL_MESSAGE_ID])
+        codec = metadata.get(FRAGMENT_HEADER_CODEC)
+        encoded_size = (
+            int(metadata[FRAGMENT_HEADER_ENCODED_SIZE]) if codec is not None else None
+        )
     except (KeyError, TypeError, ValueError) as exc:
         raise FragmentProtocolError("消息分片缺少有效元数据") from exc
+    if isinstance(codec, bytes):
+        codec = codec.decode("utf-8", errors="replace")
 
     if not fragment_id or not original_message_id:
         raise FragmentProtocolError("消息分片标识和原始消息 ID 不能为空")
-    if count <= 1 or index < 0 or index >= count:
+    # 压缩消息允许只有一个物理分片，头部中的编码标记由分片协议承载。
+    min_count = 1 if codec is not None else 2
+    if count < min_count or index < 0 or index >= count:
         raise FragmentProtocolError("消息分片序号或总数无效")
+    if codec is not None:
+        if codec not in SUPPORTED_CODECS:
+            raise FragmentProtocolError(f"不支持的消息压缩编码: {codec}")
+        if encoded_size is None or not 0 < encoded_size <= original_size:
+            raise FragmentProtocolError("压缩消息分片的编码大小无效")
     if count > MAX_FRAGMENT_COUNT:
         raise FragmentProtocolError("消息分片总数超过允许上限")
-    if original_size <= settings.threshold_bytes:
+    if codec is None and original_size <= settings.threshold_bytes:
         raise FragmentProtocolError("无需分片的消息使用了分片协议")
     if original_size > settings.max_logical_message_bytes:
         raise FragmentProtocolError(
@@ -205,6 +335,8 @@ def parse_fragment(
         original_sha256=original_sha256,
         original_message_id=original_message_id,
         body=body,
+        codec=codec,
+        encoded_size=encoded_size,
     )
 
 
@@ -235,6 +367,8 @@ class FragmentAssembler(Generic[TokenT]):
                 original_size=fragment.original_size,
                 original_sha256=fragment.original_sha256,
                 original_message_id=fragment.original_message_id,
+                codec=fragment.codec,
+                encoded_size=fragment.encoded_size,
             )
             self._states[fragment.fragment_id] = state
         elif (
@@ -242,6 +376,8 @@ class FragmentAssembler(Generic[TokenT]):
             or state.original_size != fragment.original_size
             or state.original_sha256 != fragment.original_sha256
             or state.original_message_id != fragment.original_message_id
+            or state.codec != fragment.codec
+            or state.encoded_size != fragment.encoded_size
         ):
             raise FragmentProtocolError("同一分片组的元数据不一致")
 
@@ -256,6 +392,14 @@ class FragmentAssembler(Generic[TokenT]):
 
         assembled = b"".join(state.chunks[index] for index in range(state.count))
         del self._states[fragment.fragment_id]
+        if state.codec is not None:
+            if len(assembled) != state.encoded_size:
+                raise FragmentProtocolError("压缩消息分片重组后的大小不一致")
+            assembled = decompress_payload(
+                assembled,
+                state.codec,
+                state.original_size,
+            )
         if len(assembled) != state.original_size:
             raise FragmentProtocolError("消息分片重组后的大小不一致")
         if hashlib.sha256(assembled).hexdigest() != state.original_sha256:
@@ -27,6 +27,7 @@ from app.db import (
 )
 from app.utils.cos import init_cos, close_cos
 from app.utils.embedding import init_embedding_client, close_embedding_client
+from app.utils.async_fetch import close_http_sessions
 from app.service.auth.service import ensure_default_admin
 from app.core.system_config import system_config_manager
 
@@ -137,6 +138,7 @@ async def lifespan(app: FastAPI):
                                     bridge_id=bridge.id,
                                     worker_id=worker_id,
                                     lease_token=bridge.lease_token,
+                                    batch_size=settings.REFERENCE_BRIDGE_BATCH_SIZE,
                                 )
                             )
                         )
@@ -158,6 +160,16 @@ async def lifespan(app: FastAPI):
         monitor_action_runtime_events()
     )
     reference_bridge_task = asyncio.create_task(monitor_reference_bridges())
+    from app.service.action.graph_cache import WorkflowGraphCache
+
+    graph_cache_invalidation_task = asyncio.create_task(
+        WorkflowGraphCache.listen_invalidations()
+    )
+    from app.service.platform_cache import PlatformMetadataCache
+
+    platform_cache_invalidation_task = asyncio.create_task(
+        PlatformMetadataCache.listen_invalidations()
+    )
 
     system_config_manager.commit_bootstrap()
     from app.service.system_config_history import SystemConfigHistoryService
@@ -169,15 +181,24 @@ async def lifespan(app: FastAPI):
     action_timeout_task.cancel()
     action_runtime_event_task.cancel()
     reference_bridge_task.cancel()
+    graph_cache_invalidation_task.cancel()
+    platform_cache_invalidation_task.cancel()
     with suppress(asyncio.CancelledError):
         await action_timeout_task
     with suppress(asyncio.CancelledError):
         await action_runtime_event_task
     with suppress(asyncio.CancelledError):
         await reference_bridge_task
+    with suppress(asyncio.CancelledError):
+        await graph_cache_invalidation_task
+    with suppress(asyncio.CancelledError):
+        await platform_cache_invalidation_task
 
     system_config_manager.mark_not_ready()
 
+    from app.service.stream_hub import stream_hub
+    await stream_hub.close()
+
     await debug_output_worker.stop()
     await entity_content_analysis_worker.stop()
 
@@ -188,6 +209,7 @@ async def lifespan(app: FastAPI):
     await AnalystService.shutdown_running_agents()
 
     await close_embedding_client()
+    await close_http_sessions()
     await close_cos()
     await close_rabbitmq()
     await close_mariadb()
@@ -20,6 +20,7 @@ class AlertObservationInboxModel(Document):
     observation: AlertObservation
     status: AlertInboxStatusEnum = AlertInboxStatusEnum.PENDING
     claimed_by: str | None = None
+    claim_token: str | None = None
     lease_until: datetime | None = None
     attempts: int = 0
     next_retry_at: datetime | None = None
@@ -39,5 +40,6 @@ class AlertObservationInboxModel(Document):
                 ]
             ),
             IndexModel([("lease_until", ASCENDING)]),
+            IndexModel([("claim_token", ASCENDING)], sparse=True),
             IndexModel([("expire_at", ASCENDING)], expireAfterSeconds=0),
         ]
@@ -51,6 +51,7 @@ class AlertRuleModel(Document):
     last_success_at: datetime | None = None
     last_error: str | None = None
     is_deleted: bool = False
+    scan_hash: int | None = None
     created_at: datetime = Field(default_factory=utc_now)
     updated_at: datetime = Field(default_factory=utc_now)
 
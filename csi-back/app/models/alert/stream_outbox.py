@@ -24,6 +24,7 @@ class AlertStreamOutboxModel(Document):
     payload: dict[str, Any] = Field(default_factory=dict)
     status: AlertOutboxStatusEnum = AlertOutboxStatusEnum.PENDING
     claimed_by: str | None = None
+    claim_token: str | None = None
     lease_until: datetime | None = None
     attempts: int = 0
     next_retry_at: datetime | None = None
@@ -50,5 +51,6 @@ class AlertStreamOutboxModel(Document):
                 ]
             ),
             IndexModel([("lease_until", ASCENDING)]),
+            IndexModel([("claim_token", ASCENDING)], sparse=True),
             IndexModel([("expire_at", ASCENDING)], expireAfterSeconds=0),
         ]
@@ -23,6 +23,17 @@ async def run_scheduler() -> None:
     for signum in (signal.SIGINT, signal.SIGTERM):
         with suppress(NotImplementedError):
             loop.add_signal_handler(signum, stop_event.set)
+    if settings.ACTION_SCHEDULER_MODE == "heap":
+        from app.service.action.schedule_engine import ActionScheduleHeapEngine
+
+        logger.info("行动调度器已启动（最小堆模式）")
+        try:
+            await ActionScheduleHeapEngine().run(stop_event)
+        finally:
+            await close_redis()
+            await close_mongodb()
+            logger.info("行动调度器已停止")
+        return
     logger.info("行动调度器已启动")
     try:
         while not stop_event.is_set():
@@ -0,0 +1,148 @@
+"""进程内编译图缓存，跨进程通过 Redis Pub/Sub 失效蓝图条目。"""
+
+import asyncio
+from collections import OrderedDict
+from typing import Any
+
+from loguru import logger
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.utils.workflow import (
+    CompiledWorkflowGraph,
+    compile_blueprint_graph,
+    compile_workflow_graph,
+)
+
+logger = logger.bind(name=__name__)
+
+BLUEPRINT_GRAPH_INVALIDATE_CHANNEL = "action:cache:blueprint:invalidate"
+
+
+class WorkflowGraphCache:
+    """按蓝图 ID + Revision 或行动 ID 缓存不可变编译图的 LRU。
+
+    行动执行计划创建后即冻结，因此行动条目只受容量淘汰；
+    蓝图条目以更新时间作为 Revision，编辑后由发布方广播失效。
+    """
+
+    _entries: "OrderedDict[tuple[str, ...], CompiledWorkflowGraph]" = OrderedDict()
+
+    @staticmethod
+    def _blueprint_key(blueprint: Any) -> tuple[str, ...]:
+        updated_at = getattr(blueprint, "updated_at", None)
+        revision = updated_at.isoformat() if updated_at is not None else ""
+        return ("blueprint", blueprint.id, revision)
+
+    @staticmethod
+    def _action_key(action_id: str) -> tuple[str, ...]:
+        return ("action", action_id)
+
+    @classmethod
+    def _get(cls, key: tuple[str, ...]) -> CompiledWorkflowGraph | None:
+        compiled = cls._entries.get(key)
+        if compiled is not None:
+            cls._entries.move_to_end(key)
+        return compiled
+
+    @classmethod
+    def _put(
+        cls,
+        key: tuple[str, ...],
+        compiled: CompiledWorkflowGraph,
+    ) -> CompiledWorkflowGraph:
+        cls._entries[key] = compiled
+        cls._entries.move_to_end(key)
+        capacity = max(1, settings.ACTION_GRAPH_CACHE_SIZE)
+        while len(cls._entries) > capacity:
+            cls._entries.popitem(last=False)
+        return compiled
+
+    @classmethod
+    def get_blueprint_graph(cls, blueprint: Any) -> CompiledWorkflowGraph:
+        """返回蓝图编辑图的编译结果，Revision 变化时自动重新编译。"""
+        key = cls._blueprint_key(blueprint)
+        compiled = cls._get(key)
+        if compiled is None:
+            compiled = cls._put(key, compile_blueprint_graph(blueprint))
+        return compiled
+
+    @classmethod
+    def peek_action_graph(cls, action_id: str) -> CompiledWorkflowGraph | None:
+        return cls._get(cls._action_key(action_id))
+
+    @classmethod
+    def get_action_graph(cls, action: Any) -> CompiledWorkflowGraph:
+        """返回行动冻结执行计划的编译结果。"""
+        key = cls._action_key(action.id)
+        compiled = cls._get(key)
+        if compiled is None:
+            execution_plan = action.execution_plan_snapshot
+            compiled = cls._put(
+                key,
+                compile_workflow_graph(
+                    (node.id for node in getattr(execution_plan, "nodes", [])),
+                    getattr(execution_plan, "edges", []),
+                ),
+            )
+        return compiled
+
+    @classmethod
+    def evict_blueprint(cls, blueprint_id: str) -> int:
+        """移除指定蓝图的全部 Revision 条目。"""
+        keys = [
+            key
+            for key in cls._entries
+            if key[0] == "blueprint" and key[1] == blueprint_id
+        ]
+        for key in keys:
+            cls._entries.pop(key, None)
+        return len(keys)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._entries.clear()
+
+    @classmethod
+    async def invalidate_blueprint(cls, blueprint_id: str) -> None:
+        """本地失效并通知其他进程失效蓝图编译图。"""
+        cls.evict_blueprint(blueprint_id)
+        try:
+            redis_client = get_redis()
+            if redis_client:
+                await redis_client.publish(
+                    BLUEPRINT_GRAPH_INVALIDATE_CHANNEL,
+                    blueprint_id,
+                )
+        except Exception as e:
+            logger.warning(f"广播蓝图编译图失效失败: {e}")
+
+    @classmethod
+    async def listen_invalidations(cls) -> None:
+        """订阅蓝图失效广播，连接中断后清空缓存并重新订阅。"""
+        while True:
+            redis_client = get_redis()
+            if redis_client is None:
+                await asyncio.sleep(1)
+                continue
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(BLUEPRINT_GRAPH_INVALIDATE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    cls.evict_blueprint(str(message.get("data") or ""))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"蓝图编译图失效订阅中断: {e}")
+                # 订阅断开期间可能错过广播，保守清空蓝图条目。
+                for key in [key for key in cls._entries if key[0] == "blueprint"]:
+                    cls._entries.pop(key, None)
+                await asyncio.sleep(1)
+            finally:
+                close = getattr(pubsub, "aclose", None) or pubsub.close
+                try:
+                    await close()
+                except Exception:
+                    pass
@@ -26,6 +26,7 @@ from app.service.action.service import ActionInstanceService
 logger = logger.bind(name=__name__)
 
 SCHEDULER_HEARTBEAT_KEY = "action:scheduler:heartbeat"
+SCHEDULE_CHANGED_CHANNEL = "action:schedule:changed"
 ACTIVE_ACTION_STATUSES = {
     ActionFlowStatusEnum.UNKNOWN,
     ActionFlowStatusEnum.UNREADY,
@@ -193,6 +194,16 @@ class ActionScheduleService:
             count=count,
         )
 
+    @staticmethod
+    async def notify_changed(schedule_id: str) -> None:
+        """通知堆调度模式的 Scheduler 增量刷新单个计划。"""
+        try:
+            redis = get_redis()
+            if redis is not None:
+                await redis.publish(SCHEDULE_CHANGED_CHANNEL, schedule_id)
+        except Exception as exc:
+            logger.warning(f"发布计划变更通知失败，计划 ID: {schedule_id}，错误: {exc}")
+
     @staticmethod
     async def _acquire_lock(schedule_id: str) -> str | None:
         """获取计划级 Redis 短锁。"""
@@ -0,0 +1,240 @@
+"""基于最小堆的增量行动计划调度引擎。"""
+
+import asyncio
+import heapq
+from contextlib import suppress
+from datetime import datetime, timedelta
+
+from loguru import logger
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.models.action.schedule import ActionScheduleModel
+from app.service.action.schedule import (
+    SCHEDULE_CHANGED_CHANNEL,
+    ActionScheduleService,
+    as_utc,
+    utc_now,
+)
+
+logger = logger.bind(name=__name__)
+
+
+class ActionScheduleHeapEngine:
+    """在内存最小堆中维护计划下一次触发时间，精确休眠到最近到期点。
+
+    启动时从 Mongo 全量重建，之后通过 Redis 变更通知增量刷新单个计划，
+    并按 `ACTION_SCHEDULER_RESYNC_SECONDS` 周期兜底全量对账；启动失败的
+    READY 行动与轮询模式一致，按 `ACTION_SCHEDULER_POLL_SECONDS` 独立恢复。
+    堆条目采用惰性删除：`_due` 记录每个计划的当前有效时刻，
+    出堆时与之不一致的条目直接丢弃。
+    """
+
+    def __init__(
+        self,
+        *,
+        concurrency: int | None = None,
+        resync_seconds: float | None = None,
+        recover_seconds: float | None = None,
+    ) -> None:
+        self._heap: list[tuple[datetime, str]] = []
+        self._due: dict[str, datetime] = {}
+        self._inflight: set[str] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._wakeup = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(
+            max(1, concurrency or settings.ACTION_SCHEDULER_WORKER_CONCURRENCY)
+        )
+        self._resync_seconds = (
+            resync_seconds or settings.ACTION_SCHEDULER_RESYNC_SECONDS
+        )
+        self._recover_seconds = (
+            recover_seconds or settings.ACTION_SCHEDULER_POLL_SECONDS
+        )
+        self.triggered = 0
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def next_due_at(self) -> datetime | None:
+        """返回堆顶有效条目的触发时刻。"""
+        while self._heap:
+            due, schedule_id = self._heap[0]
+            if self._due.get(schedule_id) == due:
+                return due
+            heapq.heappop(self._heap)
+        return None
+
+    def upsert(self, schedule_id: str, next_run_at: datetime | None) -> None:
+        """更新单个计划的触发时刻，`None` 表示从堆中移除。"""
+        if next_run_at is None:
+            self._due.pop(schedule_id, None)
+        else:
+            due = as_utc(next_run_at)
+            if self._due.get(schedule_id) == due:
+                return
+            self._due[schedule_id] = due
+            heapq.heappush(self._heap, (due, schedule_id))
+        self._wakeup.set()
+
+    @staticmethod
+    def _effective_next_run(schedule: ActionScheduleModel | None) -> datetime | None:
+        if schedule is None or schedule.is_deleted or not schedule.enabled:
+            return None
+        return schedule.next_run_at
+
+    async def rebuild(self) -> int:
+        """从 Mongo 全量重建堆，用于启动与周期兜底对账。"""
+        schedules = await ActionScheduleModel.find(
+            {
+                "enabled": True,
+                "is_deleted": False,
+                "next_run_at": {"$ne": None},
+            }
+        ).to_list()
+        self._due = {
+            schedule.id: as_utc(schedule.next_run_at) for schedule in schedules
+        }
+        self._heap = [(due, schedule_id) for schedule_id, due in self._due.items()]
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+        return len(self._due)
+
+    async def refresh(self, schedule_id: str) -> None:
+        """按变更通知重新读取单个计划。"""
+        if schedule_id in self._inflight:
+            return
+        schedule = await ActionScheduleModel.find_one({"_id": schedule_id})
+        self.upsert(schedule_id, self._effective_next_run(schedule))
+
+    def pop_due(self, now: datetime) -> list[str]:
+        """弹出所有已到期且未在执行中的计划。"""
+        due_ids: list[str] = []
+        current = as_utc(now)
+        while self._heap and self._heap[0][0] <= current:
+            due, schedule_id = heapq.heappop(self._heap)
+            if self._due.get(schedule_id) != due or schedule_id in self._inflight:
+                continue
+            self._due.pop(schedule_id, None)
+            due_ids.append(schedule_id)
+        return due_ids
+
+    async def _trigger(self, schedule_id: str, now: datetime) -> None:
+        async with self._semaphore:
+            try:
+                action_id = await ActionScheduleService.trigger_due_schedule(
+                    schedule_id,
+                    now,
+                )
+                if action_id:
+                    self.triggered += 1
+            except Exception as exc:
+                logger.exception(
+                    f"堆调度触发计划失败，计划 ID: {schedule_id}，错误: {exc}"
+                )
+            finally:
+                self._inflight.discard(schedule_id)
+        try:
+            schedule = await ActionScheduleModel.find_one({"_id": schedule_id})
+            next_run_at = self._effective_next_run(schedule)
+        except Exception as exc:
+            logger.warning(f"刷新计划触发时间失败，计划 ID: {schedule_id}，错误: {exc}")
+            next_run_at = utc_now()
+        if next_run_at is not None and as_utc(next_run_at) <= utc_now():
+            # 锁竞争或创建失败时保留原时刻，按轮询周期退避重试，避免忙等。
+            next_run_at = utc_now() + timedelta(
+                seconds=settings.ACTION_SCHEDULER_POLL_SECONDS
+            )
+        self.upsert(schedule_id, next_run_at)
+
+    def dispatch_due(self, now: datetime) -> int:
+        """将到期计划交给有界工作池执行。"""
+        due_ids = self.pop_due(now)
+        for schedule_id in due_ids:
+            self._inflight.add(schedule_id)
+            task = asyncio.create_task(self._trigger(schedule_id, now))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        return len(due_ids)
+
+    async def listen_changes(self) -> None:
+        """订阅计划变更通知，连接中断后全量重建再继续订阅。"""
+        while True:
+            redis_client = get_redis()
+            if redis_client is None:
+                await asyncio.sleep(1)
+                continue
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(SCHEDULE_CHANGED_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    schedule_id = str(message.get("data") or "")
+                    if schedule_id:
+                        await self.refresh(schedule_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                logger.warning(f"计划变更订阅中断: {exc}")
+                await asyncio.sleep(1)
+                with suppress(Exception):
+                    await self.rebuild()
+            finally:
+                close = getattr(pubsub, "aclose", None) or pubsub.close
+                with suppress(Exception):
+                    await close()
+
+    async def run(self, stop_event: asyncio.Event) -> None:
+        """运行堆调度循环，直到停止事件被设置。"""
+        await self.rebuild()
+        listener = asyncio.create_task(self.listen_changes())
+        loop = asyncio.get_running_loop()
+        next_resync = loop.time() + self._resync_seconds
+        next_recover = loop.time()
+        try:
+            while not stop_event.is_set():
+                now = utc_now()
+                if loop.time() >= next_recover:
+                    try:
+                        await ActionScheduleService.recover_ready_actions()
+                    except Exception as exc:
+                        logger.exception(f"恢复待启动行动失败: {exc}")
+                    next_recover = loop.time() + self._recover_seconds
+                try:
+                    if loop.time() >= next_resync:
+                        await self.rebuild()
+                        next_resync = loop.time() + self._resync_seconds
+                    dispatched = self.dispatch_due(now)
+                    await ActionScheduleService.heartbeat(now)
+                    if dispatched:
+                        logger.info(f"堆调度派发 {dispatched} 个到期计划")
+                except Exception as exc:
+                    logger.exception(f"行动堆调度循环失败: {exc}")
+                self._wakeup.clear()
+                timeout = min(
+                    next_resync - loop.time(),
+                    next_recover - loop.time(),
+                    settings.ACTION_SCHEDULER_HEARTBEAT_TTL_SECONDS / 2,
+                )
+                next_due = self.next_due_at()
+                if next_due is not None:
+                    timeout = min(timeout, (next_due - utc_now()).total_seconds())
+                if timeout > 0:
+                    waiters = {
+                        asyncio.create_task(stop_event.wait()),
+                        asyncio.create_task(self._wakeup.wait()),
+                    }
+                    _, pending = await asyncio.wait(
+                        waiters,
+                        timeout=timeout,
+                        return_when=asyncio.FIRST_COMPLETED,
+                    )
+                    for waiter in pending:
+                        waiter.cancel()
+        finally:
+            listener.cancel()
+            with suppress(asyncio.CancelledError):
+                await listener
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
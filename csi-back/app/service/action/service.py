@@ -60,6 +60,7 @@ from app.schemas.action.reference import (
 from app.service.component.service import cancel_component_run
 from app.service.action.alert_source import publish_action_status_observation
 from app.service.action.compiler import BlueprintCompiler
+from app.service.action.graph_cache import WorkflowGraphCache
 from app.service.action.log import ActionLogService
 from app.service.blueprint_revision import BlueprintRevisionService
 from app.service.native_nodes.registry import native_handlers
@@ -332,6 +333,8 @@ class ActionInstanceService:
                 logger.info(f"已清理缓存: {cache_key}")
         except Exception as e:
             logger.warning(f"清理缓存失败: {e}")
+        if cache_type == "blueprint":
+            await WorkflowGraphCache.invalidate_blueprint(cache_id)
     
     @staticmethod
     async def get_blueprint(blueprint_id: str) -> ActionBlueprintModel:
@@ -1644,18 +1647,58 @@ class ActionInstanceService:
                 item.node_id,
             )
         )
+        observers = [
+            item
+            for item in node_instances
+            if item.extension_spec_snapshot
+            and item.extension_spec_snapshot.execution_policy == "debug.observer"
+        ]
+        observer_ids = {item.id for item in observers}
+        others = [item for item in node_instances if item.id not in observer_ids]
+        semaphore = asyncio.Semaphore(
+            max(1, settings.ACTION_NODE_DISPATCH_CONCURRENCY)
+        )
         dispatched = 0
-        for node_instance in node_instances:
-            dispatched += int(
-                bool(
-                    await ActionInstanceService.run_node(
-                        node_instance.id,
-                        action_id,
+        # 调试观察节点需先于业务节点就绪，分两批并发派发以保持原有顺序语义。
+        for wave in (observers, others):
+            if not wave:
+                continue
+            results = await asyncio.gather(
+                *(
+                    ActionInstanceService._dispatch_ready_node(
+                        node_instance,
+                        action,
+                        semaphore,
                     )
+                    for node_instance in wave
                 )
             )
+            dispatched += sum(int(result) for result in results)
         return dispatched
 
+    @staticmethod
+    async def _dispatch_ready_node(
+        node_instance: ActionInstanceNodeModel,
+        action: ActionInstanceModel,
+        semaphore: asyncio.Semaphore,
+    ) -> bool:
+        """在并发上限内派发单个预取节点，隔离单节点异常。"""
+        async with semaphore:
+            try:
+                return bool(
+                    await ActionInstanceService.run_node(
+                        node_instance.id,
+                        action.id,
+                        _node_instance=node_instance,
+                        _action=action,
+                    )
+                )
+            except Exception as exc:
+                logger.exception(
+                    f"派发就绪节点失败，Node Instance ID: {node_instance.id}，错误: {exc}"
+                )
+                return False
+
     @staticmethod
     async def reconcile_ready_nodes(limit: int = 100) -> int:
         """轮转扫描待运行节点，补偿已持久化但尚未派发的就绪状态。"""
@@ -1702,12 +1745,23 @@ class ActionInstanceService:
         return reconciled
 
     @staticmethod
-    async def run_node(node_instance_id: str, action_id: str):
+    async def run_node(
+        node_instance_id: str,
+        action_id: str,
+        *,
+        _node_instance: ActionInstanceNodeModel | None = None,
+        _action: ActionInstanceModel | None = None,
+    ):
         """
         运行指定行动的指定节点
+
+        `_node_instance` 与 `_action` 供批量派发传入已预取的文档，
+        仅用于就绪判断，派发声明成功后仍会重新读取最新状态。
         """
         logger.info(f"运行节点: {node_instance_id}")
-        node_instance = await ActionInstanceNodeModel.find_one({"_id": node_instance_id})
+        node_instance = _node_instance
+        if node_instance is None:
+            node_instance = await ActionInstanceNodeModel.find_one({"_id": node_instance_id})
         if not node_instance:
             logger.error(f"未找到节点，Action ID: {action_id}，Node Instance ID: {node_instance_id}")
             return False
@@ -1719,7 +1773,9 @@ class ActionInstanceService:
             logger.error(f"未找到节点定义，Node Instance ID: {node_instance_id}")
             return False
 
-        action = await ActionInstanceModel.find_one({"_id": action_id})
+        action = _action
+        if action is None:
+            action = await ActionInstanceModel.find_one({"_id": action_id})
         if action is None:
             logger.error(f"未找到行动，Action ID: {action_id}")
             return False
@@ -4848,29 +4904,21 @@ class ActionInstanceService:
         查找下一个节点的实例ID列表以及对应的连接点映射
         返回结构：{目标节点实例ID: [(source_port_id, target_port_id), ...]}
         """
-        action = await ActionInstanceModel.find_one({"_id": action_id})
-        if not action:
-            logger.error(f"未找到行动，Action ID: {action_id}")
-            return {}
-        
-        blueprint = await ActionInstanceService.get_action_blueprint(action)
-        if not blueprint:
-            logger.error(f"未找到蓝图，Blueprint ID: {action.blueprint_id}")
+        compiled = await ActionInstanceService._get_action_graph(action_id)
+        if compiled is None:
             return {}
         
         next_nodes = {}
-        execution_edges = action.execution_plan_snapshot.edges
-        for edge in execution_edges:
-            if edge.source == node_id:
-                instance_id = generate_id(action_id + edge.target)
-                edge_mapping = (
-                    edge.source_port_id,
-                    edge.target_port_id,
-                )
-                if instance_id in next_nodes:
-                    next_nodes[instance_id].append(edge_mapping)
-                else:
-                    next_nodes[instance_id] = [edge_mapping]
+        for edge in compiled.outgoing_edges.get(node_id, ()):
+            instance_id = generate_id(action_id + edge.target)
+            edge_mapping = (
+                edge.source_port_id,
+                edge.target_port_id,
+            )
+            if instance_id in next_nodes:
+                next_nodes[instance_id].append(edge_mapping)
+            else:
+                next_nodes[instance_id] = [edge_mapping]
         
         return next_nodes
 
@@ -4879,23 +4927,28 @@ class ActionInstanceService:
         """
         获取所有前置节点实例ID列表
         """
+        compiled = await ActionInstanceService._get_action_graph(action_id)
+        if compiled is None:
+            return False
+        
+        return list(compiled.predecessors(node_id))
+
+    @staticmethod
+    async def _get_action_graph(action_id: str):
+        """读取行动冻结执行计划的编译图，命中进程缓存时无需访问数据库。"""
+        compiled = WorkflowGraphCache.peek_action_graph(action_id)
+        if compiled is not None:
+            return compiled
         action = await ActionInstanceModel.find_one({"_id": action_id})
         if not action:
             logger.error(f"未找到行动，Action ID: {action_id}")
-            return False
+            return None
         
         blueprint = await ActionInstanceService.get_action_blueprint(action)
         if not blueprint:
             logger.error(f"未找到蓝图，Blueprint ID: {action.blueprint_id}")
-            return False
-        
-        previous_nodes = []
-        execution_edges = action.execution_plan_snapshot.edges
-        for edge in execution_edges:
-            if edge.target == node_id:
-                previous_nodes.append(edge.source)
-        
-        return previous_nodes
+            return None
+        return WorkflowGraphCache.get_action_graph(action)
 
     @staticmethod
     async def set_node_status(node_id: str, action_id: str, status: ActionInstanceNodeStatusEnum):
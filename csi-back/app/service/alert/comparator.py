@@ -1,3 +1,4 @@
+from dataclasses import dataclass
 from datetime import datetime, timezone
 from math import isfinite
 from typing import Any
@@ -157,3 +158,39 @@ def evaluate_expression(
             )
         )
     return all(results) if expression.logic == "all" else any(results)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledAlertExpression:
+    """阈值已预先规范化的条件表达式，供规则索引重复执行。"""
+
+    value_type: AlertValueTypeEnum
+    logic: str
+    conditions: tuple[tuple[AlertOperatorEnum, Any], ...]
+
+    def evaluate(self, actual_value: Any) -> bool:
+        """规范化实际值后与预解析阈值比较。"""
+        actual = normalize_value(self.value_type, actual_value)
+        results = [
+            compare_values(self.value_type, actual, operator, expected)
+            for operator, expected in self.conditions
+        ]
+        return all(results) if self.logic == "all" else any(results)
+
+
+def compile_expression(
+    expression: AlertExpression,
+    value_type: AlertValueTypeEnum,
+) -> CompiledAlertExpression:
+    """预先规范化表达式阈值，结果与 `evaluate_expression` 等价。"""
+    return CompiledAlertExpression(
+        value_type=value_type,
+        logic=expression.logic,
+        conditions=tuple(
+            (
+                condition.operator,
+                normalize_threshold(value_type, condition.value).value,
+            )
+            for condition in expression.conditions
+        ),
+    )
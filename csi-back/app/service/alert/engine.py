@@ -3,6 +3,7 @@ from __future__ import annotations
 import hashlib
 import json
 import secrets
+from contextlib import suppress
 from datetime import datetime, timezone
 
 from pymongo.errors import DuplicateKeyError
@@ -24,9 +25,18 @@ from app.schemas.alert.observation import AlertObservation
 from app.service.alert.comparator import evaluate_expression, normalize_value
 from app.service.alert.lifecycle import AlertLifecycleService
 from app.service.alert.registry import AlertSourceRegistry, alert_source_registry
+from app.service.alert.rule_index import AlertRuleIndex, IndexedAlertRule
+from app.service.alert.state_buffer import AlertRuleStateBuffer
 from app.utils.id_lib import generate_id
 
 
+INCIDENT_LOCK_TTL_SECONDS = 60
+
+
+class AlertIncidentLockError(RuntimeError):
+    """信号锁被其他 Worker 持有或在批处理期间丢失，观测需稍后重试。"""
+
+
 def utc_now() -> datetime:
     """返回带 UTC 时区的当前时间。"""
     return datetime.now(timezone.utc)
@@ -35,8 +45,13 @@ def utc_now() -> datetime:
 class AlertEngine:
     """把统一观测转换为规则状态、聚合信号和告警生命周期。"""
 
-    def __init__(self, registry: AlertSourceRegistry | None = None) -> None:
+    def __init__(
+        self,
+        registry: AlertSourceRegistry | None = None,
+        rule_index: AlertRuleIndex | None = None,
+    ) -> None:
         self.registry = registry or alert_source_registry
+        self.rule_index = rule_index
 
     @staticmethod
     def incident_key(observation: AlertObservation) -> str:
@@ -83,11 +98,41 @@ class AlertEngine:
         acquired = await redis.set(
             f"alert:incident-lock:{incident_key}",
             token,
-            ex=60,
+            ex=INCIDENT_LOCK_TTL_SECONDS,
             nx=True,
         )
         return token if acquired else None
 
+    @staticmethod
+    async def _extend_lock(incident_key: str, token: str) -> bool:
+        """仍由当前持有者持有时把信号锁续期一个 TTL，锁已丢失时返回 False。"""
+        redis = get_redis()
+        if redis is None or token == "local":
+            return True
+        extended = await redis.eval(
+            "if redis.call('GET', KEYS[1]) == ARGV[1] then return redis.call('EXPIRE', KEYS[1], ARGV[2]) else return 0 end",
+            1,
+            f"alert:incident-lock:{incident_key}",
+            token,
+            INCIDENT_LOCK_TTL_SECONDS,
+        )
+        return bool(extended)
+
+    async def _flush_state_buffer(self, state_buffer: AlertRuleStateBuffer) -> int:
+        """续期本批持有的全部信号锁后再落库，任一锁已丢失时放弃落库。
+
+        批处理可能超过锁 TTL，锁过期后其他 Worker 可能已基于库内状态推进，
+        此时写回缓冲中的旧快照会覆盖对方结果，因此整批抛错交由调用方重试。
+        """
+        if not state_buffer.dirty_count:
+            return 0
+        for incident_key, token in state_buffer.locks.items():
+            if not await self._extend_lock(incident_key, token):
+                raise AlertIncidentLockError(
+                    f"信号锁在批处理期间过期，放弃落库并重试: {incident_key}"
+                )
+        return await state_buffer.flush()
+
     @staticmethod
     async def _release_lock(incident_key: str, token: str) -> None:
         """仅释放当前持有者的信号锁。"""
@@ -117,24 +162,37 @@ class AlertEngine:
         normalize_value(field.value_type, observation.value)
         return field
 
+    @staticmethod
+    def state_id(rule_id: str, observation: AlertObservation) -> str:
+        """构造规则资源状态的稳定 ID。"""
+        return generate_id(
+            f"{rule_id}:{observation.resource_type}:{observation.resource_id}"
+        )
+
     @staticmethod
     async def _get_or_create_rule_state(
         rule: AlertRuleModel,
         observation: AlertObservation,
         incident_key: str,
+        fingerprint: str | None = None,
+        state_buffer: AlertRuleStateBuffer | None = None,
     ) -> tuple[AlertRuleEvaluationStateModel, bool]:
-        """读取或幂等创建规则资源状态。"""
-        state_id = generate_id(
-            f"{rule.id}:{observation.resource_type}:{observation.resource_id}"
+        """读取或幂等创建规则资源状态，批量模式下新状态随批末写入。"""
+        state_id = AlertEngine.state_id(rule.id, observation)
+        existing = (
+            await state_buffer.get(state_id)
+            if state_buffer is not None
+            else await AlertRuleEvaluationStateModel.find_one({"_id": state_id})
         )
-        existing = await AlertRuleEvaluationStateModel.find_one({"_id": state_id})
         if existing is not None:
             return existing, False
         state = AlertRuleEvaluationStateModel(
             id=state_id,
             rule_id=rule.id,
             rule_version=rule.version,
-            condition_fingerprint=AlertEngine.condition_fingerprint(rule),
+            condition_fingerprint=(
+                fingerprint or AlertEngine.condition_fingerprint(rule)
+            ),
             source_key=observation.source_key,
             resource_type=observation.resource_type,
             resource_id=observation.resource_id,
@@ -147,6 +205,8 @@ class AlertEngine:
             last_source_event_id=observation.source_event_id,
             last_observed_at=observation.observed_at,
         )
+        if state_buffer is not None:
+            return state, True
         try:
             await state.insert()
             return state, True
@@ -161,14 +221,25 @@ class AlertEngine:
         rule: AlertRuleModel,
         observation: AlertObservation,
         incident_key: str,
+        indexed: IndexedAlertRule | None = None,
+        state_buffer: AlertRuleStateBuffer | None = None,
     ) -> tuple[AlertRuleEvaluationStateModel, bool]:
-        """根据触发、恢复和连续次数更新单条规则状态。"""
+        """根据触发、恢复和连续次数更新单条规则状态。
+
+        传入索引条目时复用其预计算指纹和预解析表达式。
+        """
+        fingerprint = (
+            indexed.fingerprint
+            if indexed is not None
+            else AlertEngine.condition_fingerprint(rule)
+        )
         state, created = await AlertEngine._get_or_create_rule_state(
             rule,
             observation,
             incident_key,
+            fingerprint,
+            state_buffer,
         )
-        fingerprint = AlertEngine.condition_fingerprint(rule)
         if (
             not created
             and state.last_observation_id == observation.observation_id
@@ -213,10 +284,14 @@ class AlertEngine:
         state.condition_fingerprint = fingerprint
         now = utc_now()
         if state.state == AlertRuleStateEnum.NORMAL:
-            trigger_matches = evaluate_expression(
-                rule.trigger_expression,
-                observation.value_type,
-                observation.value,
+            trigger_matches = (
+                indexed.trigger.evaluate(observation.value)
+                if indexed is not None and indexed.trigger is not None
+                else evaluate_expression(
+                    rule.trigger_expression,
+                    observation.value_type,
+                    observation.value,
+                )
             )
             state.trigger_match_count = (
                 state.trigger_match_count + 1 if trigger_matches else 0
@@ -227,10 +302,14 @@ class AlertEngine:
                 state.activated_at = observation.observed_at
                 state.recovered_at = None
         elif rule.recovery_expression is not None:
-            recovery_matches = evaluate_expression(
-                rule.recovery_expression,
-                observation.value_type,
-                observation.value,
+            recovery_matches = (
+                indexed.recovery.evaluate(observation.value)
+                if indexed is not None and indexed.recovery is not None
+                else evaluate_expression(
+                    rule.recovery_expression,
+                    observation.value_type,
+                    observation.value,
+                )
             )
             state.recovery_match_count = (
                 state.recovery_match_count + 1 if recovery_matches else 0
@@ -246,7 +325,10 @@ class AlertEngine:
         state.last_source_event_id = observation.source_event_id
         state.last_observed_at = observation.observed_at
         state.updated_at = now
-        await state.save()
+        if state_buffer is not None:
+            state_buffer.put(state)
+        else:
+            await state.save()
         return state, True
 
     @staticmethod
@@ -280,30 +362,50 @@ class AlertEngine:
     @staticmethod
     async def _active_rules(
         incident_key: str,
+        rule_index: AlertRuleIndex | None = None,
+        state_buffer: AlertRuleStateBuffer | None = None,
     ) -> list[AlertRuleModel]:
-        """读取当前信号所有仍处于活动状态的规则。"""
+        """读取当前信号所有仍处于活动状态的规则。
+
+        有规则索引时优先从索引解析，只有已停用或失效的规则才回查 Mongo；
+        批量模式下以缓冲中尚未落库的状态覆盖查询结果。
+        """
         states = await AlertRuleEvaluationStateModel.find(
             {
                 "incident_key": incident_key,
                 "state": AlertRuleStateEnum.ACTIVE,
             }
         ).to_list()
+        if state_buffer is not None:
+            states = state_buffer.overlay_active(incident_key, states)
         if not states:
             return []
         rule_ids = list(dict.fromkeys(state.rule_id for state in states))
-        rules = await AlertRuleModel.find({"_id": {"$in": rule_ids}}).to_list()
+        rules: list[AlertRuleModel] = []
+        missing = rule_ids
+        if rule_index is not None:
+            missing = []
+            for rule_id in rule_ids:
+                entry = rule_index.get(rule_id)
+                if entry is None:
+                    missing.append(rule_id)
+                else:
+                    rules.append(entry.rule)
+        if missing:
+            rules.extend(
+                await AlertRuleModel.find({"_id": {"$in": missing}}).to_list()
+            )
         order = {rule_id: index for index, rule_id in enumerate(rule_ids)}
         return sorted(rules, key=lambda item: order.get(item.id, len(order)))
 
-    async def process_observation(
-        self,
+    @staticmethod
+    async def _find_rules(
         observation: AlertObservation,
         *,
         target_rule_id: str | None = None,
         realtime_only: bool = False,
-    ) -> int:
-        """处理一条观测并返回实际匹配的规则数量。"""
-        await self._validate_observation(observation)
+    ) -> list[AlertRuleModel]:
+        """未启用规则索引时直接从 Mongo 查询匹配规则。"""
         filters = {
             "source_key": observation.source_key,
             "field_key": observation.field_key,
@@ -320,44 +422,177 @@ class AlertEngine:
                     AlertEvaluationModeEnum.HYBRID,
                 ]
             }
-        rules = await AlertRuleModel.find(filters).to_list()
+        return await AlertRuleModel.find(filters).to_list()
+
+    async def _match_rules(
+        self,
+        observation: AlertObservation,
+        *,
+        target_rule_id: str | None = None,
+        realtime_only: bool = False,
+    ) -> list[IndexedAlertRule]:
+        """校验观测并返回已过首次检测策略过滤的匹配规则。"""
+        await self._validate_observation(observation)
+        if self.rule_index is not None:
+            entries = await self.rule_index.match(
+                observation.source_key,
+                observation.field_key,
+                target_rule_id=target_rule_id,
+                realtime_only=realtime_only,
+            )
+        else:
+            entries = [
+                IndexedAlertRule(
+                    rule=rule,
+                    fingerprint=self.condition_fingerprint(rule),
+                    trigger=None,
+                    recovery=None,
+                )
+                for rule in await self._find_rules(
+                    observation,
+                    target_rule_id=target_rule_id,
+                    realtime_only=realtime_only,
+                )
+            ]
         observation.observed_at = (
             observation.observed_at.replace(tzinfo=timezone.utc)
             if observation.observed_at.tzinfo is None
             else observation.observed_at.astimezone(timezone.utc)
         )
-        rules = [
-            rule
-            for rule in rules
+        entries = [
+            entry
+            for entry in entries
             if not (
-                rule.initial_evaluation_policy
+                entry.rule.initial_evaluation_policy
                 == AlertInitialEvaluationPolicyEnum.FROM_ACTIVATION
                 and observation.observed_at
                 < (
-                    rule.active_from.replace(tzinfo=timezone.utc)
-                    if rule.active_from.tzinfo is None
-                    else rule.active_from.astimezone(timezone.utc)
+                    entry.rule.active_from.replace(tzinfo=timezone.utc)
+                    if entry.rule.active_from.tzinfo is None
+                    else entry.rule.active_from.astimezone(timezone.utc)
                 )
             )
         ]
-        if not rules:
+        return entries
+
+    async def process_observation(
+        self,
+        observation: AlertObservation,
+        *,
+        target_rule_id: str | None = None,
+        realtime_only: bool = False,
+    ) -> int:
+        """处理一条观测并返回实际匹配的规则数量。"""
+        entries = await self._match_rules(
+            observation,
+            target_rule_id=target_rule_id,
+            realtime_only=realtime_only,
+        )
+        return await self._process_matched(observation, entries)
+
+    async def process_observations(
+        self,
+        observations: list[AlertObservation],
+        *,
+        target_rule_id: str | None = None,
+        realtime_only: bool = False,
+    ) -> list[int | Exception]:
+        """按批处理观测，规则状态变化在批末合并为一次 `bulk_write`。
+
+        返回值与输入逐条对应，单条失败或信号锁竞争以异常对象返回且不影响
+        同批其他观测；状态落库失败或信号锁在批内过期时直接抛出，由调用方
+        把整批交回收件箱重试。
+        """
+        state_buffer = AlertRuleStateBuffer()
+        matched: list[list[IndexedAlertRule] | Exception] = []
+        for observation in observations:
+            try:
+                matched.append(
+                    await self._match_rules(
+                        observation,
+                        target_rule_id=target_rule_id,
+                        realtime_only=realtime_only,
+                    )
+                )
+            except Exception as exc:
+                matched.append(exc)
+        results: list[int | Exception] = []
+        try:
+            await state_buffer.prefetch(
+                self.state_id(entry.rule.id, observation)
+                for observation, entries in zip(observations, matched)
+                if not isinstance(entries, Exception)
+                for entry in entries
+            )
+            for observation, entries in zip(observations, matched):
+                if isinstance(entries, Exception):
+                    results.append(entries)
+                    continue
+                try:
+                    results.append(
+                        await self._process_matched(
+                            observation,
+                            entries,
+                            state_buffer,
+                        )
+                    )
+                except Exception as exc:
+                    results.append(exc)
+            await self._flush_state_buffer(state_buffer)
+        finally:
+            for incident_key, token in state_buffer.locks.items():
+                with suppress(Exception):
+                    await self._release_lock(incident_key, token)
+        return results
+
+    async def _process_matched(
+        self,
+        observation: AlertObservation,
+        entries: list[IndexedAlertRule],
+        state_buffer: AlertRuleStateBuffer | None = None,
+    ) -> int:
+        """在信号锁内应用匹配规则并推进信号和告警生命周期。
+
+        批量模式下信号锁由缓冲持有到状态落库之后，每次复用时续期；创建或
+        自动恢复告警前先落库已缓冲状态，避免重放时重复开启告警周期。
+        信号锁被其他 Worker 持有时抛出 `AlertIncidentLockError` 以便重试。
+        """
+        if not entries:
             return 0
         incident_key = self.incident_key(observation)
-        token = await self._acquire_lock(incident_key)
-        if token is None:
-            return 0
+        token = state_buffer.locks.get(incident_key) if state_buffer else None
+        if token is not None:
+            if not await self._extend_lock(incident_key, token):
+                raise AlertIncidentLockError(
+                    f"信号锁在批处理期间过期，观测需重试: {incident_key}"
+                )
+        else:
+            token = await self._acquire_lock(incident_key)
+            if token is None:
+                # 锁竞争时不能返回 0，否则实时观测会被当作已处理而丢弃。
+                raise AlertIncidentLockError(
+                    f"信号锁被其他 Worker 持有，观测需重试: {incident_key}"
+                )
+            if state_buffer is not None:
+                state_buffer.locks[incident_key] = token
         try:
             applied_count = 0
-            for rule in rules:
+            for entry in entries:
                 _, applied = await self._apply_rule(
-                    rule,
+                    entry.rule,
                     observation,
                     incident_key,
+                    entry,
+                    state_buffer,
                 )
                 applied_count += int(applied)
             if applied_count == 0:
                 return 0
-            active_rules = await self._active_rules(incident_key)
+            active_rules = await self._active_rules(
+                incident_key,
+                self.rule_index,
+                state_buffer,
+            )
             signal = await self._get_or_create_signal(observation, incident_key)
             now = utc_now()
             if active_rules:
@@ -378,6 +613,8 @@ class AlertEngine:
                     else None
                 )
                 if alert is None:
+                    if state_buffer is not None:
+                        await self._flush_state_buffer(state_buffer)
                     signal.anomaly_sequence += 1
                     alert = await AlertLifecycleService.create_or_get(
                         incident_key=incident_key,
@@ -403,6 +640,8 @@ class AlertEngine:
                     signal.manual_suppressed = False
                     signal.armed = True
                 elif signal.current_alert_id:
+                    if state_buffer is not None:
+                        await self._flush_state_buffer(state_buffer)
                     alert = await AlertLifecycleService.get(signal.current_alert_id)
                     await AlertLifecycleService.resolve_auto(alert, observation)
                     signal.current_alert_id = None
@@ -413,4 +652,5 @@ class AlertEngine:
             await signal.save()
             return applied_count
         finally:
-            await self._release_lock(incident_key, token)
+            if state_buffer is None:
+                await self._release_lock(incident_key, token)
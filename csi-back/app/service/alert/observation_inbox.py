@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import secrets
 from datetime import datetime, timedelta, timezone
+from typing import Any
 
 from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
@@ -32,44 +34,50 @@ class AlertObservationInboxService:
         except DuplicateKeyError:
             return False
 
+    @staticmethod
+    def _claimable_filter(now: datetime) -> dict[str, Any]:
+        """待处理、可重试或租约已过期的观测过滤条件。"""
+        return {
+            "$or": [
+                {
+                    "status": {
+                        "$in": [
+                            AlertInboxStatusEnum.PENDING.value,
+                            AlertInboxStatusEnum.FAILED.value,
+                        ]
+                    },
+                    "$and": [
+                        {
+                            "$or": [
+                                {"next_retry_at": None},
+                                {"next_retry_at": {"$lte": now}},
+                            ]
+                        },
+                        {
+                            "attempts": {
+                                "$lt": settings.ALERT_OBSERVATION_MAX_ATTEMPTS
+                            }
+                        },
+                    ],
+                },
+                {
+                    "status": AlertInboxStatusEnum.PROCESSING.value,
+                    "lease_until": {"$lte": now},
+                },
+            ]
+        }
+
     @staticmethod
     async def claim(worker_id: str) -> AlertObservationInboxModel | None:
         """原子声明一条待处理或租约过期的观测。"""
         now = utc_now()
         raw = await AlertObservationInboxModel.get_motor_collection().find_one_and_update(
-            {
-                "$or": [
-                    {
-                        "status": {
-                            "$in": [
-                                AlertInboxStatusEnum.PENDING.value,
-                                AlertInboxStatusEnum.FAILED.value,
-                            ]
-                        },
-                        "$and": [
-                            {
-                                "$or": [
-                                    {"next_retry_at": None},
-                                    {"next_retry_at": {"$lte": now}},
-                                ]
-                            },
-                            {
-                                "attempts": {
-                                    "$lt": settings.ALERT_OBSERVATION_MAX_ATTEMPTS
-                                }
-                            },
-                        ],
-                    },
-                    {
-                        "status": AlertInboxStatusEnum.PROCESSING.value,
-                        "lease_until": {"$lte": now},
-                    },
-                ]
-            },
+            AlertObservationInboxService._claimable_filter(now),
             {
                 "$set": {
                     "status": AlertInboxStatusEnum.PROCESSING.value,
                     "claimed_by": worker_id,
+                    "claim_token": None,
                     "lease_until": now
                     + timedelta(seconds=settings.ALERT_OBSERVATION_LEASE_SECONDS),
                     "last_error": None,
@@ -81,6 +89,84 @@ class AlertObservationInboxService:
         )
         return AlertObservationInboxModel.model_validate(raw) if raw else None
 
+    @staticmethod
+    async def claim_batch(
+        worker_id: str,
+        limit: int,
+    ) -> list[AlertObservationInboxModel]:
+        """用同一声明令牌批量租约最多 `limit` 条观测。
+
+        先按创建时间挑选候选 ID，再以 `update_many` 在原过滤条件下
+        原子改写，被其他 Worker 抢先声明的候选自然落空；最后按令牌取回本批。
+        """
+        now = utc_now()
+        collection = AlertObservationInboxModel.get_motor_collection()
+        claimable = AlertObservationInboxService._claimable_filter(now)
+        candidates = await collection.find(claimable, {"_id": 1}).sort(
+            "created_at", 1
+        ).limit(limit).to_list(length=limit)
+        if not candidates:
+            return []
+        claim_token = secrets.token_urlsafe(18)
+        result = await collection.update_many(
+            {
+                "$and": [
+                    {"_id": {"$in": [item["_id"] for item in candidates]}},
+                    claimable,
+                ]
+            },
+            {
+                "$set": {
+                    "status": AlertInboxStatusEnum.PROCESSING.value,
+                    "claimed_by": worker_id,
+                    "claim_token": claim_token,
+                    "lease_until": now
+                    + timedelta(seconds=settings.ALERT_OBSERVATION_LEASE_SECONDS),
+                    "last_error": None,
+                },
+                "$inc": {"attempts": 1},
+            },
+        )
+        if not result.modified_count:
+            return []
+        raw_items = await collection.find({"claim_token": claim_token}).sort(
+            "created_at", 1
+        ).to_list(length=limit)
+        return [AlertObservationInboxModel.model_validate(raw) for raw in raw_items]
+
+    @staticmethod
+    async def mark_processed_many(
+        inbox_ids: list[str],
+        worker_id: str,
+        claim_token: str,
+    ) -> int:
+        """一次确认同一声明令牌下已处理的观测。"""
+        if not inbox_ids:
+            return 0
+        now = utc_now()
+        result = await AlertObservationInboxModel.get_motor_collection().update_many(
+            {
+                "_id": {"$in": inbox_ids},
+                "status": AlertInboxStatusEnum.PROCESSING.value,
+                "claimed_by": worker_id,
+                "claim_token": claim_token,
+            },
+            {
+                "$set": {
+                    "status": AlertInboxStatusEnum.PROCESSED.value,
+                    "processed_at": now,
+                    "expire_at": now
+                    + timedelta(
+                        days=max(1, settings.ALERT_OBSERVATION_RETENTION_DAYS)
+                    ),
+                    "lease_until": None,
+                    "next_retry_at": None,
+                    "last_error": None,
+                }
+            },
+        )
+        return result.modified_count
+
     @staticmethod
     async def mark_processed(inbox_id: str, worker_id: str) -> bool:
         """确认当前 Worker 已处理观测。"""
@@ -108,11 +194,17 @@ class AlertObservationInboxService:
         return result.modified_count == 1
 
     @staticmethod
-    async def mark_failed(inbox_id: str, worker_id: str, error: Exception) -> bool:
-        """记录观测失败并安排退避重试。"""
+    async def mark_failed(
+        inbox_id: str,
+        worker_id: str,
+        error: Exception,
+        attempts: int | None = None,
+    ) -> bool:
+        """记录观测失败并安排退避重试，已知尝试次数时省去回查。"""
         now = utc_now()
-        inbox = await AlertObservationInboxModel.find_one({"_id": inbox_id})
-        attempts = inbox.attempts if inbox is not None else 1
+        if attempts is None:
+            inbox = await AlertObservationInboxModel.find_one({"_id": inbox_id})
+            attempts = inbox.attempts if inbox is not None else 1
         terminal = attempts >= settings.ALERT_OBSERVATION_MAX_ATTEMPTS
         result = await AlertObservationInboxModel.get_motor_collection().update_one(
             {
@@ -0,0 +1,211 @@
+"""告警 Worker 进程内规则索引，按规则版本水位线增量刷新。"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+
+from loguru import logger
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.models.alert.rule import AlertRuleModel
+from app.schemas.alert.constants import (
+    AlertEvaluationModeEnum,
+    AlertRuleValidationStatusEnum,
+)
+from app.service.alert.comparator import CompiledAlertExpression, compile_expression
+from app.service.alert.registry import AlertSourceRegistry, alert_source_registry
+
+logger = logger.bind(name=__name__)
+
+RULE_VERSION_KEY = "alert:rule-version"
+
+_REALTIME_MODES = frozenset(
+    {
+        AlertEvaluationModeEnum.REALTIME,
+        AlertEvaluationModeEnum.HYBRID,
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedAlertRule:
+    """规则快照及其预计算的条件指纹和预解析表达式。"""
+
+    rule: AlertRuleModel
+    fingerprint: str
+    trigger: CompiledAlertExpression | None
+    recovery: CompiledAlertExpression | None
+
+    @property
+    def realtime(self) -> bool:
+        return self.rule.evaluation_mode in _REALTIME_MODES
+
+
+def compile_rule(
+    rule: AlertRuleModel,
+    registry: AlertSourceRegistry | None = None,
+) -> IndexedAlertRule:
+    """预计算单条规则的指纹和表达式，字段已失效时保留原始表达式路径。"""
+    from app.service.alert.engine import AlertEngine
+
+    trigger = recovery = None
+    try:
+        value_type = (registry or alert_source_registry).get_field(
+            rule.source_key,
+            rule.field_key,
+        ).value_type
+        trigger = compile_expression(rule.trigger_expression, value_type)
+        if rule.recovery_expression is not None:
+            recovery = compile_expression(rule.recovery_expression, value_type)
+    except (KeyError, ValueError):
+        trigger = recovery = None
+    return IndexedAlertRule(
+        rule=rule,
+        fingerprint=AlertEngine.condition_fingerprint(rule),
+        trigger=trigger,
+        recovery=recovery,
+    )
+
+
+async def bump_rule_version() -> None:
+    """规则变更后推进全局水位线，通知各 Worker 重建索引。"""
+    try:
+        redis = get_redis()
+        if redis is not None:
+            await redis.incr(RULE_VERSION_KEY)
+    except Exception as exc:
+        logger.warning(f"推进告警规则版本水位线失败: {exc}")
+
+
+class AlertRuleIndex:
+    """按 (source_key, field_key) 分桶的有效规则内存索引。
+
+    每隔 `ALERT_RULE_INDEX_CHECK_SECONDS` 读取一次 Redis 水位线，
+    与已加载版本不一致时从 Mongo 全量重建；Redis 不可用时按同一间隔重建。
+    先读水位线再加载规则，加载期间发生的变更会在下一次检查时再次触发重建。
+    """
+
+    def __init__(self, registry: AlertSourceRegistry | None = None) -> None:
+        self.registry = registry or alert_source_registry
+        self._buckets: dict[tuple[str, str], tuple[IndexedAlertRule, ...]] = {}
+        self._by_id: dict[str, IndexedAlertRule] = {}
+        self._version: str | None = None
+        self._loaded = False
+        self._checked_at = 0.0
+        self.reloads = 0
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    @staticmethod
+    async def _read_version() -> str | None:
+        redis = get_redis()
+        if redis is None:
+            return None
+        raw = await redis.get(RULE_VERSION_KEY)
+        if isinstance(raw, bytes):
+            raw = raw.decode()
+        return str(raw or "0")
+
+    def load(self, rules: list[AlertRuleModel], version: str | None = None) -> None:
+        """用给定规则整体替换索引内容。"""
+        buckets: dict[tuple[str, str], list[IndexedAlertRule]] = {}
+        by_id: dict[str, IndexedAlertRule] = {}
+        for rule in rules:
+            entry = compile_rule(rule, self.registry)
+            by_id[rule.id] = entry
+            buckets.setdefault((rule.source_key, rule.field_key), []).append(entry)
+        self._buckets = {key: tuple(items) for key, items in buckets.items()}
+        self._by_id = by_id
+        self._version = version
+        self._loaded = True
+        self.reloads += 1
+
+    async def reload(self, version: str | None = None) -> None:
+        """从 Mongo 读取全部有效规则并重建索引。"""
+        rules = await AlertRuleModel.find(
+            {
+                "enabled": True,
+                "is_deleted": False,
+                "validation_status": AlertRuleValidationStatusEnum.VALID,
+            }
+        ).to_list()
+        self.load(rules, version)
+
+    async def refresh(self, *, force: bool = False) -> None:
+        """按检查间隔比较水位线，变化时重建索引。"""
+        now = time.monotonic()
+        if (
+            not force
+            and self._loaded
+            and now - self._checked_at < settings.ALERT_RULE_INDEX_CHECK_SECONDS
+        ):
+            return
+        self._checked_at = now
+        try:
+            version = await self._read_version()
+        except Exception as exc:
+            logger.warning(f"读取告警规则版本水位线失败: {exc}")
+            version = None
+        if force or not self._loaded or version is None or version != self._version:
+            await self.reload(version)
+
+    def upsert(self, rule: AlertRuleModel) -> IndexedAlertRule | None:
+        """用刚从 Mongo 读取的规则快照更新索引，旧版本不会覆盖新版本。"""
+        current = self._by_id.get(rule.id)
+        if current is not None and current.rule.version > rule.version:
+            return current
+        key = (rule.source_key, rule.field_key)
+        bucket = [
+            entry for entry in self._buckets.get(key, ()) if entry.rule.id != rule.id
+        ]
+        if (
+            not rule.enabled
+            or rule.is_deleted
+            or rule.validation_status != AlertRuleValidationStatusEnum.VALID
+        ):
+            self._by_id.pop(rule.id, None)
+            entry = None
+        else:
+            entry = compile_rule(rule, self.registry)
+            self._by_id[rule.id] = entry
+            bucket.append(entry)
+        if bucket:
+            self._buckets[key] = tuple(bucket)
+        else:
+            self._buckets.pop(key, None)
+        return entry
+
+    def invalidate(self) -> None:
+        """使下一次匹配强制重建索引。"""
+        self._loaded = False
+
+    def get(self, rule_id: str) -> IndexedAlertRule | None:
+        return self._by_id.get(rule_id)
+
+    async def match(
+        self,
+        source_key: str,
+        field_key: str,
+        *,
+        target_rule_id: str | None = None,
+        realtime_only: bool = False,
+    ) -> list[IndexedAlertRule]:
+        """返回与观测字段匹配的有效规则，语义与 Mongo 过滤条件一致。"""
+        await self.refresh()
+        if target_rule_id is not None:
+            entry = self._by_id.get(target_rule_id)
+            entries: tuple[IndexedAlertRule, ...] = (
+                (entry,)
+                if entry is not None
+                and entry.rule.source_key == source_key
+                and entry.rule.field_key == field_key
+                else ()
+            )
+        else:
+            entries = self._buckets.get((source_key, field_key), ())
+        if realtime_only:
+            return [entry for entry in entries if entry.realtime]
+        return list(entries)
@@ -25,6 +25,8 @@ from app.schemas.alert.rule import (
 from app.schemas.alert.source import AlertFieldDescriptor, AlertSourceDescriptor
 from app.service.alert.comparator import normalize_threshold
 from app.service.alert.registry import AlertSourceRegistry, alert_source_registry
+from app.service.alert.rule_index import bump_rule_version
+from app.service.alert.sharding import rule_scan_hash
 from app.service.alert.stream import AlertStreamService
 
 
@@ -102,7 +104,8 @@ class AlertRuleService:
 
     @staticmethod
     async def _emit_rule_change(rule: AlertRuleModel, event_type: str) -> None:
-        """把规则变化写入可靠 SSE Outbox。"""
+        """推进规则索引水位线并把规则变化写入可靠 SSE Outbox。"""
+        await bump_rule_version()
         await AlertStreamService.enqueue(
             event_id=f"rule:{rule.id}:v{rule.version}:{event_type}",
             event_type=event_type,
@@ -134,8 +137,9 @@ class AlertRuleService:
             }
             else None
         )
+        rule_id = uuid4().hex
         rule = AlertRuleModel(
-            id=uuid4().hex,
+            id=rule_id,
             name=payload.name,
             description=payload.description,
             source_key=payload.source_key,
@@ -158,6 +162,7 @@ class AlertRuleService:
             next_evaluate_at=now if payload.enabled else None,
             created_at=now,
             updated_at=now,
+            scan_hash=rule_scan_hash(rule_id),
         )
         await rule.insert()
         await self._emit_rule_change(rule, "rule.created")
@@ -0,0 +1,178 @@
+"""告警规则扫描的一致性哈希分片与 Redis 租约。"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import time
+import zlib
+from typing import Any
+
+from loguru import logger
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.models.alert.rule import AlertRuleModel
+
+logger = logger.bind(name=__name__)
+
+MEMBERS_KEY = "alert:worker:members"
+SHARD_LEASE_KEY_PREFIX = "alert:rule-shard:"
+VIRTUAL_NODES = 64
+
+# 逐个分片续约或抢占租约，返回与 KEYS 等长的 0/1 列表。
+_ACQUIRE_SCRIPT = """
+local owned = {}
+for index, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('PEXPIRE', key, ARGV[2])
+        owned[index] = 1
+    elseif redis.call('SET', key, ARGV[1], 'PX', ARGV[2], 'NX') then
+        owned[index] = 1
+    else
+        owned[index] = 0
+    end
+end
+return owned
+"""
+
+_RELEASE_SCRIPT = """
+local released = 0
+for _, key in ipairs(KEYS) do
+    if redis.call('GET', key) == ARGV[1] then
+        redis.call('DEL', key)
+        released = released + 1
+    end
+end
+return released
+"""
+
+
+def rule_scan_hash(rule_id: str) -> int:
+    """规则的稳定扫描哈希，分片号为其对分片总数取模。"""
+    return zlib.crc32(rule_id.encode("utf-8"))
+
+
+def _ring_point(value: str) -> int:
+    return int.from_bytes(hashlib.sha1(value.encode("utf-8")).digest()[:8], "big")
+
+
+def assign_shards(members: list[str], shard_count: int) -> dict[int, str]:
+    """按带虚拟节点的一致性哈希环把分片分配给存活 Worker。"""
+    if not members:
+        return {}
+    ring = sorted(
+        (_ring_point(f"{member}#{index}"), member)
+        for member in set(members)
+        for index in range(VIRTUAL_NODES)
+    )
+    points = [point for point, _ in ring]
+    assignment: dict[int, str] = {}
+    for shard in range(shard_count):
+        position = bisect.bisect_left(points, _ring_point(f"shard:{shard}"))
+        assignment[shard] = ring[position % len(ring)][1]
+    return assignment
+
+
+class AlertRuleShardManager:
+    """维护当前 Worker 在哈希环上的成员身份和所属分片租约。
+
+    成员以过期时间为分值写入有序集合，超过租约时长未续期即视为离线；
+    每轮按存活成员重新计算归属，只扫描已成功持有租约的分片。
+    成员变化时旧持有者主动释放不再归属的分片，新持有者最迟在租约过期后接管。
+    """
+
+    def __init__(self, worker_id: str, shard_count: int | None = None) -> None:
+        self.worker_id = worker_id
+        self.shard_count = max(1, shard_count or settings.ALERT_RULE_SHARD_COUNT)
+        self.owned: frozenset[int] = frozenset()
+
+    def _lease_key(self, shard: int) -> str:
+        return f"{SHARD_LEASE_KEY_PREFIX}{shard}"
+
+    @property
+    def owns_all(self) -> bool:
+        return len(self.owned) == self.shard_count
+
+    async def rebalance(self) -> frozenset[int]:
+        """续期成员身份、重算归属并续约或抢占分片租约。"""
+        redis = get_redis()
+        if redis is None:
+            # Redis 不可用时只能单进程运行，退化为持有全部分片。
+            self.owned = frozenset(range(self.shard_count))
+            return self.owned
+        lease_seconds = settings.ALERT_RULE_SHARD_LEASE_SECONDS
+        now = time.time()
+        await redis.zadd(MEMBERS_KEY, {self.worker_id: now + lease_seconds})
+        await redis.zremrangebyscore(MEMBERS_KEY, "-inf", now)
+        members = [
+            member.decode() if isinstance(member, bytes) else str(member)
+            for member in await redis.zrange(MEMBERS_KEY, 0, -1)
+        ]
+        assignment = assign_shards(members, self.shard_count)
+        desired = sorted(
+            shard for shard, owner in assignment.items() if owner == self.worker_id
+        )
+        released = sorted(self.owned.difference(desired))
+        if released:
+            await redis.eval(
+                _RELEASE_SCRIPT,
+                len(released),
+                *(self._lease_key(shard) for shard in released),
+                self.worker_id,
+            )
+        owned: set[int] = set()
+        if desired:
+            flags = await redis.eval(
+                _ACQUIRE_SCRIPT,
+                len(desired),
+                *(self._lease_key(shard) for shard in desired),
+                self.worker_id,
+                int(lease_seconds * 1000),
+            )
+            owned = {shard for shard, flag in zip(desired, flags) if int(flag)}
+        if owned != self.owned:
+            logger.info(
+                f"告警规则分片归属变化，Worker: {self.worker_id}，"
+                f"持有 {len(owned)}/{self.shard_count}，成员 {len(members)}"
+            )
+        self.owned = frozenset(owned)
+        return self.owned
+
+    async def leave(self) -> None:
+        """释放全部分片租约并退出哈希环。"""
+        redis = get_redis()
+        owned, self.owned = self.owned, frozenset()
+        if redis is None:
+            return
+        if owned:
+            await redis.eval(
+                _RELEASE_SCRIPT,
+                len(owned),
+                *(self._lease_key(shard) for shard in sorted(owned)),
+                self.worker_id,
+            )
+        await redis.zrem(MEMBERS_KEY, self.worker_id)
+
+    def rule_filter(self) -> dict[str, Any] | None:
+        """返回限定到已持有分片的规则过滤条件，持有全部分片时返回 None。"""
+        if self.owns_all:
+            return None
+        clauses: list[dict[str, Any]] = [
+            {"scan_hash": {"$mod": [self.shard_count, shard]}}
+            for shard in sorted(self.owned)
+        ]
+        if 0 in self.owned:
+            # 尚未回填扫描哈希的旧规则统一由 0 号分片持有者处理。
+            clauses.append({"scan_hash": None})
+        return {"$or": clauses} if clauses else {"_id": {"$in": []}}
+
+    @staticmethod
+    async def backfill_rule_hashes(limit: int = 1000) -> int:
+        """为历史规则补写扫描哈希。"""
+        rules = await AlertRuleModel.find({"scan_hash": None}).limit(limit).to_list()
+        for rule in rules:
+            await AlertRuleModel.find_one({"_id": rule.id, "scan_hash": None}).update(
+                {"$set": {"scan_hash": rule_scan_hash(rule.id)}}
+            )
+        return len(rules)
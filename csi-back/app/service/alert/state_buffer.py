@@ -0,0 +1,94 @@
+"""批量观测处理期间的规则状态写缓冲。"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+from pymongo import ReplaceOne
+
+from app.models.alert.evaluation_state import AlertRuleEvaluationStateModel
+from app.schemas.alert.constants import AlertRuleStateEnum
+
+
+class AlertRuleStateBuffer:
+    """一批观测共享的规则状态快照，批末合并为一次 `bulk_write`。
+
+    状态按批一次性 `$in` 预取，读取时返回副本，只有 `_apply_rule`
+    完整执行后的状态才会写回缓冲并标记为待落库；同时持有本批获取的
+    信号锁，直到状态落库后再由引擎统一释放。
+    """
+
+    def __init__(self) -> None:
+        self._states: dict[str, AlertRuleEvaluationStateModel | None] = {}
+        self._dirty: set[str] = set()
+        self.locks: dict[str, str] = {}
+        self.flushed = 0
+
+    @property
+    def dirty_count(self) -> int:
+        return len(self._dirty)
+
+    async def prefetch(self, state_ids: Iterable[str]) -> None:
+        """一次查询加载尚未缓存的状态，不存在的 ID 记为空。"""
+        missing = list(
+            dict.fromkeys(
+                state_id for state_id in state_ids if state_id not in self._states
+            )
+        )
+        if not missing:
+            return
+        states = await AlertRuleEvaluationStateModel.find(
+            {"_id": {"$in": missing}}
+        ).to_list()
+        for state_id in missing:
+            self._states[state_id] = None
+        for state in states:
+            self._states[state.id] = state
+
+    async def get(self, state_id: str) -> AlertRuleEvaluationStateModel | None:
+        """返回状态副本，未预取的 ID 会补充读取。"""
+        if state_id not in self._states:
+            await self.prefetch([state_id])
+        state = self._states[state_id]
+        return state.model_copy(deep=True) if state is not None else None
+
+    def put(self, state: AlertRuleEvaluationStateModel) -> None:
+        """记录已更新的状态，等待批末落库。"""
+        self._states[state.id] = state
+        self._dirty.add(state.id)
+
+    def overlay_active(
+        self,
+        incident_key: str,
+        persisted: list[AlertRuleEvaluationStateModel],
+    ) -> list[AlertRuleEvaluationStateModel]:
+        """用缓冲中的最新状态覆盖库内活动状态查询结果。"""
+        merged = {state.id: state for state in persisted}
+        for state_id, state in self._states.items():
+            if state is None or state.incident_key != incident_key:
+                continue
+            if state.state == AlertRuleStateEnum.ACTIVE:
+                merged[state_id] = state
+            else:
+                merged.pop(state_id, None)
+        return list(merged.values())
+
+    async def flush(self) -> int:
+        """把待落库状态合并为一次无序 `bulk_write`。"""
+        if not self._dirty:
+            return 0
+        operations = [
+            ReplaceOne(
+                {"_id": state_id},
+                self._states[state_id].model_dump(by_alias=True),
+                upsert=True,
+            )
+            for state_id in sorted(self._dirty)
+        ]
+        await AlertRuleEvaluationStateModel.get_motor_collection().bulk_write(
+            operations,
+            ordered=False,
+        )
+        self._dirty.clear()
+        self.flushed += len(operations)
+        return len(operations)
@@ -1,17 +1,19 @@
 from __future__ import annotations
 
 import json
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 from loguru import logger
-from pymongo import ReturnDocument
+from pymongo import ReturnDocument, UpdateOne
 from pymongo.errors import DuplicateKeyError
 
 from app.core.config import settings
 from app.db.redis import get_redis
 from app.models.alert.stream_outbox import AlertStreamOutboxModel
 from app.schemas.alert.constants import AlertOutboxStatusEnum
+from app.service.stream_hub import StreamSubscription, stream_hub
 
 logger = logger.bind(name=__name__)
 
@@ -57,38 +59,44 @@ class AlertStreamService:
                 raise
             return existing
 
+    @staticmethod
+    def _claimable_filter(now: datetime) -> dict[str, Any]:
+        """待投递、可重试或租约已过期的 Outbox 过滤条件。"""
+        return {
+            "$or": [
+                {
+                    "status": {
+                        "$in": [
+                            AlertOutboxStatusEnum.PENDING.value,
+                            AlertOutboxStatusEnum.FAILED.value,
+                        ]
+                    },
+                    "attempts": {
+                        "$lt": settings.ALERT_OBSERVATION_MAX_ATTEMPTS
+                    },
+                    "$or": [
+                        {"next_retry_at": None},
+                        {"next_retry_at": {"$lte": now}},
+                    ],
+                },
+                {
+                    "status": AlertOutboxStatusEnum.PUBLISHING.value,
+                    "lease_until": {"$lte": now},
+                },
+            ]
+        }
+
     @classmethod
     async def claim(cls, worker_id: str) -> AlertStreamOutboxModel | None:
         """原子声明一条待投递或租约过期的 Outbox。"""
         now = utc_now()
         raw = await AlertStreamOutboxModel.get_motor_collection().find_one_and_update(
-            {
-                "$or": [
-                    {
-                        "status": {
-                            "$in": [
-                                AlertOutboxStatusEnum.PENDING.value,
-                                AlertOutboxStatusEnum.FAILED.value,
-                            ]
-                        },
-                        "attempts": {
-                            "$lt": settings.ALERT_OBSERVATION_MAX_ATTEMPTS
-                        },
-                        "$or": [
-                            {"next_retry_at": None},
-                            {"next_retry_at": {"$lte": now}},
-                        ],
-                    },
-                    {
-                        "status": AlertOutboxStatusEnum.PUBLISHING.value,
-                        "lease_until": {"$lte": now},
-                    },
-                ]
-            },
+            cls._claimable_filter(now),
             {
                 "$set": {
                     "status": AlertOutboxStatusEnum.PUBLISHING.value,
                     "claimed_by": worker_id,
+                    "claim_token": None,
                     "lease_until": now
                     + timedelta(seconds=settings.ALERT_OBSERVATION_LEASE_SECONDS),
                     "last_error": None,
@@ -101,91 +109,169 @@ class AlertStreamService:
         return AlertStreamOutboxModel.model_validate(raw) if raw else None
 
     @classmethod
-    async def publish_one(
+    async def claim_batch(
         cls,
-        outbox: AlertStreamOutboxModel,
         worker_id: str,
-    ) -> bool:
-        """发布一条 Outbox 并更新其投递状态。"""
+        limit: int,
+    ) -> list[AlertStreamOutboxModel]:
+        """用同一声明令牌批量租约一段 Outbox，并按创建时间返回。"""
+        now = utc_now()
+        collection = AlertStreamOutboxModel.get_motor_collection()
+        claimable = cls._claimable_filter(now)
+        candidates = await collection.find(claimable, {"_id": 1}).sort(
+            "created_at", 1
+        ).limit(limit).to_list(length=limit)
+        if not candidates:
+            return []
+        claim_token = secrets.token_urlsafe(18)
+        result = await collection.update_many(
+            {
+                "$and": [
+                    {"_id": {"$in": [item["_id"] for item in candidates]}},
+                    claimable,
+                ]
+            },
+            {
+                "$set": {
+                    "status": AlertOutboxStatusEnum.PUBLISHING.value,
+                    "claimed_by": worker_id,
+                    "claim_token": claim_token,
+                    "lease_until": now
+                    + timedelta(seconds=settings.ALERT_OBSERVATION_LEASE_SECONDS),
+                    "last_error": None,
+                },
+                "$inc": {"attempts": 1},
+            },
+        )
+        if not result.modified_count:
+            return []
+        raw_items = await collection.find({"claim_token": claim_token}).sort(
+            "created_at", 1
+        ).to_list(length=limit)
+        return [AlertStreamOutboxModel.model_validate(raw) for raw in raw_items]
+
+    @staticmethod
+    def _stream_fields(outbox: AlertStreamOutboxModel) -> dict[str, str]:
+        """构造写入 Redis Stream 的事件字段。"""
+        return {
+            "event_id": outbox.id,
+            "event": outbox.event_type,
+            "aggregate_type": outbox.aggregate_type,
+            "aggregate_id": outbox.aggregate_id or "",
+            "aggregate_version": str(outbox.aggregate_version or ""),
+            "data": json.dumps(
+                outbox.payload,
+                ensure_ascii=False,
+                default=str,
+            ),
+        }
+
+    @staticmethod
+    def _claimed_filter(outbox: AlertStreamOutboxModel, worker_id: str) -> dict:
+        return {
+            "_id": outbox.id,
+            "status": AlertOutboxStatusEnum.PUBLISHING.value,
+            "claimed_by": worker_id,
+        }
+
+    @classmethod
+    async def publish_batch(
+        cls,
+        items: list[AlertStreamOutboxModel],
+        worker_id: str,
+    ) -> int:
+        """在一个 MULTI 中按序 XADD 整批事件，再用一次 `bulk_write` 确认。
+
+        同一事务内的 XADD 连续分配递增的 Stream ID，批内顺序与 Outbox
+        创建顺序一致，`replay_status` 依赖的游标单调性不受影响。
+        """
+        if not items:
+            return 0
         redis = get_redis()
         now = utc_now()
+        collection = AlertStreamOutboxModel.get_motor_collection()
         try:
             if redis is None:
                 raise RuntimeError("Redis 尚未初始化")
-            stream_id = await redis.xadd(
-                cls.STREAM_KEY,
-                {
-                    "event_id": outbox.id,
-                    "event": outbox.event_type,
-                    "aggregate_type": outbox.aggregate_type,
-                    "aggregate_id": outbox.aggregate_id or "",
-                    "aggregate_version": str(outbox.aggregate_version or ""),
-                    "data": json.dumps(
-                        outbox.payload,
-                        ensure_ascii=False,
-                        default=str,
-                    ),
-                },
-                maxlen=max(100, settings.ALERT_SSE_STREAM_MAXLEN),
-                approximate=True,
-            )
-            result = await AlertStreamOutboxModel.get_motor_collection().update_one(
-                {
-                    "_id": outbox.id,
-                    "status": AlertOutboxStatusEnum.PUBLISHING.value,
-                    "claimed_by": worker_id,
-                },
-                {
-                    "$set": {
-                        "status": AlertOutboxStatusEnum.PUBLISHED.value,
-                        "published_at": now,
-                        "last_error": None,
-                        "next_retry_at": None,
-                        "claimed_by": None,
-                        "lease_until": None,
-                        "expire_at": now
-                        + timedelta(
-                            days=max(
-                                1,
-                                settings.ALERT_OBSERVATION_RETENTION_DAYS,
-                            )
-                        ),
-                        "payload.stream_id": stream_id,
-                    }
-                },
-            )
-            return result.modified_count == 1
+            maxlen = max(100, settings.ALERT_SSE_STREAM_MAXLEN)
+            async with redis.pipeline(transaction=True) as pipe:
+                for outbox in items:
+                    pipe.xadd(
+                        cls.STREAM_KEY,
+                        cls._stream_fields(outbox),
+                        maxlen=maxlen,
+                        approximate=True,
+                    )
+                stream_ids = await pipe.execute()
         except Exception as exc:
-            status = (
-                AlertOutboxStatusEnum.FAILED
-                if outbox.attempts >= settings.ALERT_OBSERVATION_MAX_ATTEMPTS
-                else AlertOutboxStatusEnum.PENDING
-            )
-            await AlertStreamOutboxModel.get_motor_collection().update_one(
-                {
-                    "_id": outbox.id,
-                    "status": AlertOutboxStatusEnum.PUBLISHING.value,
-                    "claimed_by": worker_id,
-                },
-                {
-                    "$set": {
-                        "status": status.value,
-                        "claimed_by": None,
-                        "lease_until": None,
-                        "last_error": str(exc)[:2000],
-                        "next_retry_at": (
-                            None
-                            if status == AlertOutboxStatusEnum.FAILED
-                            else now
-                            + timedelta(
-                                seconds=min(2 ** min(outbox.attempts, 8), 300)
-                            )
-                        ),
-                    }
-                },
-            )
-            logger.warning(f"告警 SSE Outbox 发布失败: {outbox.id}: {exc}")
-            return False
+            operations = []
+            for outbox in items:
+                status = (
+                    AlertOutboxStatusEnum.FAILED
+                    if outbox.attempts >= settings.ALERT_OBSERVATION_MAX_ATTEMPTS
+                    else AlertOutboxStatusEnum.PENDING
+                )
+                operations.append(
+                    UpdateOne(
+                        cls._claimed_filter(outbox, worker_id),
+                        {
+                            "$set": {
+                                "status": status.value,
+                                "claimed_by": None,
+                                "lease_until": None,
+                                "last_error": str(exc)[:2000],
+                                "next_retry_at": (
+                                    None
+                                    if status == AlertOutboxStatusEnum.FAILED
+                                    else now
+                                    + timedelta(
+                                        seconds=min(
+                                            2 ** min(outbox.attempts, 8),
+                                            300,
+                                        )
+                                    )
+                                ),
+                            }
+                        },
+                    )
+                )
+            await collection.bulk_write(operations, ordered=False)
+            logger.warning(f"告警 SSE Outbox 批量发布失败，数量: {len(items)}: {exc}")
+            return 0
+        expire_at = now + timedelta(
+            days=max(1, settings.ALERT_OBSERVATION_RETENTION_DAYS)
+        )
+        result = await collection.bulk_write(
+            [
+                UpdateOne(
+                    cls._claimed_filter(outbox, worker_id),
+                    {
+                        "$set": {
+                            "status": AlertOutboxStatusEnum.PUBLISHED.value,
+                            "published_at": now,
+                            "last_error": None,
+                            "next_retry_at": None,
+                            "claimed_by": None,
+                            "lease_until": None,
+                            "expire_at": expire_at,
+                            "payload.stream_id": stream_id,
+                        }
+                    },
+                )
+                for outbox, stream_id in zip(items, stream_ids)
+            ],
+            ordered=False,
+        )
+        return result.modified_count
+
+    @classmethod
+    async def publish_one(
+        cls,
+        outbox: AlertStreamOutboxModel,
+        worker_id: str,
+    ) -> bool:
+        """发布一条 Outbox 并更新其投递状态。"""
+        return await cls.publish_batch([outbox], worker_id) == 1
 
     @classmethod
     async def publish_pending(
@@ -194,15 +280,9 @@ class AlertStreamService:
         *,
         worker_id: str = "inline",
     ) -> int:
-        """批量发布到期 Outbox。"""
-        published = 0
-        for _ in range(limit):
-            item = await cls.claim(worker_id)
-            if item is None:
-                break
-            if await cls.publish_one(item, worker_id):
-                published += 1
-        return published
+        """批量声明并发布到期 Outbox。"""
+        items = await cls.claim_batch(worker_id, limit)
+        return await cls.publish_batch(items, worker_id)
 
     @classmethod
     async def latest_cursor(cls) -> str:
@@ -249,23 +329,6 @@ class AlertStreamService:
         return stale, oldest, latest
 
     @classmethod
-    async def read_after(
-        cls,
-        cursor: str,
-        *,
-        block_ms: int = 15000,
-        count: int = 100,
-    ) -> list[tuple[str, dict[str, str]]]:
-        """从指定 Redis Stream 游标之后读取事件。"""
-        redis = get_redis()
-        if redis is None:
-            return []
-        rows = await redis.xread(
-            {cls.STREAM_KEY: cursor},
-            count=count,
-            block=block_ms,
-        )
-        messages: list[tuple[str, dict[str, str]]] = []
-        for _, stream_messages in rows or []:
-            messages.extend(stream_messages)
-        return messages
+    def subscribe(cls, cursor: str) -> StreamSubscription:
+        """通过进程内扇出中心订阅指定游标之后的告警事件。"""
+        return stream_hub.subscribe(cls.STREAM_KEY, cursor)
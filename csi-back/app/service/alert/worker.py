@@ -20,6 +20,8 @@ from app.schemas.alert.constants import (
 from app.service.alert.engine import AlertEngine
 from app.service.alert.observation_inbox import AlertObservationInboxService
 from app.service.alert.registry import alert_source_registry
+from app.service.alert.rule_index import AlertRuleIndex, bump_rule_version
+from app.service.alert.sharding import AlertRuleShardManager
 from app.service.alert.stream import AlertStreamService
 
 logger = logger.bind(name=__name__)
@@ -37,7 +39,14 @@ class AlertWorkerService:
 
     def __init__(self, worker_id: str) -> None:
         self.worker_id = worker_id
-        self.engine = AlertEngine()
+        self.rule_index = AlertRuleIndex()
+        self.engine = AlertEngine(rule_index=self.rule_index)
+        self.shards = AlertRuleShardManager(worker_id)
+        self._scan_tasks: dict[str, asyncio.Task] = {}
+        self._scan_semaphore = asyncio.Semaphore(
+            max(1, settings.ALERT_RULE_SCAN_CONCURRENCY)
+        )
+        self._provider_semaphores: dict[str, asyncio.Semaphore] = {}
         self.last_observation_scan_at: datetime | None = None
         self.last_rule_scan_at: datetime | None = None
         self.last_sse_dispatch_at: datetime | None = None
@@ -167,6 +176,7 @@ class AlertWorkerService:
         )
         if not result or result.modified_count != 1:
             return
+        await bump_rule_version()
         await AlertStreamService.enqueue(
             event_id=f"rule:{rule.id}:v{rule.version}:rule.invalid",
             event_type="rule.updated",
@@ -201,6 +211,7 @@ class AlertWorkerService:
             )
             if current is None:
                 return 0
+            self.rule_index.upsert(current)
             try:
                 provider = alert_source_registry.get(current.source_key)
                 descriptor = alert_source_registry.get_descriptor(
@@ -245,12 +256,14 @@ class AlertWorkerService:
                     cursor=cursor,
                     limit=settings.ALERT_PROVIDER_PAGE_SIZE,
                 )
-                for observation in page.items:
-                    await self.engine.process_observation(
-                        observation,
-                        target_rule_id=current.id,
-                    )
-                    processed += 1
+                results = await self.engine.process_observations(
+                    list(page.items),
+                    target_rule_id=current.id,
+                )
+                for result in results:
+                    if isinstance(result, Exception):
+                        raise result
+                processed += len(results)
                 pages += 1
                 if not page.next_cursor:
                     break
@@ -290,47 +303,99 @@ class AlertWorkerService:
         finally:
             await self._release_rule_lock(rule.id, token)
 
+    def _provider_semaphore(self, source_key: str) -> asyncio.Semaphore:
+        """返回告警源级并发预算，慢 Provider 只占用自己的名额。"""
+        semaphore = self._provider_semaphores.get(source_key)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(
+                max(1, settings.ALERT_PROVIDER_SCAN_CONCURRENCY)
+            )
+            self._provider_semaphores[source_key] = semaphore
+        return semaphore
+
+    async def _scan_with_budget(self, rule: AlertRuleModel) -> int:
+        """先占用告警源预算再占用全局并发名额，避免排队任务占满全局池。"""
+        async with self._provider_semaphore(rule.source_key):
+            async with self._scan_semaphore:
+                return await self.scan_rule(rule)
+
+    def _on_scan_done(self, rule_id: str, task: asyncio.Task) -> None:
+        if self._scan_tasks.get(rule_id) is task:
+            self._scan_tasks.pop(rule_id, None)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"告警规则扫描任务异常，Rule ID: {rule_id}: {task.exception()}")
+
     async def scan_due_rules(self, limit: int = 50) -> int:
-        """扫描本轮到期的有效规则。"""
+        """把本 Worker 持有分片内的到期规则派发到并发扫描池。"""
+        await self.shards.rebalance()
+        if not self.shards.owned:
+            # 未持有任何分片时不查询，避免排除条件覆盖分片过滤后扫描全部规则。
+            self.last_rule_scan_at = utc_now()
+            return 0
         now = utc_now()
-        rules = await AlertRuleModel.find(
-            {
-                "enabled": True,
-                "is_deleted": False,
-                "validation_status": AlertRuleValidationStatusEnum.VALID,
-                "next_evaluate_at": {"$lte": now},
+        filters: dict[str, Any] = {
+            "enabled": True,
+            "is_deleted": False,
+            "validation_status": AlertRuleValidationStatusEnum.VALID,
+            "next_evaluate_at": {"$lte": now},
+        }
+        shard_filter = self.shards.rule_filter()
+        if shard_filter is not None:
+            filters.update(shard_filter)
+        if self._scan_tasks:
+            filters["_id"] = {
+                **filters.get("_id", {}),
+                "$nin": list(self._scan_tasks),
             }
-        ).sort("+next_evaluate_at").limit(limit).to_list()
-        processed = 0
+        rules = await AlertRuleModel.find(filters).sort(
+            "+next_evaluate_at"
+        ).limit(limit).to_list()
         for rule in rules:
-            processed += await self.scan_rule(rule)
+            task = asyncio.create_task(self._scan_with_budget(rule))
+            self._scan_tasks[rule.id] = task
+            task.add_done_callback(
+                lambda done, rule_id=rule.id: self._on_scan_done(rule_id, done)
+            )
         self.last_rule_scan_at = utc_now()
-        return processed
+        return len(rules)
 
-    async def consume_observations(self, limit: int = 100) -> int:
-        """领取并处理一批实时观测。"""
-        processed = 0
-        for _ in range(limit):
-            inbox = await AlertObservationInboxService.claim(self.worker_id)
-            if inbox is None:
-                break
-            try:
-                await self.engine.process_observation(
-                    inbox.observation,
-                    realtime_only=True,
-                )
-                await AlertObservationInboxService.mark_processed(
-                    inbox.id,
-                    self.worker_id,
-                )
-                processed += 1
-            except Exception as exc:
-                await AlertObservationInboxService.mark_failed(
-                    inbox.id,
-                    self.worker_id,
-                    exc,
-                )
-                logger.exception(f"告警实时观测处理失败，Inbox ID: {inbox.id}: {exc}")
+    async def consume_observations(self, limit: int | None = None) -> int:
+        """批量领取实时观测并作为一个单元处理。
+
+        规则状态随整批一次落库，落库失败时整批标记失败重试，保持至少一次语义。
+        """
+        items = await AlertObservationInboxService.claim_batch(
+            self.worker_id,
+            limit or settings.ALERT_OBSERVATION_BATCH_SIZE,
+        )
+        if not items:
+            self.last_observation_scan_at = utc_now()
+            return 0
+        try:
+            results = await self.engine.process_observations(
+                [inbox.observation for inbox in items],
+                realtime_only=True,
+            )
+        except Exception as exc:
+            logger.exception(f"告警实时观测批处理失败，数量: {len(items)}: {exc}")
+            results = [exc] * len(items)
+        processed_ids: list[str] = []
+        for inbox, result in zip(items, results):
+            if not isinstance(result, Exception):
+                processed_ids.append(inbox.id)
+                continue
+            await AlertObservationInboxService.mark_failed(
+                inbox.id,
+                self.worker_id,
+                result,
+                inbox.attempts,
+            )
+            logger.error(f"告警实时观测处理失败，Inbox ID: {inbox.id}: {result}")
+        processed = await AlertObservationInboxService.mark_processed_many(
+            processed_ids,
+            self.worker_id,
+            items[0].claim_token,
+        )
         self.last_observation_scan_at = utc_now()
         return processed
 
@@ -354,19 +419,32 @@ class AlertWorkerService:
                 pass
 
     async def rule_loop(self, stop_event: asyncio.Event) -> None:
-        """持续扫描到期规则。"""
-        while not stop_event.is_set():
-            try:
-                await self.scan_due_rules()
-            except Exception as exc:
-                logger.exception(f"告警规则扫描循环异常: {exc}")
-            try:
-                await asyncio.wait_for(
-                    stop_event.wait(),
-                    timeout=settings.ALERT_WORKER_POLL_SECONDS,
-                )
-            except TimeoutError:
-                pass
+        """持续派发本 Worker 分片内的到期规则。"""
+        try:
+            await AlertRuleShardManager.backfill_rule_hashes()
+        except Exception as exc:
+            logger.warning(f"告警规则扫描哈希回填失败: {exc}")
+        try:
+            while not stop_event.is_set():
+                try:
+                    await self.scan_due_rules()
+                except Exception as exc:
+                    logger.exception(f"告警规则扫描循环异常: {exc}")
+                try:
+                    await asyncio.wait_for(
+                        stop_event.wait(),
+                        timeout=settings.ALERT_WORKER_POLL_SECONDS,
+                    )
+                except TimeoutError:
+                    pass
+        finally:
+            tasks = list(self._scan_tasks.values())
+            for task in tasks:
+                task.cancel()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            with suppress(Exception):
+                await self.shards.leave()
 
     async def outbox_loop(self, stop_event: asyncio.Event) -> None:
         """持续把 MongoDB Outbox 分发到 Redis Stream。"""
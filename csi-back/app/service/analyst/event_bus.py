@@ -11,9 +11,12 @@ from loguru import logger
 
 from app.core.config import settings
 from app.db.redis import get_redis
+from app.service.stream_hub import stream_hub
 
 logger = logger.bind(name=__name__)
 
+_READ_TIMEOUT_SECONDS = 15.0
+
 
 @dataclass
 class AnalystEventSubscription:
@@ -128,70 +131,59 @@ class AnalystEventBus:
 
     @classmethod
     async def _pump(cls, subscription: AnalystEventSubscription) -> None:
-        """持续读取 Redis Stream，并按 Mongo seq 去除回放阶段产生的重复事件。"""
-        cursor = subscription.cursor
+        """经进程内扇出中心消费 Redis Stream，并按 Mongo seq 去除回放阶段产生的重复事件。"""
+        stream = stream_hub.subscribe(subscription.key, subscription.cursor)
         recovered = False
-        while True:
-            try:
-                redis = get_redis()
-                if redis is None:
-                    await asyncio.sleep(1.0)
-                    continue
-                if not recovered and cursor != "0-0":
-                    rows = await redis.xrange(
-                        subscription.key,
-                        min="-",
-                        max=cursor,
-                    )
-                    for _, fields in rows:
-                        raw_seq = fields.get("seq")
-                        seq = int(raw_seq) if raw_seq else None
-                        if seq is None or seq <= subscription.persisted_max_seq:
-                            continue
-                        try:
-                            data = json.loads(fields.get("data") or "null")
-                        except json.JSONDecodeError:
-                            data = fields.get("data")
-                        await subscription.queue.put(
-                            {
-                                "event": fields.get("event") or "message",
-                                "data": data,
-                                "id": seq,
-                            }
+        try:
+            while True:
+                try:
+                    redis = get_redis()
+                    if redis is None:
+                        await asyncio.sleep(1.0)
+                        continue
+                    if not recovered and subscription.cursor != "0-0":
+                        rows = await redis.xrange(
+                            subscription.key,
+                            min="-",
+                            max=subscription.cursor,
                         )
-                    recovered = True
-                rows = await redis.xread(
-                    {subscription.key: cursor},
-                    count=100,
-                    block=15000,
-                )
-                for _, messages in rows or []:
-                    for message_id, fields in messages:
-                        cursor = message_id
+                        for _, fields in rows:
+                            raw_seq = fields.get("seq")
+                            seq = int(raw_seq) if raw_seq else None
+                            if seq is None or seq <= subscription.persisted_max_seq:
+                                continue
+                            await subscription.queue.put(cls._to_event(fields, seq))
+                        recovered = True
+                    messages = await stream.read(timeout=_READ_TIMEOUT_SECONDS)
+                    for _, fields in messages:
                         raw_seq = fields.get("seq")
                         seq = int(raw_seq) if raw_seq else None
                         if seq is not None and seq <= subscription.replay_max_seq:
                             continue
-                        try:
-                            data = json.loads(fields.get("data") or "null")
-                        except json.JSONDecodeError:
-                            data = fields.get("data")
-                        await subscription.queue.put(
-                            {
-                                "event": fields.get("event") or "message",
-                                "data": data,
-                                "id": seq,
-                            }
-                        )
-            except asyncio.CancelledError:
-                raise
-            except Exception:
-                logger.exception(
-                    "消费分析事件 Stream 失败，将从原游标重试: key={} cursor={}",
-                    subscription.key,
-                    cursor,
-                )
-                await asyncio.sleep(1.0)
+                        await subscription.queue.put(cls._to_event(fields, seq))
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    logger.exception(
+                        "消费分析事件 Stream 失败，将从原游标重试: key={} cursor={}",
+                        subscription.key,
+                        stream.cursor,
+                    )
+                    await asyncio.sleep(1.0)
+        finally:
+            await stream.close()
+
+    @staticmethod
+    def _to_event(fields: dict[str, str], seq: int | None) -> dict[str, Any]:
+        try:
+            data = json.loads(fields.get("data") or "null")
+        except json.JSONDecodeError:
+            data = fields.get("data")
+        return {
+            "event": fields.get("event") or "message",
+            "data": data,
+            "id": seq,
+        }
 
 
 __all__ = ["AnalystEventBus", "AnalystEventSubscription"]
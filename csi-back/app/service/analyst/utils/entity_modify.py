@@ -10,6 +10,7 @@ from loguru import logger
 
 from app.db.elasticsearch import get_es
 from app.schemas.constants import ENTITY_TYPE_INDEX_MAP
+from app.service.search import bump_search_index_generation
 
 logger = logger.bind(name=__name__)
 
@@ -131,4 +132,5 @@ async def apply_entity_modifications_to_es(
         logger.exception(f"写入实体失败: {entity_type}:{entity_uuid}")
         return f"写入实体失败: {exc}"
 
+    await bump_search_index_generation()
     return None
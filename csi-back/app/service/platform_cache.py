@@ -0,0 +1,127 @@
+"""进程内平台元数据缓存，按平台名称批量预取并定时过期。"""
+
+import asyncio
+import time
+from collections.abc import Iterable
+
+from loguru import logger
+
+from app.core.config import settings
+from app.db.redis import get_redis
+from app.models.platform.platform import PlatformModel
+
+logger = logger.bind(name=__name__)
+
+PLATFORM_CACHE_INVALIDATE_CHANNEL = "platform:cache:invalidate"
+
+
+class PlatformMetadataCache:
+    """按平台名称缓存平台文档的 TTL 映射。
+
+    未命中的名称合并为一次 `$in` 查询，不存在的名称同样缓存为空，
+    避免检索结果中的未知平台反复回源；平台新增或编辑后由发布方广播失效。
+    """
+
+    _entries: dict[str, tuple[float, PlatformModel | None]] = {}
+
+    @classmethod
+    def _lookup(cls, name: str, now: float) -> tuple[bool, PlatformModel | None]:
+        entry = cls._entries.get(name)
+        if entry is None:
+            return False, None
+        expires_at, platform = entry
+        if expires_at <= now:
+            cls._entries.pop(name, None)
+            return False, None
+        return True, platform
+
+    @classmethod
+    async def get_many(cls, names: Iterable[str | None]) -> dict[str, PlatformModel]:
+        """返回名称到平台文档的映射，未命中部分一次查询补齐。"""
+        now = time.monotonic()
+        found: dict[str, PlatformModel] = {}
+        missing: list[str] = []
+        for name in dict.fromkeys(name for name in names if name):
+            hit, platform = cls._lookup(name, now)
+            if not hit:
+                missing.append(name)
+            elif platform is not None:
+                found[name] = platform
+        if not missing:
+            return found
+        try:
+            platforms = await PlatformModel.find({"name": {"$in": missing}}).to_list()
+        except Exception as e:
+            logger.warning(f"批量查询平台失败: {e}, platform_names: {missing}")
+            return found
+        expires_at = time.monotonic() + settings.PLATFORM_CACHE_TTL_SECONDS
+        loaded = {platform.name: platform for platform in platforms}
+        for name in missing:
+            platform = loaded.get(name)
+            cls._entries[name] = (expires_at, platform)
+            if platform is not None:
+                found[name] = platform
+        return found
+
+    @classmethod
+    async def get_ids(cls, names: Iterable[str | None]) -> dict[str, str]:
+        """返回名称到平台 ID 的映射。"""
+        platforms = await cls.get_many(names)
+        return {name: platform.id for name, platform in platforms.items()}
+
+    @classmethod
+    async def get_id(cls, name: str | None) -> str | None:
+        if not name:
+            return None
+        return (await cls.get_ids([name])).get(name)
+
+    @classmethod
+    def evict(cls, names: Iterable[str]) -> None:
+        for name in names:
+            cls._entries.pop(name, None)
+
+    @classmethod
+    def clear(cls) -> None:
+        cls._entries.clear()
+
+    @classmethod
+    async def invalidate(cls, *names: str) -> None:
+        """本地失效并通知其他进程失效指定平台名称。"""
+        targets = [name for name in names if name]
+        cls.evict(targets)
+        try:
+            redis_client = get_redis()
+            if redis_client:
+                for name in targets:
+                    await redis_client.publish(PLATFORM_CACHE_INVALIDATE_CHANNEL, name)
+        except Exception as e:
+            logger.warning(f"广播平台缓存失效失败: {e}")
+
+    @classmethod
+    async def listen_invalidations(cls) -> None:
+        """订阅平台失效广播，连接中断后清空缓存并重新订阅。"""
+        while True:
+            redis_client = get_redis()
+            if redis_client is None:
+                await asyncio.sleep(1)
+                continue
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(PLATFORM_CACHE_INVALIDATE_CHANNEL)
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    cls.evict([str(message.get("data") or "")])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"平台缓存失效订阅中断: {e}")
+                # 订阅断开期间可能错过广播，保守清空全部条目。
+                cls.clear()
+                await asyncio.sleep(1)
+            finally:
+                close = getattr(pubsub, "aclose", None) or pubsub.close
+                try:
+                    await close()
+                except Exception:
+                    pass
@@ -276,104 +276,213 @@ class ReferenceBridgeService:
                     await delivery.ack()
                     return ReferenceBridgeStepResult.FORWARDED
 
-                stream_id, producer_id = rabbitmq.get_reference_control_identity(
-                    delivery.message
-                )
-                if stream_id != source.stream_id or not producer_id:
-                    await ReferenceBridgeService._propagate_abort(
-                        bridge=bridge,
-                        worker_id=worker_id,
-                        lease_token=lease_token,
-                        producer_id=f"bridge:{bridge.id}",
-                        reason="Reference控制消息缺少有效流或生产者身份",
-                    )
-                    failed = await ReferenceBridgeService._fail(
-                        bridge=bridge,
-                        worker_id=worker_id,
-                        lease_token=lease_token,
-                        error_message="Reference控制消息缺少有效流或生产者身份",
-                    )
-                    if not failed:
-                        await delivery.nack(requeue=True)
-                        return await ReferenceBridgeService._resolve_inactive_result(
-                            bridge.id
-                        )
-                    await delivery.nack(requeue=False)
-                    return ReferenceBridgeStepResult.FAILED
-
-                control_key = ReferenceBridgeService._control_key(
-                    stream_id,
-                    producer_id,
-                )
-                (
-                    updated,
-                    effective_terminal,
-                ) = await ReferenceBridgeService._record_control(
-                    bridge_id=bridge.id,
+                return await ReferenceBridgeService._handle_control(
+                    bridge=bridge,
+                    source=source,
+                    delivery=delivery,
+                    control_kind=control_kind,
                     worker_id=worker_id,
                     lease_token=lease_token,
-                    control_key=control_key,
-                    control_kind=control_kind,
                 )
-                if updated is None or effective_terminal is None:
+            except ReferenceBridgeLeaseLostError:
+                if not delivery.message.processed:
                     await delivery.nack(requeue=True)
-                    return await ReferenceBridgeService._resolve_inactive_result(
-                        bridge.id
-                    )
+                return await ReferenceBridgeService._resolve_inactive_result(bridge.id)
+            except Exception:
+                if not delivery.message.processed:
+                    await delivery.nack(requeue=True)
+                raise
+            finally:
+                await delivery.close()
+        return ReferenceBridgeStepResult.IDLE
 
-                if effective_terminal == "abort":
-                    await ReferenceBridgeService._propagate_abort(
-                        bridge=updated,
-                        worker_id=worker_id,
-                        lease_token=lease_token,
-                        producer_id=f"bridge:{bridge.id}",
-                        reason="上游Reference流已中止",
-                    )
-                    failed = await ReferenceBridgeService._fail(
-                        bridge=updated,
-                        worker_id=worker_id,
-                        lease_token=lease_token,
-                        error_message=f"源流 {stream_id} 被生产者 {producer_id} 中止",
-                        abort_key=control_key,
-                    )
-                    if not failed:
-                        await delivery.nack(requeue=True)
-                        return await ReferenceBridgeService._resolve_inactive_result(
-                            bridge.id
-                        )
-                    await delivery.ack()
-                    return ReferenceBridgeStepResult.FAILED
+    @staticmethod
+    async def process_batch(
+        *,
+        bridge_id: str,
+        worker_id: str,
+        lease_token: str,
+        max_messages: int,
+        wait_seconds: float = 0.0,
+    ) -> ReferenceBridgeStepResult:
+        """在有效租约下批量转存一个源流的至多 max_messages 条消息。
+
+        整批 DATA 统一等待目标 publisher confirm 并一次累加计数后，
+        才以 multiple 确认源消息；批尾的控制消息按单条语义处理。
+        """
+        bridge = await ReferenceBridgeService._get_owned_bridge(
+            bridge_id=bridge_id,
+            worker_id=worker_id,
+            lease_token=lease_token,
+        )
+        if bridge is None:
+            return await ReferenceBridgeService._resolve_inactive_result(bridge_id)
+
+        if ReferenceBridgeService._all_sources_ended(bridge):
+            return await ReferenceBridgeService._complete(
+                bridge=bridge,
+                worker_id=worker_id,
+                lease_token=lease_token,
+            )
 
-                if ReferenceBridgeService._all_sources_ended(updated):
-                    result = await ReferenceBridgeService._complete(
-                        bridge=updated,
+        ended_stream_ids = ReferenceBridgeService._ended_stream_ids(bridge)
+        for source in bridge.sources:
+            if source.stream_id in ended_stream_ids:
+                continue
+            batch = await rabbitmq.get_reference_batch(
+                source.queue_name,
+                max_messages,
+                wait_seconds=wait_seconds,
+            )
+            if batch is None:
+                continue
+            try:
+                data = batch.messages
+                control_kind = rabbitmq.get_reference_control_kind(data[-1])
+                if control_kind is not None:
+                    data = data[:-1]
+                if data:
+                    for destination in bridge.destinations:
+                        await ReferenceBridgeService._require_owned_bridge(
+                            bridge_id=bridge.id,
+                            worker_id=worker_id,
+                            lease_token=lease_token,
+                        )
+                        await rabbitmq.publish_reference_batch(
+                            batch.channel,
+                            data,
+                            [destination.queue_name],
+                        )
+                    await ReferenceBridgeService._record_forwarded(
+                        bridge_id=bridge.id,
                         worker_id=worker_id,
                         lease_token=lease_token,
+                        byte_count=sum(len(message.body) for message in data),
+                        message_count=len(data),
                     )
-                    if result == ReferenceBridgeStepResult.COMPLETED:
-                        await delivery.ack()
-                    else:
-                        await delivery.nack(requeue=True)
-                    return result
-                await ReferenceBridgeService._require_owned_bridge(
-                    bridge_id=bridge.id,
+                    await batch.ack_through(len(data))
+                if control_kind is None:
+                    return ReferenceBridgeStepResult.FORWARDED
+                return await ReferenceBridgeService._handle_control(
+                    bridge=bridge,
+                    source=source,
+                    delivery=rabbitmq.ReferenceMessageDelivery(
+                        channel=batch.channel,
+                        message=batch.messages[-1],
+                        owns_channel=False,
+                    ),
+                    control_kind=control_kind,
                     worker_id=worker_id,
                     lease_token=lease_token,
                 )
-                await delivery.ack()
-                return ReferenceBridgeStepResult.CONTROL
             except ReferenceBridgeLeaseLostError:
-                if not delivery.message.processed:
-                    await delivery.nack(requeue=True)
+                await batch.nack_pending(requeue=True)
                 return await ReferenceBridgeService._resolve_inactive_result(bridge.id)
             except Exception:
-                if not delivery.message.processed:
-                    await delivery.nack(requeue=True)
+                await batch.nack_pending(requeue=True)
                 raise
             finally:
-                await delivery.close()
+                await batch.close()
         return ReferenceBridgeStepResult.IDLE
 
+    @staticmethod
+    async def _handle_control(
+        *,
+        bridge: ReferenceBridgeModel,
+        source: ReferenceStreamDescriptor,
+        delivery: rabbitmq.ReferenceMessageDelivery,
+        control_kind: Literal["eos", "abort"],
+        worker_id: str,
+        lease_token: str,
+    ) -> ReferenceBridgeStepResult:
+        """持久化源流 EOS/ABORT 并据此确认或重新入队控制消息。"""
+        stream_id, producer_id = rabbitmq.get_reference_control_identity(
+            delivery.message
+        )
+        if stream_id != source.stream_id or not producer_id:
+            await ReferenceBridgeService._propagate_abort(
+                bridge=bridge,
+                worker_id=worker_id,
+                lease_token=lease_token,
+                producer_id=f"bridge:{bridge.id}",
+                reason="Reference控制消息缺少有效流或生产者身份",
+            )
+            failed = await ReferenceBridgeService._fail(
+                bridge=bridge,
+                worker_id=worker_id,
+                lease_token=lease_token,
+                error_message="Reference控制消息缺少有效流或生产者身份",
+            )
+            if not failed:
+                await delivery.nack(requeue=True)
+                return await ReferenceBridgeService._resolve_inactive_result(
+                    bridge.id
+                )
+            await delivery.nack(requeue=False)
+            return ReferenceBridgeStepResult.FAILED
+
+        control_key = ReferenceBridgeService._control_key(
+            stream_id,
+            producer_id,
+        )
+        (
+            updated,
+            effective_terminal,
+        ) = await ReferenceBridgeService._record_control(
+            bridge_id=bridge.id,
+            worker_id=worker_id,
+            lease_token=lease_token,
+            control_key=control_key,
+            control_kind=control_kind,
+        )
+        if updated is None or effective_terminal is None:
+            await delivery.nack(requeue=True)
+            return await ReferenceBridgeService._resolve_inactive_result(
+                bridge.id
+            )
+
+        if effective_terminal == "abort":
+            await ReferenceBridgeService._propagate_abort(
+                bridge=updated,
+                worker_id=worker_id,
+                lease_token=lease_token,
+                producer_id=f"bridge:{bridge.id}",
+                reason="上游Reference流已中止",
+            )
+            failed = await ReferenceBridgeService._fail(
+                bridge=updated,
+                worker_id=worker_id,
+                lease_token=lease_token,
+                error_message=f"源流 {stream_id} 被生产者 {producer_id} 中止",
+                abort_key=control_key,
+            )
+            if not failed:
+                await delivery.nack(requeue=True)
+                return await ReferenceBridgeService._resolve_inactive_result(
+                    bridge.id
+                )
+            await delivery.ack()
+            return ReferenceBridgeStepResult.FAILED
+
+        if ReferenceBridgeService._all_sources_ended(updated):
+            result = await ReferenceBridgeService._complete(
+                bridge=updated,
+                worker_id=worker_id,
+                lease_token=lease_token,
+            )
+            if result == ReferenceBridgeStepResult.COMPLETED:
+                await delivery.ack()
+            else:
+                await delivery.nack(requeue=True)
+            return result
+        await ReferenceBridgeService._require_owned_bridge(
+            bridge_id=bridge.id,
+            worker_id=worker_id,
+            lease_token=lease_token,
+        )
+        await delivery.ack()
+        return ReferenceBridgeStepResult.CONTROL
+
     @staticmethod
     async def run_claimed(
         *,
@@ -382,23 +491,42 @@ class ReferenceBridgeService:
         lease_token: str,
         lease_seconds: int = 30,
         poll_interval: float = 0.1,
+        batch_size: int = 1,
     ) -> ReferenceBridgeStepResult:
-        """循环推进一个已领取桥接直至终态或失去租约。"""
+        """循环推进一个已领取桥接直至终态或失去租约。
+
+        租约按时间而非逐条消息续期，间隔为租约时长的三分之一；
+        batch_size 大于 1 时按批转存，空闲等待由批量读取的首条超时承担。
+        """
+        renew_interval = lease_seconds / 3
+        loop = asyncio.get_running_loop()
+        renewed_at: float | None = None
         try:
             while True:
-                renewed = await ReferenceBridgeService.renew_lease(
-                    bridge_id=bridge_id,
-                    worker_id=worker_id,
-                    lease_token=lease_token,
-                    lease_seconds=lease_seconds,
-                )
-                if not renewed:
-                    return ReferenceBridgeStepResult.LEASE_LOST
-                result = await ReferenceBridgeService.process_once(
-                    bridge_id=bridge_id,
-                    worker_id=worker_id,
-                    lease_token=lease_token,
-                )
+                if renewed_at is None or loop.time() - renewed_at >= renew_interval:
+                    renewed = await ReferenceBridgeService.renew_lease(
+                        bridge_id=bridge_id,
+                        worker_id=worker_id,
+                        lease_token=lease_token,
+                        lease_seconds=lease_seconds,
+                    )
+                    if not renewed:
+                        return ReferenceBridgeStepResult.LEASE_LOST
+                    renewed_at = loop.time()
+                if batch_size > 1:
+                    result = await ReferenceBridgeService.process_batch(
+                        bridge_id=bridge_id,
+                        worker_id=worker_id,
+                        lease_token=lease_token,
+                        max_messages=batch_size,
+                        wait_seconds=poll_interval,
+                    )
+                else:
+                    result = await ReferenceBridgeService.process_once(
+                        bridge_id=bridge_id,
+                        worker_id=worker_id,
+                        lease_token=lease_token,
+                    )
                 if result in {
                     ReferenceBridgeStepResult.COMPLETED,
                     ReferenceBridgeStepResult.FAILED,
@@ -406,7 +534,7 @@ class ReferenceBridgeService:
                     ReferenceBridgeStepResult.LEASE_LOST,
                 }:
                     return result
-                if result == ReferenceBridgeStepResult.IDLE:
+                if result == ReferenceBridgeStepResult.IDLE and batch_size <= 1:
                     await asyncio.sleep(poll_interval)
         except BaseException as exc:
             now = datetime.now()
@@ -520,6 +648,7 @@ class ReferenceBridgeService:
         worker_id: str,
         lease_token: str,
         byte_count: int,
+        message_count: int = 1,
     ) -> None:
         """记录已确认转存的数据量。"""
         result = await ReferenceBridgeModel.get_motor_collection().update_one(
@@ -532,7 +661,7 @@ class ReferenceBridgeService:
             },
             {
                 "$inc": {
-                    "copied_message_count": 1,
+                    "copied_message_count": message_count,
                     "copied_byte_count": byte_count,
                 },
                 "$set": {"updated_at": datetime.now(), "last_error": None},
@@ -1,4 +1,6 @@
 import asyncio
+import hashlib
+import json
 from typing import Union
 
 from loguru import logger
@@ -12,13 +14,17 @@ from app.schemas.search import (
 from app.schemas.constants import ALL_INDEX, SearchModeEnum
 from app.schemas.general import PageResponseSchema
 from app.core.config import settings
-from app.models.platform.platform import PlatformModel
+from app.db.redis import get_redis
 from app.utils.date_time import parse_datetime
-from app.utils.search import merge_highlight_tags, has_keywords, rrf_merge
+from app.utils.search import merge_highlight_tags, has_keywords, rrf_merge_scored, source_projection
 from app.utils.embedding import embed_query_async
+from app.service.platform_cache import PlatformMetadataCache
 
 logger = logger.bind(name=__name__)
 
+HYBRID_CACHE_KEY_PREFIX = "search:hybrid:"
+SEARCH_INDEX_GENERATION_KEY = "search:index-generation"
+
 
 def _get_es_total(result: dict) -> int:
     total = result["hits"]["total"]
@@ -52,18 +58,16 @@ def build_filter_must(params: SearchFilterParams) -> list:
     return must
 
 
-async def hit_to_search_result(hit: dict) -> SearchResultSchema:
+async def hit_to_search_result(
+    hit: dict,
+    platform_ids: dict[str, str] | None = None,
+) -> SearchResultSchema:
     source_data = hit.get("_source", {})
     highlight_data = hit.get("highlight", {})
     platform_name = source_data.get("platform")
-    platform_id = None
-    if platform_name:
-        try:
-            platform = await PlatformModel.find_one({"name": platform_name})
-            if platform:
-                platform_id = platform.id
-        except Exception as e:
-            logger.warning(f"查询平台ID失败: {e}, platform_name: {platform_name}")
+    if platform_ids is None:
+        platform_ids = await PlatformMetadataCache.get_ids([platform_name])
+    platform_id = platform_ids.get(platform_name) if platform_name else None
     title = highlight_data.get("title", [source_data.get("title", "")])[0]
     title = (merge_highlight_tags(title) or "") if title is not None else ""
     clean_content = source_data.get("clean_content")
@@ -97,7 +101,10 @@ async def hit_to_search_result(hit: dict) -> SearchResultSchema:
 
 
 async def hits_to_search_results(hits: list) -> list[SearchResultSchema]:
-    return await asyncio.gather(*[hit_to_search_result(h) for h in hits])
+    platform_ids = await PlatformMetadataCache.get_ids(
+        h.get("_source", {}).get("platform") for h in hits
+    )
+    return await asyncio.gather(*[hit_to_search_result(h, platform_ids) for h in hits])
 
 
 def _normalize_keywords(keywords: list[str]) -> list[str]:
@@ -208,7 +215,7 @@ def keyword_list_query_body(
             },
         }
     _apply_sort_to_body(body, params)
-    return body
+    return source_projection("list").apply(body)
 
 
 async def search_filter_only_tool(
@@ -228,6 +235,7 @@ async def search_filter_only_tool(
         "size": params.page_size,
     }
     _apply_sort_to_body(query_body, params)
+    source_projection("list").apply(query_body)
     result = await es.search(index=ALL_INDEX, body=query_body)
     total = _get_es_total(result)
     hits = result["hits"]["hits"]
@@ -281,7 +289,8 @@ async def search_filter_only(es, params: EntitySearchRequestSchema) -> PageRespo
         query_body["sort"] = [{"publish_at": {"order": "desc", "missing": "_last"}}]
     elif params.sort_by == "crawled_at":
         query_body["sort"] = [{"crawled_at": {"order": "desc", "missing": "_last"}}]
-        
+    source_projection("list").apply(query_body)
+
     result = await es.search(index=ALL_INDEX, body=query_body)
     total = _get_es_total(result)
     hits = result["hits"]["hits"]
@@ -329,7 +338,7 @@ def keyword_query_body(params: EntitySearchRequestSchema, from_: int, size: int)
             "fields": {"title": {}, "clean_content": {"fragment_size": 200, "number_of_fragments": 3}}
         }
     _apply_sort_to_body(body, params)
-    return body
+    return source_projection("list").apply(body)
 
 
 async def search_vector(es, params: EntitySearchRequestSchema, query_vector: list[float]) -> PageResponseSchema[SearchResultSchema]:
@@ -349,11 +358,11 @@ async def search_vector(es, params: EntitySearchRequestSchema, query_vector: lis
     }
     if filter_must:
         knn["filter"] = {"bool": {"must": filter_must}}
-    query_body = {
+    query_body = source_projection("list").apply({
         "query": {"knn": knn},
         "from": from_,
         "size": size
-    }
+    })
     result = await es.search(index=ALL_INDEX, body=query_body)
     total = _get_es_total(result)
     hits = result["hits"]["hits"]
@@ -373,44 +382,171 @@ async def search_entity(es, params: EntitySearchRequestSchema, instruct: str = "
         return await search_vector(es, params, query_vector)
 
     if params.search_mode == SearchModeEnum.HYBRID:
-        query_vector = await embed_query_async(params.keywords, instruct)
-        hybrid_size = min(settings.HYBRID_TOTAL_CAP, max((params.page * params.page_size) + 200, 500))
-        keyword_body = keyword_query_body(params, 0, hybrid_size)
-        filter_must = build_filter_must(params)
-        vec_k = hybrid_size
-        vec_num_candidates = min(
-            settings.VECTOR_NUM_CANDIDATES_MAX,
-            max(vec_k * settings.VECTOR_NUM_CANDIDATES_MULTIPLIER, settings.VECTOR_NUM_CANDIDATES_MIN)
-        )
-        knn = {
-            "field": "clean_content_vector",
-            "query_vector": query_vector,
-            "k": vec_k,
-            "num_candidates": vec_num_candidates
-        }
-        if filter_must:
-            knn["filter"] = {"bool": {"must": filter_must}}
-        vector_body = {"query": {"knn": knn}, "from": 0, "size": hybrid_size}
+        return await search_hybrid(es, params, instruct)
+
+    return await search_keyword(es, params)
+
+
+async def bump_search_index_generation() -> None:
+    """实体文档被后端改写后推进索引代数，使已缓存的融合结果失效。"""
+    try:
+        redis_client = get_redis()
+        if redis_client:
+            await redis_client.incr(SEARCH_INDEX_GENERATION_KEY)
+    except Exception as e:
+        logger.warning(f"推进检索索引代数失败: {e}")
+
+
+def hybrid_cache_fingerprint(params: EntitySearchRequestSchema, instruct: str = "") -> str:
+    """规范化查询词、过滤条件和排序后计算融合结果集指纹，与分页参数无关。"""
+    payload = {
+        "keywords": " ".join((params.keywords or "").split()),
+        "instruct": instruct or "",
+        "platform": params.platform,
+        "entity_type": sorted(params.entity_type or []),
+        "author": params.author,
+        "aigc": params.aigc,
+        "nsfw": params.nsfw,
+        "is_highlighted": params.is_highlighted,
+        "start_at": params.start_at.isoformat() if params.start_at else None,
+        "end_at": params.end_at.isoformat() if params.end_at else None,
+        "sort_by": params.sort_by,
+        "sort_order": params.sort_order,
+        "rrf_k": settings.RRF_K,
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+async def _hybrid_cache_key(params: EntitySearchRequestSchema, instruct: str) -> str | None:
+    redis_client = get_redis()
+    if not redis_client:
+        return None
+    try:
+        generation = await redis_client.get(SEARCH_INDEX_GENERATION_KEY)
+    except Exception as e:
+        logger.warning(f"读取检索索引代数失败: {e}")
+        return None
+    if isinstance(generation, bytes):
+        generation = generation.decode()
+    return f"{HYBRID_CACHE_KEY_PREFIX}{generation or 0}:{hybrid_cache_fingerprint(params, instruct)}"
 
-        kw_result, vec_result = await asyncio.gather(
-            es.search(index=ALL_INDEX, body=keyword_body),
-            es.search(index=ALL_INDEX, body=vector_body)
-        )
 
-        kw_total = _get_es_total(kw_result)
-        vec_total = _get_es_total(vec_result)
-        keyword_hits = kw_result["hits"]["hits"]
-        vector_hits = vec_result["hits"]["hits"]
-        merged = rrf_merge(keyword_hits, vector_hits, settings.RRF_K)
-        from_ = (params.page - 1) * params.page_size
-        page_hits = merged[from_: from_ + params.page_size]
-        total_estimate = min(settings.HYBRID_TOTAL_CAP, kw_total + vec_total)
-        items = await hits_to_search_results(page_hits)
-        return PageResponseSchema.create(
-            items=items,
-            total=total_estimate,
-            page=params.page,
-            page_size=params.page_size
+async def _load_fused_result(key: str | None) -> dict | None:
+    if key is None:
+        return None
+    try:
+        raw = await get_redis().get(key)
+        return json.loads(raw) if raw else None
+    except Exception as e:
+        logger.warning(f"读取混合检索缓存失败: {e}")
+        return None
+
+
+async def _save_fused_result(key: str | None, entry: dict) -> None:
+    if key is None:
+        return
+    try:
+        await get_redis().setex(
+            key,
+            settings.HYBRID_RESULT_CACHE_TTL_SECONDS,
+            json.dumps(entry, separators=(",", ":")),
         )
+    except Exception as e:
+        logger.warning(f"写入混合检索缓存失败: {e}")
 
-    return await search_keyword(es, params)
+
+async def _fuse_hybrid(
+    es, params: EntitySearchRequestSchema, instruct: str, hybrid_size: int
+) -> tuple[list[tuple[dict, float]], dict]:
+    """执行关键词与向量两路召回并做 RRF 融合，返回融合命中和可缓存的结果集。"""
+    query_vector = await embed_query_async(params.keywords, instruct)
+    keyword_body = keyword_query_body(params, 0, hybrid_size)
+    filter_must = build_filter_must(params)
+    vec_k = hybrid_size
+    vec_num_candidates = min(
+        settings.VECTOR_NUM_CANDIDATES_MAX,
+        max(vec_k * settings.VECTOR_NUM_CANDIDATES_MULTIPLIER, settings.VECTOR_NUM_CANDIDATES_MIN)
+    )
+    knn = {
+        "field": "clean_content_vector",
+        "query_vector": query_vector,
+        "k": vec_k,
+        "num_candidates": vec_num_candidates
+    }
+    if filter_must:
+        knn["filter"] = {"bool": {"must": filter_must}}
+    vector_body = source_projection("list").apply(
+        {"query": {"knn": knn}, "from": 0, "size": hybrid_size}
+    )
+
+    kw_result, vec_result = await asyncio.gather(
+        es.search(index=ALL_INDEX, body=keyword_body),
+        es.search(index=ALL_INDEX, body=vector_body)
+    )
+    keyword_hits = kw_result["hits"]["hits"]
+    vector_hits = vec_result["hits"]["hits"]
+    merged = rrf_merge_scored(keyword_hits, vector_hits, settings.RRF_K)
+    entry = {
+        "size": hybrid_size,
+        # 两路召回都未被截断时，融合列表已包含全部候选，更深的分页无需重新召回。
+        "complete": hybrid_size >= settings.HYBRID_TOTAL_CAP
+        or (len(keyword_hits) < hybrid_size and len(vector_hits) < hybrid_size),
+        "total": min(
+            settings.HYBRID_TOTAL_CAP,
+            _get_es_total(kw_result) + _get_es_total(vec_result),
+        ),
+        "refs": [[hit.get("_index", ""), hit.get("_id", ""), score] for hit, score in merged],
+    }
+    return merged, entry
+
+
+async def _fetch_hybrid_slice(
+    es, params: EntitySearchRequestSchema, refs: list[list]
+) -> list[dict]:
+    """按缓存的文档 ID 取回当前页命中，保留关键词高亮并按融合顺序排列。"""
+    if not refs:
+        return []
+    keyword_body = keyword_query_body(params, 0, len(refs))
+    body = {
+        "query": {
+            "bool": {
+                "filter": [{"ids": {"values": [ref[1] for ref in refs]}}],
+                "should": [keyword_body["query"]],
+            }
+        },
+        "size": len(refs),
+    }
+    if "highlight" in keyword_body:
+        body["highlight"] = keyword_body["highlight"]
+    source_projection("list").apply(body)
+    result = await es.search(index=ALL_INDEX, body=body)
+    by_ref = {(hit.get("_index", ""), hit.get("_id", "")): hit for hit in result["hits"]["hits"]}
+    return [by_ref[key] for key in ((ref[0], ref[1]) for ref in refs) if key in by_ref]
+
+
+async def search_hybrid(
+    es, params: EntitySearchRequestSchema, instruct: str = ""
+) -> PageResponseSchema[SearchResultSchema]:
+    """混合检索；融合后的有序 ID 列表按查询指纹缓存，翻页时只取当前页文档。"""
+    from_ = (params.page - 1) * params.page_size
+    end = from_ + params.page_size
+    cache_key = await _hybrid_cache_key(params, instruct)
+    entry = await _load_fused_result(cache_key)
+    if entry is not None and (entry["complete"] or end <= len(entry["refs"])):
+        page_hits = await _fetch_hybrid_slice(es, params, entry["refs"][from_:end])
+    else:
+        hybrid_size = min(settings.HYBRID_TOTAL_CAP, max(end + 200, 500))
+        if entry is not None:
+            # 缓存的候选深度不足以覆盖当前页，成倍扩大召回深度后重建。
+            hybrid_size = min(settings.HYBRID_TOTAL_CAP, max(hybrid_size, entry["size"] * 2))
+        merged, entry = await _fuse_hybrid(es, params, instruct, hybrid_size)
+        await _save_fused_result(cache_key, entry)
+        page_hits = [hit for hit, _ in merged[from_:end]]
+    items = await hits_to_search_results(page_hits)
+    return PageResponseSchema.create(
+        items=items,
+        total=entry["total"],
+        page=params.page,
+        page_size=params.page_size
+    )
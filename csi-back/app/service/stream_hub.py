@@ -0,0 +1,226 @@
+"""进程内 Redis Stream 扇出中心，同一 Stream 只保留一个阻塞读取者。"""
+
+from __future__ import annotations
+
+import asyncio
+from contextlib import suppress
+
+from loguru import logger
+
+from app.core.config import settings
+from app.db.redis import get_redis
+
+logger = logger.bind(name=__name__)
+
+StreamMessage = tuple[str, dict[str, str]]
+
+_READER_BLOCK_MS = 15000
+_READER_COUNT = 500
+
+
+def stream_id_tuple(stream_id: str) -> tuple[int, int]:
+    """解析 Redis Stream ID，非法值按最早位置处理。"""
+    try:
+        milliseconds, sequence = stream_id.split("-", 1)
+        return int(milliseconds), int(sequence)
+    except (AttributeError, TypeError, ValueError):
+        return 0, 0
+
+
+class StreamSubscription:
+    """单个 SSE 连接在扇出中心上的有界订阅。
+
+    新订阅和缓冲溢出的订阅处于追赶状态，先从自身游标非阻塞 XREAD
+    拉取到流尾，再切换为消费共享读取者推送的队列；两段重叠部分按
+    Stream ID 去重，因此切换过程中不会丢失或重复事件。
+    """
+
+    def __init__(
+        self,
+        hub: RedisStreamHub,
+        key: str,
+        cursor: str,
+        maxsize: int,
+    ) -> None:
+        self.hub = hub
+        self.key = key
+        self.cursor = cursor or "0-0"
+        self.queue: asyncio.Queue[StreamMessage | None] = asyncio.Queue(
+            maxsize=max(1, maxsize)
+        )
+        self.lagging = True
+        self.overflows = 0
+        self.closed = False
+
+    def offer(self, message: StreamMessage) -> None:
+        """由读取者调用；缓冲已满时丢弃缓冲并转为按游标追赶。"""
+        try:
+            self.queue.put_nowait(message)
+            return
+        except asyncio.QueueFull:
+            pass
+        self.overflows += 1
+        self.lagging = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        # 唤醒正在等待队列的消费者，让其立即进入追赶读取。
+        self.queue.put_nowait(None)
+
+    async def read(self, *, timeout: float, count: int = 100) -> list[StreamMessage]:
+        """读取游标之后的下一批事件，超时返回空列表。"""
+        if self.lagging:
+            redis = get_redis()
+            if redis is None:
+                await asyncio.sleep(min(timeout, 1.0))
+                return []
+            overflows = self.overflows
+            rows = await redis.xread({self.key: self.cursor}, count=count)
+            messages = [
+                message for _, stream_messages in rows or [] for message in stream_messages
+            ]
+            if messages:
+                self.cursor = messages[-1][0]
+                return messages
+            # 只有追到流末尾且期间未再溢出时才切回实时缓冲；XREAD 失败时保持追赶状态。
+            if self.overflows == overflows:
+                self.lagging = False
+        try:
+            item = await asyncio.wait_for(self.queue.get(), timeout=timeout)
+        except TimeoutError:
+            return []
+        items = [item]
+        while len(items) < count and not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        messages: list[StreamMessage] = []
+        current = stream_id_tuple(self.cursor)
+        for entry in items:
+            if entry is None:
+                continue
+            position = stream_id_tuple(entry[0])
+            if position <= current:
+                continue
+            messages.append(entry)
+            current = position
+            self.cursor = entry[0]
+        return messages
+
+    async def close(self) -> None:
+        """退订，最后一个订阅者离开时停止对应读取者。"""
+        if self.closed:
+            return
+        self.closed = True
+        await self.hub.unsubscribe(self)
+
+
+class _StreamReader:
+    """一个 Stream key 的共享阻塞读取任务。"""
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self.subscribers: set[StreamSubscription] = set()
+        self.task: asyncio.Task | None = None
+
+    def _start_id(self) -> str | None:
+        """返回订阅者中最靠前的游标，读取者从这里开始以免漏掉切换间隙的事件。"""
+        return min(
+            (subscription.cursor for subscription in self.subscribers),
+            key=stream_id_tuple,
+            default=None,
+        )
+
+    async def run(self) -> None:
+        # 从最小订阅游标开始而不是流尾：订阅者追赶到流尾后、读取者首次
+        # 读取前追加的事件仍会被推送，重叠部分由订阅者按 Stream ID 去重。
+        last_id = self._start_id()
+        while True:
+            try:
+                redis = get_redis()
+                if redis is None:
+                    await asyncio.sleep(1.0)
+                    continue
+                if last_id is None:
+                    latest = await redis.xrevrange(self.key, count=1)
+                    last_id = latest[0][0] if latest else "0-0"
+                rows = await redis.xread(
+                    {self.key: last_id},
+                    count=_READER_COUNT,
+                    block=_READER_BLOCK_MS,
+                )
+                for _, messages in rows or []:
+                    for message in messages:
+                        last_id = message[0]
+                        for subscription in tuple(self.subscribers):
+                            subscription.offer(message)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(
+                    "Stream 扇出读取失败，将从原游标重试: key={} cursor={}",
+                    self.key,
+                    last_id,
+                )
+                await asyncio.sleep(1.0)
+
+
+class RedisStreamHub:
+    """按 Stream key 复用阻塞 XREAD，并把事件扇出到各订阅者的有界缓冲。"""
+
+    def __init__(self) -> None:
+        self._readers: dict[str, _StreamReader] = {}
+
+    def subscribe(
+        self,
+        key: str,
+        cursor: str,
+        *,
+        maxsize: int | None = None,
+    ) -> StreamSubscription:
+        """从指定游标之后订阅 Stream。"""
+        subscription = StreamSubscription(
+            self,
+            key,
+            cursor,
+            maxsize or settings.SSE_HUB_SUBSCRIBER_BUFFER,
+        )
+        reader = self._readers.get(key)
+        if reader is None:
+            reader = _StreamReader(key)
+            self._readers[key] = reader
+        reader.subscribers.add(subscription)
+        if reader.task is None or reader.task.done():
+            reader.task = asyncio.create_task(
+                reader.run(),
+                name=f"stream-hub:{key}",
+            )
+        return subscription
+
+    async def unsubscribe(self, subscription: StreamSubscription) -> None:
+        reader = self._readers.get(subscription.key)
+        if reader is None:
+            return
+        reader.subscribers.discard(subscription)
+        if reader.subscribers:
+            return
+        self._readers.pop(subscription.key, None)
+        if reader.task is not None:
+            reader.task.cancel()
+            with suppress(asyncio.CancelledError):
+                await reader.task
+
+    def reader_count(self) -> int:
+        return len(self._readers)
+
+    async def close(self) -> None:
+        """停止全部读取者，供进程关闭时调用。"""
+        readers = list(self._readers.values())
+        self._readers.clear()
+        for reader in readers:
+            if reader.task is not None:
+                reader.task.cancel()
+        for reader in readers:
+            if reader.task is not None:
+                with suppress(asyncio.CancelledError):
+                    await reader.task
+
+
+stream_hub = RedisStreamHub()
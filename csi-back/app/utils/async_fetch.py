@@ -1,10 +1,24 @@
 from loguru import logger
+import asyncio
+import os
 import aiohttp
-from typing import Optional, Dict
+from typing import AsyncIterator, Optional, Dict
 from app.core.config import settings
+from app.utils.cos import upload_stream
 
 logger = logger.bind(name=__name__)
 
+DEFAULT_DOWNLOAD_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+}
+
+_sessions: Dict[str, tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+_closing_tasks: set[asyncio.Task] = set()
+
+
+class DownloadTooLargeError(ValueError):
+    """下载内容超过允许的最大字节数。"""
+
 
 def unwrap_response(resp):
     """外部服务统一包裹 { code, message, data }，返回 data；无 data 时返回原 resp 兼容。"""
@@ -13,60 +27,200 @@ def unwrap_response(resp):
     return resp["data"]
 
 
+def get_http_session(name: str = "default") -> aiohttp.ClientSession:
+    """
+    获取进程内共享的 HTTP 会话，按名称复用连接池、DNS 缓存和长连接
+
+    会话与创建时的事件循环绑定，循环变化或会话已关闭时重新创建并关闭旧会话。
+    会话不保存 Cookie，避免一次调用中外部服务设置的 Cookie 被带到无关的后续请求。
+    """
+    loop = asyncio.get_running_loop()
+    entry = _sessions.get(name)
+    if entry is not None:
+        session_loop, session = entry
+        if session_loop is loop and not session.closed:
+            return session
+        _close_stale_session(session_loop, session)
+    connector = aiohttp.TCPConnector(
+        limit=settings.HTTP_POOL_LIMIT,
+        limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+        ttl_dns_cache=settings.HTTP_DNS_CACHE_SECONDS,
+        keepalive_timeout=settings.HTTP_KEEPALIVE_SECONDS,
+    )
+    session = aiohttp.ClientSession(
+        connector=connector,
+        cookie_jar=aiohttp.DummyCookieJar(),
+    )
+    _sessions[name] = (loop, session)
+    return session
+
+
+def _close_stale_session(
+    session_loop: asyncio.AbstractEventLoop,
+    session: aiohttp.ClientSession,
+):
+    """关闭被替换的旧会话：旧循环仍在其他线程运行时交回该循环关闭，否则在当前循环关闭"""
+    if session.closed:
+        return
+    if session_loop.is_running() and not session_loop.is_closed():
+        asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+        return
+    task = asyncio.get_running_loop().create_task(session.close())
+    _closing_tasks.add(task)
+    task.add_done_callback(_closing_tasks.discard)
+
+
+async def close_http_sessions():
+    """关闭全部共享 HTTP 会话"""
+    sessions = [session for _, session in _sessions.values()]
+    _sessions.clear()
+    for session in sessions:
+        if not session.closed:
+            await session.close()
+    if _closing_tasks:
+        await asyncio.gather(*_closing_tasks, return_exceptions=True)
+
+
 async def async_get(url: str, params: dict = None, **kwargs):
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url, params=params, **kwargs) as response:
-            return await response.json()
-        
+    session = get_http_session()
+    async with session.get(url, params=params, **kwargs) as response:
+        return await response.json()
+
 async def async_post(url: str, data: dict = None, **kwargs):
-    async with aiohttp.ClientSession() as session:
-        async with session.post(url, json=data, **kwargs) as response:
-            return await response.json()
+    session = get_http_session()
+    async with session.post(url, json=data, **kwargs) as response:
+        return await response.json()
+
+
+async def stream_download(
+    url: str,
+    timeout: int = 30,
+    headers: Dict[str, str] | None = None,
+    use_proxy: bool | None = None,
+    max_size: int | None = None,
+    chunk_size: int = 64 * 1024
+) -> AsyncIterator[bytes]:
+    """
+    分块流式下载，累计大小超过上限时立即中止
+
+    Args:
+        url: 文件URL
+        timeout: 超时时间（秒）
+        headers: 自定义请求头
+        use_proxy: 是否使用代理，None时使用配置
+        max_size: 最大字节数，None时使用 HTTP_DOWNLOAD_MAX_BYTES
+        chunk_size: 单次读取的块大小
+
+    Yields:
+        字节块
+    """
+    should_use_proxy = use_proxy if use_proxy is not None else settings.USE_PROXY
+    proxy = settings.OUT_SERVICE_PROXY if should_use_proxy else None
+    limit = max_size or settings.HTTP_DOWNLOAD_MAX_BYTES
+
+    request_headers = dict(DEFAULT_DOWNLOAD_HEADERS)
+    if headers:
+        request_headers.update(headers)
+
+    session = get_http_session()
+    async with session.get(
+        url,
+        headers=request_headers,
+        proxy=proxy,
+        timeout=aiohttp.ClientTimeout(total=timeout)
+    ) as response:
+        response.raise_for_status()
+        if response.content_length is not None and response.content_length > limit:
+            raise DownloadTooLargeError(
+                f"文件大小 {response.content_length} 字节超过上限 {limit} 字节: {url}"
+            )
+        received = 0
+        async for chunk in response.content.iter_chunked(chunk_size):
+            received += len(chunk)
+            if received > limit:
+                raise DownloadTooLargeError(f"文件大小超过上限 {limit} 字节: {url}")
+            yield chunk
 
 
 async def async_download_file(
     url: str,
     timeout: int = 30,
     headers: Dict[str, str] | None = None,
-    use_proxy: bool | None = None
+    use_proxy: bool | None = None,
+    max_size: int | None = None
 ) -> bytes:
     """
     异步下载文件并返回字节数据
-    
+
     Args:
         url: 文件URL
         timeout: 超时时间（秒）
         headers: 自定义请求头
         use_proxy: 是否使用代理，None时使用配置
-    
+        max_size: 最大字节数，None时使用 HTTP_DOWNLOAD_MAX_BYTES
+
     Returns:
         文件字节数据
     """
-    should_use_proxy = use_proxy if use_proxy is not None else settings.USE_PROXY
-    proxy = settings.OUT_SERVICE_PROXY if should_use_proxy else None
-    
-    
-    
-    default_headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-        
-    }
-    if headers:
-        default_headers.update(headers)
-    
-    timeout_obj = aiohttp.ClientTimeout(total=timeout)
-    
     try:
-        async with aiohttp.ClientSession(timeout=timeout_obj) as session:
-            async with session.get(url, headers=default_headers, proxy=proxy) as response:
-                response.raise_for_status()
-                content = await response.read()
-                logger.info(f"文件下载成功: {url}, 大小: {len(content)} 字节")
-                return content
+        content = bytearray()
+        async for chunk in stream_download(url, timeout, headers, use_proxy, max_size):
+            content.extend(chunk)
+        logger.info(f"文件下载成功: {url}, 大小: {len(content)} 字节")
+        return bytes(content)
     except aiohttp.ClientError as e:
         logger.error(f"下载文件失败 {url}: {e}")
         raise
     except Exception as e:
         logger.error(f"下载文件时发生未知错误 {url}: {e}")
         raise
-        
\ No newline at end of file
+
+
+async def download_to_path(
+    url: str,
+    local_path: str,
+    timeout: int = 30,
+    headers: Dict[str, str] | None = None,
+    use_proxy: bool | None = None,
+    max_size: int | None = None
+) -> int:
+    """
+    流式下载到本地文件，返回写入的字节数；失败时不保留不完整文件
+    """
+    written = 0
+    # 打开、写入、关闭和清理文件都放到线程中执行，避免阻塞事件循环
+    f = await asyncio.to_thread(open, local_path, 'wb')
+    try:
+        try:
+            async for chunk in stream_download(url, timeout, headers, use_proxy, max_size):
+                await asyncio.to_thread(f.write, chunk)
+                written += len(chunk)
+        finally:
+            await asyncio.to_thread(f.close)
+    except BaseException:
+        try:
+            await asyncio.to_thread(os.remove, local_path)
+        except OSError:
+            pass
+        raise
+    logger.info(f"文件下载成功: {url} -> {local_path}, 大小: {written} 字节")
+    return written
+
+
+async def download_to_cos(
+    url: str,
+    object_key: str,
+    timeout: int = 30,
+    headers: Dict[str, str] | None = None,
+    use_proxy: bool | None = None,
+    max_size: int | None = None,
+    content_type: Optional[str] = None
+) -> str:
+    """
+    流式下载并通过分片上传直接写入COS，内存占用与文件大小无关
+    """
+    return await upload_stream(
+        stream_download(url, timeout, headers, use_proxy, max_size),
+        object_key,
+        content_type=content_type
+    )
@@ -1,20 +1,27 @@
 from loguru import logger
+import asyncio
 import io
-from typing import Optional, BinaryIO, Dict, List
-from contextlib import asynccontextmanager
+from typing import AsyncIterable, AsyncIterator, Optional, BinaryIO, Dict, List, Union
+from contextlib import AsyncExitStack, asynccontextmanager
 from aioboto3 import Session
+from botocore.config import Config
 from botocore.exceptions import ClientError
 from app.core.config import settings
 
 logger = logger.bind(name=__name__)
 
+# S3 协议要求除最后一个分片外，每个分片不小于 5 MiB。
+MIN_MULTIPART_PART_SIZE = 5 * 1024 * 1024
+
 cos_session: Optional[Session] = None
 cos_config: Optional[Dict] = None
+cos_client = None
+_cos_exit_stack: Optional[AsyncExitStack] = None
 
 
 async def init_cos():
-    """初始化COS连接"""
-    global cos_session, cos_config
+    """初始化COS连接，创建进程内长期复用的客户端"""
+    global cos_session, cos_config, cos_client, _cos_exit_stack
     
     if not all([
         settings.COS_ENDPOINT,
@@ -30,55 +37,89 @@ async def init_cos():
         'endpoint_url': settings.COS_ENDPOINT,
         'aws_access_key_id': settings.COS_ACCESS_KEY_ID,
         'aws_secret_access_key': settings.COS_SECRET_ACCESS_KEY,
-        'region_name': settings.COS_REGION
+        'region_name': settings.COS_REGION,
+        'config': Config(max_pool_connections=settings.COS_MAX_POOL_CONNECTIONS),
     }
     
-    async with cos_session.client('s3', **cos_config) as client:
-        try:
-            await client.head_bucket(Bucket=settings.COS_BUCKET_NAME)
-            logger.info(f"已连接到COS存储桶: {settings.COS_BUCKET_NAME}")
-        except ClientError as e:
-            logger.error(f"连接COS存储桶失败: {e}")
-            raise
+    _cos_exit_stack = AsyncExitStack()
+    cos_client = await _cos_exit_stack.enter_async_context(
+        cos_session.client('s3', **cos_config)
+    )
+    try:
+        await cos_client.head_bucket(Bucket=settings.COS_BUCKET_NAME)
+        logger.info(f"已连接到COS存储桶: {settings.COS_BUCKET_NAME}")
+    except ClientError as e:
+        logger.error(f"连接COS存储桶失败: {e}")
+        await close_cos()
+        raise
 
 
 async def close_cos():
     """关闭COS连接"""
-    global cos_session, cos_config
+    global cos_session, cos_config, cos_client, _cos_exit_stack
+    exit_stack, _cos_exit_stack = _cos_exit_stack, None
+    cos_client = None
     cos_session = None
     cos_config = None
+    if exit_stack is not None:
+        await exit_stack.aclose()
 
 
 @asynccontextmanager
 async def get_cos_client():
-    """获取COS客户端实例（异步上下文管理器）"""
+    """获取COS客户端实例（异步上下文管理器），复用生命周期内的长连接客户端"""
+    if cos_client is not None:
+        yield cos_client
+        return
     if cos_session is None or cos_config is None:
         raise RuntimeError("COS未初始化，请先调用 init_cos()")
     async with cos_session.client('s3', **cos_config) as client:
         yield client
 
 
-async def upload_file(
-    file_path: str,
+async def _iter_source_chunks(
+    source: Union[BinaryIO, AsyncIterable[bytes]],
+    chunk_size: int
+) -> AsyncIterator[bytes]:
+    if hasattr(source, "read"):
+        while True:
+            chunk = await asyncio.to_thread(source.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+    else:
+        async for chunk in source:
+            if chunk:
+                yield chunk
+
+
+async def upload_stream(
+    source: Union[BinaryIO, AsyncIterable[bytes]],
     object_key: str,
     bucket_name: Optional[str] = None,
     content_type: Optional[str] = None,
-    metadata: Optional[Dict[str, str]] = None
+    metadata: Optional[Dict[str, str]] = None,
+    part_size: Optional[int] = None,
+    concurrency: Optional[int] = None
 ) -> str:
     """
-    上传文件到COS
+    流式分片上传到COS，内存占用不超过 (并发数 + 1) 个分片
     
     Args:
-        file_path: 本地文件路径
+        source: 文件对象或异步字节流
         object_key: 对象键（在存储桶中的路径）
         bucket_name: 存储桶名称，默认使用配置中的存储桶
         content_type: 文件MIME类型
         metadata: 元数据字典
+        part_size: 分片大小，默认使用 COS_MULTIPART_PART_SIZE
+        concurrency: 并发上传分片数，默认使用 COS_MULTIPART_CONCURRENCY
     
     Returns:
-        对象的URL路径
+        对象键
     """
     bucket = bucket_name or settings.COS_BUCKET_NAME
+    part_size = max(MIN_MULTIPART_PART_SIZE, part_size or settings.COS_MULTIPART_PART_SIZE)
+    concurrency = max(1, concurrency or settings.COS_MULTIPART_CONCURRENCY)
     
     extra_args = {}
     if content_type:
@@ -86,15 +127,180 @@ async def upload_file(
     if metadata:
         extra_args['Metadata'] = metadata
     
-    try:
-        async with get_cos_client() as client:
-            with open(file_path, 'rb') as f:
-                await client.upload_fileobj(
-                    f,
-                    bucket,
-                    object_key,
-                    ExtraArgs=extra_args if extra_args else None
+    async with get_cos_client() as client:
+        buffer = bytearray()
+        upload_id: Optional[str] = None
+        part_count = 0
+        parts: Dict[int, str] = {}
+        tasks: set[asyncio.Task] = set()
+        slots = asyncio.Semaphore(concurrency)
+
+        async def send_part(part_number: int, body: bytes) -> None:
+            try:
+                response = await client.upload_part(
+                    Bucket=bucket,
+                    Key=object_key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=body
                 )
+                parts[part_number] = response['ETag']
+            finally:
+                slots.release()
+
+        async def dispatch(body: bytes) -> None:
+            nonlocal upload_id, part_count
+            if upload_id is None:
+                response = await client.create_multipart_upload(
+                    Bucket=bucket,
+                    Key=object_key,
+                    **extra_args
+                )
+                upload_id = response['UploadId']
+            # 先占用并发槽位再读取下一分片，源数据读取速度受上传速度约束。
+            await slots.acquire()
+            for task in [task for task in tasks if task.done()]:
+                tasks.discard(task)
+                task.result()
+            part_count += 1
+            tasks.add(asyncio.create_task(send_part(part_count, body)))
+
+        try:
+            async for chunk in _iter_source_chunks(source, part_size):
+                buffer.extend(chunk)
+                while len(buffer) >= part_size:
+                    body = bytes(buffer[:part_size])
+                    del buffer[:part_size]
+                    await dispatch(body)
+            if upload_id is None:
+                await client.put_object(
+                    Bucket=bucket,
+                    Key=object_key,
+                    Body=bytes(buffer),
+                    **extra_args
+                )
+                logger.info(f"文件流上传成功: {object_key}")
+                return object_key
+            if buffer:
+                await dispatch(bytes(buffer))
+                buffer.clear()
+            await asyncio.gather(*tasks)
+            await client.complete_multipart_upload(
+                Bucket=bucket,
+                Key=object_key,
+                UploadId=upload_id,
+                MultipartUpload={
+                    'Parts': [
+                        {'PartNumber': number, 'ETag': parts[number]}
+                        for number in sorted(parts)
+                    ]
+                }
+            )
+            logger.info(f"文件分片上传成功: {object_key}, 分片数 {len(parts)}")
+            return object_key
+        except BaseException as e:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if upload_id is not None:
+                try:
+                    await client.abort_multipart_upload(
+                        Bucket=bucket,
+                        Key=object_key,
+                        UploadId=upload_id
+                    )
+                except Exception as abort_error:
+                    logger.warning(f"取消分片上传失败 {object_key}: {abort_error}")
+            if isinstance(e, Exception):
+                logger.error(f"文件流上传失败 {object_key}: {e}")
+            raise
+
+
+async def download_stream(
+    object_key: str,
+    bucket_name: Optional[str] = None,
+    part_size: Optional[int] = None,
+    concurrency: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    按 Range 分片并发下载COS对象，按顺序产出分片，最多预取并发数个分片
+    
+    Args:
+        object_key: 对象键（在存储桶中的路径）
+        bucket_name: 存储桶名称，默认使用配置中的存储桶
+        part_size: 分片大小，默认使用 COS_MULTIPART_PART_SIZE
+        concurrency: 并发下载分片数，默认使用 COS_MULTIPART_CONCURRENCY
+    
+    Yields:
+        按顺序排列的字节分片
+    """
+    bucket = bucket_name or settings.COS_BUCKET_NAME
+    part_size = max(1, part_size or settings.COS_MULTIPART_PART_SIZE)
+    concurrency = max(1, concurrency or settings.COS_MULTIPART_CONCURRENCY)
+    
+    async with get_cos_client() as client:
+        head = await client.head_object(Bucket=bucket, Key=object_key)
+        size = int(head.get('ContentLength') or 0)
+        etag = head.get('ETag')
+
+        async def fetch(start: int) -> bytes:
+            end = min(start + part_size, size) - 1
+            response = await client.get_object(
+                Bucket=bucket,
+                Key=object_key,
+                Range=f"bytes={start}-{end}",
+                **({'IfMatch': etag} if etag else {})
+            )
+            body = response['Body']
+            try:
+                return await body.read()
+            finally:
+                body.close()
+
+        offsets = iter(range(0, size, part_size))
+        window: list[asyncio.Task] = []
+        try:
+            for start in offsets:
+                window.append(asyncio.create_task(fetch(start)))
+                if len(window) >= concurrency:
+                    break
+            while window:
+                data = await window.pop(0)
+                next_start = next(offsets, None)
+                if next_start is not None:
+                    window.append(asyncio.create_task(fetch(next_start)))
+                yield data
+        finally:
+            for task in window:
+                task.cancel()
+            await asyncio.gather(*window, return_exceptions=True)
+
+
+async def upload_file(
+    file_path: str,
+    object_key: str,
+    bucket_name: Optional[str] = None,
+    content_type: Optional[str] = None,
+    metadata: Optional[Dict[str, str]] = None
+) -> str:
+    """
+    上传文件到COS
+    
+    Args:
+        file_path: 本地文件路径
+        object_key: 对象键（在存储桶中的路径）
+        bucket_name: 存储桶名称，默认使用配置中的存储桶
+        content_type: 文件MIME类型
+        metadata: 元数据字典
+    
+    Returns:
+        对象的URL路径
+    """
+    bucket = bucket_name or settings.COS_BUCKET_NAME
+    
+    try:
+        with open(file_path, 'rb') as f:
+            await upload_stream(f, object_key, bucket, content_type, metadata)
         logger.info(f"文件上传成功: {object_key}")
         return object_key
     except Exception as e:
@@ -1,15 +1,31 @@
+import asyncio
+import base64
+import hashlib
 import re
+import struct
+from collections import OrderedDict
+
 import httpx
 from fastapi import HTTPException
+from loguru import logger
 from typing import Optional
 
 from langchain_openai import OpenAIEmbeddings
 
 from app.core.config import settings
+from app.db.redis import get_redis
 from app.utils.network import log_http_error_response_async
 
+logger = logger.bind(name=__name__)
+
+EMBEDDING_CACHE_KEY_PREFIX = "embedding:query:"
+_STATS_LOG_INTERVAL = 1000
+
 _async_http_client: Optional[httpx.AsyncClient] = None
 _embeddings_client: Optional[OpenAIEmbeddings] = None
+_local_cache: "OrderedDict[str, tuple[float, ...]]" = OrderedDict()
+_inflight: dict[str, asyncio.Future] = {}
+_cache_stats = {"local_hits": 0, "redis_hits": 0, "coalesced": 0, "misses": 0}
 
 
 async def init_embedding_client():
@@ -49,11 +65,100 @@ def normalize_whitespace(text: str) -> str:
     return re.sub(r"\s+", " ", (text or "").strip())
 
 
-async def embed_query_async(text: str, instruct: str = "") -> list[float]:
-    text = normalize_whitespace(text)
+def pack_vector(vector: list[float]) -> str:
+    """按 float16 小端序压缩向量并转为 base64，体积约为 JSON 的八分之一。"""
+    return base64.b64encode(struct.pack(f"<{len(vector)}e", *vector)).decode("ascii")
+
+
+def unpack_vector(payload: str) -> tuple[float, ...]:
+    raw = base64.b64decode(payload)
+    return struct.unpack(f"<{len(raw) // 2}e", raw)
+
+
+def embedding_cache_key(text: str, instruct: str = "") -> str:
+    digest = hashlib.sha1(
+        f"{settings.EMBEDDING_MODEL}\0{instruct}\0{normalize_whitespace(text)}".encode("utf-8")
+    ).hexdigest()
+    return f"{EMBEDDING_CACHE_KEY_PREFIX}{digest}"
+
+
+def embedding_cache_stats() -> dict:
+    """返回查询向量缓存的命中统计。"""
+    lookups = sum(_cache_stats.values())
+    hits = lookups - _cache_stats["misses"]
+    return {
+        **_cache_stats,
+        "lookups": lookups,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        "local_size": len(_local_cache),
+    }
+
+
+def clear_embedding_cache() -> None:
+    _local_cache.clear()
+    for name in _cache_stats:
+        _cache_stats[name] = 0
+
+
+def _record(outcome: str) -> None:
+    _cache_stats[outcome] += 1
+    if sum(_cache_stats.values()) % _STATS_LOG_INTERVAL == 0:
+        logger.info(f"查询向量缓存统计: {embedding_cache_stats()}")
+
+
+def _remember(key: str, vector: tuple[float, ...]) -> None:
+    _local_cache[key] = vector
+    _local_cache.move_to_end(key)
+    capacity = max(1, settings.EMBEDDING_CACHE_SIZE)
+    while len(_local_cache) > capacity:
+        _local_cache.popitem(last=False)
+
+
+async def _load_or_embed(key: str, text: str, instruct: str) -> tuple[float, ...]:
+    redis_client = get_redis()
+    if redis_client:
+        try:
+            cached = await redis_client.get(key)
+            if cached:
+                vector = unpack_vector(cached)
+                _remember(key, vector)
+                _record("redis_hits")
+                return vector
+        except Exception as e:
+            logger.warning(f"读取查询向量缓存失败: {e}")
     embeddings = get_embeddings_client()
     query_text = f"Instruct: {instruct}\nQuery:{text}" if instruct else text
-    return await embeddings.aembed_query(query_text)
+    packed = pack_vector(await embeddings.aembed_query(query_text))
+    # 回源结果同样按 float16 取整，保证无论哪一级缓存命中，同一查询得到的向量一致。
+    vector = unpack_vector(packed)
+    _record("misses")
+    _remember(key, vector)
+    if redis_client:
+        try:
+            await redis_client.setex(key, settings.EMBEDDING_CACHE_TTL_SECONDS, packed)
+        except Exception as e:
+            logger.warning(f"写入查询向量缓存失败: {e}")
+    return vector
+
+
+async def embed_query_async(text: str, instruct: str = "") -> list[float]:
+    """生成查询向量；依次查进程内 LRU、Redis，未命中时调用嵌入服务并回填两级缓存。"""
+    text = normalize_whitespace(text)
+    key = embedding_cache_key(text, instruct)
+    vector = _local_cache.get(key)
+    if vector is not None:
+        _local_cache.move_to_end(key)
+        _record("local_hits")
+        return list(vector)
+    pending = _inflight.get(key)
+    if pending is None:
+        # 同一查询的并发请求共享一次回源。
+        pending = asyncio.ensure_future(_load_or_embed(key, text, instruct))
+        _inflight[key] = pending
+        pending.add_done_callback(lambda _: _inflight.pop(key, None))
+    else:
+        _record("coalesced")
+    return list(await asyncio.shield(pending))
 
 
 def get_embeddings_client() -> OpenAIEmbeddings:
@@ -1,7 +1,80 @@
 import re
+from dataclasses import dataclass
 
 HIGHLIGHT_MERGE_PATTERN = re.compile(r'</em>(\s*)<em>')
 
+# 向量字段只用于 ES 内部 kNN 检索，任何响应都不需要取回。
+VECTOR_FIELDS = ("clean_content_vector",)
+
+
+@dataclass(frozen=True, slots=True)
+class SourceProjection:
+    """ES `_source` 字段投影；includes 为空表示保留除 excludes 外的全部字段。"""
+
+    includes: tuple[str, ...] = ()
+    excludes: tuple[str, ...] = VECTOR_FIELDS
+    docvalue_fields: tuple[str, ...] = ()
+
+    def source(self) -> dict:
+        source: dict = {}
+        if self.includes:
+            source["includes"] = list(self.includes)
+        if self.excludes:
+            source["excludes"] = list(self.excludes)
+        return source
+
+    def apply(self, body: dict) -> dict:
+        """把投影写入查询体（也适用于 top_hits 聚合体）。"""
+        body["_source"] = self.source()
+        if self.docvalue_fields:
+            body["docvalue_fields"] = list(self.docvalue_fields)
+        return body
+
+    def get_kwargs(self) -> dict:
+        """`es.get` 使用的投影参数。"""
+        kwargs: dict = {}
+        if self.includes:
+            kwargs["_source_includes"] = list(self.includes)
+        if self.excludes:
+            kwargs["_source_excludes"] = list(self.excludes)
+        return kwargs
+
+
+SOURCE_PROJECTIONS: dict[str, SourceProjection] = {
+    # 列表页：只取卡片展示所需字段，正文之外的大字段（原文、快照、向量）一律不取。
+    "list": SourceProjection(
+        includes=(
+            "uuid",
+            "entity_type",
+            "source_id",
+            "data_version",
+            "platform",
+            "section",
+            "update_at",
+            "last_edit_at",
+            "crawled_at",
+            "author_name",
+            "nsfw",
+            "aigc",
+            "keywords",
+            "title",
+            "clean_content",
+            "confidence",
+            "is_highlighted",
+            "highlight_reason",
+            "floor",
+        ),
+    ),
+    # 详情页：保留全部业务字段，仅剔除向量。
+    "detail": SourceProjection(),
+    # 导出：与详情一致，单独命名以便导出字段独立演进。
+    "export": SourceProjection(),
+}
+
+
+def source_projection(profile: str) -> SourceProjection:
+    return SOURCE_PROJECTIONS[profile]
+
 
 def merge_highlight_tags(text: str | None) -> str | None:
     if not text:
@@ -13,7 +86,7 @@ def has_keywords(text: str | None) -> bool:
     return bool(text and text.strip())
 
 
-def rrf_merge(keyword_hits: list, vector_hits: list, k: int) -> list:
+def rrf_merge_scored(keyword_hits: list, vector_hits: list, k: int) -> list[tuple[dict, float]]:
     def doc_id(h: dict) -> str:
         return h.get("_source", {}).get("uuid") or h.get("_id", "")
 
@@ -29,5 +102,9 @@ def rrf_merge(keyword_hits: list, vector_hits: list, k: int) -> list:
     for uid in sorted_ids:
         hit = keyword_map.get(uid) or vector_map.get(uid)
         if hit:
-            merged.append(hit)
+            merged.append((hit, rank_by_id[uid]))
     return merged
+
+
+def rrf_merge(keyword_hits: list, vector_hits: list, k: int) -> list:
+    return [hit for hit, _ in rrf_merge_scored(keyword_hits, vector_hits, k)]
@@ -1,82 +1,130 @@
-from collections import defaultdict
+from collections import defaultdict, deque
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Any
 
 from app.models.action.blueprint import ActionBlueprintModel, GraphNodeModel, GraphModel
 from app.schemas.action.blueprint import GraphSchema, GraphNodeSchema, GraphEdgeSchema, PositionSchema, NodeDataSchema, ViewportSchema
 from app.utils.dict_helper import unpack_dict
 
 
-def find_start_nodes(action_blueprint: ActionBlueprintModel) -> list[GraphNodeModel]:
-    """查找起始节点（入度为0的节点）"""
-    nodes = action_blueprint.graph.nodes
-    edges = action_blueprint.graph.edges
-
-    adj_list = defaultdict(list)
-    in_degree = defaultdict(int)
-
-    all_node_ids = set()
-    for node in nodes:
-        all_node_ids.add(node.id)
-        in_degree[node.id] = 0
-
+@dataclass(frozen=True, slots=True)
+class CompiledWorkflowGraph:
+    """预计算邻接关系的不可变工作流图，可在进程内安全共享。"""
+
+    node_ids: tuple[str, ...]
+    adjacency: Mapping[str, tuple[str, ...]]
+    reverse_adjacency: Mapping[str, tuple[str, ...]]
+    start_node_ids: tuple[str, ...]
+    topological_order: tuple[str, ...]
+    outgoing_edges: Mapping[str, tuple[Any, ...]]
+    incoming_edges: Mapping[str, tuple[Any, ...]]
+
+    def successors(self, node_id: str) -> tuple[str, ...]:
+        return self.adjacency.get(node_id, ())
+
+    def predecessors(self, node_id: str) -> tuple[str, ...]:
+        return self.reverse_adjacency.get(node_id, ())
+
+    def count_paths(self) -> int:
+        """按逆拓扑序累计从各起点到叶子节点的完整路径数量。"""
+        paths: dict[str, int] = {}
+        for node_id in reversed(self.topological_order):
+            neighbors = self.adjacency.get(node_id, ())
+            paths[node_id] = (
+                sum(paths.get(neighbor, 1) for neighbor in neighbors)
+                if neighbors
+                else 1
+            )
+        return sum(paths.get(node_id, 1) for node_id in self.start_node_ids)
+
+
+def compile_workflow_graph(
+    node_ids: Iterable[str],
+    edges: Iterable[Any],
+) -> CompiledWorkflowGraph:
+    """将节点与边编译为只读邻接表、反向邻接表、起点和拓扑序。
+
+    边仅需提供 `source` 与 `target` 属性，重复边会按出现次数保留，
+    与按边计算路径数量的原有语义保持一致。
+    """
+    ordered_ids = list(dict.fromkeys(node_ids))
+    adjacency: dict[str, list[str]] = defaultdict(list)
+    reverse_adjacency: dict[str, list[str]] = defaultdict(list)
+    outgoing_edges: dict[str, list[Any]] = defaultdict(list)
+    incoming_edges: dict[str, list[Any]] = defaultdict(list)
+    in_degree = {node_id: 0 for node_id in ordered_ids}
     for edge in edges:
-        source = edge.source
-        target = edge.target
-
-        adj_list[source].append(target)
-        in_degree[target] += 1
-
-    start_nodes = [
-        node for node in nodes if in_degree[node.id] == 0]
-
-    return start_nodes
-
-
-def count_workflow_paths(action_blueprint: ActionBlueprintModel) -> int:
-    """计算工作流路径数量"""
-    nodes = action_blueprint.graph.nodes
-    edges = action_blueprint.graph.edges
-
-    adj_list = defaultdict(list)
-    in_degree = defaultdict(int)
-
-    all_node_ids = set()
-    for node in nodes:
-        all_node_ids.add(node.id)
-        in_degree[node.id] = 0
-
-    for edge in edges:
-        source = edge.source
-        target = edge.target
-
-        adj_list[source].append(target)
-        in_degree[target] += 1
-
-    start_nodes = find_start_nodes(action_blueprint)
-
-    memo: dict[str, int] = {}
-
-    def get_paths_from(node_id: str) -> int:
-        if node_id in memo:
-            return memo[node_id]
+        outgoing_edges[edge.source].append(edge)
+        incoming_edges[edge.target].append(edge)
+        adjacency[edge.source].append(edge.target)
+        reverse_adjacency[edge.target].append(edge.source)
+        in_degree[edge.target] = in_degree.get(edge.target, 0) + 1
+        in_degree.setdefault(edge.source, 0)
+
+    start_node_ids = tuple(
+        node_id for node_id in ordered_ids if in_degree[node_id] == 0
+    )
+    remaining = dict(in_degree)
+    queue = deque(node_id for node_id in in_degree if remaining[node_id] == 0)
+    topological_order: list[str] = []
+    while queue:
+        node_id = queue.popleft()
+        topological_order.append(node_id)
+        for neighbor in adjacency.get(node_id, ()):
+            remaining[neighbor] -= 1
+            if remaining[neighbor] == 0:
+                queue.append(neighbor)
+
+    return CompiledWorkflowGraph(
+        node_ids=tuple(ordered_ids),
+        adjacency=MappingProxyType(
+            {key: tuple(value) for key, value in adjacency.items()}
+        ),
+        reverse_adjacency=MappingProxyType(
+            {key: tuple(value) for key, value in reverse_adjacency.items()}
+        ),
+        start_node_ids=start_node_ids,
+        topological_order=tuple(topological_order),
+        outgoing_edges=MappingProxyType(
+            {key: tuple(value) for key, value in outgoing_edges.items()}
+        ),
+        incoming_edges=MappingProxyType(
+            {key: tuple(value) for key, value in incoming_edges.items()}
+        ),
+    )
 
-        neighbors = adj_list[node_id]
 
-        if not neighbors:
-            return 1
+def compile_blueprint_graph(
+    action_blueprint: ActionBlueprintModel,
+) -> CompiledWorkflowGraph:
+    """编译蓝图编辑图。"""
+    return compile_workflow_graph(
+        (node.id for node in action_blueprint.graph.nodes),
+        action_blueprint.graph.edges,
+    )
 
-        total_paths = 0
-        for neighbor in neighbors:
-            total_paths += get_paths_from(neighbor)
 
-        memo[node_id] = total_paths
-        return total_paths
+def find_start_nodes(
+    action_blueprint: ActionBlueprintModel,
+    compiled: CompiledWorkflowGraph | None = None,
+) -> list[GraphNodeModel]:
+    """查找起始节点（入度为0的节点）"""
+    compiled = compiled or compile_blueprint_graph(action_blueprint)
+    start_node_ids = set(compiled.start_node_ids)
+    return [
+        node for node in action_blueprint.graph.nodes if node.id in start_node_ids
+    ]
 
-    total_count = 0
-    for start_node in start_nodes:
-        path_count = get_paths_from(start_node.id)
-        total_count += path_count
 
-    return total_count
+def count_workflow_paths(
+    action_blueprint: ActionBlueprintModel,
+    compiled: CompiledWorkflowGraph | None = None,
+) -> int:
+    """计算工作流路径数量"""
+    compiled = compiled or compile_blueprint_graph(action_blueprint)
+    return compiled.count_paths()
 
 
 def graph_model2schemas(graph_model: GraphModel) -> GraphSchema:
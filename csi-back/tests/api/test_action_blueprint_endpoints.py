@@ -18,6 +18,7 @@ from app.schemas.constants import (
     ActionSchedulingModeEnum,
 )
 from app.service.action import ActionInstanceService
+from app.service.action.schedule import ActionScheduleService
 
 
 def test_blueprint_schema_defaults_to_barrier_mode() -> None:
@@ -270,10 +271,12 @@ async def test_update_blueprint_keeps_id_and_disables_invalid_schedules(
     schedule_query = Mock()
     schedule_query.to_list = AsyncMock(return_value=[schedule])
     clear_cache = AsyncMock()
+    notify_changed = AsyncMock()
 
     monkeypatch.setattr(ActionBlueprintModel, "find_one", AsyncMock(return_value=blueprint))
     monkeypatch.setattr(ActionScheduleModel, "find", Mock(return_value=schedule_query))
     monkeypatch.setattr(ActionInstanceService, "_clear_cache", clear_cache)
+    monkeypatch.setattr(ActionScheduleService, "notify_changed", notify_changed)
 
     request = ActionBlueprintSchema(
         name="新蓝图",
@@ -314,6 +317,7 @@ async def test_update_blueprint_keeps_id_and_disables_invalid_schedules(
     assert schedule.last_trigger_status == "invalid"
     assert "非模板蓝图" in schedule.last_error
     schedule.save.assert_awaited_once()
+    notify_changed.assert_awaited_once_with("schedule-1")
     assert response.data.disabled_schedules[0].id == "schedule-1"
 
 
@@ -16,7 +16,7 @@ class _FakeES:
     def __init__(self, source: dict[str, Any]) -> None:
         self._source = source
 
-    async def get(self, index: str, id: str) -> dict[str, Any]:
+    async def get(self, index: str, id: str, **_kwargs: Any) -> dict[str, Any]:
         return {"_source": self._source}
 
     async def search(self, index: str, body: dict[str, Any]) -> dict[str, Any]:
@@ -30,7 +30,7 @@ def _article_client(monkeypatch: pytest.MonkeyPatch, source: dict[str, Any]) ->
     async def _no_platform(*_args: Any, **_kwargs: Any) -> None:
         return None
 
-    monkeypatch.setattr(article_ep.PlatformModel, "find_one", _no_platform)
+    monkeypatch.setattr(article_ep.PlatformMetadataCache, "get_id", _no_platform)
     return TestClient(app)
 
 
@@ -41,7 +41,7 @@ def _forum_client(monkeypatch: pytest.MonkeyPatch, source: dict[str, Any]) -> Te
     async def _no_platform(*_args: Any, **_kwargs: Any) -> None:
         return None
 
-    monkeypatch.setattr(forum_ep.PlatformModel, "find_one", _no_platform)
+    monkeypatch.setattr(forum_ep.PlatformMetadataCache, "get_id", _no_platform)
     return TestClient(app)
 
 
@@ -70,3 +70,12 @@ def _ensure_ci_placeholder_env() -> None:
 
 
 _ensure_ci_placeholder_env()
+
+
+@pytest.fixture(autouse=True)
+def _reset_workflow_graph_cache():
+    """进程内编译图缓存按行动 ID 复用，测试之间需要隔离。"""
+    yield
+    from app.service.action.graph_cache import WorkflowGraphCache
+
+    WorkflowGraphCache.clear()
@@ -378,6 +378,90 @@ async def test_reference_consumer_reassembles_and_nacks_all_parts(monkeypatch):
     assert all(message.nack.await_count == 1 for message in messages)
 
 
+def _fragment_messages(fragments, first_delivery_tag):
+    """把分片编码为带递增 delivery tag 的入站消息替身。"""
+    messages = []
+    for offset, fragment in enumerate(fragments):
+        message = _incoming_message(
+            fragment.body,
+            SimpleNamespace(
+                headers=fragment.headers,
+                content_type="application/json",
+                content_encoding="utf-8",
+                delivery_mode=2,
+                priority=None,
+                correlation_id=None,
+                reply_to=None,
+                expiration=None,
+                message_id=fragment.message_id,
+                timestamp=None,
+                type=FRAGMENT_MESSAGE_TYPE,
+                user_id=None,
+                app_id=None,
+            ),
+        )
+        message.delivery_tag = first_delivery_tag + offset
+        messages.append(message)
+    return messages
+
+
+@pytest.mark.asyncio
+async def test_reference_consumer_acks_fragments_with_single_multiple_ack(
+    monkeypatch,
+):
+    settings = FragmentSettings(4, 2, 16)
+    monkeypatch.setattr(rabbit_mod, "fragment_settings", settings)
+    messages = _fragment_messages(
+        encode_fragments(b"abcdef", "logical-1", settings),
+        1,
+    )
+    consumer = rabbit_mod.ReferenceQueueConsumer(
+        channel=SimpleNamespace(is_closed=False),
+        iterator=SimpleNamespace(__anext__=AsyncMock(side_effect=messages)),
+    )
+
+    delivery = await consumer.receive()
+    await delivery.ack()
+
+    messages[-1].ack.assert_awaited_once_with(multiple=True)
+    assert all(message.ack.await_count == 0 for message in messages[:-1])
+    assert delivery.message.processed is True
+    await delivery.nack(requeue=True)
+    assert all(message.nack.await_count == 0 for message in messages)
+
+
+@pytest.mark.asyncio
+async def test_reference_consumer_multiple_ack_stops_at_interleaved_fragment(
+    monkeypatch,
+):
+    settings = FragmentSettings(4, 2, 16)
+    monkeypatch.setattr(rabbit_mod, "fragment_settings", settings)
+    first = _fragment_messages(
+        encode_fragments(b"abcdef", "logical-1", settings),
+        1,
+    )
+    second = _fragment_messages(
+        encode_fragments(b"ghijkl", "logical-2", settings),
+        10,
+    )
+    second[0].delivery_tag = 3
+    first[2].delivery_tag = 4
+    consumer = rabbit_mod.ReferenceQueueConsumer(
+        channel=SimpleNamespace(is_closed=False),
+        iterator=SimpleNamespace(
+            __anext__=AsyncMock(side_effect=[first[0], first[1], second[0], first[2]])
+        ),
+    )
+
+    delivery = await consumer.receive()
+    await delivery.ack()
+
+    first[0].ack.assert_not_awaited()
+    first[1].ack.assert_awaited_once_with(multiple=True)
+    first[2].ack.assert_awaited_once_with()
+    second[0].ack.assert_not_awaited()
+
+
 @pytest.mark.asyncio
 async def test_reference_consumer_allows_other_producer_eos_between_fragments(
     monkeypatch,
@@ -6,7 +6,9 @@ from app.db.rabbitmq_fragmentation import (
     DEFAULT_FRAGMENT_BYTES,
     DEFAULT_FRAGMENT_THRESHOLD_BYTES,
     DEFAULT_MAX_LOGICAL_MESSAGE_BYTES,
+    FRAGMENT_HEADER_CODEC,
     FRAGMENT_MESSAGE_TYPE,
+    SUPPORTED_CODECS,
     FragmentAssembler,
     FragmentProtocolError,
     FragmentSettings,
@@ -64,3 +66,45 @@ def test_backend_protocol_rejects_invalid_fragment_metadata():
             {},
             FragmentSettings(12, 8, 64),
         )
+
+
+@pytest.mark.parametrize("codec", sorted(SUPPORTED_CODECS))
+def test_backend_protocol_decodes_compressed_fragments(codec):
+    settings = FragmentSettings(
+        threshold_bytes=4096,
+        fragment_bytes=1024,
+        max_logical_message_bytes=1024 * 1024,
+        compression_threshold_bytes=1024,
+        compression_codecs=(codec,),
+    )
+    body = ('{"html": "<p>后端压缩消息</p>"},' * 2048).encode("utf-8")
+    fragments = encode_fragments(body, "message-1", settings)
+    assembler = FragmentAssembler[int](settings)
+
+    assert {fragment.headers[FRAGMENT_HEADER_CODEC] for fragment in fragments} == {
+        codec
+    }
+    result = None
+    for index, encoded in reversed(list(enumerate(fragments))):
+        parsed = parse_fragment(
+            encoded.body,
+            FRAGMENT_MESSAGE_TYPE,
+            encoded.headers,
+            settings,
+        )
+        result = assembler.add(parsed, index)
+
+    assert result is not None
+    assert result.body == body
+    assert sorted(result.tokens) == list(range(len(fragments)))
+
+
+def test_backend_compression_is_opt_in(monkeypatch):
+    monkeypatch.delenv("CSI_RABBITMQ_COMPRESSION", raising=False)
+    assert FragmentSettings.from_env().compression_codec is None
+
+    monkeypatch.setenv("CSI_RABBITMQ_COMPRESSION", "gzip")
+    assert FragmentSettings.from_env().compression_codec == "gzip"
+
+    monkeypatch.setenv("CSI_RABBITMQ_COMPRESSION", "none")
+    assert FragmentSettings.from_env().compression_codec is None
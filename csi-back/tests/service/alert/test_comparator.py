@@ -6,6 +6,7 @@ from app.schemas.alert.condition import AlertCondition, AlertExpression, AlertTh
 from app.schemas.alert.constants import AlertOperatorEnum, AlertValueTypeEnum
 from app.service.alert.comparator import (
     compare_values,
+    compile_expression,
     evaluate_expression,
     normalize_threshold,
     normalize_value,
@@ -44,6 +45,19 @@ def test_duration_expression_supports_trigger_and_recovery_hysteresis():
     assert evaluate_expression(recovery, AlertValueTypeEnum.DURATION, 11 * 86400)
 
 
+@pytest.mark.parametrize("actual", [0, 6 * 86400, 7 * 86400, 30 * 86400])
+def test_compiled_expression_matches_runtime_evaluation(actual):
+    expression = _expression(AlertOperatorEnum.LT, 7, "day")
+    compiled = compile_expression(expression, AlertValueTypeEnum.DURATION)
+
+    assert compiled.conditions == ((AlertOperatorEnum.LT, 7 * 86400),)
+    assert compiled.evaluate(actual) is evaluate_expression(
+        expression,
+        AlertValueTypeEnum.DURATION,
+        actual,
+    )
+
+
 def test_datetime_is_normalized_to_utc():
     value = normalize_value(
         AlertValueTypeEnum.DATETIME,
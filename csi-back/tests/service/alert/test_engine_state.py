@@ -1,9 +1,14 @@
 from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
 
-from app.models.alert.evaluation_state import AlertRuleEvaluationStateModel
+from app.core.config import settings
+from app.models.alert.evaluation_state import (
+    AlertRuleEvaluationStateModel,
+    AlertSignalStateModel,
+)
 from app.models.alert.rule import AlertRuleModel
 from app.schemas.alert.condition import (
     AlertCondition,
@@ -19,9 +24,10 @@ from app.schemas.alert.constants import (
     AlertValueTypeEnum,
 )
 from app.schemas.alert.observation import AlertObservation
-from app.service.alert.engine import AlertEngine
+from app.service.alert.engine import AlertEngine, AlertIncidentLockError
 from app.service.action.alert_source import ActionInstanceAlertSource
 from app.service.alert.registry import AlertSourceRegistry
+from app.service.alert.rule_index import AlertRuleIndex
 
 
 def expression(value: str) -> AlertExpression:
@@ -352,8 +358,214 @@ async def test_naive_rule_activation_time_is_compared_as_utc(
     monkeypatch.setattr(AlertEngine, "_acquire_lock", acquire_lock)
     engine = AlertEngine(registry)
 
-    result = await engine.process_observation(item, **process_kwargs)
+    with pytest.raises(AlertIncidentLockError):
+        await engine.process_observation(item, **process_kwargs)
 
-    assert result == 0
     assert item.observed_at.tzinfo == timezone.utc
     acquire_lock.assert_awaited_once_with(engine.incident_key(item))
+
+
+@pytest.mark.asyncio
+async def test_rule_index_matches_in_memory_and_reloads_on_version_change(
+    monkeypatch,
+):
+    registry = AlertSourceRegistry()
+    registry.register(ActionInstanceAlertSource())
+    realtime_rule = rule()
+    periodic_rule = rule().model_copy(
+        update={
+            "id": "rule-2",
+            "evaluation_mode": AlertEvaluationModeEnum.INTERVAL,
+        }
+    )
+    loads = []
+
+    class _Query:
+        async def to_list(self):
+            return [realtime_rule, periodic_rule]
+
+    def find(filters):
+        loads.append(filters)
+        return _Query()
+
+    versions = iter(["1", "1", "2"])
+    monkeypatch.setattr(AlertRuleModel, "find", staticmethod(find))
+    monkeypatch.setattr(
+        AlertRuleIndex,
+        "_read_version",
+        staticmethod(AsyncMock(side_effect=lambda: next(versions))),
+    )
+    monkeypatch.setattr(settings, "ALERT_RULE_INDEX_CHECK_SECONDS", 0.0)
+    index = AlertRuleIndex(registry)
+
+    realtime = await index.match("action.instance", "status", realtime_only=True)
+    targeted = await index.match(
+        "action.instance",
+        "status",
+        target_rule_id="rule-2",
+    )
+    await index.match("action.instance", "status")
+
+    assert [entry.rule.id for entry in realtime] == ["rule-1"]
+    assert [entry.rule.id for entry in targeted] == ["rule-2"]
+    assert realtime[0].fingerprint == AlertEngine.condition_fingerprint(
+        realtime_rule
+    )
+    assert realtime[0].trigger.evaluate("timeout") is True
+    assert index.reloads == 2
+    assert len(loads) == 2
+
+
+@pytest.mark.asyncio
+async def test_indexed_engine_skips_rule_queries(monkeypatch):
+    registry = AlertSourceRegistry()
+    registry.register(ActionInstanceAlertSource())
+    index = AlertRuleIndex(registry)
+    index.load([rule()], version="1")
+    monkeypatch.setattr(
+        AlertRuleIndex,
+        "_read_version",
+        staticmethod(AsyncMock(return_value="1")),
+    )
+    find = AsyncMock()
+    monkeypatch.setattr(AlertRuleModel, "find", find)
+    apply_rule = AsyncMock(return_value=(None, False))
+    monkeypatch.setattr(AlertEngine, "_apply_rule", apply_rule)
+    monkeypatch.setattr(AlertEngine, "_acquire_lock", AsyncMock(return_value="local"))
+    engine = AlertEngine(registry, rule_index=index)
+    item = observation("observation-1", "timeout")
+    item.observed_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+
+    result = await engine.process_observation(item, realtime_only=True)
+
+    assert result == 0
+    find.assert_not_called()
+    indexed = apply_rule.await_args.args[3]
+    assert indexed is index.get("rule-1")
+
+
+def _batch_engine(monkeypatch, acquire_result="token"):
+    """构造只依赖内存规则索引和假状态集合的批处理引擎。"""
+    registry = AlertSourceRegistry()
+    registry.register(ActionInstanceAlertSource())
+    index = AlertRuleIndex(registry)
+    index.load([rule()], version="1")
+    monkeypatch.setattr(
+        AlertRuleIndex,
+        "_read_version",
+        staticmethod(AsyncMock(return_value="1")),
+    )
+    state_queries = []
+
+    class _Query:
+        async def to_list(self):
+            return []
+
+    def find_states(filters):
+        state_queries.append(filters)
+        return _Query()
+
+    collection = SimpleNamespace(bulk_write=AsyncMock())
+    monkeypatch.setattr(
+        AlertRuleEvaluationStateModel,
+        "find",
+        staticmethod(find_states),
+    )
+    monkeypatch.setattr(
+        AlertRuleEvaluationStateModel,
+        "get_motor_collection",
+        staticmethod(lambda: collection),
+    )
+    signal = AlertSignalStateModel.model_construct(
+        _id="incident-1",
+        incident_key="incident-1",
+        current_alert_id=None,
+        manual_suppressed=False,
+    )
+    monkeypatch.setattr(AlertSignalStateModel, "save", AsyncMock())
+    monkeypatch.setattr(
+        AlertEngine,
+        "_get_or_create_signal",
+        AsyncMock(return_value=signal),
+    )
+    acquire_lock = AsyncMock(return_value=acquire_result)
+    release_lock = AsyncMock()
+    monkeypatch.setattr(AlertEngine, "_acquire_lock", acquire_lock)
+    monkeypatch.setattr(AlertEngine, "_release_lock", release_lock)
+    engine = AlertEngine(registry, rule_index=index)
+    observed_at = datetime.now(timezone.utc) + timedelta(seconds=1)
+    items = []
+    for position in range(3):
+        item = observation(f"observation-{position}", "running")
+        item.observed_at = observed_at + timedelta(seconds=position)
+        items.append(item)
+    return SimpleNamespace(
+        engine=engine,
+        items=items,
+        collection=collection,
+        state_queries=state_queries,
+        acquire_lock=acquire_lock,
+        release_lock=release_lock,
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_processing_coalesces_rule_state_writes(monkeypatch):
+    batch = _batch_engine(monkeypatch)
+    engine, items = batch.engine, batch.items
+    invalid = observation("observation-invalid", "running")
+    invalid.signal_key = "unknown"
+
+    results = await engine.process_observations(
+        [*items, invalid],
+        realtime_only=True,
+    )
+
+    assert results[:3] == [1, 1, 1]
+    assert isinstance(results[3], ValueError)
+    assert len(batch.state_queries) == 4
+    assert batch.state_queries[0]["_id"]["$in"] == [
+        AlertEngine.state_id("rule-1", items[0])
+    ]
+    batch.collection.bulk_write.assert_awaited_once()
+    operations = batch.collection.bulk_write.await_args.args[0]
+    assert len(operations) == 1
+    assert operations[0]._doc["last_observation_id"] == "observation-2"
+    batch.acquire_lock.assert_awaited_once()
+    batch.release_lock.assert_awaited_once_with(
+        engine.incident_key(items[0]),
+        "token",
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_processing_reports_lock_contention_as_retryable(monkeypatch):
+    batch = _batch_engine(monkeypatch, acquire_result=None)
+
+    results = await batch.engine.process_observations(
+        batch.items,
+        realtime_only=True,
+    )
+
+    assert all(isinstance(result, AlertIncidentLockError) for result in results)
+    batch.collection.bulk_write.assert_not_awaited()
+    batch.release_lock.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_batch_processing_skips_flush_when_lock_expired(monkeypatch):
+    batch = _batch_engine(monkeypatch)
+    extend_lock = AsyncMock(return_value=False)
+    monkeypatch.setattr(AlertEngine, "_extend_lock", extend_lock)
+
+    with pytest.raises(AlertIncidentLockError):
+        await batch.engine.process_observations(
+            batch.items,
+            realtime_only=True,
+        )
+
+    batch.collection.bulk_write.assert_not_awaited()
+    batch.release_lock.assert_awaited_once_with(
+        batch.engine.incident_key(batch.items[0]),
+        "token",
+    )
@@ -0,0 +1,125 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+import app.service.alert.sharding as sharding_module
+from app.service.alert.sharding import (
+    AlertRuleShardManager,
+    assign_shards,
+    rule_scan_hash,
+)
+from app.service.alert.worker import AlertWorkerService
+
+
+def test_consistent_hash_moves_only_shards_taken_by_new_member():
+    before = assign_shards(["worker-a", "worker-b"], 64)
+    after = assign_shards(["worker-a", "worker-b", "worker-c"], 64)
+
+    moved = [shard for shard in range(64) if before[shard] != after[shard]]
+
+    assert set(before.values()) == {"worker-a", "worker-b"}
+    assert moved
+    assert all(after[shard] == "worker-c" for shard in moved)
+
+
+def test_rule_filter_limits_scan_to_owned_shards():
+    manager = AlertRuleShardManager("worker-a", shard_count=4)
+    manager.owned = frozenset({0, 2})
+
+    assert manager.rule_filter() == {
+        "$or": [
+            {"scan_hash": {"$mod": [4, 0]}},
+            {"scan_hash": {"$mod": [4, 2]}},
+            {"scan_hash": None},
+        ]
+    }
+    manager.owned = frozenset(range(4))
+    assert manager.rule_filter() is None
+    assert rule_scan_hash("rule-1") == rule_scan_hash("rule-1")
+
+
+@pytest.mark.asyncio
+async def test_rebalance_acquires_leases_for_assigned_shards(monkeypatch):
+    redis = AsyncMock()
+    redis.zrange.return_value = [b"worker-a", b"worker-b"]
+    redis.eval.side_effect = lambda script, count, *args: [1] * count
+    monkeypatch.setattr(sharding_module, "get_redis", lambda: redis)
+    manager = AlertRuleShardManager("worker-a", shard_count=16)
+
+    owned = await manager.rebalance()
+
+    expected = {
+        shard
+        for shard, owner in assign_shards(["worker-a", "worker-b"], 16).items()
+        if owner == "worker-a"
+    }
+    assert owned == expected
+    script, count, *args = redis.eval.await_args.args
+    assert count == len(expected)
+    assert args[count] == "worker-a"
+
+
+@pytest.mark.asyncio
+async def test_slow_provider_does_not_starve_other_rules(monkeypatch):
+    monkeypatch.setattr(
+        "app.service.alert.worker.settings.ALERT_PROVIDER_SCAN_CONCURRENCY",
+        1,
+    )
+    worker = AlertWorkerService("worker-1")
+    slow_started = asyncio.Event()
+    release_slow = asyncio.Event()
+    scanned = []
+
+    async def scan_rule(rule):
+        scanned.append(rule.id)
+        if rule.source_key == "slow":
+            slow_started.set()
+            await release_slow.wait()
+        return 1
+
+    worker.scan_rule = scan_rule
+    slow_rules = [SimpleNamespace(id=f"slow-{i}", source_key="slow") for i in range(2)]
+    fast_rule = SimpleNamespace(id="fast-1", source_key="fast")
+    tasks = [
+        asyncio.create_task(worker._scan_with_budget(rule))
+        for rule in [*slow_rules, fast_rule]
+    ]
+    await slow_started.wait()
+    await asyncio.wait_for(tasks[2], timeout=1)
+
+    assert scanned == ["slow-0", "fast-1"]
+    release_slow.set()
+    assert await asyncio.gather(*tasks) == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_scan_due_rules_skips_query_without_owned_shards(monkeypatch):
+    find = MagicMock()
+    monkeypatch.setattr("app.service.alert.worker.AlertRuleModel.find", find)
+    worker = AlertWorkerService("worker-1")
+    worker.shards.rebalance = AsyncMock(return_value=frozenset())
+    worker._scan_tasks["rule-running"] = MagicMock()
+
+    assert await worker.scan_due_rules() == 0
+    find.assert_not_called()
+    assert worker.last_rule_scan_at is not None
+
+
+@pytest.mark.asyncio
+async def test_scan_due_rules_keeps_shard_filter_with_running_scans(monkeypatch):
+    query = MagicMock()
+    query.sort.return_value.limit.return_value.to_list = AsyncMock(return_value=[])
+    find = MagicMock(return_value=query)
+    monkeypatch.setattr("app.service.alert.worker.AlertRuleModel.find", find)
+    worker = AlertWorkerService("worker-1")
+    worker.shards = AlertRuleShardManager("worker-1", shard_count=4)
+    worker.shards.owned = frozenset({1})
+    worker.shards.rebalance = AsyncMock(return_value=worker.shards.owned)
+    worker._scan_tasks["rule-running"] = MagicMock()
+
+    assert await worker.scan_due_rules() == 0
+    filters = find.call_args.args[0]
+    assert filters["$or"] == [{"scan_hash": {"$mod": [4, 1]}}]
+    assert filters["_id"] == {"$nin": ["rule-running"]}
@@ -1,8 +1,11 @@
+from types import SimpleNamespace
 from unittest.mock import AsyncMock
 
 import pytest
 
 import app.service.alert.stream as stream_module
+from app.models.alert.stream_outbox import AlertStreamOutboxModel
+from app.schemas.alert.constants import AlertOutboxStatusEnum
 from app.service.alert.stream import AlertStreamService
 
 
@@ -42,3 +45,91 @@ async def test_zero_cursor_replays_current_retention_window(monkeypatch):
         "100-0",
         "200-5",
     )
+
+
+class _Pipeline:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def xadd(self, key, fields, **kwargs):
+        self.commands.append((key, fields))
+
+    async def execute(self):
+        if self.fail:
+            raise ConnectionError("Redis 连接中断")
+        return [f"100-{index}" for index in range(len(self.commands))]
+
+
+def _outbox(index: int, attempts: int = 1) -> AlertStreamOutboxModel:
+    return AlertStreamOutboxModel.model_construct(
+        _id=f"event-{index}",
+        event_type="alert.updated",
+        aggregate_type="alert",
+        aggregate_id=f"alert-{index}",
+        aggregate_version=1,
+        payload={"index": index},
+        attempts=attempts,
+    )
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_pipelines_xadd_and_bulk_acknowledges(monkeypatch):
+    pipeline = _Pipeline()
+    redis = SimpleNamespace(pipeline=lambda transaction: pipeline)
+    collection = SimpleNamespace(
+        bulk_write=AsyncMock(return_value=SimpleNamespace(modified_count=3))
+    )
+    monkeypatch.setattr(stream_module, "get_redis", lambda: redis)
+    monkeypatch.setattr(
+        AlertStreamOutboxModel,
+        "get_motor_collection",
+        staticmethod(lambda: collection),
+    )
+
+    published = await AlertStreamService.publish_batch(
+        [_outbox(index) for index in range(3)],
+        "worker-1",
+    )
+
+    assert published == 3
+    assert [fields["event_id"] for _, fields in pipeline.commands] == [
+        "event-0",
+        "event-1",
+        "event-2",
+    ]
+    operations = collection.bulk_write.await_args.args[0]
+    assert [operation._doc["$set"]["payload.stream_id"] for operation in operations] == [
+        "100-0",
+        "100-1",
+        "100-2",
+    ]
+    assert operations[0]._filter["claimed_by"] == "worker-1"
+
+
+@pytest.mark.asyncio
+async def test_publish_batch_schedules_retry_when_pipeline_fails(monkeypatch):
+    redis = SimpleNamespace(pipeline=lambda transaction: _Pipeline(fail=True))
+    collection = SimpleNamespace(bulk_write=AsyncMock())
+    monkeypatch.setattr(stream_module, "get_redis", lambda: redis)
+    monkeypatch.setattr(
+        AlertStreamOutboxModel,
+        "get_motor_collection",
+        staticmethod(lambda: collection),
+    )
+
+    published = await AlertStreamService.publish_batch(
+        [_outbox(0), _outbox(1, attempts=10)],
+        "worker-1",
+    )
+
+    assert published == 0
+    operations = collection.bulk_write.await_args.args[0]
+    assert operations[0]._doc["$set"]["status"] == AlertOutboxStatusEnum.PENDING.value
+    assert operations[1]._doc["$set"]["status"] == AlertOutboxStatusEnum.FAILED.value
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from app.service.alert.observation_inbox import AlertObservationInboxService
+from app.service.alert.worker import AlertWorkerService
+
+
+@pytest.mark.asyncio
+async def test_consume_observations_acks_batch_and_retries_failures(monkeypatch):
+    items = [
+        SimpleNamespace(
+            id=f"inbox-{index}",
+            observation=f"observation-{index}",
+            attempts=1,
+            claim_token="claim-1",
+        )
+        for index in range(3)
+    ]
+    failure = ValueError("观测无效")
+    claim_batch = AsyncMock(return_value=items)
+    mark_processed_many = AsyncMock(return_value=2)
+    mark_failed = AsyncMock(return_value=True)
+    monkeypatch.setattr(AlertObservationInboxService, "claim_batch", claim_batch)
+    monkeypatch.setattr(
+        AlertObservationInboxService,
+        "mark_processed_many",
+        mark_processed_many,
+    )
+    monkeypatch.setattr(AlertObservationInboxService, "mark_failed", mark_failed)
+    worker = AlertWorkerService("worker-1")
+    worker.engine.process_observations = AsyncMock(return_value=[1, failure, 0])
+
+    processed = await worker.consume_observations(limit=3)
+
+    assert processed == 2
+    claim_batch.assert_awaited_once_with("worker-1", 3)
+    worker.engine.process_observations.assert_awaited_once_with(
+        ["observation-0", "observation-1", "observation-2"],
+        realtime_only=True,
+    )
+    mark_processed_many.assert_awaited_once_with(
+        ["inbox-0", "inbox-2"],
+        "worker-1",
+        "claim-1",
+    )
+    mark_failed.assert_awaited_once_with("inbox-1", "worker-1", failure, 1)
+
+
+@pytest.mark.asyncio
+async def test_consume_observations_fails_whole_batch_when_flush_fails(
+    monkeypatch,
+):
+    items = [
+        SimpleNamespace(
+            id=f"inbox-{index}",
+            observation=f"observation-{index}",
+            attempts=2,
+            claim_token="claim-1",
+        )
+        for index in range(2)
+    ]
+    monkeypatch.setattr(
+        AlertObservationInboxService,
+        "claim_batch",
+        AsyncMock(return_value=items),
+    )
+    mark_processed_many = AsyncMock(return_value=0)
+    mark_failed = AsyncMock(return_value=True)
+    monkeypatch.setattr(
+        AlertObservationInboxService,
+        "mark_processed_many",
+        mark_processed_many,
+    )
+    monkeypatch.setattr(AlertObservationInboxService, "mark_failed", mark_failed)
+    worker = AlertWorkerService("worker-1")
+    worker.engine.process_observations = AsyncMock(
+        side_effect=RuntimeError("bulk_write 失败")
+    )
+
+    processed = await worker.consume_observations()
+
+    assert processed == 0
+    assert mark_failed.await_count == 2
+    mark_processed_many.assert_awaited_once_with([], "worker-1", "claim-1")
@@ -1,4 +1,5 @@
-from datetime import datetime, timezone
+import asyncio
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
 import pytest
@@ -20,6 +21,7 @@ from app.service.action.schedule import (
     validate_blueprint_params,
     validate_cron_expression,
 )
+from app.service.action.schedule_engine import ActionScheduleHeapEngine
 
 
 class _Schedule(SimpleNamespace):
@@ -294,3 +296,97 @@ async def test_lock_contention_does_not_read_or_trigger_schedule(monkeypatch):
     monkeypatch.setattr(ActionScheduleModel, "find_one", staticmethod(fail_find))
 
     assert await ActionScheduleService.trigger_due_schedule("schedule-1") is None
+
+
+def test_heap_engine_pops_only_current_due_entries():
+    engine = ActionScheduleHeapEngine(concurrency=2, resync_seconds=300)
+    base = datetime(2026, 7, 20, 1, tzinfo=timezone.utc)
+    engine.upsert("late", base + timedelta(minutes=5))
+    engine.upsert("early", base)
+    engine.upsert("moved", base)
+    engine.upsert("moved", base + timedelta(hours=1))
+    engine.upsert("removed", base)
+    engine.upsert("removed", None)
+
+    assert engine.next_due_at() == base
+    assert engine.pop_due(base + timedelta(minutes=1)) == ["early"]
+    assert engine.next_due_at() == base + timedelta(minutes=5)
+    assert len(engine) == 2
+
+
+@pytest.mark.asyncio
+async def test_heap_engine_triggers_with_bounded_pool_and_reschedules(monkeypatch):
+    now = datetime.now(timezone.utc)
+    next_run = now + timedelta(hours=1)
+    running = 0
+    peak = 0
+
+    async def trigger(schedule_id, _now):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        return f"action-{schedule_id}"
+
+    async def find_schedule(query):
+        return _schedule(id=query["_id"], next_run_at=next_run, is_deleted=False)
+
+    monkeypatch.setattr(
+        ActionScheduleService,
+        "trigger_due_schedule",
+        staticmethod(trigger),
+    )
+    monkeypatch.setattr(ActionScheduleModel, "find_one", staticmethod(find_schedule))
+    engine = ActionScheduleHeapEngine(concurrency=2, resync_seconds=300)
+    for index in range(5):
+        engine.upsert(f"schedule-{index}", now - timedelta(seconds=1))
+
+    assert engine.dispatch_due(now) == 5
+    await asyncio.gather(*list(engine._tasks))
+
+    assert peak == 2
+    assert engine.triggered == 5
+    assert engine.next_due_at() == next_run
+    assert len(engine) == 5
+
+
+@pytest.mark.asyncio
+async def test_heap_engine_recovers_ready_actions_on_poll_interval(monkeypatch):
+    recovered = 0
+    stop_event = asyncio.Event()
+
+    async def recover_ready_actions():
+        nonlocal recovered
+        recovered += 1
+        if recovered >= 3:
+            stop_event.set()
+        return 0
+
+    async def heartbeat(_now):
+        return None
+
+    async def listen_changes():
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(
+        ActionScheduleService,
+        "recover_ready_actions",
+        staticmethod(recover_ready_actions),
+    )
+    monkeypatch.setattr(ActionScheduleService, "heartbeat", staticmethod(heartbeat))
+    engine = ActionScheduleHeapEngine(resync_seconds=300, recover_seconds=0.01)
+    rebuilds = 0
+
+    async def rebuild():
+        nonlocal rebuilds
+        rebuilds += 1
+        return 0
+
+    engine.rebuild = rebuild
+    engine.listen_changes = listen_changes
+
+    await asyncio.wait_for(engine.run(stop_event), timeout=2)
+
+    assert recovered == 3
+    assert rebuilds == 1
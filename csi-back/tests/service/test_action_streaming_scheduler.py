@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 from types import SimpleNamespace
 from unittest.mock import AsyncMock
@@ -351,6 +352,64 @@ async def test_ready_reconciliation_rotates_across_actions(monkeypatch) -> None:
     assert queries[1]["_id"] == {"$gt": "node-instance-1"}
 
 
+@pytest.mark.asyncio
+async def test_schedule_ready_nodes_dispatches_concurrently_with_isolation(
+    monkeypatch,
+) -> None:
+    action = SimpleNamespace(id="action-1", status=ActionFlowStatusEnum.RUNNING)
+    observer = SimpleNamespace(
+        id="observer",
+        node_id="node-0",
+        extension_spec_snapshot=SimpleNamespace(execution_policy="debug.observer"),
+    )
+    nodes = [
+        SimpleNamespace(
+            id=f"node-instance-{index}",
+            node_id=f"node-{index + 1}",
+            extension_spec_snapshot=None,
+        )
+        for index in range(6)
+    ]
+    running = 0
+    peak = 0
+    calls = []
+
+    async def run_node(node_instance_id, action_id, *, _node_instance, _action):
+        nonlocal running, peak
+        calls.append(node_instance_id)
+        assert _node_instance.id == node_instance_id
+        assert _action is action
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0)
+        running -= 1
+        if node_instance_id == "node-instance-2":
+            raise RuntimeError("boom")
+        return True
+
+    monkeypatch.setattr(
+        ActionInstanceNodeModel,
+        "find",
+        staticmethod(lambda _query: _FindMany([*nodes, observer])),
+    )
+    monkeypatch.setattr(ActionInstanceService, "run_node", staticmethod(run_node))
+    monkeypatch.setattr(
+        action_service.settings,
+        "ACTION_NODE_DISPATCH_CONCURRENCY",
+        3,
+        raising=False,
+    )
+
+    dispatched = await ActionInstanceService.schedule_ready_nodes(
+        "action-1",
+        _action=action,
+    )
+
+    assert dispatched == 6
+    assert calls[0] == "observer"
+    assert peak == 3
+
+
 @pytest.mark.asyncio
 async def test_streaming_reference_is_ready_after_activation(monkeypatch) -> None:
     updates = await _run_readiness_case(
@@ -446,6 +446,168 @@ async def test_publish_failure_requeues_source_message(monkeypatch):
     assert events == ["nack:True", "close"]
 
 
+class _FakeBatch:
+    def __init__(self, messages, events: list[str]):
+        self.channel = SimpleNamespace(is_closed=False)
+        self.messages = messages
+        self.events = events
+        self.acked = 0
+
+    async def ack_through(self, count):
+        self.events.append(f"ack_through:{count}")
+        self.acked = count
+
+    async def nack_pending(self, *, requeue=True):
+        self.events.append(f"nack_pending:{requeue}")
+
+    async def close(self):
+        self.events.append("close")
+
+
+@pytest.mark.asyncio
+async def test_batch_publishes_and_records_once_before_multi_ack(monkeypatch):
+    events: list[str] = []
+    messages = [_message(body=b"a"), _message(body=b"bb"), _message(body=b"ccc")]
+    batch = _FakeBatch(messages, events)
+    bridge = _bridge()
+
+    monkeypatch.setattr(
+        ReferenceBridgeService,
+        "_get_owned_bridge",
+        AsyncMock(return_value=bridge),
+    )
+    monkeypatch.setattr(rabbitmq, "get_reference_batch", AsyncMock(return_value=batch))
+
+    async def _publish(_channel, published, queues):
+        assert queues == ["parent-q"]
+        assert list(published) == messages
+        events.append("confirmed")
+
+    async def _record(**kwargs):
+        assert kwargs["message_count"] == 3
+        assert kwargs["byte_count"] == 6
+        events.append("recorded")
+
+    monkeypatch.setattr(rabbitmq, "publish_reference_batch", _publish)
+    monkeypatch.setattr(ReferenceBridgeService, "_record_forwarded", _record)
+
+    result = await ReferenceBridgeService.process_batch(
+        bridge_id=bridge.id,
+        worker_id="worker-1",
+        lease_token="lease-1",
+        max_messages=10,
+    )
+
+    assert result == ReferenceBridgeStepResult.FORWARDED
+    assert events == ["confirmed", "recorded", "ack_through:3", "close"]
+
+
+@pytest.mark.asyncio
+async def test_batch_handles_trailing_control_after_data(monkeypatch):
+    events: list[str] = []
+    control = _message(
+        message_type=rabbitmq.REFERENCE_EOS_TYPE,
+        stream_id="source-1",
+        producer_id="run-1",
+    )
+    batch = _FakeBatch([_message(), control], events)
+    bridge = _bridge()
+
+    monkeypatch.setattr(
+        ReferenceBridgeService,
+        "_get_owned_bridge",
+        AsyncMock(return_value=bridge),
+    )
+    monkeypatch.setattr(rabbitmq, "get_reference_batch", AsyncMock(return_value=batch))
+    monkeypatch.setattr(
+        rabbitmq,
+        "publish_reference_batch",
+        AsyncMock(side_effect=lambda *_args: events.append("confirmed")),
+    )
+    monkeypatch.setattr(
+        ReferenceBridgeService,
+        "_record_forwarded",
+        AsyncMock(side_effect=lambda **_kwargs: events.append("recorded")),
+    )
+
+    async def _handle_control(*, delivery, control_kind, **_kwargs):
+        assert delivery.message is control
+        assert delivery.owns_channel is False
+        events.append(f"control:{control_kind}")
+        return ReferenceBridgeStepResult.CONTROL
+
+    monkeypatch.setattr(ReferenceBridgeService, "_handle_control", _handle_control)
+
+    result = await ReferenceBridgeService.process_batch(
+        bridge_id=bridge.id,
+        worker_id="worker-1",
+        lease_token="lease-1",
+        max_messages=10,
+    )
+
+    assert result == ReferenceBridgeStepResult.CONTROL
+    assert events == [
+        "confirmed",
+        "recorded",
+        "ack_through:1",
+        "control:eos",
+        "close",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_publish_failure_requeues_pending_messages(monkeypatch):
+    events: list[str] = []
+    batch = _FakeBatch([_message(), _message()], events)
+    bridge = _bridge()
+
+    monkeypatch.setattr(
+        ReferenceBridgeService,
+        "_get_owned_bridge",
+        AsyncMock(return_value=bridge),
+    )
+    monkeypatch.setattr(rabbitmq, "get_reference_batch", AsyncMock(return_value=batch))
+    monkeypatch.setattr(
+        rabbitmq,
+        "publish_reference_batch",
+        AsyncMock(side_effect=RuntimeError("confirm失败")),
+    )
+
+    with pytest.raises(RuntimeError, match="confirm失败"):
+        await ReferenceBridgeService.process_batch(
+            bridge_id=bridge.id,
+            worker_id="worker-1",
+            lease_token="lease-1",
+            max_messages=10,
+        )
+
+    assert events == ["nack_pending:True", "close"]
+
+
+@pytest.mark.asyncio
+async def test_run_claimed_renews_lease_on_interval_not_per_batch(monkeypatch):
+    renew = AsyncMock(return_value=True)
+    monkeypatch.setattr(ReferenceBridgeService, "renew_lease", renew)
+    results = [ReferenceBridgeStepResult.FORWARDED] * 5 + [
+        ReferenceBridgeStepResult.COMPLETED
+    ]
+    process_batch = AsyncMock(side_effect=results)
+    monkeypatch.setattr(ReferenceBridgeService, "process_batch", process_batch)
+
+    result = await ReferenceBridgeService.run_claimed(
+        bridge_id="bridge-1",
+        worker_id="worker-1",
+        lease_token="lease-1",
+        lease_seconds=30,
+        batch_size=100,
+    )
+
+    assert result == ReferenceBridgeStepResult.COMPLETED
+    assert renew.await_count == 1
+    assert process_batch.await_count == 6
+    assert process_batch.await_args.kwargs["max_messages"] == 100
+
+
 @pytest.mark.asyncio
 async def test_abort_is_persisted_before_source_ack(monkeypatch):
     events: list[str] = []
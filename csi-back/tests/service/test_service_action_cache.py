@@ -1,8 +1,18 @@
 """app.service.action 中与缓存键、序列化相关的轻量测试（不涉及工作流与 DB）。"""
 
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
 from pydantic import BaseModel
 
+from app.models.action.action import ActionInstanceModel
 from app.service.action import ActionInstanceService
+from app.service.action import graph_cache as graph_cache_mod
+from app.service.action.graph_cache import (
+    BLUEPRINT_GRAPH_INVALIDATE_CHANNEL,
+    WorkflowGraphCache,
+)
 
 
 def test_action_instance_cache_key_format():
@@ -17,3 +27,60 @@ def test_action_instance_serialize_model_json():
 
     s = ActionInstanceService._serialize_model(M(x=1))
     assert '"x":1' in s
+
+
+@pytest.mark.asyncio
+async def test_action_graph_is_compiled_once_per_action(monkeypatch):
+    # 冻结执行计划编译后，后续前驱/后继查询不再读取行动文档
+    edge = SimpleNamespace(
+        source="node-1",
+        source_port_id="out",
+        target="node-2",
+        target_port_id="in",
+    )
+    action = SimpleNamespace(
+        id="action-graph",
+        blueprint_id="bp-1",
+        blueprint_snapshot=object(),
+        execution_plan_snapshot=SimpleNamespace(
+            nodes=[SimpleNamespace(id="node-1"), SimpleNamespace(id="node-2")],
+            edges=[edge],
+        ),
+    )
+    find_one = AsyncMock(return_value=action)
+    monkeypatch.setattr(ActionInstanceModel, "find_one", find_one)
+
+    next_nodes = await ActionInstanceService.find_next_node("action-graph", "node-1")
+    previous = await ActionInstanceService.find_all_previous_nodes(
+        "action-graph",
+        "node-2",
+    )
+
+    assert list(next_nodes.values()) == [[("out", "in")]]
+    assert previous == ["node-1"]
+    find_one.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_blueprint_graph_invalidation_evicts_and_broadcasts(monkeypatch):
+    # 蓝图编辑后本地条目失效，并通过 Redis Pub/Sub 通知其他进程
+    redis_client = SimpleNamespace(publish=AsyncMock(), delete=AsyncMock())
+    monkeypatch.setattr(graph_cache_mod, "get_redis", lambda: redis_client)
+    blueprint = SimpleNamespace(
+        id="bp-graph",
+        updated_at=None,
+        graph=SimpleNamespace(
+            nodes=[SimpleNamespace(id="a"), SimpleNamespace(id="b")],
+            edges=[SimpleNamespace(source="a", target="b")],
+        ),
+    )
+    compiled = WorkflowGraphCache.get_blueprint_graph(blueprint)
+    assert WorkflowGraphCache.get_blueprint_graph(blueprint) is compiled
+
+    await WorkflowGraphCache.invalidate_blueprint("bp-graph")
+
+    assert WorkflowGraphCache.get_blueprint_graph(blueprint) is not compiled
+    redis_client.publish.assert_awaited_once_with(
+        BLUEPRINT_GRAPH_INVALIDATE_CHANNEL,
+        "bp-graph",
+    )
@@ -1,10 +1,14 @@
 """app.service.search 查询构建与 ES 辅助函数测试。"""
 
 from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
 
 from app.schemas.constants import SearchModeEnum
 from app.schemas.search import EntityKeywordSearchParams, EntitySearchRequestSchema
 from app.service import search as search_svc
+from app.service.platform_cache import PlatformMetadataCache
 
 
 def test_get_es_total():
@@ -105,3 +109,166 @@ def test_keyword_list_query_body_with_keywords():
     assert "highlight" in body
     must = body["query"]["bool"]["must"]
     assert any("must" in m.get("bool", {}) for m in must if "bool" in m)
+
+
+class _PlatformQuery:
+    def __init__(self, docs):
+        self.docs = docs
+
+    async def to_list(self):
+        return self.docs
+
+
+@pytest.mark.asyncio
+async def test_hits_to_search_results_prefetches_platforms_once(monkeypatch):
+    queries = []
+
+    def find(query):
+        queries.append(query)
+        names = query["name"]["$in"]
+        docs = [SimpleNamespace(id=f"pid-{name}", name=name) for name in names if name != "missing"]
+        return _PlatformQuery(docs)
+
+    PlatformMetadataCache.clear()
+    monkeypatch.setattr("app.service.platform_cache.PlatformModel.find", find)
+    hits = [
+        {
+            "_id": f"u{index}",
+            "_source": {"platform": name, "title": "t", "update_at": "2024-01-01T00:00:00Z"},
+        }
+        for index, name in enumerate(["a", "b", "a", "missing", "b"])
+    ]
+
+    results = await search_svc.hits_to_search_results(hits)
+    assert [item.platform_id for item in results] == ["pid-a", "pid-b", "pid-a", None, "pid-b"]
+    assert queries == [{"name": {"$in": ["a", "b", "missing"]}}]
+
+    # 第二页命中缓存（包括不存在的平台），不再回源。
+    await search_svc.hits_to_search_results(hits)
+    assert len(queries) == 1
+
+    await PlatformMetadataCache.invalidate("missing")
+    await search_svc.hits_to_search_results(hits)
+    assert queries[-1] == {"name": {"$in": ["missing"]}}
+    PlatformMetadataCache.clear()
+
+
+class _RecordingES:
+    def __init__(self):
+        self.bodies = []
+
+    async def search(self, index, body):
+        self.bodies.append(body)
+        return {"hits": {"total": {"value": 0}, "hits": []}}
+
+
+def _assert_vector_free(body):
+    source = body["_source"]
+    assert "clean_content_vector" in source["excludes"]
+    assert source["includes"]
+    assert not any("vector" in field for field in source["includes"])
+
+
+@pytest.mark.asyncio
+async def test_list_queries_never_fetch_vectors(monkeypatch):
+    from app.api.v1.endpoints import timeline as timeline_ep
+    from app.schemas.constants import EntityType
+    from app.schemas.general import PageParamsSchema
+
+    async def fake_embed(*_args, **_kwargs):
+        return [0.1, 0.2]
+
+    monkeypatch.setattr(search_svc, "embed_query_async", fake_embed)
+    es = _RecordingES()
+    for mode in (SearchModeEnum.KEYWORD, SearchModeEnum.VECTOR, SearchModeEnum.HYBRID):
+        await search_svc.search_entity(
+            es, EntitySearchRequestSchema(keywords="x", search_mode=mode)
+        )
+    await search_svc.search_entity(es, EntitySearchRequestSchema())
+    await search_svc.search_entities_keyword(es, EntityKeywordSearchParams(keywords=["x"]))
+    await search_svc.search_entities_keyword(es, EntityKeywordSearchParams())
+    monkeypatch.setattr(timeline_ep, "get_es", lambda: es)
+    await timeline_ep.get_timeline(
+        entity_type=EntityType.ARTICLE,
+        source_id="s1",
+        params=PageParamsSchema(),
+    )
+
+    assert len(es.bodies) == 8
+    for body in es.bodies:
+        _assert_vector_free(body)
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+    async def incr(self, key):
+        self.store[key] = str(int(self.store.get(key) or 0) + 1)
+
+
+class _HybridES:
+    def __init__(self, docs):
+        self.docs = docs
+        self.bodies = []
+
+    def _hit(self, doc_id):
+        return {"_index": "article", "_id": doc_id, "_source": {"uuid": doc_id, "title": doc_id, "update_at": "2024-01-01T00:00:00Z"}}
+
+    async def search(self, index, body):
+        self.bodies.append(body)
+        query = body["query"]
+        if "knn" in query:
+            ids = list(reversed(self.docs))
+        elif "filter" in query.get("bool", {}):
+            wanted = query["bool"]["filter"][0]["ids"]["values"]
+            # ES 按相关度返回，顺序与缓存的融合顺序无关。
+            ids = sorted(wanted)
+        else:
+            ids = list(self.docs)
+        hits = [self._hit(doc_id) for doc_id in ids[: body["size"]]]
+        return {"hits": {"total": {"value": len(ids)}, "hits": hits}}
+
+
+@pytest.mark.asyncio
+async def test_hybrid_pages_reuse_cached_fused_ids(monkeypatch):
+    redis = _FakeRedis()
+    embeds = []
+
+    async def fake_embed(*args, **_kwargs):
+        embeds.append(args)
+        return [0.1]
+
+    monkeypatch.setattr(search_svc, "get_redis", lambda: redis)
+    monkeypatch.setattr(search_svc, "embed_query_async", fake_embed)
+    es = _HybridES([f"d{index:02d}" for index in range(30)])
+
+    def params(page):
+        return EntitySearchRequestSchema(
+            keywords="  x  y ", search_mode=SearchModeEnum.HYBRID, page=page, page_size=5
+        )
+
+    first = await search_svc.search_entity(es, params(1))
+    assert len(es.bodies) == 2 and len(embeds) == 1
+
+    second = await search_svc.search_entity(es, params(2))
+    assert len(es.bodies) == 3 and len(embeds) == 1
+    assert es.bodies[-1]["query"]["bool"]["filter"][0]["ids"]["values"] == [
+        item.uuid for item in second.items
+    ]
+    assert second.total == first.total
+
+    # 同一结果集的翻页顺序稳定，且与全量融合后的切片一致。
+    redis.store.clear()
+    uncached = await search_svc.search_hybrid(_HybridES(es.docs), params(2))
+    assert [item.uuid for item in uncached.items] == [item.uuid for item in second.items]
+
+    await search_svc.bump_search_index_generation()
+    await search_svc.search_entity(es, params(2))
+    assert len(embeds) == 3
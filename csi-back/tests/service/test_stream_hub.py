@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+import app.service.stream_hub as hub_module
+from app.service.stream_hub import RedisStreamHub
+
+
+class _FakeStreamRedis:
+    """按 Redis Stream 语义保存条目，并记录阻塞读取次数。"""
+
+    def __init__(self):
+        self.entries: list[tuple[str, dict[str, str]]] = []
+        self.blocking_reads = 0
+        self._changed = asyncio.Condition()
+
+    async def add(self, data: str) -> str:
+        stream_id = f"{len(self.entries) + 1}-0"
+        self.entries.append((stream_id, {"event": "alert.updated", "data": data}))
+        async with self._changed:
+            self._changed.notify_all()
+        return stream_id
+
+    def _after(self, cursor: str, count: int):
+        position = int(cursor.split("-", 1)[0])
+        return self.entries[position : position + count]
+
+    async def xrevrange(self, key, count=1):
+        return self.entries[-count:][::-1]
+
+    async def xread(self, streams, count=100, block=None):
+        (key, cursor), = streams.items()
+        rows = self._after(cursor, count)
+        if not rows and block is not None:
+            self.blocking_reads += 1
+            async with self._changed:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), block / 1000)
+                except TimeoutError:
+                    return []
+            rows = self._after(cursor, count)
+        return [(key, rows)] if rows else []
+
+
+@pytest.mark.asyncio
+async def test_subscribers_share_one_reader_per_stream(monkeypatch):
+    redis = _FakeStreamRedis()
+    monkeypatch.setattr(hub_module, "get_redis", lambda: redis)
+    hub = RedisStreamHub()
+    first = hub.subscribe("stream", "0-0")
+    second = hub.subscribe("stream", "0-0")
+    assert await first.read(timeout=0.05) == []
+    assert await second.read(timeout=0.05) == []
+
+    await redis.add("a")
+    await redis.add("b")
+    first_messages = await first.read(timeout=1)
+    second_messages = await second.read(timeout=1)
+
+    assert [item[1]["data"] for item in first_messages] == ["a", "b"]
+    assert [item[1]["data"] for item in second_messages] == ["a", "b"]
+    assert hub.reader_count() == 1
+    await first.close()
+    await second.close()
+    assert hub.reader_count() == 0
+
+
+@pytest.mark.asyncio
+async def test_slow_subscriber_resumes_from_cursor_after_overflow(monkeypatch):
+    redis = _FakeStreamRedis()
+    monkeypatch.setattr(hub_module, "get_redis", lambda: redis)
+    hub = RedisStreamHub()
+    await redis.add("old")
+    subscription = hub.subscribe("stream", "1-0", maxsize=2)
+    assert await subscription.read(timeout=0.05) == []
+
+    for index in range(5):
+        await redis.add(str(index))
+    await asyncio.sleep(0.05)
+    received = []
+    while len(received) < 5:
+        received.extend(await subscription.read(timeout=0.2, count=2))
+
+    assert subscription.overflows >= 1
+    assert [item[1]["data"] for item in received] == ["0", "1", "2", "3", "4"]
+    assert subscription.cursor == "6-0"
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_catch_up_read_keeps_subscription_lagging(monkeypatch):
+    redis = _FakeStreamRedis()
+    monkeypatch.setattr(hub_module, "get_redis", lambda: redis)
+    hub = RedisStreamHub()
+    await redis.add("missed-1")
+    await redis.add("missed-2")
+    subscription = hub.subscribe("stream", "0-0")
+    xread = redis.xread
+    failures = []
+
+    async def flaky_xread(streams, count=100, block=None):
+        if block is None and not failures:
+            failures.append(streams)
+            raise ConnectionError("redis unavailable")
+        return await xread(streams, count=count, block=block)
+
+    redis.xread = flaky_xread
+    with pytest.raises(ConnectionError):
+        await subscription.read(timeout=0.05)
+
+    assert subscription.lagging
+    messages = await subscription.read(timeout=0.05)
+    assert [item[1]["data"] for item in messages] == ["missed-1", "missed-2"]
+    assert subscription.cursor == "2-0"
+    await hub.close()
+
+
+@pytest.mark.asyncio
+async def test_entry_appended_before_reader_starts_is_delivered(monkeypatch):
+    redis = _FakeStreamRedis()
+    monkeypatch.setattr(hub_module, "get_redis", lambda: redis)
+    hub = RedisStreamHub()
+    subscription = hub.subscribe("stream", "0-0")
+    xread = redis.xread
+
+    async def xread_then_append(streams, count=100, block=None):
+        rows = await xread(streams, count=count, block=block)
+        if block is None and not redis.entries:
+            # 追赶读取返回空之后、共享读取者启动之前写入新事件。
+            redis.entries.append(("1-0", {"event": "alert.updated", "data": "gap"}))
+        return rows
+
+    redis.xread = xread_then_append
+    messages = await subscription.read(timeout=0.2)
+
+    assert not subscription.lagging
+    if not messages:
+        messages = await subscription.read(timeout=1)
+    assert [item[1]["data"] for item in messages] == ["gap"]
+    await hub.close()
@@ -1,3 +1,11 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import app.utils.async_fetch as fetch_mod
 from app.utils.async_fetch import unwrap_response
 
 
@@ -16,3 +24,134 @@ def test_unwrap_response_dict_without_data_key():
 def test_unwrap_response_extracts_data():
     """dict 含 data 时返回 data 字段内容。"""
     assert unwrap_response({"data": {"a": 1}}) == {"a": 1}
+
+
+@pytest.fixture
+async def file_server():
+    payload = bytes(range(256)) * 1024
+
+    async def whole(_request):
+        return web.Response(body=payload)
+
+    async def chunked(_request):
+        response = web.StreamResponse()
+        await response.prepare(_request)
+        for index in range(0, len(payload), 4096):
+            await response.write(payload[index: index + 4096])
+        await response.write_eof()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/whole", whole)
+    app.router.add_get("/chunked", chunked)
+    server = TestServer(app)
+    await server.start_server()
+    yield server, payload
+    await server.close()
+    await fetch_mod.close_http_sessions()
+
+
+@pytest.mark.asyncio
+async def test_download_reuses_shared_session(file_server):
+    server, payload = file_server
+    first = await fetch_mod.async_download_file(str(server.make_url("/whole")), use_proxy=False)
+    session = fetch_mod.get_http_session()
+    second = await fetch_mod.async_download_file(str(server.make_url("/chunked")), use_proxy=False)
+    assert first == second == payload
+    assert fetch_mod.get_http_session() is session
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("path", ["/whole", "/chunked"])
+async def test_download_enforces_max_size(file_server, path):
+    server, payload = file_server
+    with pytest.raises(fetch_mod.DownloadTooLargeError):
+        await fetch_mod.async_download_file(
+            str(server.make_url(path)), use_proxy=False, max_size=len(payload) - 1
+        )
+
+
+@pytest.mark.asyncio
+async def test_download_to_path_streams_and_cleans_up(file_server, tmp_path):
+    server, payload = file_server
+    target = tmp_path / "out.bin"
+    written = await fetch_mod.download_to_path(
+        str(server.make_url("/chunked")), str(target), use_proxy=False
+    )
+    assert written == len(payload)
+    assert target.read_bytes() == payload
+
+    with pytest.raises(fetch_mod.DownloadTooLargeError):
+        await fetch_mod.download_to_path(
+            str(server.make_url("/chunked")), str(target), use_proxy=False, max_size=10
+        )
+    assert not target.exists()
+
+
+@pytest.mark.asyncio
+async def test_download_to_path_runs_file_io_in_threads(file_server, tmp_path, monkeypatch):
+    server, payload = file_server
+    target = tmp_path / "out.bin"
+    to_thread = fetch_mod.asyncio.to_thread
+    calls = []
+
+    async def recording_to_thread(func, *args, **kwargs):
+        calls.append(getattr(func, "__name__", ""))
+        return await to_thread(func, *args, **kwargs)
+
+    monkeypatch.setattr(fetch_mod.asyncio, "to_thread", recording_to_thread)
+    with pytest.raises(fetch_mod.DownloadTooLargeError):
+        await fetch_mod.download_to_path(
+            str(server.make_url("/chunked")), str(target), use_proxy=False, max_size=10
+        )
+
+    assert calls[0] == "open"
+    assert calls[-2:] == ["close", "remove"]
+    assert not target.exists()
+
+
+def test_session_is_replaced_and_closed_after_loop_change():
+    async def open_session():
+        return fetch_mod.get_http_session("loop-test")
+
+    async def reopen_session():
+        session = fetch_mod.get_http_session("loop-test")
+        await fetch_mod.close_http_sessions()
+        return session
+
+    old = asyncio.run(open_session())
+    new = asyncio.run(reopen_session())
+
+    assert new is not old
+    assert old.closed and new.closed
+    assert isinstance(new.cookie_jar, aiohttp.DummyCookieJar)
+
+
+@pytest.mark.asyncio
+async def test_shared_session_does_not_carry_cookies_between_calls():
+    seen_cookies = []
+
+    async def set_cookie(_request):
+        response = web.json_response({})
+        response.set_cookie("session", "secret")
+        return response
+
+    async def echo(request):
+        seen_cookies.append(dict(request.cookies))
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_get("/login", set_cookie)
+    app.router.add_get("/echo", echo)
+    server = TestServer(app)
+    await server.start_server()
+    try:
+        # 默认 CookieJar 不接受 IP 地址设置的 Cookie，因此按主机名访问。
+        base_url = f"http://localhost:{server.port}"
+        await fetch_mod.async_get(f"{base_url}/login")
+        await fetch_mod.async_get(f"{base_url}/echo")
+    finally:
+        await server.close()
+        await fetch_mod.close_http_sessions()
+
+    assert seen_cookies == [{}]
@@ -1,5 +1,8 @@
 """app.utils.cos 生命周期与客户端获取测试（不连真实 COS）。"""
 
+import asyncio
+import io
+
 import pytest
 
 import app.utils.cos as cos_mod
@@ -23,3 +26,114 @@ async def test_get_cos_client_requires_init():
     with pytest.raises(RuntimeError, match="未初始化"):
         async with cos_mod.get_cos_client():
             pass
+
+
+class _FakeBody:
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self):
+        return self.data
+
+    def close(self):
+        pass
+
+
+class _FakeS3:
+    def __init__(self, stored=b""):
+        self.stored = stored
+        self.parts = {}
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def put_object(self, **kwargs):
+        self.calls.append("put_object")
+        self.stored = kwargs["Body"]
+
+    async def create_multipart_upload(self, **kwargs):
+        self.calls.append("create_multipart_upload")
+        return {"UploadId": "u1"}
+
+    async def upload_part(self, **kwargs):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        self.parts[kwargs["PartNumber"]] = kwargs["Body"]
+        return {"ETag": f"e{kwargs['PartNumber']}"}
+
+    async def complete_multipart_upload(self, **kwargs):
+        self.calls.append("complete_multipart_upload")
+        numbers = [part["PartNumber"] for part in kwargs["MultipartUpload"]["Parts"]]
+        self.stored = b"".join(self.parts[number] for number in numbers)
+
+    async def abort_multipart_upload(self, **kwargs):
+        self.calls.append("abort_multipart_upload")
+
+    async def head_object(self, **kwargs):
+        return {"ContentLength": len(self.stored), "ETag": "x"}
+
+    async def get_object(self, **kwargs):
+        start, end = kwargs["Range"].removeprefix("bytes=").split("-")
+        return {"Body": _FakeBody(self.stored[int(start): int(end) + 1])}
+
+
+async def _chunks(data, size):
+    for index in range(0, len(data), size):
+        yield data[index: index + size]
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_uses_multipart_with_bounded_concurrency(monkeypatch):
+    client = _FakeS3()
+    monkeypatch.setattr(cos_mod, "cos_client", client)
+    monkeypatch.setattr(cos_mod, "MIN_MULTIPART_PART_SIZE", 4)
+    data = bytes(range(50))
+
+    await cos_mod.upload_stream(_chunks(data, 3), "k", bucket_name="b", part_size=8, concurrency=2)
+
+    assert client.calls == ["create_multipart_upload", "complete_multipart_upload"]
+    assert client.stored == data
+    assert sorted(client.parts) == list(range(1, 8))
+    assert client.max_in_flight <= 2
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_aborts_multipart_on_source_error(monkeypatch):
+    client = _FakeS3()
+    monkeypatch.setattr(cos_mod, "cos_client", client)
+    monkeypatch.setattr(cos_mod, "MIN_MULTIPART_PART_SIZE", 4)
+
+    async def broken():
+        yield b"x" * 10
+        raise OSError("read failed")
+
+    with pytest.raises(OSError):
+        await cos_mod.upload_stream(broken(), "k", bucket_name="b", part_size=4)
+
+    assert client.calls == ["create_multipart_upload", "abort_multipart_upload"]
+
+
+@pytest.mark.asyncio
+async def test_upload_stream_small_payload_uses_single_put(monkeypatch):
+    client = _FakeS3()
+    monkeypatch.setattr(cos_mod, "cos_client", client)
+    monkeypatch.setattr(cos_mod, "MIN_MULTIPART_PART_SIZE", 4)
+
+    await cos_mod.upload_stream(io.BytesIO(b"abc"), "k", bucket_name="b", part_size=8)
+
+    assert client.calls == ["put_object"]
+    assert client.stored == b"abc"
+
+
+@pytest.mark.asyncio
+async def test_download_stream_yields_ranges_in_order(monkeypatch):
+    data = bytes(range(256)) * 3
+    client = _FakeS3(stored=data)
+    monkeypatch.setattr(cos_mod, "cos_client", client)
+
+    parts = [part async for part in cos_mod.download_stream("k", bucket_name="b", part_size=100, concurrency=3)]
+
+    assert b"".join(parts) == data
+    assert len(parts) == 8
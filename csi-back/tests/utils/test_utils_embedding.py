@@ -24,3 +24,97 @@ def test_get_embeddings_client_raises_when_not_initialized():
         assert exc_info.value.status_code == 503
     finally:
         embedding_mod._embeddings_client = prev
+
+
+class _FakeEmbeddings:
+    def __init__(self):
+        self.calls = []
+
+    async def aembed_query(self, text):
+        self.calls.append(text)
+        return [0.5, -0.25, 0.125]
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.store = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+
+
+def test_pack_vector_roundtrip_float16():
+    packed = embedding_mod.pack_vector([0.1, -1.0, 0.0])
+    assert isinstance(packed, str)
+    restored = embedding_mod.unpack_vector(packed)
+    assert restored[1:] == (-1.0, 0.0)
+    assert abs(restored[0] - 0.1) < 1e-3
+
+
+@pytest.mark.asyncio
+async def test_embed_query_uses_local_then_redis_cache(monkeypatch):
+    client = _FakeEmbeddings()
+    redis = _FakeRedis()
+    monkeypatch.setattr(embedding_mod, "_embeddings_client", client)
+    monkeypatch.setattr(embedding_mod, "get_redis", lambda: redis)
+    embedding_mod.clear_embedding_cache()
+
+    first = await embedding_mod.embed_query_async("  hello \n world ", "inst")
+    again = await embedding_mod.embed_query_async("hello world", "inst")
+    assert first == again == [0.5, -0.25, 0.125]
+    assert client.calls == ["Instruct: inst\nQuery:hello world"]
+    assert len(redis.store) == 1
+
+    # 其他进程（本地缓存为空）从 Redis 命中，指令不同则视为不同查询。
+    embedding_mod._local_cache.clear()
+    assert await embedding_mod.embed_query_async("hello world", "inst") == [0.5, -0.25, 0.125]
+    await embedding_mod.embed_query_async("hello world")
+    assert len(client.calls) == 2
+
+    stats = embedding_mod.embedding_cache_stats()
+    assert (stats["local_hits"], stats["redis_hits"], stats["misses"]) == (1, 1, 2)
+    assert stats["hit_rate"] == 0.5
+    embedding_mod.clear_embedding_cache()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_share_one_provider_call(monkeypatch):
+    import asyncio
+
+    client = _FakeEmbeddings()
+    monkeypatch.setattr(embedding_mod, "_embeddings_client", client)
+    monkeypatch.setattr(embedding_mod, "get_redis", lambda: None)
+    embedding_mod.clear_embedding_cache()
+
+    results = await asyncio.gather(*[embedding_mod.embed_query_async("q") for _ in range(5)])
+    assert len(client.calls) == 1
+    assert all(result == results[0] for result in results)
+    assert embedding_mod.embedding_cache_stats()["coalesced"] == 4
+    embedding_mod.clear_embedding_cache()
+
+
+@pytest.mark.asyncio
+async def test_every_cache_tier_returns_same_quantized_vector(monkeypatch):
+    class _PreciseEmbeddings(_FakeEmbeddings):
+        async def aembed_query(self, text):
+            self.calls.append(text)
+            return [0.1, 0.2, 0.3]
+
+    client = _PreciseEmbeddings()
+    redis = _FakeRedis()
+    monkeypatch.setattr(embedding_mod, "_embeddings_client", client)
+    monkeypatch.setattr(embedding_mod, "get_redis", lambda: redis)
+    embedding_mod.clear_embedding_cache()
+
+    from_provider = await embedding_mod.embed_query_async("q")
+    from_local = await embedding_mod.embed_query_async("q")
+    embedding_mod._local_cache.clear()
+    from_redis = await embedding_mod.embed_query_async("q")
+
+    assert len(client.calls) == 1
+    assert from_provider == from_local == from_redis
+    assert from_provider != [0.1, 0.2, 0.3]
+    embedding_mod.clear_embedding_cache()
@@ -1,5 +1,9 @@
 """app.utils.workflow 蓝图图论辅助函数测试。"""
 
+from types import SimpleNamespace
+
+import pytest
+
 from app.models.action.blueprint import (
     ActionBlueprintModel,
     GraphEdgeModel,
@@ -10,7 +14,12 @@ from app.models.action.blueprint import (
     ViewportModel,
 )
 from app.schemas.action.blueprint import GraphSchema
-from app.utils.workflow import count_workflow_paths, find_start_nodes, graph_model2schemas
+from app.utils.workflow import (
+    compile_workflow_graph,
+    count_workflow_paths,
+    find_start_nodes,
+    graph_model2schemas,
+)
 
 
 def _node(nid: str) -> GraphNodeModel:
@@ -77,3 +86,22 @@ def test_graph_model2schemas_shape():
     assert isinstance(sch, GraphSchema)
     assert len(sch.nodes) == 1
     assert sch.viewport.zoom == 0.5
+
+
+def test_compile_workflow_graph_builds_immutable_indexes():
+    # 菱形 A->B/C->D：反向邻接、起点、拓扑序与路径数一次性预计算
+    edges = [
+        SimpleNamespace(source="a", target="b"),
+        SimpleNamespace(source="a", target="c"),
+        SimpleNamespace(source="b", target="d"),
+        SimpleNamespace(source="c", target="d"),
+    ]
+    compiled = compile_workflow_graph(["a", "b", "c", "d"], edges)
+
+    assert compiled.start_node_ids == ("a",)
+    assert compiled.successors("a") == ("b", "c")
+    assert compiled.predecessors("d") == ("b", "c")
+    assert compiled.topological_order == ("a", "b", "c", "d")
+    assert compiled.count_paths() == 2
+    with pytest.raises(TypeError):
+        compiled.adjacency["a"] = ()